@@ -34,7 +34,6 @@ import time
 from queue import LifoQueue
 import threading
 from datetime import datetime
-import subprocess
 import inotify.adapters
 
 project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -53,7 +52,9 @@ from shared.src.lib.utils.storage_path_utils import (
     get_capture_folder_from_device_id
 )
 from shared.src.lib.utils.audio_transcription_utils import check_audio_continuous
+from shared.src.lib.utils.audio_analysis_utils import get_audio_analysis_engine
 from shared.src.lib.utils.zapping_detector_utils import detect_and_record_zapping
+from shared.src.lib.utils.capture_timeline_utils import get_timeline_path, parse_capture_sequence, record_capture
 from detector import detect_issues
 from incident_manager import IncidentManager
 
@@ -143,7 +144,8 @@ class InotifyFrameMonitor:
             
             self.dir_to_info[capture_dir] = {
                 'capture_dir': parent_dir,
-                'capture_folder': capture_folder
+                'capture_folder': capture_folder,
+                'timeline_path': get_timeline_path(parent_dir)  # Resolved once (hot/cold check reads /proc/mounts)
             }
             
             if os.path.exists(capture_dir):
@@ -1372,118 +1374,58 @@ class InotifyFrameMonitor:
                     'segments_checked': segments_used
                 }
             
-            # ✅ Multiple segments: Merge and check
-            logger.info(f"[{capture_folder}] 🔗 Merging {len(segment_files_to_use)} segments for audio analysis")
+            # ✅ Multiple segments: Decode each once and analyze as one timeline (no concat/merge temp files)
+            logger.info(f"[{capture_folder}] 🔗 Analyzing {len(segment_files_to_use)} consecutive segments as one timeline")
             
-            # ✅ Use FIXED filenames (overwrite each time - no space accumulation!)
-            concat_list_path = f'/tmp/{capture_folder}_concat_list.txt'
-            merged_path = f'/tmp/{capture_folder}_audio_check.ts'
+            segment_duration = get_device_segment_duration(capture_folder) * len(segment_files_to_use)
+            logger.info(f"[{capture_folder}] Analyzing combined audio: {segment_duration:.1f}s total")
             
-            try:
-                # Write concat list (overwrites previous file)
-                with open(concat_list_path, 'w') as f:
-                    for seg_file in segment_files_to_use:
-                        f.write(f"file '{seg_file}'\n")
-                
-                logger.info(f"[{capture_folder}] 📝 Concat list written to: {concat_list_path}")
-                
-                # Merge segments with ffmpeg (overwrites previous merged file)
-                merge_cmd = [
-                    'ffmpeg',
-                    '-hide_banner',
-                    '-loglevel', 'warning',  # Changed from 'error' to 'warning' for more details
-                    '-f', 'concat',
-                    '-safe', '0',
-                    '-i', concat_list_path,
-                    '-c', 'copy',
-                    '-y',  # Overwrite without asking
-                    merged_path
-                ]
-                
-                logger.info(f"[{capture_folder}] 🔧 FFmpeg command: {' '.join(merge_cmd)}")
-                
-                result = subprocess.run(merge_cmd, capture_output=True, text=True, timeout=10)
-                
-                # Clean up concat list (tiny file, but good practice)
-                if os.path.exists(concat_list_path):
-                    os.unlink(concat_list_path)
-                
-                if result.returncode != 0:
-                    logger.error(f"[{capture_folder}] ❌ FFmpeg merge FAILED (exit code {result.returncode})")
-                    logger.error(f"[{capture_folder}] 📋 Attempted segments: {segments_to_check}")
-                    logger.error(f"[{capture_folder}] 📂 Segments directory: {segments_dir}")
-                    logger.error(f"[{capture_folder}] 📝 Concat list: {concat_list_path}")
-                    logger.error(f"[{capture_folder}] 📤 Output path: {merged_path}")
-                    if result.stderr:
-                        logger.error(f"[{capture_folder}] 🔴 FFmpeg STDERR:")
-                        for line in result.stderr.strip().split('\n'):
-                            logger.error(f"[{capture_folder}]     {line}")
-                    if result.stdout:
-                        logger.error(f"[{capture_folder}] 🔵 FFmpeg STDOUT:")
-                        for line in result.stdout.strip().split('\n'):
-                            logger.error(f"[{capture_folder}]     {line}")
-                    
-                    # ✅ Return EMPTY segments_checked so caller knows merge FAILED
-                    return {
-                        'has_continuous_audio': False,
-                        'silence_duration': 0.0,
-                        'mean_volume_db': -100.0,
-                        'segment_duration': 0.0,
-                        'segments_checked': []  # ✅ EMPTY = merge failed (caller will abort)
-                    }
-                
-                # Get total duration of merged file
-                merged_size = os.path.getsize(merged_path)
-                logger.info(f"[{capture_folder}] Merged {len(segment_files_to_use)} segments → {merged_path} ({merged_size/1024:.1f} KB)")
-                
-                # Analyze merged file for audio continuity
-                segment_duration = get_device_segment_duration(capture_folder) * len(segment_files_to_use)
-                logger.info(f"[{capture_folder}] Analyzing merged audio: {segment_duration:.1f}s total")
-                
-                has_continuous_audio, silence_duration, mean_volume = check_audio_continuous(
-                    file_path=merged_path,
-                    sample_duration=segment_duration,  # Full duration of merged segments
-                    min_silence_duration=0.1,  # Detect silence >= 100ms
-                    timeout=15,  # Higher timeout for merged file
-                    context=capture_folder
-                )
-                
-                # ✅ DISTINGUISH: Constant silence vs dropout
-                # If silence_duration ≈ segment_duration → constant silence (no audio at all)
-                # If silence_duration < segment_duration → true dropout (audio cut out temporarily)
-                if abs(silence_duration - segment_duration) < 0.05:  # Within 50ms tolerance
-                    logger.info(f"[{capture_folder}] 🔇 CONSTANT SILENCE: {silence_duration:.2f}s silence in {segment_duration:.1f}s total (mean: {mean_volume:.1f}dB)")
-                    logger.info(f"[{capture_folder}]     This is NOT a dropout - no audio present at all")
-                    # Treat constant silence as "continuous" (i.e., no dropout occurred)
-                    has_continuous_audio = True
-                elif has_continuous_audio:
-                    logger.info(f"[{capture_folder}] 🔊 Audio CONTINUOUS: {mean_volume:.1f}dB (no dropouts across {len(segment_files_to_use)} segments)")
-                else:
-                    logger.info(f"[{capture_folder}] 🔇 Audio DROPOUT detected: {silence_duration:.2f}s silence in {segment_duration:.1f}s total (mean: {mean_volume:.1f}dB)")
+            metrics = get_audio_analysis_engine().analyze_segments(
+                segment_files_to_use,
+                max_duration=segment_duration,  # Full duration of combined segments
+                min_silence_duration=0.1,  # Detect silence >= 100ms
+                timeout=15,
+                context=capture_folder
+            )
+            
+            if metrics is None:
+                logger.error(f"[{capture_folder}] ❌ Audio decode FAILED")
+                logger.error(f"[{capture_folder}] 📋 Attempted segments: {segments_to_check}")
+                logger.error(f"[{capture_folder}] 📂 Segments directory: {segments_dir}")
                 
+                # ✅ Return EMPTY segments_checked so caller knows analysis FAILED
                 return {
-                    'has_continuous_audio': has_continuous_audio,
-                    'silence_duration': silence_duration,
-                    'mean_volume_db': mean_volume,
-                    'segment_duration': segment_duration,
-                    'segments_checked': segments_used
+                    'has_continuous_audio': False,
+                    'silence_duration': 0.0,
+                    'mean_volume_db': -100.0,
+                    'segment_duration': 0.0,
+                    'segments_checked': []  # ✅ EMPTY = analysis failed (caller will abort)
                 }
-                
-            finally:
-                # Clean up merged file (frees space immediately instead of waiting for next overwrite)
-                if os.path.exists(merged_path):
-                    try:
-                        os.unlink(merged_path)
-                        logger.debug(f"[{capture_folder}] Cleaned up merged audio file: {merged_path}")
-                    except Exception as e:
-                        logger.warning(f"[{capture_folder}] Failed to delete merged audio file: {e}")
-                
-                # Also clean up concat list if it still exists
-                if os.path.exists(concat_list_path):
-                    try:
-                        os.unlink(concat_list_path)
-                    except:
-                        pass
+            
+            has_continuous_audio = metrics['has_continuous_audio']
+            silence_duration = metrics['total_silence']
+            mean_volume = metrics['mean_volume_db']
+            
+            # ✅ DISTINGUISH: Constant silence vs dropout
+            # If silence_duration ≈ segment_duration → constant silence (no audio at all)
+            # If silence_duration < segment_duration → true dropout (audio cut out temporarily)
+            if abs(silence_duration - segment_duration) < 0.05:  # Within 50ms tolerance
+                logger.info(f"[{capture_folder}] 🔇 CONSTANT SILENCE: {silence_duration:.2f}s silence in {segment_duration:.1f}s total (mean: {mean_volume:.1f}dB)")
+                logger.info(f"[{capture_folder}]     This is NOT a dropout - no audio present at all")
+                # Treat constant silence as "continuous" (i.e., no dropout occurred)
+                has_continuous_audio = True
+            elif has_continuous_audio:
+                logger.info(f"[{capture_folder}] 🔊 Audio CONTINUOUS: {mean_volume:.1f}dB (no dropouts across {len(segment_files_to_use)} segments)")
+            else:
+                logger.info(f"[{capture_folder}] 🔇 Audio DROPOUT detected: {silence_duration:.2f}s silence in {segment_duration:.1f}s total (mean: {mean_volume:.1f}dB)")
+            
+            return {
+                'has_continuous_audio': has_continuous_audio,
+                'silence_duration': silence_duration,
+                'mean_volume_db': mean_volume,
+                'segment_duration': segment_duration,
+                'segments_checked': segments_used
+            }
             
         except Exception as e:
             logger.warning(f"[{capture_folder}] Audio check failed: {e}")
@@ -1975,6 +1917,19 @@ class InotifyFrameMonitor:
             with open(json_file, 'w') as f:
                 json.dump({"analyzed": True, "subtitle_ocr_pending": True, "error": str(e)}, f)
     
+    def _record_timeline(self, path, filename):
+        """Append frame to the device capture timeline (frame-window lookups for video verification)"""
+        sequence = parse_capture_sequence(filename)
+        if sequence is None:
+            return
+        info = self.dir_to_info[path]
+        try:
+            timestamp = os.stat(os.path.join(path, filename)).st_mtime
+        except OSError:
+            return  # Already rotated out
+        if not record_capture(info['capture_dir'], sequence, timestamp, index_path=info['timeline_path']):
+            logger.debug(f"[{info['capture_folder']}] Timeline append failed for {filename}")
+    
     def run(self):
         """Main event loop - enqueue frames for worker threads"""
         logger.info("Starting inotify event loop (zero CPU when idle)...")
@@ -1988,6 +1943,9 @@ class InotifyFrameMonitor:
                     if path in self.dir_to_info:
                         capture_folder = self.dir_to_info[path]['capture_folder']
                         
+                        # Index every frame on arrival (sequence order) - even ones skipped by backlog below
+                        self._record_timeline(path, filename)
+                        
                         # 🔍 TRACE: Extract sequence from filename for logging
                         try:
                             sequence = int(filename.split('_')[1].split('.')[0])
@@ -44,6 +44,7 @@ sys.path.insert(0, project_root)
 
 from shared.src.lib.utils.storage_path_utils import get_capture_base_directories, is_ram_mode
 from shared.src.lib.utils.video_utils import merge_progressive_batch
+from shared.src.lib.utils.capture_timeline_utils import trim_capture_timeline
 
 # Configure logging (systemd handles file output)
 logging.basicConfig(
@@ -1237,6 +1238,11 @@ def process_hot_storage(capture_dir: str):
     deleted_captures = rotate_hot_captures(capture_dir)
     deleted_thumbnails = clean_old_thumbnails(capture_dir)
     deleted_metadata = cleanup_hot_files(capture_dir, 'metadata', 'capture_*.json')
+    
+    # Capture timeline index: drop frames past cold retention (cheap no-op most cycles)
+    trimmed_timeline = trim_capture_timeline(capture_dir)
+    if trimmed_timeline:
+        logger.info(f"Capture timeline: trimmed {trimmed_timeline} expired frames")
     # Note: Cold cleanup moved to separate thread
     # Note: Audio extracted directly to COLD - no hot cleanup needed
     
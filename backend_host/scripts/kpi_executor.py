@@ -180,15 +180,16 @@ class KPIExecutorService:
         
         start_time = time.time()
         
-        # CRITICAL: Copy images from hot storage to /tmp/ (RAM) to avoid race condition
+        # CRITICAL: Pin images from hot storage into a working directory to avoid race condition
         # Hot storage only keeps 150 images (30s at 5fps), they may be deleted during processing
-        working_dir, extra_before_filename = self._copy_images_to_tmp(request)
-        if not working_dir:
-            self._update_result(request.execution_result_id, request.team_id, False, None, "Failed to copy images from hot storage")
+        frame_cache, extra_before_filename = self._pin_frames(request)
+        if not frame_cache:
+            self._update_result(request.execution_result_id, request.team_id, False, None, "Failed to pin images from hot storage")
             return
+        working_dir = frame_cache.working_dir
         
         try:
-            # Scan captures from /tmp/ working directory
+            # Scan captures from working directory
             match_result = await self._scan_until_match(request, working_dir)
             
             logger.info(f"🔍 Scan completed, processing result: success={match_result.get('success')}")
@@ -201,6 +202,7 @@ class KPIExecutorService:
                 logger.info(f"   • KPI duration: {kpi_ms}ms")
                 logger.info(f"   • Algorithm: {algorithm}")
                 logger.info(f"   • Captures scanned: {match_result['captures_scanned']}")
+                logger.info(f"   • Time to result: {match_result.get('time_to_result_ms', 0)}ms")
                 
                 # Generate KPI report with thumbnails (from working directory)
                 from shared.src.lib.utils.kpi_report_generator import generate_kpi_success_report
@@ -212,6 +214,7 @@ class KPIExecutorService:
                 logger.error(f"❌ KPI measurement failed: {match_result['error']}")
                 logger.info(f"   • Algorithm: {algorithm}")
                 logger.info(f"   • Captures scanned: {match_result.get('captures_scanned', 0)}")
+                logger.info(f"   • Time to result: {match_result.get('time_to_result_ms', 0)}ms")
                 
                 # Generate local failure report for debugging
                 from shared.src.lib.utils.kpi_report_generator import generate_kpi_failure_report
@@ -235,24 +238,27 @@ class KPIExecutorService:
             logger.info(f"⏱️  KPI processing failed in {processing_time}ms")
         
         finally:
-            # Cleanup: Delete working directory
+            # Cleanup: Delete working directory (drops the pinned hardlinks)
             self._cleanup_working_dir(working_dir)
     
-    def _copy_images_to_tmp(self, request: KPIMeasurementRequest) -> tuple:
+    def _pin_frames(self, request: KPIMeasurementRequest) -> tuple:
         """
-        Copy required images AND thumbnails from hot/cold storage to /tmp/ working directory (RAM).
+        Pin required images AND thumbnails from hot/cold storage into a working directory.
         Avoids race condition where hot storage images are deleted during processing.
         
+        PERFORMANCE: Frames are hardlinked (working dir sits next to the captures, same filesystem)
+        instead of copied - a rotated capture keeps its inode alive until the working dir is removed.
+        
         Returns:
-            (working_dir, extra_before_filename) or (None, None) if copy failed
+            (frame_cache, extra_before_filename) or (None, None) if no frame could be pinned
         """
+        from shared.src.lib.utils.kpi_search_utils import FrameCache, get_kpi_working_dir
         
-        # Create working directory in /tmp/ (RAM)
         working_id = str(uuid.uuid4())[:8]
-        working_dir = f'/tmp/kpi_working/{request.execution_result_id[:8]}_{working_id}'
-        os.makedirs(working_dir, exist_ok=True)
+        working_dir = get_kpi_working_dir(request.capture_dir, f'{request.execution_result_id[:8]}_{working_id}')
+        frame_cache = FrameCache(working_dir)
         
-        logger.info(f"📂 Copying images to /tmp/ working directory...")
+        logger.info(f"📂 Pinning images to working directory...")
         logger.info(f"   • Source: {request.capture_dir}")
         logger.info(f"   • Working dir: {working_dir}")
         
@@ -284,12 +290,11 @@ class KPIExecutorService:
         
         logger.info(f"   • Scan window: {scan_end - scan_start:.2f}s (max {request.timeout_ms}ms)")
         
-        # Copy captures in time window + 1 frame before (for "before" thumbnail)
+        # Pin captures in time window + 1 frame before (for "before" thumbnail)
         pattern = os.path.join(request.capture_dir, "capture_*.jpg")
-        copied_captures = 0
-        copied_capture_names = []  # Track which captures we copied
+        pinned_capture_names = []  # Track which captures we pinned
         
-        # First pass: find all captures and get the one before scan window
+        # Single listing: all captures sorted by timestamp
         all_available_captures = []
         for source_path in glob.glob(pattern):
             if "_thumbnail" in source_path:
@@ -301,7 +306,6 @@ class KPIExecutorService:
             except (OSError, IOError):
                 continue
         
-        # Sort by timestamp
         all_available_captures.sort(key=lambda x: x['ts'])
         
         # Find first capture in scan window
@@ -313,74 +317,54 @@ class KPIExecutorService:
                 first_in_window_idx = i
                 break
         
-        # Copy the frame BEFORE first frame in window (if exists)
+        # Pin the frame BEFORE first frame in window (if exists)
         if first_in_window_idx is not None and first_in_window_idx > 0:
             before_window_cap = all_available_captures[first_in_window_idx - 1]
-            dest_path = os.path.join(working_dir, before_window_cap['filename'])
-            try:
-                shutil.copy2(before_window_cap['path'], dest_path)
-                copied_captures += 1
-                copied_capture_names.append(before_window_cap['filename'])
+            dest_path = frame_cache.pin(before_window_cap['path'])
+            if dest_path:
+                pinned_capture_names.append(before_window_cap['filename'])
                 extra_before_filename = before_window_cap['filename']  # Store it
-                logger.info(f"📸 Copied extra frame BEFORE: {before_window_cap['path']} → {dest_path}")
-            except (OSError, IOError) as e:
-                logger.warning(f"Could not copy before-window frame: {e}")
+                logger.info(f"📸 Pinned extra frame BEFORE: {before_window_cap['path']} → {dest_path}")
+            else:
+                logger.warning(f"Could not pin before-window frame: {before_window_cap['path']}")
         
-        # Copy all captures in scan window
-        for source_path in glob.glob(pattern):
-            if "_thumbnail" in source_path:
-                continue
-            
-            try:
-                ts = os.path.getmtime(source_path)
-                # Copy images in time window: scan_start → scan_end
-                if scan_start <= ts <= scan_end:
-                    filename = os.path.basename(source_path)
-                    if filename not in copied_capture_names:  # Don't copy twice
-                        dest_path = os.path.join(working_dir, filename)
-                        shutil.copy2(source_path, dest_path)  # copy2 preserves timestamps
-                        copied_captures += 1
-                        copied_capture_names.append(filename)
-                        logger.debug(f"📸 Copied: {source_path} → {dest_path}")
-            except (OSError, IOError) as e:
-                logger.warning(f"Could not copy {source_path}: {e}")
-                continue
+        # Pin all captures in scan window
+        for cap in all_available_captures:
+            if scan_start <= cap['ts'] <= scan_end and cap['filename'] not in pinned_capture_names:
+                if frame_cache.pin(cap['path']):
+                    pinned_capture_names.append(cap['filename'])
+                else:
+                    logger.warning(f"Could not pin {cap['path']}")
         
-        if copied_captures == 0:
-            logger.error(f"❌ No captures copied from {request.capture_dir}")
+        if not pinned_capture_names:
+            logger.error(f"❌ No captures pinned from {request.capture_dir}")
+            frame_cache.close()
             return None, None
         
-        logger.info(f"✅ Copied {copied_captures} captures to /tmp/ (RAM) - includes 1 before scan window")
+        logger.info(f"✅ Pinned {len(pinned_capture_names)} captures ({frame_cache.linked} hardlinked, {frame_cache.copied} copied) - includes 1 before scan window")
         
-        # Copy thumbnails for EACH capture we copied (use centralized function!)
+        # Pin thumbnails for EACH capture we pinned (use centralized function!)
         from shared.src.lib.utils.storage_path_utils import get_thumbnail_path_from_capture
         
-        copied_thumbnails = 0
+        pinned_thumbnails = 0
         missing_thumbnails = 0
         
-        for capture_name in copied_capture_names:
+        for capture_name in pinned_capture_names:
             # For each capture, get its thumbnail path using centralized function
             capture_source = os.path.join(request.capture_dir, capture_name)
             thumb_source = get_thumbnail_path_from_capture(capture_source)
-            thumb_dest = os.path.join(working_dir, os.path.basename(thumb_source))
             
-            if os.path.exists(thumb_source):
-                try:
-                    shutil.copy2(thumb_source, thumb_dest)
-                    copied_thumbnails += 1
-                    logger.debug(f"🖼️  Copied thumbnail: {thumb_source} → {thumb_dest}")
-                except (OSError, IOError) as e:
-                    logger.warning(f"Could not copy thumbnail: {e}")
-                    missing_thumbnails += 1
+            if frame_cache.pin(thumb_source):
+                pinned_thumbnails += 1
             else:
                 logger.warning(f"⚠️  Thumbnail NOT found: {thumb_source}")
                 missing_thumbnails += 1
         
         if missing_thumbnails > 0:
-            logger.warning(f"⚠️  {missing_thumbnails} thumbnails missing for copied captures")
-        logger.info(f"✅ Copied {copied_thumbnails}/{copied_captures} thumbnails to /tmp/ (RAM)")
+            logger.warning(f"⚠️  {missing_thumbnails} thumbnails missing for pinned captures")
+        logger.info(f"✅ Pinned {pinned_thumbnails}/{len(pinned_capture_names)} thumbnails")
         
-        return working_dir, extra_before_filename
+        return frame_cache, extra_before_filename
     
     def _cleanup_working_dir(self, working_dir: str):
         """Delete working directory and all its contents"""
@@ -395,11 +379,14 @@ class KPIExecutorService:
     
     async def _scan_until_match(self, request: KPIMeasurementRequest, capture_dir: str) -> dict:
         """
-        Scan captures using optimized quick check + backward scan algorithm.
+        Find the first capture matching the KPI references with the fewest verification probes.
+        
+        Appear/disappear references use monotonic search (gallop + k-ary), other references
+        a parallel backward scan (see kpi_search_utils, KPI_SEARCH_MODE / KPI_PROBE_WORKERS).
         
         Args:
             request: KPI measurement request
-            capture_dir: Directory to scan (usually /tmp/ working directory)
+            capture_dir: Directory to scan (usually the pinned working directory)
         """
         action_timestamp = request.action_timestamp
         verification_timestamp = request.verification_timestamp
@@ -501,166 +488,55 @@ class KPIExecutorService:
         
         logger.info(f"   • Total verifications configured: {len(verifications)}")
         
-        # Helper to test a capture
-        async def test_capture(capture, label):
-            logger.info(f"🔍 Quick check - {label}: {os.path.basename(capture['path'])}")
-            try:
-                result = await verif_executor.execute_verifications(
-                    verifications=verifications,
-                    userinterface_name=request.userinterface_name,  # MANDATORY parameter
-                    image_source_url=capture['path'],
-                    team_id=request.team_id
-                )
-                success = result.get('success', False)
-                logger.info(f"   ↳ Result: {success}")
-                return success
-            except Exception as e:
-                logger.error(f"   ↳ ERROR in test_capture: {e}")
-                import traceback
-                traceback.print_exc()
-                return False
-        
-        captures_scanned = 0
-        
-        # PHASE 1: QUICK CHECK (early only - late check is useless for finding earliest)
-        logger.info(f"⚡ Phase 1: Quick check (early only)")
-        
-        # Quick check: T0+200ms (early in the scan window)
-        # If it matches here, we know it appeared very early (earliest or close to it)
+        # Each probe verifies one pinned frame - execute_verifications is async but the image
+        # controllers are synchronous, so probes get their own event loop in a worker thread
+        import asyncio
+        from shared.src.lib.utils.kpi_search_utils import KPISearchEngine, is_monotonic_verification
+        
+        def probe(index: int) -> bool:
+            capture = all_captures[index]
+            result = asyncio.run(verif_executor.execute_verifications(
+                verifications=verifications,
+                userinterface_name=request.userinterface_name,  # MANDATORY parameter
+                image_source_url=capture['path'],
+                team_id=request.team_id
+            ))
+            success = result.get('success', False)
+            logger.info(f"🔍 Probe idx {index}/{total_captures}: {os.path.basename(capture['path'])} → {success}")
+            return success
+        
+        monotonic = is_monotonic_verification(verifications)
+        engine = KPISearchEngine(probe)
+        
+        # Quick check target for scan mode: T0+200ms (early in the scan window)
         target_ts = scan_start + 0.2
         early_idx = min(range(total_captures), key=lambda i: abs(all_captures[i]['timestamp'] - target_ts))
-        captures_scanned += 1
-        
-        if await test_capture(all_captures[early_idx], f"early check (start+200ms, idx {early_idx}/{total_captures})"):
-            return {
-                'success': True,
-                'timestamp': all_captures[early_idx]['timestamp'],
-                'capture_path': all_captures[early_idx]['path'],
-                'capture_index': early_idx,  # ✅ Return index for thumbnail selection
-                'all_captures': all_captures,  # ✅ Return full list for before/match selection
-                'captures_scanned': captures_scanned,
-                'error': None,
-                'algorithm': 'quick_check_early'
-            }
-        
-        logger.info(f"⚡ Quick check: no early match, proceeding to backward scan")
-        checked_indices = {early_idx}
-        logger.info(f"   ↳ Early idx checked: {early_idx}")
-        
-        # PHASE 2: BACKWARD SCAN (optimized to find earliest match)
-        logger.info(f"🔙 Phase 2: Backward scan from verification → action")
-        logger.info(f"   ↳ Will scan {total_captures - len(checked_indices)} remaining captures")
-        logger.info(f"   ↳ Strategy: Scan backward in steps of 2, fill gap when boundary found")
         
-        earliest_match = None  # Track the earliest (closest to action) match found
+        if monotonic:
+            logger.info(f"⚡ Monotonic search: gallop from action + {engine.workers}-ary search ({engine.workers} probe workers)")
+        else:
+            logger.info(f"🔙 Backward scan: verification → action in parallel batches of {engine.workers}")
         
-        # Scan backward in steps of 2 (skip every other frame for speed)
-        for i in range(total_captures - 1, -1, -2):
-            if i in checked_indices:
-                continue
-            
-            capture = all_captures[i]
-            captures_scanned += 1
-            
-            logger.info(f"🔍 Backward scan {i+1}/{total_captures}: {os.path.basename(capture['path'])}")
-            
-            try:
-                result = await verif_executor.execute_verifications(
-                    verifications=verifications,
-                    userinterface_name=request.userinterface_name,  # MANDATORY parameter
-                    image_source_url=capture['path'],
-                    team_id=request.team_id
-                )
-                
-                if result.get('success'):
-                    # Found a match - keep scanning backward to find earliest
-                    earliest_match = {
-                        'timestamp': capture['timestamp'],
-                        'capture_path': capture['path'],
-                        'index': i
-                    }
-                    logger.info(f"   ↳ Match found! Continuing backward (step -2)...")
-                elif earliest_match:
-                    # No match after having matches - check the skipped frame (i+1) to fill the gap
-                    gap_idx = i + 1
-                    if gap_idx < total_captures and gap_idx not in checked_indices:
-                        logger.info(f"   ↳ Checking skipped frame at idx {gap_idx} to confirm boundary...")
-                        gap_capture = all_captures[gap_idx]
-                        captures_scanned += 1
-                        
-                        gap_result = await verif_executor.execute_verifications(
-                            verifications=verifications,
-                            userinterface_name=request.userinterface_name,
-                            image_source_url=gap_capture['path'],
-                            team_id=request.team_id
-                        )
-                        
-                        if gap_result.get('success'):
-                            # Gap frame matches, so earliest is the gap frame
-                            earliest_match = {
-                                'timestamp': gap_capture['timestamp'],
-                                'capture_path': gap_capture['path'],
-                                'index': gap_idx
-                            }
-                            logger.info(f"   ↳ Gap frame matches - earliest is at idx {gap_idx}")
-                    
-                    # Return the earliest match found
-                    logger.info(f"   ↳ Boundary confirmed - earliest match at idx {earliest_match['index']}")
-                    return {
-                        'success': True,
-                        'timestamp': earliest_match['timestamp'],
-                        'capture_path': earliest_match['capture_path'],
-                        'capture_index': earliest_match['index'],  # ✅ Return index for thumbnail selection
-                        'all_captures': all_captures,  # ✅ Return full list for before/match selection
-                        'captures_scanned': captures_scanned,
-                        'error': None,
-                        'algorithm': 'backward_scan_step2'
-                    }
-                else:
-                    logger.debug(f"   ↳ No match")
-            except Exception as e:
-                logger.error(f"   ↳ ERROR in backward scan: {e}")
-                import traceback
-                traceback.print_exc()
-                continue
+        # Last frame is probed first by both modes: probing it alone resolves the reference
+        # image once before the concurrent rounds read it
+        engine.warm_up(total_captures - 1)
+        search = engine.search(total_captures, monotonic=monotonic, early_index=early_idx)
+        logger.info(f"   ↳ {search['algorithm']}: {search['probes']}/{total_captures} probes in {search['rounds']} rounds, {search['time_to_result_ms']}ms")
         
-        # If we have a match at the end (reached start while still matching)
-        # Check if there's a skipped frame at index 0 that we need to verify
-        if earliest_match:
-            if earliest_match['index'] > 0 and 0 not in checked_indices:
-                logger.info(f"   ↳ Checking first frame (idx 0) to confirm earliest...")
-                first_capture = all_captures[0]
-                captures_scanned += 1
-                
-                first_result = await verif_executor.execute_verifications(
-                    verifications=verifications,
-                    userinterface_name=request.userinterface_name,
-                    image_source_url=first_capture['path'],
-                    team_id=request.team_id
-                )
-                
-                if first_result.get('success'):
-                    earliest_match = {
-                        'timestamp': first_capture['timestamp'],
-                        'capture_path': first_capture['path'],
-                        'index': 0
-                    }
-                    logger.info(f"   ↳ First frame matches - earliest is at idx 0")
-            
-            logger.info(f"   ↳ Reached start of window - earliest match at idx {earliest_match['index']}")
+        if search['success']:
+            match_idx = search['index']
             return {
                 'success': True,
-                'timestamp': earliest_match['timestamp'],
-                'capture_path': earliest_match['capture_path'],
-                'capture_index': earliest_match['index'],  # ✅ Return index for thumbnail selection
+                'timestamp': all_captures[match_idx]['timestamp'],
+                'capture_path': all_captures[match_idx]['path'],
+                'capture_index': match_idx,  # ✅ Return index for thumbnail selection
                 'all_captures': all_captures,  # ✅ Return full list for before/match selection
-                'captures_scanned': captures_scanned,
+                'captures_scanned': search['probes'],
+                'time_to_result_ms': search['time_to_result_ms'],
                 'error': None,
-                'algorithm': 'backward_scan_step2'
+                'algorithm': search['algorithm']
             }
         
-        # No match found - backward scan completed without finding match
-        logger.info(f"🔙 Backward scan completed: checked {captures_scanned} captures total")
         window_duration = scan_end - scan_start
         error_msg = f'No match found in {total_captures} captures ({window_duration:.2f}s window)'
         logger.warning(f"⚠️  {error_msg}")
@@ -670,9 +546,10 @@ class KPIExecutorService:
             'timestamp': None,
             'capture_index': None,  # ✅ Include for consistency
             'all_captures': all_captures,  # ✅ Include for consistency (even on failure)
-            'captures_scanned': captures_scanned,
+            'captures_scanned': search['probes'],
+            'time_to_result_ms': search['time_to_result_ms'],
             'error': error_msg,
-            'algorithm': 'exhaustive_search_failed'
+            'algorithm': search['algorithm']
         }
     
     def _update_result(self, execution_result_id: str, team_id: str, success: bool, kpi_ms: int, error: str, report_url: str = None):
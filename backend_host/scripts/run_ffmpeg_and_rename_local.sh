@@ -340,6 +340,8 @@ start_grabber() {
   if [ "$source_type" = "v4l2" ]; then
     # 3-tier quality system: LOW (preview) → SD (modal opened) → HD (user clicks HD)
     # Captures always stay at 1280:720 for high-quality detection (zap, freeze, etc)
+    # Capture pyramid: captures 1280:720 -> thumbnails 320:180, scaled from the capture in the same
+    # filter graph (storage_path_utils.CAPTURE_PYRAMID_LEVELS)
     if [ "$quality" = "hd" ]; then
       # HD: Full quality stream for single device focus
       local stream_scale="1280:720"
@@ -369,9 +371,10 @@ start_grabber() {
       -thread_queue_size 512 \
       -f v4l2 -input_format mjpeg -video_size 1280x720 -framerate $input_fps -i $source \
       -f alsa -thread_queue_size 2048 -async 1 -err_detect ignore_err -i \"$audio_device\" \
-      -filter_complex \"[0:v]fps=5[v5];[v5]split=3[str][cap][thm]; \
+      -filter_complex \"[0:v]fps=5[v5];[v5]split=2[str][cap]; \
         [str]scale=${stream_scale}:flags=fast_bilinear,fps=$input_fps[streamout]; \
-        [cap]scale=${capture_scale}:flags=fast_bilinear,setpts=PTS-STARTPTS[captureout];[thm]scale=320:180:flags=neighbor[thumbout]\" \
+        [cap]scale=${capture_scale}:flags=fast_bilinear,setpts=PTS-STARTPTS,split=2[captureout][pyr]; \
+        [pyr]scale=320:180:flags=neighbor[thumbout]\" \
       -map \"[streamout]\" -map 1:a? \
       -c:v libx264 -preset ultrafast -tune zerolatency \
       -b:v $stream_bitrate -maxrate $stream_maxrate -bufsize $stream_bufsize \
@@ -388,6 +391,7 @@ start_grabber() {
   elif [ "$source_type" = "x11grab" ]; then
     # 3-tier quality system: LOW (preview) → SD (modal opened) → HD (user clicks HD)
     # Captures always stay at 1280:720 for high-quality VNC detection (aligned with v4l2)
+    # Capture pyramid: captures -> thumbnails 320:180 (same as v4l2)
     if [ "$quality" = "hd" ]; then
       # HD: Full quality stream for single device focus
       local stream_scale="1280:720"
@@ -421,9 +425,10 @@ start_grabber() {
       -draw_mouse 0 -show_region 0 \
       -f x11grab -video_size $resolution -framerate $input_fps -i $source \
       -an \
-      -filter_complex \"[0:v]fps=2[v2];[v2]split=3[str][cap][thm]; \
+      -filter_complex \"[0:v]fps=2[v2];[v2]split=2[str][cap]; \
         [str]scale=${stream_scale}:flags=neighbor[streamout]; \
-        [cap]scale=${capture_scale}:flags=neighbor,setpts=PTS-STARTPTS[captureout];[thm]scale=320:180:flags=neighbor[thumbout]\" \
+        [cap]scale=${capture_scale}:flags=neighbor,setpts=PTS-STARTPTS,split=2[captureout][pyr]; \
+        [pyr]scale=320:180:flags=neighbor[thumbout]\" \
       -map \"[streamout]\" \
       -c:v libx264 -preset ultrafast -tune zerolatency \
       -b:v $stream_bitrate -maxrate $stream_maxrate -bufsize $stream_bufsize \
@@ -7,8 +7,11 @@ OPTIMIZATIONS:
 - Configurable downscale (default 33% = 89% fewer pixels)
 - Optional binarization (black/white) before OCR → ~20% faster  
 - Language caching per device (2min) → 2x faster after first detection
-- Round-robin processing (1s delay per device)
+- OCR process pool sized to CPU cores (one frame in flight per device)
+- Subtitle band hash → pixel-identical band reuses previous text (no OCR)
+- Weighted fair scheduling: devices with recent subtitles get more OCR slots
 - LIFO queue (newest frames first, max 10 per device)
+- OCR lag (frame written → result written) tracked per device
 
 DISABLED (too slow for real-time):
 - Spell checking (adds 200-500ms per OCR)
@@ -43,10 +46,13 @@ os.environ['OPENBLAS_NUM_THREADS'] = '4'
 
 import sys
 import json
+import hashlib
 import logging
 import queue
 import threading
 import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 import cv2
 import numpy as np
 import inotify.adapters
@@ -80,19 +86,219 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Scheduling
+OCR_WORKERS = int(os.environ.get('SUBTITLE_OCR_WORKERS', '0') or 0) or (os.cpu_count() or 1)
+ACTIVITY_ALPHA = 0.2          # EWMA weight of the latest frame in the subtitle activity score
+ACTIVITY_WEIGHT = 4.0         # Device with constant subtitles gets (1 + 4) = 5x the OCR share of an idle one
+STATS_LOG_INTERVAL = 60       # Seconds between scheduler stats logs
+
+# Language mapping: langdetect (2-letter) -> Tesseract (3-letter)
+LANG_MAP = {
+    'en': 'eng',
+    'fr': 'fra',
+    'de': 'deu',
+    'es': 'spa',
+    'it': 'ita'
+}
+
+
+# ============================================================================
+# OCR WORKER (runs in pool processes)
+# ============================================================================
+
+_spell_checker = None
+
+
+def _init_ocr_worker():
+    # Parallelism comes from the pool - keep Tesseract/OpenMP single-threaded per process
+    os.environ['OMP_THREAD_LIMIT'] = '1'
+    cv2.setNumThreads(1)
+
+
+def _spellcheck(text):
+    global _spell_checker
+    if _spell_checker is None:
+        _spell_checker = SpellChecker()
+    
+    corrected_words = []
+    corrections_made = []
+    for word in text.split():
+        # Only check words with letters (skip numbers, punctuation)
+        if any(c.isalpha() for c in word):
+            corrected = _spell_checker.correction(word.lower())
+            if corrected and corrected != word.lower():
+                corrected_words.append(corrected)
+                corrections_made.append(f"{word}→{corrected}")
+                continue
+        corrected_words.append(word)
+    return ' '.join(corrected_words), corrections_made
+
+
+def ocr_subtitle_frame(frame_path, lang_config, last_band_hash=None, detect_language=False):
+    """
+    Full per-frame subtitle pipeline (edge check, crop, band hash, OCR, cleanup)
+    
+    Args:
+        frame_path: Captured frame (.jpg)
+        lang_config: Tesseract language string ('eng+deu+fra' or cached single language)
+        last_band_hash: Hash of the band last OCR'd for this device - identical band skips OCR
+        detect_language: Run langdetect on the extracted text
+    
+    Returns:
+        Dict with 'status' ('no_image' | 'no_edges' | 'unchanged' | 'ocr') and timings
+    """
+    start_total = time.perf_counter()
+    img = cv2.imread(frame_path, cv2.IMREAD_GRAYSCALE)
+    if img is None:
+        return {'status': 'no_image'}
+    
+    img_height, img_width = img.shape
+    
+    # Edge detection (bottom band only)
+    start_edge = time.perf_counter()
+    subtitle_y = int(img_height * 0.85)
+    edges_subtitle = cv2.Canny(img[subtitle_y:img_height, :], 50, 150)
+    subtitle_edge_density = np.count_nonzero(edges_subtitle) / edges_subtitle.size * 100
+    edge_time = (time.perf_counter() - start_edge) * 1000
+    
+    result = {
+        'status': 'no_edges',
+        'subtitle_edge_density': subtitle_edge_density,
+        'edge_time_ms': edge_time
+    }
+    if not (0.9 < subtitle_edge_density < 8):
+        return result
+    
+    # Crop
+    start_crop = time.perf_counter()
+    x = int(img_width * 0.10)
+    y = int(img_height * 0.60)
+    w = int(img_width * 0.80)
+    h = int(img_height * 0.35)
+    crop = img[y:y+h, x:x+w]
+    crop_time = (time.perf_counter() - start_crop) * 1000
+    
+    band_hash = hashlib.blake2b(np.ascontiguousarray(crop).data, digest_size=16).hexdigest()
+    result.update({
+        'box': {'x': x, 'y': y, 'width': w, 'height': h},
+        'band_hash': band_hash,
+        'crop_time_ms': crop_time
+    })
+    if band_hash == last_band_hash:
+        result['status'] = 'unchanged'
+        result['total_time_ms'] = (time.perf_counter() - start_total) * 1000
+        return result
+    
+    # Downscale - reduces pixels for faster OCR
+    start_down = time.perf_counter()
+    crop = cv2.resize(crop, None, fx=DOWNSCALE_FACTOR, fy=DOWNSCALE_FACTOR, interpolation=cv2.INTER_AREA)
+    down_h, down_w = crop.shape
+    down_time = (time.perf_counter() - start_down) * 1000
+    
+    # Binarization (black/white only) - 20% faster OCR (OPTIONAL)
+    start_binarize = time.perf_counter()
+    if ENABLE_BINARIZATION:
+        _, crop = cv2.threshold(crop, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    binarize_time = (time.perf_counter() - start_binarize) * 1000
+    
+    # OCR
+    start_ocr = time.perf_counter()
+    import pytesseract
+    text = pytesseract.image_to_string(
+        crop,
+        config=f'--psm 6 --oem 1 -l {lang_config}',
+        timeout=2
+    ).strip()
+    ocr_time = (time.perf_counter() - start_ocr) * 1000
+    
+    # Clean OCR noise
+    if text:
+        cleaned = []
+        for line in text.split('\n'):
+            real = [word for word in line.split() if len(re.sub(r'[^a-zA-Z]', '', word)) >= 3]
+            if real:
+                cleaned.append(line.strip())
+        text = '\n'.join(cleaned).strip()
+    
+    # Apply shared regex-based filter
+    text = clean_transcript_text(text)
+    
+    # Spell checking (optional - measures time and shows corrections)
+    spell_time = 0
+    spell_status = "disabled"
+    corrections_made = []
+    if ENABLE_SPELLCHECK and SPELLCHECKER_AVAILABLE and text:
+        start_spell = time.perf_counter()
+        try:
+            text, corrections_made = _spellcheck(text)
+            spell_status = f"corrected {len(corrections_made)} words" if corrections_made else "no corrections"
+        except Exception as e:
+            spell_status = f"error: {str(e)[:30]}"
+        spell_time = (time.perf_counter() - start_spell) * 1000
+    elif ENABLE_SPELLCHECK and not SPELLCHECKER_AVAILABLE:
+        spell_status = "unavailable (install pyspellchecker)"
+    
+    # Language detection (only when parent has no valid cached language)
+    detected_language = None
+    lang_time = 0
+    if detect_language and text and len(text) > 10:
+        start_lang = time.perf_counter()
+        try:
+            from langdetect import detect
+            detected_language = detect(text)
+        except Exception:
+            detected_language = 'unknown'
+        lang_time = (time.perf_counter() - start_lang) * 1000
+    
+    original_pixels = w * h
+    result.update({
+        'status': 'ocr',
+        'text': text,
+        'detected_language': detected_language,
+        'lang_time_ms': lang_time,
+        'image_size': (w, h, down_w, down_h),
+        'pixel_reduction_pct': ((original_pixels - down_w * down_h) / original_pixels) * 100,
+        'down_time_ms': down_time,
+        'binarize_time_ms': binarize_time,
+        'ocr_time_ms': ocr_time,
+        'spell_time_ms': spell_time,
+        'spell_status': spell_status,
+        'spell_corrections': corrections_made,
+        'total_time_ms': (time.perf_counter() - start_total) * 1000
+    })
+    return result
+
+
+def write_frame_json(json_path, data):
+    with open(json_path + '.tmp', 'w') as f:
+        json.dump(data, f, indent=2)
+    os.rename(json_path + '.tmp', json_path)
+
+
 class InotifySubtitleMonitor:
-    def __init__(self, capture_dirs):
+    def __init__(self, capture_dirs, ocr_workers=OCR_WORKERS):
         self.inotify = inotify.adapters.Inotify()
         self.path_to_folder = {}
         self.capture_dirs_map = {}
         self.queues = {}
         self.ocr_worker = None
         self.worker_running = False
+        self.ocr_workers = max(1, ocr_workers)
+        self.executor = None
         
         # Language cache per device: {capture_folder: (timestamp, detected_language)}
         # Reuse language for 2 minutes before detecting again
         self.language_cache = {}
         
+        # Scheduler state (guarded by self.lock)
+        self.lock = threading.Lock()
+        self.work_available = threading.Event()
+        self.in_flight = set()        # Devices with a frame in the pool (max 1 per device)
+        self.device_pass = {}         # Stride scheduling: lowest pass is served next
+        self.activity = {}            # EWMA of has_subtitles per device (0.0 - 1.0)
+        self.last_band = {}           # {capture_folder: (band_hash, extracted_text, detected_language)}
+        self.device_stats = {}
+        
         for capture_dir in capture_dirs:
             capture_folder = get_capture_folder(capture_dir)
             metadata_dir = get_metadata_path(capture_folder)
@@ -108,71 +314,133 @@ class InotifySubtitleMonitor:
                 logger.info(f"Watching: {metadata_dir} -> {capture_folder}")
             
             self.queues[capture_folder] = queue.LifoQueue(maxsize=10)
+            self.device_pass[capture_folder] = 0.0
+            self.activity[capture_folder] = 0.0
+            self.device_stats[capture_folder] = {
+                'ocr': 0, 'reused': 0, 'skipped': 0, 'errors': 0,
+                'last_lag_ms': None, 'avg_lag_ms': None, 'max_lag_ms': 0.0
+            }
         
         self._start_ocr_worker()
     
     def _start_ocr_worker(self):
+        # spawn: the parent runs inotify/dispatcher threads, forking them is unsafe
+        self.executor = ProcessPoolExecutor(
+            max_workers=self.ocr_workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_ocr_worker
+        )
         self.worker_running = True
         self.ocr_worker = threading.Thread(
-            target=self._round_robin_worker,
+            target=self._dispatch_worker,
             daemon=True,
-            name="ocr-worker"
+            name="ocr-dispatcher"
         )
         self.ocr_worker.start()
         binarize_status = "ON" if ENABLE_BINARIZATION else "OFF"
         spellcheck_status = "ON" if ENABLE_SPELLCHECK else "OFF"
         downscale_pct = int(DOWNSCALE_FACTOR * 100)
-        logger.info(f"OCR worker started (resize={downscale_pct}% + binarization={binarize_status} + spellcheck={spellcheck_status} + language caching)")
+        logger.info(f"OCR pool started: {self.ocr_workers} workers (resize={downscale_pct}% + binarization={binarize_status} + spellcheck={spellcheck_status} + language caching + band hash reuse)")
     
-    def _round_robin_worker(self):
-        devices = list(self.queues.keys())
-        if not devices:
-            return
-        
-        device_index = 0
+    def enqueue(self, capture_folder, json_path):
+        """Queue a frame JSON for OCR (LIFO, oldest dropped when full)"""
+        work_queue = self.queues[capture_folder]
+        item = (json_path, time.time())
+        try:
+            work_queue.put_nowait(item)
+        except queue.Full:
+            try:
+                work_queue.get_nowait()
+                work_queue.put_nowait(item)
+            except (queue.Empty, queue.Full):
+                pass
+        self.work_available.set()
+    
+    def _device_weight(self, capture_folder):
+        return 1.0 + ACTIVITY_WEIGHT * self.activity[capture_folder]
+    
+    def _next_device(self):
+        """Pick the ready device with the lowest stride pass (weighted by subtitle activity)"""
+        with self.lock:
+            if len(self.in_flight) >= self.ocr_workers:
+                return None
+            ready = [
+                folder for folder, work_queue in self.queues.items()
+                if folder not in self.in_flight and not work_queue.empty()
+            ]
+            if not ready:
+                return None
+            
+            capture_folder = min(ready, key=lambda folder: self.device_pass[folder])
+            # Idle devices don't bank credit: catch up to the current virtual time
+            virtual_time = self.device_pass[capture_folder]
+            for folder in ready:
+                self.device_pass[folder] = max(self.device_pass[folder], virtual_time)
+            self.device_pass[capture_folder] += 1.0 / self._device_weight(capture_folder)
+            self.in_flight.add(capture_folder)
+            return capture_folder
+    
+    def _dispatch_worker(self):
+        last_stats_log = time.time()
         
         while self.worker_running:
-            capture_folder = devices[device_index]
-            work_queue = self.queues[capture_folder]
-            captures_dir = self.capture_dirs_map[capture_folder]
+            if time.time() - last_stats_log >= STATS_LOG_INTERVAL:
+                self._log_stats()
+                last_stats_log = time.time()
+            
+            capture_folder = self._next_device()
+            if capture_folder is None:
+                self.work_available.wait(timeout=0.5)
+                self.work_available.clear()
+                continue
             
             try:
-                json_path = work_queue.get_nowait()
-                
-                try:
-                    self.process_ocr(json_path, captures_dir, capture_folder)
-                except Exception as e:
-                    logger.error(f"[{capture_folder}] OCR error: {e}")
-                
-                work_queue.task_done()
-                time.sleep(1.0)
-                
+                json_path, enqueued_at = self.queues[capture_folder].get_nowait()
             except queue.Empty:
-                pass
+                self._release(capture_folder)
+                continue
             
-            device_index = (device_index + 1) % len(devices)
-            time.sleep(0.1)
+            try:
+                if not self.process_ocr(json_path, enqueued_at, capture_folder):
+                    self._release(capture_folder)
+            except Exception as e:
+                logger.error(f"[{capture_folder}] OCR error: {e}")
+                self.device_stats[capture_folder]['errors'] += 1
+                self._release(capture_folder)
     
-    def process_ocr(self, json_path, captures_dir, capture_folder):
+    def _release(self, capture_folder):
+        with self.lock:
+            self.in_flight.discard(capture_folder)
+        self.work_available.set()
+    
+    def _finish_skip(self, json_path, data, capture_folder, analysis):
+        data['subtitle_analysis'] = analysis
+        data['subtitle_ocr_pending'] = False
+        write_frame_json(json_path, data)
+        self.device_stats[capture_folder]['skipped'] += 1
+    
+    def process_ocr(self, json_path, enqueued_at, capture_folder):
+        """
+        Cheap JSON-level checks in the dispatcher, image work submitted to the OCR pool
+        
+        Returns:
+            True if a frame was submitted to the pool (device released on completion)
+        """
         with open(json_path, 'r') as f:
             data = json.load(f)
         
         # Skip OCR if no audio detected (no content = no subtitles)
         if not data.get('audio', True):
             logger.info(f"[{capture_folder}] ⊗ SKIP: No audio (no content to subtitle)")
-            data['subtitle_analysis'] = {
+            self._finish_skip(json_path, data, capture_folder, {
                 'has_subtitles': False,
                 'extracted_text': '',
                 'skipped': True,
                 'skip_reason': 'no_audio'
-            }
-            data['subtitle_ocr_pending'] = False
-            
-            with open(json_path + '.tmp', 'w') as f:
-                json.dump(data, f, indent=2)
-            os.rename(json_path + '.tmp', json_path)
-            return
+            })
+            return False
         
+        captures_dir = self.capture_dirs_map[capture_folder]
         frame_file = os.path.basename(json_path).replace('.json', '.jpg')
         frame_path = os.path.join(captures_dir, frame_file)
         
@@ -185,277 +453,218 @@ class InotifySubtitleMonitor:
         
         if not data.get('subtitle_ocr_pending', False):
             logger.info(f"[{capture_folder}] ⊗ Skip: no OCR pending")
-            return
+            return False
         
         # Skip OCR if freeze detected (frozen frame = no new subtitles)
         if data.get('freeze', False):
             logger.info(f"[{capture_folder}] ⊗ SKIP: Freeze detected (no new content)")
-            data['subtitle_analysis'] = {
+            self._finish_skip(json_path, data, capture_folder, {
                 'has_subtitles': False,
                 'extracted_text': '',
                 'skipped': True,
                 'skip_reason': 'freeze'
-            }
-            data['subtitle_ocr_pending'] = False
-            with open(json_path + '.tmp', 'w') as f:
-                json.dump(data, f, indent=2)
-            os.rename(json_path + '.tmp', json_path)
-            return
+            })
+            return False
         
         # Skip OCR if blackscreen detected (no content = no subtitles)
         if data.get('blackscreen', False):
             logger.info(f"[{capture_folder}] ⊗ SKIP: Blackscreen (no content)")
-            data['subtitle_analysis'] = {
+            self._finish_skip(json_path, data, capture_folder, {
                 'has_subtitles': False,
                 'extracted_text': '',
                 'skipped': True,
                 'skip_reason': 'blackscreen'
-            }
-            data['subtitle_ocr_pending'] = False
-            with open(json_path + '.tmp', 'w') as f:
-                json.dump(data, f, indent=2)
-            os.rename(json_path + '.tmp', json_path)
-            return
+            })
+            return False
         
         if not os.path.exists(frame_path):
             logger.error(f"[{capture_folder}] ⊗ Skip: image deleted")
-            return
+            return False
         
-        try:
-            start_total = time.perf_counter()
-            img = cv2.imread(frame_path, cv2.IMREAD_GRAYSCALE)
-            
-            if img is None:
-                return
-            
-            img_height, img_width = img.shape
-            
-            # Edge detection
-            start_edge = time.perf_counter()
-            edges = cv2.Canny(img, 50, 150)
-            subtitle_y = int(img_height * 0.85)
-            edges_subtitle = edges[subtitle_y:img_height, :]
-            subtitle_edge_density = np.sum(edges_subtitle > 0) / edges_subtitle.size * 100
-            edge_time = (time.perf_counter() - start_edge) * 1000
-            
-            if not (0.9 < subtitle_edge_density < 8):
-                logger.info(f"[{capture_folder}] ⊗ SKIP: No subtitle edges detected")
-                logger.info(f"[{capture_folder}]    └─ Edge density: {subtitle_edge_density:.1f}% (need 0.9-8%)")
-                data['subtitle_analysis'] = {
-                    'has_subtitles': False,
-                    'extracted_text': '',
-                    'subtitle_edge_density': round(subtitle_edge_density, 1),
-                    'skipped': True,
-                    'skip_reason': 'no_edges'
-                }
-            else:
-                # Crop
-                start_crop = time.perf_counter()
-                x = int(img_width * 0.10)
-                y = int(img_height * 0.60)
-                w = int(img_width * 0.80)
-                h = int(img_height * 0.35)
-                crop = img[y:y+h, x:x+w]
-                crop_time = (time.perf_counter() - start_crop) * 1000
-                
-                # Downscale - reduces pixels for faster OCR
-                start_down = time.perf_counter()
-                crop = cv2.resize(crop, None, fx=DOWNSCALE_FACTOR, fy=DOWNSCALE_FACTOR, interpolation=cv2.INTER_AREA)
-                down_h, down_w = crop.shape
-                down_time = (time.perf_counter() - start_down) * 1000
-                
-                # Calculate actual pixel reduction
-                original_pixels = w * h
-                downscaled_pixels = down_w * down_h
-                pixel_reduction_pct = ((original_pixels - downscaled_pixels) / original_pixels) * 100
-                
-                # Binarization (black/white only) - 20% faster OCR (OPTIONAL)
-                start_binarize = time.perf_counter()
-                if ENABLE_BINARIZATION:
-                    _, crop = cv2.threshold(crop, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
-                binarize_time = (time.perf_counter() - start_binarize) * 1000
-                
-                # Get cached language or use default (reuse language for 2 minutes)
-                current_time = time.time()
-                cached_lang = None
-                lang_config = 'eng+deu+fra'  # Default
-                lang_cached = False
-                
-                # Language mapping: langdetect (2-letter) -> Tesseract (3-letter)
-                lang_map = {
-                    'en': 'eng',
-                    'fr': 'fra', 
-                    'de': 'deu',
-                    'es': 'spa',
-                    'it': 'ita'
-                }
-                
-                if capture_folder in self.language_cache:
-                    cache_time, cached_lang = self.language_cache[capture_folder]
-                    cache_age = current_time - cache_time
-                    if cache_age < 120:  # 2 minutes
-                        # Map detected language (en/fr/de) to Tesseract code (eng/fra/deu)
-                        tesseract_lang = lang_map.get(cached_lang, 'eng')
-                        lang_config = tesseract_lang
-                        lang_cached = True
-                        logger.info(f"[{capture_folder}] 🔄 Using cached language: {cached_lang} → {tesseract_lang} (age={cache_age:.0f}s)")
-                
-                # OCR
-                start_ocr = time.perf_counter()
-                import pytesseract
-                text = pytesseract.image_to_string(
-                    crop,
-                    config=f'--psm 6 --oem 1 -l {lang_config}',
-                    timeout=2
-                ).strip()
-                ocr_time = (time.perf_counter() - start_ocr) * 1000
-                
-                # Clean OCR noise
-                if text:
-                    import re
-                    lines = text.split('\n')
-                    cleaned = []
-                    for line in lines:
-                        words = line.split()
-                        real = [w for w in words if len(re.sub(r'[^a-zA-Z]', '', w)) >= 3]
-                        if real:
-                            cleaned.append(line.strip())
-                    text = '\n'.join(cleaned).strip()
-                
-                # Apply shared regex-based filter
-                text_before_spellcheck = text
-                text = clean_transcript_text(text)
-                
-                # Spell checking (optional - measures time and shows corrections)
-                spell_time = 0
-                spell_corrections = 0
-                spell_status = "disabled"
-                
-                if ENABLE_SPELLCHECK and SPELLCHECKER_AVAILABLE and text:
-                    start_spell = time.perf_counter()
-                    try:
-                        # Initialize spell checker (cached after first use)
-                        if not hasattr(self, '_spell_checker'):
-                            self._spell_checker = SpellChecker()
-                        
-                        spell = self._spell_checker
-                        words = text.split()
-                        corrected_words = []
-                        corrections_made = []
-                        
-                        for word in words:
-                            # Only check words with letters (skip numbers, punctuation)
-                            if any(c.isalpha() for c in word):
-                                # Get correction
-                                corrected = spell.correction(word.lower())
-                                if corrected and corrected != word.lower():
-                                    # Word was corrected
-                                    corrected_words.append(corrected)
-                                    corrections_made.append(f"{word}→{corrected}")
-                                    spell_corrections += 1
-                                else:
-                                    corrected_words.append(word)
-                            else:
-                                corrected_words.append(word)
-                        
-                        text = ' '.join(corrected_words)
-                        spell_time = (time.perf_counter() - start_spell) * 1000
-                        spell_status = f"corrected {spell_corrections} words" if spell_corrections > 0 else "no corrections"
-                        
-                        if corrections_made:
-                            logger.info(f"[{capture_folder}] ✏️  Spell corrections: {', '.join(corrections_made[:5])}")
-                            
-                    except Exception as e:
-                        spell_time = (time.perf_counter() - start_spell) * 1000
-                        spell_status = f"error: {str(e)[:30]}"
-                        logger.warning(f"[{capture_folder}] Spell check error: {e}")
-                elif ENABLE_SPELLCHECK and not SPELLCHECKER_AVAILABLE:
-                    spell_status = "unavailable (install pyspellchecker)"
-                
-                # Detect language if text found and not cached (or cache expired)
-                detected_language = None
-                if text and len(text) > 10:  # Only detect if meaningful text
-                    # Check if we should detect language (no cache or cache expired)
-                    should_detect_language = True
-                    if capture_folder in self.language_cache:
-                        cache_time, cached_lang = self.language_cache[capture_folder]
-                        if current_time - cache_time < 120:  # 2 minutes
-                            should_detect_language = False
-                            detected_language = cached_lang
-                    
-                    if should_detect_language:
-                        # Detect language and cache for 2 minutes
-                        start_lang = time.perf_counter()
-                        try:
-                            from langdetect import detect
-                            detected_language = detect(text)
-                            # Update cache
-                            self.language_cache[capture_folder] = (current_time, detected_language)
-                            lang_time = (time.perf_counter() - start_lang) * 1000
-                            logger.info(f"[{capture_folder}] 🌐 Detected language: {detected_language} ({lang_time:.0f}ms) - cached for 2min")
-                        except Exception as e:
-                            detected_language = 'unknown'
-                            logger.debug(f"[{capture_folder}] Language detection failed: {e}")
-                
-                total_time = (time.perf_counter() - start_total) * 1000
-                
-                # Calculate preprocessing time (everything except OCR)
-                preprocess_time = crop_time + down_time + binarize_time
-                
-                data['subtitle_analysis'] = {
-                    'has_subtitles': bool(text),
-                    'extracted_text': text,
-                    'detected_language': detected_language,
-                    'subtitle_edge_density': round(subtitle_edge_density, 1),
-                    'box': {'x': x, 'y': y, 'width': w, 'height': h},
-                    'skipped': False,
-                    'ocr_time_ms': round(ocr_time, 2),
-                    'downscale_factor': DOWNSCALE_FACTOR,
-                    'pixel_reduction_pct': round(pixel_reduction_pct, 1),
-                    'binarized': ENABLE_BINARIZATION
-                }
-                
-                # Clear, readable logging showing what happened
-                binarize_status = "ON" if ENABLE_BINARIZATION else "OFF"
-                downscale_pct = int(DOWNSCALE_FACTOR * 100)
-                
-                if text:
-                    lang_str = f" [{detected_language}]" if detected_language else ""
-                    if lang_cached:
-                        lang_method = f" (cached, single lang)"
-                        lang_info = f"lang={lang_config} ⚡"
-                    else:
-                        lang_method = f" (3 languages)"
-                        lang_info = f"lang={lang_config}"
-                    
-                    logger.info(f"[{capture_folder}] 📝 TEXT FOUND{lang_str}:")
-                    logger.info(f"[{capture_folder}]    └─ '{text[:70]}'")
-                    logger.info(f"[{capture_folder}]    └─ Image: {w}x{h} → {down_w}x{down_h} (resize={downscale_pct}%, {pixel_reduction_pct:.0f}% fewer pixels)")
-                    logger.info(f"[{capture_folder}]    └─ Preprocessing: crop={crop_time:.0f}ms + resize={down_time:.0f}ms + binarize={binarize_time:.0f}ms [bin={binarize_status}] = {preprocess_time:.0f}ms")
-                    logger.info(f"[{capture_folder}]    └─ OCR{lang_method}: {ocr_time:.0f}ms (Tesseract {lang_info})")
-                    if ENABLE_SPELLCHECK:
-                        logger.info(f"[{capture_folder}]    └─ Spellcheck: {spell_time:.0f}ms ({spell_status})")
-                    logger.info(f"[{capture_folder}]    └─ TOTAL: {total_time:.0f}ms ({len(text)} chars)")
-                else:
-                    if lang_cached:
-                        lang_info = f" (cached {lang_config})"
-                    else:
-                        lang_info = f" ({lang_config})"
-                    logger.info(f"[{capture_folder}] ⊗ NO TEXT")
-                    logger.info(f"[{capture_folder}]    └─ Resize: {downscale_pct}% ({pixel_reduction_pct:.0f}% fewer pixels) | Preprocess: {preprocess_time:.0f}ms [bin={binarize_status}] | OCR{lang_info}: {ocr_time:.0f}ms | Total: {total_time:.0f}ms")
+        # Get cached language or use default (reuse language for 2 minutes)
+        current_time = time.time()
+        lang_config = 'eng+deu+fra'  # Default
+        cached_lang = None
+        cached = self.language_cache.get(capture_folder)
+        if cached and current_time - cached[0] < 120:  # 2 minutes
+            cached_lang = cached[1]
+            # Map detected language (en/fr/de) to Tesseract code (eng/fra/deu)
+            lang_config = LANG_MAP.get(cached_lang, 'eng')
+            logger.info(f"[{capture_folder}] 🔄 Using cached language: {cached_lang} → {lang_config} (age={current_time - cached[0]:.0f}s)")
         
+        last_band = self.last_band.get(capture_folder)
+        future = self.executor.submit(
+            ocr_subtitle_frame, frame_path, lang_config,
+            last_band[0] if last_band else None, cached_lang is None
+        )
+        future.add_done_callback(
+            lambda f: self._on_ocr_done(f, json_path, data, enqueued_at, capture_folder, lang_config, cached_lang)
+        )
+        return True
+    
+    def _on_ocr_done(self, future, json_path, data, enqueued_at, capture_folder, lang_config, cached_lang):
+        try:
+            result = future.result()
+            self._complete_ocr(result, json_path, data, enqueued_at, capture_folder, lang_config, cached_lang)
         except Exception as e:
+            logger.error(f"[{capture_folder}] OCR error: {e}")
+            self.device_stats[capture_folder]['errors'] += 1
             data['subtitle_analysis'] = {
                 'has_subtitles': False,
                 'extracted_text': '',
                 'error': str(e)
             }
+            data['subtitle_ocr_pending'] = False
+            try:
+                write_frame_json(json_path, data)
+            except OSError:
+                pass
+        finally:
+            self._release(capture_folder)
+    
+    def _record_result(self, capture_folder, has_subtitles, enqueued_at, kind):
+        lag_ms = (time.time() - enqueued_at) * 1000
+        with self.lock:
+            self.activity[capture_folder] = (
+                (1 - ACTIVITY_ALPHA) * self.activity[capture_folder] + ACTIVITY_ALPHA * (1.0 if has_subtitles else 0.0)
+            )
+            stats = self.device_stats[capture_folder]
+            stats[kind] += 1
+            stats['last_lag_ms'] = lag_ms
+            stats['avg_lag_ms'] = lag_ms if stats['avg_lag_ms'] is None else 0.8 * stats['avg_lag_ms'] + 0.2 * lag_ms
+            stats['max_lag_ms'] = max(stats['max_lag_ms'], lag_ms)
+        return lag_ms
+    
+    def _complete_ocr(self, result, json_path, data, enqueued_at, capture_folder, lang_config, cached_lang):
+        status = result['status']
+        if status == 'no_image':
+            return
+        
+        edge_density = result['subtitle_edge_density']
+        
+        if status == 'no_edges':
+            logger.info(f"[{capture_folder}] ⊗ SKIP: No subtitle edges detected")
+            logger.info(f"[{capture_folder}]    └─ Edge density: {edge_density:.1f}% (need 0.9-8%)")
+            lag_ms = self._record_result(capture_folder, False, enqueued_at, 'skipped')
+            data['subtitle_analysis'] = {
+                'has_subtitles': False,
+                'extracted_text': '',
+                'subtitle_edge_density': round(edge_density, 1),
+                'skipped': True,
+                'skip_reason': 'no_edges',
+                'ocr_lag_ms': round(lag_ms, 1)
+            }
+        
+        elif status == 'unchanged':
+            # Pixel-identical subtitle band → same text as last OCR
+            _, text, detected_language = self.last_band[capture_folder]
+            lag_ms = self._record_result(capture_folder, bool(text), enqueued_at, 'reused')
+            logger.info(f"[{capture_folder}] ♻️  Band unchanged - reused previous text ({result['total_time_ms']:.0f}ms, lag={lag_ms:.0f}ms)")
+            data['subtitle_analysis'] = {
+                'has_subtitles': bool(text),
+                'extracted_text': text,
+                'detected_language': detected_language,
+                'subtitle_edge_density': round(edge_density, 1),
+                'box': result['box'],
+                'skipped': False,
+                'reused_previous': True,
+                'ocr_time_ms': 0.0,
+                'ocr_lag_ms': round(lag_ms, 1)
+            }
+        
+        else:
+            text = result['text']
+            detected_language = None
+            if text and len(text) > 10:  # Only meaningful text carries a language
+                if cached_lang:
+                    detected_language = cached_lang
+                elif result['detected_language']:
+                    detected_language = result['detected_language']
+                    if detected_language != 'unknown':
+                        # Update cache (reused for 2 minutes)
+                        self.language_cache[capture_folder] = (time.time(), detected_language)
+                        logger.info(f"[{capture_folder}] 🌐 Detected language: {detected_language} ({result['lang_time_ms']:.0f}ms) - cached for 2min")
+            
+            self.last_band[capture_folder] = (result['band_hash'], text, detected_language)
+            lag_ms = self._record_result(capture_folder, bool(text), enqueued_at, 'ocr')
+            
+            data['subtitle_analysis'] = {
+                'has_subtitles': bool(text),
+                'extracted_text': text,
+                'detected_language': detected_language,
+                'subtitle_edge_density': round(edge_density, 1),
+                'box': result['box'],
+                'skipped': False,
+                'ocr_time_ms': round(result['ocr_time_ms'], 2),
+                'ocr_lag_ms': round(lag_ms, 1),
+                'downscale_factor': DOWNSCALE_FACTOR,
+                'pixel_reduction_pct': round(result['pixel_reduction_pct'], 1),
+                'binarized': ENABLE_BINARIZATION
+            }
+            self._log_ocr_result(capture_folder, result, text, detected_language, lang_config, cached_lang is not None, lag_ms)
         
         data['subtitle_ocr_pending'] = False
+        write_frame_json(json_path, data)
+    
+    def _log_ocr_result(self, capture_folder, result, text, detected_language, lang_config, lang_cached, lag_ms):
+        # Clear, readable logging showing what happened
+        binarize_status = "ON" if ENABLE_BINARIZATION else "OFF"
+        downscale_pct = int(DOWNSCALE_FACTOR * 100)
+        w, h, down_w, down_h = result['image_size']
+        pixel_reduction_pct = result['pixel_reduction_pct']
+        preprocess_time = result['crop_time_ms'] + result['down_time_ms'] + result['binarize_time_ms']
+        ocr_time = result['ocr_time_ms']
+        total_time = result['total_time_ms']
+        
+        if result['spell_corrections']:
+            logger.info(f"[{capture_folder}] ✏️  Spell corrections: {', '.join(result['spell_corrections'][:5])}")
         
-        with open(json_path + '.tmp', 'w') as f:
-            json.dump(data, f, indent=2)
-        os.rename(json_path + '.tmp', json_path)
+        if text:
+            lang_str = f" [{detected_language}]" if detected_language else ""
+            if lang_cached:
+                lang_method = f" (cached, single lang)"
+                lang_info = f"lang={lang_config} ⚡"
+            else:
+                lang_method = f" (3 languages)"
+                lang_info = f"lang={lang_config}"
+            
+            logger.info(f"[{capture_folder}] 📝 TEXT FOUND{lang_str}:")
+            logger.info(f"[{capture_folder}]    └─ '{text[:70]}'")
+            logger.info(f"[{capture_folder}]    └─ Image: {w}x{h} → {down_w}x{down_h} (resize={downscale_pct}%, {pixel_reduction_pct:.0f}% fewer pixels)")
+            logger.info(f"[{capture_folder}]    └─ Preprocessing: crop={result['crop_time_ms']:.0f}ms + resize={result['down_time_ms']:.0f}ms + binarize={result['binarize_time_ms']:.0f}ms [bin={binarize_status}] = {preprocess_time:.0f}ms")
+            logger.info(f"[{capture_folder}]    └─ OCR{lang_method}: {ocr_time:.0f}ms (Tesseract {lang_info})")
+            if ENABLE_SPELLCHECK:
+                logger.info(f"[{capture_folder}]    └─ Spellcheck: {result['spell_time_ms']:.0f}ms ({result['spell_status']})")
+            logger.info(f"[{capture_folder}]    └─ TOTAL: {total_time:.0f}ms ({len(text)} chars) | lag={lag_ms:.0f}ms")
+        else:
+            if lang_cached:
+                lang_info = f" (cached {lang_config})"
+            else:
+                lang_info = f" ({lang_config})"
+            logger.info(f"[{capture_folder}] ⊗ NO TEXT")
+            logger.info(f"[{capture_folder}]    └─ Resize: {downscale_pct}% ({pixel_reduction_pct:.0f}% fewer pixels) | Preprocess: {preprocess_time:.0f}ms [bin={binarize_status}] | OCR{lang_info}: {ocr_time:.0f}ms | Total: {total_time:.0f}ms | lag={lag_ms:.0f}ms")
+    
+    def get_stats(self):
+        """Per-device OCR counters, lag (enqueue → result written) and scheduling weight"""
+        with self.lock:
+            return {
+                folder: dict(
+                    stats,
+                    queued=self.queues[folder].qsize(),
+                    activity=round(self.activity[folder], 2),
+                    weight=round(self._device_weight(folder), 2)
+                )
+                for folder, stats in self.device_stats.items()
+            }
+    
+    def _log_stats(self):
+        for folder, stats in self.get_stats().items():
+            avg_lag = f"{stats['avg_lag_ms']:.0f}ms" if stats['avg_lag_ms'] is not None else "n/a"
+            logger.info(
+                f"[{folder}] 📊 OCR stats: ocr={stats['ocr']} reused={stats['reused']} skipped={stats['skipped']} "
+                f"errors={stats['errors']} | lag avg={avg_lag} max={stats['max_lag_ms']:.0f}ms | "
+                f"queued={stats['queued']} weight={stats['weight']}"
+            )
     
     def run(self):
         try:
@@ -470,21 +679,15 @@ class InotifySubtitleMonitor:
                 
                 if path in self.path_to_folder:
                     capture_folder = self.path_to_folder[path]['capture_folder']
-                    json_path = os.path.join(path, filename)
-                    work_queue = self.queues[capture_folder]
-                    
-                    try:
-                        work_queue.put_nowait(json_path)
-                    except queue.Full:
-                        try:
-                            work_queue.get_nowait()
-                            work_queue.put_nowait(json_path)
-                        except:
-                            pass
+                    self.enqueue(capture_folder, os.path.join(path, filename))
         
         except KeyboardInterrupt:
             logger.info("Shutting down...")
         finally:
+            self.worker_running = False
+            self.work_available.set()
+            if self.executor:
+                self.executor.shutdown(wait=False, cancel_futures=True)
             for path in self.path_to_folder.keys():
                 try:
                     self.inotify.remove_watch(path)
@@ -518,6 +721,7 @@ def main():
     logger.info(f"- Binarization: {binarize_status} (black/white for faster OCR)")
     logger.info(f"- Spellcheck: {spellcheck_status} (corrects misspelled words)")
     logger.info("- Language caching (2min per device)")
+    logger.info(f"- OCR pool: {OCR_WORKERS} workers, band hash reuse, activity-weighted scheduling")
     logger.info("=" * 80)
     logger.info(f"Monitoring {len(capture_dirs)} devices (queue: 10 most recent per device)")
     
@@ -30,10 +30,7 @@ os.environ['VECLIB_MAXIMUM_THREADS'] = '2'   # macOS Accelerate
 
 import sys
 import json
-import subprocess
 import logging
-import queue
-from queue import LifoQueue
 import threading
 from datetime import datetime
 import time
@@ -61,12 +58,19 @@ from shared.src.lib.utils.storage_path_utils import (
 )
 
 from shared.src.lib.utils.audio_transcription_utils import (
-    transcribe_audio,
     clean_transcript_text,
     correct_spelling,
     check_audio_level,
     ENABLE_SPELLCHECK
 )
+from shared.src.lib.utils.audio_analysis_utils import get_audio_analysis_engine
+from shared.src.lib.utils.audio_transcription_scheduler import (
+    TranscriptionScheduler,
+    TranscriptionJob,
+    SOURCE_REALTIME,
+    SOURCE_BACKLOG,
+    DEFAULT_WORKERS
+)
 
 logger = logging.getLogger(__name__)
 
@@ -83,6 +87,8 @@ TRANSLATION_LANGUAGES = {
 CHUNK_DURATION_MINUTES = 10
 SEGMENT_DURATION_MINUTES = 1
 ENABLE_DUBBED_AUDIO = False  # Set to True to enable automatic dubbed audio generation
+LANGUAGE_HINT_CONFIDENCE = 0.8
+LANGUAGE_HINT_TTL_SECONDS = 600  # Hinted (forced) jobs cannot detect a change: re-detect once per 10min chunk
 
 _chunk_languages = {}
 
@@ -143,114 +149,54 @@ def check_mp3_has_audio(mp3_path: str, capture_folder: str, sample_duration: flo
     
     return has_audio, mean_volume
 
-def transcribe_mp3_chunk_progressive(mp3_path: str, capture_folder: str, hour: int, chunk_index: int) -> list:
+def split_result_by_minute(result: dict, capture_folder: str) -> list:
     """
-    Transcribe 10-minute MP3 once, return results grouped by minute for progressive merging
+    Group transcription segments of a 10-minute chunk by minute for progressive merging
     
     Returns:
-        List of minute_data dicts (one per minute 0-9)
+        List of minute_data dicts (only minutes containing segments)
     """
-    try:
-        import psutil
+    segments = result.get('segments', [])
+    language = result.get('language', 'unknown')
+    minute_volumes_db = result.get('minute_volumes_db', [])
+    
+    minute_groups = {}
+    for i in range(10):
+        minute_groups[i] = []
+    
+    for segment in segments:
+        start_time = segment.get('start', 0)
+        minute_offset = int(start_time // 60)
+        if minute_offset < 10:
+            minute_groups[minute_offset].append(segment)
+    
+    minute_results = []
+    for minute_offset in range(10):
+        minute_segments = minute_groups[minute_offset]
         
-        process = psutil.Process()
-        cpu_before = process.cpu_percent(interval=None)  # Initialize CPU monitoring
+        if not minute_segments:
+            continue
         
-        GREEN = '\033[92m'
-        RESET = '\033[0m'
-        logger.info(f"{GREEN}[WHISPER:{capture_folder}] 🎬 Processing: {mp3_path} (transcribe once, save progressively){RESET}")
-
-        has_audio, mean_volume_db = check_mp3_has_audio(mp3_path, capture_folder, sample_duration=5.0)
-        
-        if not has_audio:
-            logger.info(f"[{capture_folder}] ⏭️  SKIPPED: chunk silent ({mean_volume_db:.1f}dB)")
-            # Return silent minute data to trigger rolling 24h cleanup
-            return [{
-                'minute_offset': i,
-                'language': 'unknown',
-                'transcript': '',
-                'segments': [],
-                'skip_reason': f'silent_audio_{mean_volume_db:.1f}dB'
-            } for i in range(10)]
-        
-        # Log CPU before Whisper execution
-        time.sleep(0.1)  # Small delay to get accurate baseline
-        cpu_before = process.cpu_percent(interval=None)
-        
-        total_start = time.time()
-        result = transcribe_audio(mp3_path, model_name='tiny', skip_silence_check=True, device_id=capture_folder)
-        elapsed = time.time() - total_start
-        cpu_after = process.cpu_percent(interval=None)
-        
-        segments = result.get('segments', [])
-        language = result.get('language', 'unknown')
-        language_code = result.get('language_code', 'unknown')
-        confidence = result.get('confidence', 0.0)
-        audio_duration = result.get('duration', 0.0)
+        minute_transcript = ' '.join([s.get('text', '').strip() for s in minute_segments])
+        minute_transcript = clean_transcript_text(minute_transcript)
+        if ENABLE_SPELLCHECK:
+            minute_transcript = correct_spelling(minute_transcript, result.get('language_code'))
         
         GREEN = '\033[92m'
-        YELLOW = '\033[93m'
         RESET = '\033[0m'
-        
-        # Get text preview from first segment (if any)
-        text_preview = ""
-        if segments:
-            first_text = segments[0].get('text', '').strip()
-            text_preview = f' | Text: "{first_text[:60]}..."' if first_text else ""
-        
-        # Duration 0.0s = Whisper detected silence/no speech (normal for silent sources)
-        duration_note = " (silent audio)" if audio_duration == 0 else ""
-        
-        # Calculate Real-Time Factor (RTF): how fast Whisper processes vs real-time
-        # RTF < 1.0 = faster than real-time (good!)
-        # RTF = 1.0 = real-time speed
-        # RTF > 1.0 = slower than real-time (problematic)
-        rtf = elapsed / audio_duration if audio_duration > 0 else 0.0
-        rtf_note = f" (RTF={rtf:.2f}x)"
-        
-        logger.info(f"{GREEN}[WHISPER:{capture_folder}] ✅ TRANSCRIPTION COMPLETE:{RESET}")
-        logger.info(f"{GREEN}  • Whisper processing time: {elapsed:.1f}s for {audio_duration:.1f}s audio{rtf_note}{duration_note}{RESET}")
-        logger.info(f"{GREEN}  • Language: {language} ({language_code}), Confidence: {confidence:.2f}{RESET}")
-        logger.info(f"{GREEN}  • Segments: {len(segments)}, CPU: {cpu_before:.1f}%→{cpu_after:.1f}%{text_preview}{RESET}")
-        
-        minute_groups = {}
-        for i in range(10):
-            minute_groups[i] = []
-        
-        for segment in segments:
-            start_time = segment.get('start', 0)
-            minute_offset = int(start_time // 60)
-            if minute_offset < 10:
-                minute_groups[minute_offset].append(segment)
-        
-        minute_results = []
-        for minute_offset in range(10):
-            minute_segments = minute_groups[minute_offset]
-            
-            if not minute_segments:
-                continue
-            
-            minute_transcript = ' '.join([s.get('text', '').strip() for s in minute_segments])
-            minute_transcript = clean_transcript_text(minute_transcript)
-            if ENABLE_SPELLCHECK:
-                minute_transcript = correct_spelling(minute_transcript, result.get('language_code'))
-            
-            GREEN = '\033[92m'
-            RESET = '\033[0m'
-            logger.info(f"{GREEN}[{capture_folder}] 📝 Minute {minute_offset}: {len(minute_segments)} segments, {len(minute_transcript)} chars - \"{minute_transcript[:50]}...\"{RESET}")
-            
-            minute_results.append({
-                'minute_offset': minute_offset,
-                'language': language,
-                'transcript': minute_transcript,
-                'segments': minute_segments
-            })
-        
-        return minute_results
-        
-    except Exception as e:
-        logger.error(f"[{capture_folder}] ❌ Error: {e}")
-        return []
+        logger.info(f"{GREEN}[{capture_folder}] 📝 Minute {minute_offset}: {len(minute_segments)} segments, {len(minute_transcript)} chars - \"{minute_transcript[:50]}...\"{RESET}")
+        
+        minute_data = {
+            'minute_offset': minute_offset,
+            'language': language,
+            'transcript': minute_transcript,
+            'segments': minute_segments
+        }
+        if minute_offset < len(minute_volumes_db):
+            minute_data['mean_volume_db'] = minute_volumes_db[minute_offset]
+        minute_results.append(minute_data)
+    
+    return minute_results
 
 def merge_minute_to_chunk(capture_folder: str, hour: int, chunk_index: int, minute_data: dict, has_mp3: bool = True):
     """
@@ -346,6 +292,9 @@ def merge_minute_to_chunk(capture_folder: str, hour: int, chunk_index: int, minu
                 'has_audio': has_audio,
                 'skip_reason': skip_reason
             }
+            # Audio level from the same PCM decode as transcription (when available)
+            if minute_data.get('mean_volume_db') is not None:
+                chunk_data['minute_statuses'][str(minute_offset)]['mean_volume_db'] = round(minute_data['mean_volume_db'], 1)
             
             # Apply timestamp offset to convert minute-relative times (0-60s) to chunk-relative times
             # Example: minute 3 segments at 0-60s become 180-240s in the chunk
@@ -879,14 +828,14 @@ def check_minute_already_processed(capture_folder: str, hour: int, chunk_index:
 class InotifyTranscriptMonitor:
     """Simple MP3 transcription monitor"""
     
-    def __init__(self, monitored_devices, enable_transcription=False):
+    def __init__(self, monitored_devices, enable_transcription=False, transcription_workers=DEFAULT_WORKERS):
         self.monitored_devices = monitored_devices
         self.enable_transcription = enable_transcription
         self.inotify = inotify.adapters.Inotify()
         self.audio_path_to_device = {}
-        # Two separate queues: inotify (real-time) and scan (backlog)
-        self.inotify_queue = LifoQueue(maxsize=500)  # Real-time events (priority)
-        self.scan_queue = queue.Queue(maxsize=10)    # Backlog/history (max 10)
+        # Single priority scheduler for all devices: real-time (newest first) > backlog (oldest first)
+        self.scheduler = None
+        self.device_languages = {}  # device_folder -> (language_code, detected_at)
         self.audio_workers = {}
         self.incident_manager = None
         
@@ -898,6 +847,10 @@ class InotifyTranscriptMonitor:
             logger.info("=" * 80)
             logger.info("🎤 TRANSCRIPTION ENABLED - Starting Whisper components")
             logger.info("=" * 80)
+            self.scheduler = TranscriptionScheduler(
+                on_result=self._handle_transcription_result,
+                num_workers=transcription_workers
+            )
             self._setup_watches()
             self._scan_existing_mp3s()
             self._start_transcription_worker()
@@ -1033,136 +986,96 @@ class InotifyTranscriptMonitor:
                 age_minutes = int((time.time() - mtime) / 60)
                 logger.info(f"{CYAN}[SCAN]   {idx:2d}. [{device_folder}] {type_label:5s} {mp3_file} (age: {age_minutes}min){RESET}")
                 
-                # Add to scan queue
-                if type_label == '1min':
-                    self.scan_queue.put((device_folder, mp3_path, hour, chunk_index))
-                else:  # 10min
-                    self.scan_queue.put((device_folder, hour, chunk_index))
+                # Add to scheduler as backlog (served after real-time, oldest first)
+                self.scheduler.submit(TranscriptionJob(
+                    device_folder=device_folder,
+                    audio_path=mp3_path,
+                    hour=hour,
+                    chunk_index=chunk_index,
+                    kind=type_label,
+                    source=SOURCE_BACKLOG,
+                    enqueued_at=mtime
+                ))
             
-            logger.info(f"{CYAN}[SCAN] ✓ Queued {len(limited_pending)} items to scan_queue (FIFO order){RESET}")
+            logger.info(f"{CYAN}[SCAN] ✓ Queued {len(limited_pending)} backlog items to scheduler (oldest first){RESET}")
         else:
             logger.info(f"{CYAN}[SCAN] ✓ No backlog across all devices - system fully up to date{RESET}")
         
         logger.info(f"{CYAN}{'=' * 80}{RESET}")
     
     def _start_transcription_worker(self):
-        """Start single transcription worker"""
-        worker = threading.Thread(target=self._transcription_worker, daemon=True)
-        worker.start()
-        logger.info("Transcription worker started")
+        """Start batched transcription scheduler (Whisper worker processes, one model each)"""
+        self.scheduler.start()
     
-    def _transcription_worker(self):
-        """Process MP3 transcription with dual-queue priority (inotify > scan)"""
-        last_heartbeat = time.time()
-        heartbeat_interval = 60
+    def _get_language_hint(self, device_folder: str):
+        """Confident language of the device, None once the hint is older than LANGUAGE_HINT_TTL_SECONDS (job re-detects)"""
+        hint = self.device_languages.get(device_folder)
+        if not hint:
+            return None
+        language_code, detected_at = hint
+        if time.time() - detected_at > LANGUAGE_HINT_TTL_SECONDS:
+            self.device_languages.pop(device_folder, None)
+            return None
+        return language_code
+    
+    def _handle_transcription_result(self, job: TranscriptionJob, result: dict):
+        """Scheduler callback: merge transcription result into the 10min chunk JSON"""
+        device_folder = job.device_folder
+        GREEN = '\033[92m'
+        RESET = '\033[0m'
         
-        while True:
-            try:
-                item = None
-                source_queue = None
-                
-                # Priority 1: Check inotify queue (real-time events)
-                try:
-                    item = self.inotify_queue.get_nowait()
-                    source_queue = 'inotify'
-                except queue.Empty:
-                    # Priority 2: If inotify empty, check scan queue (backlog)
-                    try:
-                        item = self.scan_queue.get(timeout=5)
-                        source_queue = 'scan'
-                    except queue.Empty:
-                        # Both queues empty - heartbeat check
-                        if time.time() - last_heartbeat > heartbeat_interval:
-                            inotify_size = self.inotify_queue.qsize()
-                            scan_size = self.scan_queue.qsize()
-                            logger.info(f"[TRANSCRIPTION] ❤️  Heartbeat: queues[inotify={inotify_size}, scan={scan_size}] - Idle, waiting for MP3s...")
-                            last_heartbeat = time.time()
-                        continue
-                
-                if item is None:
-                    continue
-                
-                last_heartbeat = time.time()
-                
-                # Get current queue sizes for logging
-                inotify_size = self.inotify_queue.qsize()
-                scan_size = self.scan_queue.qsize()
-                queue_status = f"queues[inotify={inotify_size}, scan={scan_size}]"
-                
-                # Debug: log what item we picked up
-                logger.debug(f"[TRANSCRIPTION] Picked up item (len={len(item)}) from {source_queue}: {item}")
-                
-                if len(item) == 3:
-                    # 10min MP3 chunk
-                    device_folder, hour, chunk_index = item
-                    
-                    from shared.src.lib.utils.storage_path_utils import get_cold_storage_path
-                    audio_cold = get_cold_storage_path(device_folder, 'audio')
-                    mp3_path = os.path.join(audio_cold, str(hour), f'chunk_10min_{chunk_index}.mp3')
-                    
-                    if os.path.exists(mp3_path):
-                        # Process 10min chunk (includes silence check before Whisper to avoid wasting CPU)
-                        logger.info(f"[{device_folder}] 🎵 Processing 10min: {hour}h/chunk_{chunk_index} (source={source_queue}, {queue_status})")
-                        minute_results = transcribe_mp3_chunk_progressive(mp3_path, device_folder, hour, chunk_index)
-                        # CRITICAL: Process ALL minute_data (including silent) to trigger rolling 24h cleanup
-                        # Without this, old transcripts persist indefinitely during silent periods
-                        for minute_data in minute_results:
-                            merge_minute_to_chunk(device_folder, hour, chunk_index, minute_data, has_mp3=True)
-                    else:
-                        logger.warning(f"[{device_folder}] ⚠️  10min MP3 not found: {mp3_path}")
-                
-                elif len(item) == 4:
-                    # 1min MP3 segment (only created when audio detected, so no silence check needed)
-                    device_folder, mp3_path, hour, chunk_index = item
-                    
-                    logger.info(f"[{device_folder}] 📋 Processing 1min MP3: {mp3_path}")
-                    
-                    if os.path.exists(mp3_path):
-                        # Extract slot number from filename (1min_0.mp3 → slot 0)
-                        slot = int(Path(mp3_path).stem.replace('1min_', ''))
-                        minute_offset = slot  # Slot number IS the minute offset within the 10min chunk
-                        logger.info(f"[{device_folder}] 🎵 Transcribing 1min: {hour}h/chunk_{chunk_index}/minute_{minute_offset} (source={source_queue}, {queue_status})")
-                        
-                        result = transcribe_audio(mp3_path, model_name='tiny', skip_silence_check=True, device_id=device_folder)
-                        segments = result.get('segments', [])
-                        
-                        if segments:
-                            transcript = ' '.join([s.get('text', '').strip() for s in segments])
-                            transcript = clean_transcript_text(transcript)
-                            if ENABLE_SPELLCHECK:
-                                transcript = correct_spelling(transcript, result.get('language_code'))
-                            
-                            minute_data = {
-                                'minute_offset': minute_offset,
-                                'language': result.get('language', 'unknown'),
-                                'transcript': transcript,
-                                'segments': segments
-                            }
-                            merge_minute_to_chunk(device_folder, hour, chunk_index, minute_data, has_mp3=False)
-                            
-                            # NOTE: AI translation now on-demand via /host/transcript/translate-chunk endpoint
-                            # No automatic 1-minute translation to reduce CPU load
-                            # if len(transcript) > 20:
-                            #     enhance_and_dub_1min(device_folder, hour, chunk_index, slot, transcript, result.get('language', 'unknown'))
-                        else:
-                            logger.info(f"[{device_folder}] ⏭️  1min MP3 returned no segments (Whisper detected silence)")
-                    else:
-                        logger.warning(f"[{device_folder}] ⚠️  1min MP3 not found (may have been archived): {mp3_path}")
-                
-                # Mark task done on appropriate queue
-                if source_queue == 'inotify':
-                    self.inotify_queue.task_done()
-                elif source_queue == 'scan':
-                    self.scan_queue.task_done()
-                
-            except Exception as e:
-                import traceback
-                logger.error(f"Transcription error: {e}")
-                logger.error(f"Traceback: {traceback.format_exc()}")
-                if source_queue == 'inotify':
-                    self.inotify_queue.task_done()
-                elif source_queue == 'scan':
-                    self.scan_queue.task_done()
+        if not result.get('success'):
+            logger.error(f"[{device_folder}] ❌ Transcription failed for {os.path.basename(job.audio_path)}: {result.get('error')}")
+            return
+        
+        # Remember confident language per device - lets next minutes join cross-device batches.
+        # Only detected languages count: a hinted job echoes its hint with full confidence
+        language_code = result.get('language_code')
+        if (not job.language and language_code and language_code != 'unknown'
+                and result.get('confidence', 0.0) >= LANGUAGE_HINT_CONFIDENCE):
+            self.device_languages[device_folder] = (language_code, time.time())
+        
+        segments = result.get('segments', [])
+        logger.info(f"{GREEN}[WHISPER:{device_folder}] ✅ {job.kind} {job.hour}h/chunk_{job.chunk_index}: {len(segments)} segments, "
+                    f"{result.get('audio_seconds', 0.0):.0f}s audio, language={result.get('language', 'unknown')}"
+                    f"{' (no speech - skipped by VAD)' if result.get('skipped') else ''}{RESET}")
+        
+        if job.kind == '10min':
+            if result.get('skipped'):
+                # Return silent minute data to trigger rolling 24h cleanup
+                minute_volumes_db = result.get('minute_volumes_db', [])
+                minute_results = [{
+                    'minute_offset': i,
+                    'language': 'unknown',
+                    'transcript': '',
+                    'segments': [],
+                    'skip_reason': f"{result.get('reason', 'no_speech')}_{result.get('mean_volume_db', -100.0):.1f}dB",
+                    'mean_volume_db': minute_volumes_db[i] if i < len(minute_volumes_db) else None
+                } for i in range(10)]
+            else:
+                minute_results = split_result_by_minute(result, device_folder)
+            # CRITICAL: Process ALL minute_data (including silent) to trigger rolling 24h cleanup
+            # Without this, old transcripts persist indefinitely during silent periods
+            for minute_data in minute_results:
+                merge_minute_to_chunk(device_folder, job.hour, job.chunk_index, minute_data, has_mp3=True)
+            return
+        
+        # 1min MP3 segment
+        if not segments:
+            logger.info(f"[{device_folder}] ⏭️  1min MP3 returned no segments ({result.get('reason', 'Whisper detected silence')}, {result.get('mean_volume_db', -100.0):.1f}dB)")
+            return
+        
+        minute_data = {
+            'minute_offset': job.minute_offset,
+            'language': result.get('language', 'unknown'),
+            'transcript': result.get('transcript', ''),
+            'segments': segments,
+            'mean_volume_db': result.get('mean_volume_db')
+        }
+        merge_minute_to_chunk(device_folder, job.hour, job.chunk_index, minute_data, has_mp3=False)
+        
+        # NOTE: AI translation now on-demand via /host/transcript/translate-chunk endpoint
+        # No automatic 1-minute translation to reduce CPU load
     
     
     
@@ -1251,6 +1164,7 @@ class InotifyTranscriptMonitor:
         processing_times = []        # Track recent processing times
         consecutive_timeouts = 0     # Track timeout streak
         consecutive_successes = 0    # Track success streak
+        audio_engine = get_audio_analysis_engine()
         
         check_count = 0
         while True:
@@ -1312,34 +1226,15 @@ class InotifyTranscriptMonitor:
                 # Adaptive timeout: increase under load
                 adaptive_timeout = 2.0 if current_interval <= 5.0 else 4.0
                 
-                # Use faster audio detection with timeout handling
-                try:
-                    cmd = [
-                        'ffmpeg',
-                        '-hide_banner',
-                        '-loglevel', 'info',  # Need 'info' level for volumedetect output (NOT 'error'!)
-                        '-i', segment_path,
-                        '-t', '0.5',
-                        '-af', 'volumedetect',
-                        '-f', 'null',
-                        '-'
-                    ]
-                    
-                    result = subprocess.run(cmd, capture_output=True, text=True, timeout=adaptive_timeout)
-                    
-                    mean_volume = -100.0
-                    volume_line_found = False
-                    for line in result.stderr.split('\n'):
-                        if 'mean_volume:' in line:
-                            volume_line_found = True
-                            try:
-                                mean_volume = float(line.split('mean_volume:')[1].split('dB')[0].strip())
-                                break
-                            except Exception as e:
-                                logger.error(f"{BLUE}[AUDIO:{device_folder}] Failed to parse volume: {line} (error: {e}){RESET}")
-                    
-                    has_audio = mean_volume > -50.0
-                    processing_time = time.time() - processing_start
+                # PERFORMANCE: Single in-process decode (PyAV) - metrics shared via AudioAnalysisEngine cache
+                metrics = audio_engine.analyze_segment(
+                    segment_path, max_duration=0.5, timeout=max(1, int(adaptive_timeout)), context=device_folder
+                )
+                processing_time = time.time() - processing_start
+                
+                if metrics is not None:
+                    has_audio = metrics['audio']
+                    mean_volume = metrics['mean_volume_db']
                     
                     # Record successful processing
                     processing_times.append(processing_time)
@@ -1348,25 +1243,15 @@ class InotifyTranscriptMonitor:
                     
                     consecutive_timeouts = 0
                     consecutive_successes += 1
-                    
-                except subprocess.TimeoutExpired:
-                    # Handle timeout - system is overloaded
-                    processing_time = adaptive_timeout
+                else:
+                    # Decode failed or timed out (ffmpeg fallback) - treat as overload signal
                     has_audio = False
                     mean_volume = -100.0
                     
                     consecutive_timeouts += 1
                     consecutive_successes = 0
                     
-                    logger.warning(f"{YELLOW}[AUDIO:{device_folder}] ⏰ ffmpeg timeout ({adaptive_timeout}s) on {segment_filename} - system overloaded{RESET}")
-                    
-                except Exception as e:
-                    # Handle other ffmpeg errors gracefully
-                    processing_time = 1.0  # Assume moderate processing time on errors
-                    has_audio = False
-                    mean_volume = -100.0
-                    
-                    logger.warning(f"{BLUE}[AUDIO:{device_folder}] ⚠️  ffmpeg error on {segment_filename}: {e} (assuming silent){RESET}")
+                    logger.warning(f"{YELLOW}[AUDIO:{device_folder}] ⚠️  Audio decode failed on {segment_filename} after {processing_time:.2f}s (assuming silent){RESET}")
                 
                 # Dynamic interval adjustment based on performance
                 old_interval = current_interval
@@ -1406,6 +1291,8 @@ class InotifyTranscriptMonitor:
                 detection_result = {
                     'audio': has_audio,
                     'mean_volume_db': mean_volume,
+                    'peak_db': metrics['peak_db'] if metrics else -100.0,
+                    'loudness_db': metrics['loudness_db'] if metrics else -100.0,
                     'segment_path': segment_path,
                     'timestamp': datetime.now().isoformat()
                 }
@@ -1559,9 +1446,10 @@ class InotifyTranscriptMonitor:
         try:
             for event in self.inotify.event_gen(yield_nones=True):
                 if time.time() - last_heartbeat > heartbeat_interval:
-                    inotify_size = self.inotify_queue.qsize()
-                    scan_size = self.scan_queue.qsize()
-                    logger.info(f"[INOTIFY] ❤️  Heartbeat: events={event_count}, MP3s={mp3_count}, queues[inotify={inotify_size}, scan={scan_size}]")
+                    stats = self.scheduler.get_stats()
+                    logger.info(f"[INOTIFY] ❤️  Heartbeat: events={event_count}, MP3s={mp3_count}, pending={stats['pending']}, "
+                                f"done={stats['jobs_done']} (vad_skipped={stats['jobs_skipped_no_speech']}), "
+                                f"throughput={stats['throughput']:.2f} audio-s/wall-s")
                     last_heartbeat = time.time()
                 
                 if event is None:
@@ -1581,11 +1469,21 @@ class InotifyTranscriptMonitor:
                         now = datetime.now()
                         hour, chunk_index = calculate_chunk_location(now)
                         
+                        # Slot number IS the minute offset within the 10min chunk (1min_0.mp3 → slot 0)
+                        slot = int(Path(filename).stem.replace('1min_', ''))
+                        
                         mp3_count += 1
-                        self.inotify_queue.put((device_folder, mp3_path, hour, chunk_index))
-                        inotify_size = self.inotify_queue.qsize()
-                        scan_size = self.scan_queue.qsize()
-                        logger.info(f"[INOTIFY] 🆕 1min MP3 detected: {device_folder}/{filename} (slot {filename.replace('1min_', '').replace('.mp3', '')}) → queues[inotify={inotify_size}, scan={scan_size}]")
+                        self.scheduler.submit(TranscriptionJob(
+                            device_folder=device_folder,
+                            audio_path=mp3_path,
+                            hour=hour,
+                            chunk_index=chunk_index,
+                            kind='1min',
+                            minute_offset=slot,
+                            source=SOURCE_REALTIME,
+                            language=self._get_language_hint(device_folder)
+                        ))
+                        logger.info(f"[INOTIFY] 🆕 1min MP3 detected: {device_folder}/{filename} (slot {slot}) → pending={self.scheduler.pending()}")
         
         except KeyboardInterrupt:
             logger.info("Shutting down...")
@@ -1614,6 +1512,12 @@ Examples:
         default=False,
         help='Enable MP3 transcription (default: false - audio detection only)'
     )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=DEFAULT_WORKERS,
+        help=f'Whisper worker processes, one model each (default: {DEFAULT_WORKERS}, env TRANSCRIPTION_WORKERS)'
+    )
     args = parser.parse_args()
     
     enable_transcription = args.transcript
@@ -1694,11 +1598,12 @@ Examples:
         
         logger.info(f"Monitoring {len(monitored_devices)} devices ({skipped_count} skipped)")
         if enable_transcription:
-            logger.info("Whisper model will be loaded on first transcription (global singleton)")
+            logger.info(f"Whisper model will be loaded once per worker process ({args.workers} worker(s))")
         else:
             logger.info("Whisper model will NOT be loaded (transcription disabled)")
         
-        monitor = InotifyTranscriptMonitor(monitored_devices, enable_transcription=enable_transcription)
+        monitor = InotifyTranscriptMonitor(monitored_devices, enable_transcription=enable_transcription,
+                                           transcription_workers=args.workers)
         monitor.run()
         
     except Exception as e:
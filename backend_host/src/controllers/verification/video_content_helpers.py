@@ -14,13 +14,18 @@ about video artifacts, subtitles, and visual content patterns.
 
 import os
 import time
-import subprocess
 import cv2
 import numpy as np
 import re
 from datetime import datetime
 from backend_host.src.lib.utils.system_info_utils import get_files_by_pattern
 from typing import Dict, Any, Optional, Tuple, List
+from shared.src.lib.utils.frame_batch_utils import (
+    iter_frame_batches,
+    dark_percentages,
+    frame_differences,
+    macroblock_metrics
+)
 from shared.src.lib.utils.image_utils import (
     analyze_subtitle_region as shared_analyze_subtitle_region,
     extract_text_from_region,
@@ -422,9 +427,36 @@ class VideoContentHelpers:
         """
         results = []
         
-        for image_path in image_paths:
-            result = self.detect_blackscreen_in_image(image_path, threshold)
-            results.append(result)
+        # PERFORMANCE: One parallel half-resolution decode + vectorized dark ratio for the whole window
+        for _, batch in iter_frame_batches(image_paths):
+            percentages = dark_percentages(batch, threshold)
+            
+            for i, image_path in enumerate(batch.paths):
+                if not batch.loaded(i):
+                    results.append({
+                        'success': False,
+                        'error': batch.errors[i],
+                        'image_path': image_path
+                    })
+                    continue
+                
+                dark_percentage = float(percentages[i])
+                is_blackscreen = bool(dark_percentage > 80)
+                width, height = batch.original_size(i)
+                total_pixels = width * height
+                
+                results.append({
+                    'success': True,
+                    'is_blackscreen': is_blackscreen,
+                    'dark_percentage': round(dark_percentage, 2),
+                    'threshold': threshold,
+                    'very_dark_pixels': int(round(total_pixels * dark_percentage / 100)),
+                    'total_pixels': int(total_pixels),
+                    'image_size': f"{width}x{height}",
+                    'confidence': 0.9 if is_blackscreen else 0.1,
+                    'image_path': os.path.basename(image_path)
+                })
+                print(f"VideoContent[{self.device_name}]: Blackscreen analysis - {dark_percentage:.1f}% dark pixels, blackscreen={is_blackscreen}")
         
         # Calculate overall result
         successful_analyses = [r for r in results if r.get('success')]
@@ -471,74 +503,70 @@ class VideoContentHelpers:
             freeze_ended = False
             MAX_ANALYSIS_IMAGES = min(50, len(image_paths))  # Dynamic safety cap based on available images
             
-            # Process images with early stopping logic
-            for i in range(len(image_paths) - 1):
-                # Safety cap on analysis
-                if i >= MAX_ANALYSIS_IMAGES - 1:
-                    print(f"VideoContent[{self.device_name}]: Reached {MAX_ANALYSIS_IMAGES}-image analysis cap - stopping")
-                    break
-                
-                # Load current and next image
-                img1_path = image_paths[i]
-                img2_path = image_paths[i + 1]
-                
-                if not os.path.exists(img1_path) or not os.path.exists(img2_path):
-                    return {
-                        'success': False,
-                        'error': f'Image file not found: {img1_path} or {img2_path}',
-                        'freeze_detected': False
-                    }
-                
-                img1 = cv2.imread(img1_path, cv2.IMREAD_GRAYSCALE)
-                img2 = cv2.imread(img2_path, cv2.IMREAD_GRAYSCALE)
-                
-                if img1 is None or img2 is None:
-                    return {
-                        'success': False,
-                        'error': f'Could not load images: {img1_path}, {img2_path}',
-                        'freeze_detected': False
-                    }
+            # PERFORMANCE: Each frame is decoded once (parallel, half resolution) and the consecutive
+            # diffs of a window are computed in one vectorized pass - early stopping between windows
+            sample_rate = SAMPLING_PATTERNS["freeze_sample_rate"]
+            
+            for offset, batch in iter_frame_batches(image_paths[:MAX_ANALYSIS_IMAGES], overlap=1):
+                differences = frame_differences(batch, sample_rate)
                 
-                # Check if images have same dimensions
-                if img1.shape != img2.shape:
-                    return {
-                        'success': False,
-                        'error': f'Image dimensions don\'t match: {img1.shape} vs {img2.shape}',
-                        'freeze_detected': False
+                for j, mean_diff in enumerate(differences):
+                    i = offset + j
+                    img1_path = batch.paths[j]
+                    img2_path = batch.paths[j + 1]
+                    
+                    if batch.errors[j] == 'Image file not found' or batch.errors[j + 1] == 'Image file not found':
+                        return {
+                            'success': False,
+                            'error': f'Image file not found: {img1_path} or {img2_path}',
+                            'freeze_detected': False
+                        }
+                    
+                    if not batch.loaded(j) or not batch.loaded(j + 1):
+                        return {
+                            'success': False,
+                            'error': f'Could not load images: {img1_path}, {img2_path}',
+                            'freeze_detected': False
+                        }
+                    
+                    # Check if images have same dimensions
+                    if np.isnan(mean_diff):
+                        return {
+                            'success': False,
+                            'error': f'Image dimensions don\'t match: {batch.original_size(j)} vs {batch.original_size(j + 1)}',
+                            'freeze_detected': False
+                        }
+                    
+                    is_frozen = bool(mean_diff < freeze_threshold)
+                    
+                    comparison = {
+                        'frame1': os.path.basename(img1_path),
+                        'frame2': os.path.basename(img2_path),
+                        'mean_difference': round(float(mean_diff), 2),
+                        'is_frozen': is_frozen,
+                        'threshold': freeze_threshold
                     }
+                    
+                    comparisons.append(comparison)
+                    
+                    # Early stopping logic (similar to blackscreen detection)
+                    if is_frozen and not freeze_detected:
+                        freeze_detected = True
+                        print(f"VideoContent[{self.device_name}]: ⚡ Freeze START at comparison {i+1} ({comparison['frame1']} vs {comparison['frame2']}: diff={mean_diff:.2f}) - continuing to find END...")
+                    
+                    elif freeze_detected and not is_frozen:
+                        freeze_ended = True
+                        print(f"VideoContent[{self.device_name}]: ✅ Freeze END at comparison {i+1} ({comparison['frame1']} vs {comparison['frame2']}: diff={mean_diff:.2f}) - STOPPING EARLY!")
+                        break  # Early stopping - complete freeze sequence found!
+                    else:
+                        # Only log non-transition frames in compact format
+                        print(f"VideoContent[{self.device_name}]: {comparison['frame1']} vs {comparison['frame2']}: diff={mean_diff:.2f}, frozen={is_frozen}")
                 
-                # Optimized sampling for pixel difference (every 10th pixel for performance)
-                sample_rate = SAMPLING_PATTERNS["freeze_sample_rate"]
-                img1_sampled = img1[::sample_rate, ::sample_rate]
-                img2_sampled = img2[::sample_rate, ::sample_rate]
-                
-                # Calculate difference
-                diff = cv2.absdiff(img1_sampled, img2_sampled)
-                mean_diff = np.mean(diff)
-                is_frozen = bool(mean_diff < freeze_threshold)
-                
-                comparison = {
-                    'frame1': os.path.basename(img1_path),
-                    'frame2': os.path.basename(img2_path),
-                    'mean_difference': round(float(mean_diff), 2),
-                    'is_frozen': is_frozen,
-                    'threshold': freeze_threshold
-                }
-                
-                comparisons.append(comparison)
-                
-                # Early stopping logic (similar to blackscreen detection)
-                if is_frozen and not freeze_detected:
-                    freeze_detected = True
-                    print(f"VideoContent[{self.device_name}]: ⚡ Freeze START at comparison {i+1} ({comparison['frame1']} vs {comparison['frame2']}: diff={mean_diff:.2f}) - continuing to find END...")
-                
-                elif freeze_detected and not is_frozen:
-                    freeze_ended = True
-                    print(f"VideoContent[{self.device_name}]: ✅ Freeze END at comparison {i+1} ({comparison['frame1']} vs {comparison['frame2']}: diff={mean_diff:.2f}) - STOPPING EARLY!")
-                    break  # Early stopping - complete freeze sequence found!
-                else:
-                    # Only log non-transition frames in compact format
-                    print(f"VideoContent[{self.device_name}]: {comparison['frame1']} vs {comparison['frame2']}: diff={mean_diff:.2f}, frozen={is_frozen}")
+                if freeze_ended:
+                    break
+            
+            if not freeze_ended and len(image_paths) > MAX_ANALYSIS_IMAGES:
+                print(f"VideoContent[{self.device_name}]: Reached {MAX_ANALYSIS_IMAGES}-image analysis cap - stopping")
             
             # Calculate freeze statistics
             frozen_count = sum(1 for comp in comparisons if comp['is_frozen'])
@@ -911,18 +939,33 @@ class VideoContentHelpers:
         """
         results = []
         
-        for image_path in image_paths:
-            if not os.path.exists(image_path):
-                results.append({
+        # PERFORMANCE: Parallel decode, artifact/blur metrics vectorized over the window
+        # Full-resolution color decode: reduced JPEG decode skips chroma upsampling and skews the HSV artifact ratio
+        for _, batch in iter_frame_batches(image_paths, reduction=1, color=True):
+            try:
+                artifacts, blur = macroblock_metrics(batch, sample_rate=10)
+            except Exception as e:
+                results.extend({
                     'image_path': image_path,
                     'success': False,
-                    'error': 'Image file not found'
-                })
+                    'error': f'Analysis error: {str(e)}'
+                } for image_path in batch.paths)
                 continue
             
-            try:
-                # Use same algorithm as analyze_audio_video.py
-                macroblocks_detected, quality_score = self._analyze_macroblocks_simple(image_path)
+            for i, image_path in enumerate(batch.paths):
+                if batch.errors[i] == 'Image file not found':
+                    results.append({
+                        'image_path': image_path,
+                        'success': False,
+                        'error': 'Image file not found'
+                    })
+                    continue
+                
+                if batch.loaded(i):
+                    width, height = batch.original_size(i)
+                    macroblocks_detected, quality_score = self._classify_macroblocks(float(artifacts[i]), float(blur[i]), width, height)
+                else:
+                    macroblocks_detected, quality_score = False, 0.0  # Unreadable image
                 
                 results.append({
                     'image_path': os.path.basename(image_path),
@@ -932,13 +975,6 @@ class VideoContentHelpers:
                 })
                 
                 print(f"VideoContent[{self.device_name}]: Macroblock analysis - macroblocks={macroblocks_detected}, quality={quality_score:.1f}")
-                
-            except Exception as e:
-                results.append({
-                    'image_path': image_path,
-                    'success': False,
-                    'error': f'Analysis error: {str(e)}'
-                })
         
         # Calculate overall result
         successful_analyses = [r for r in results if r.get('success')]
@@ -993,40 +1029,44 @@ class VideoContentHelpers:
             gray_sampled = gray[::sample_rate, ::sample_rate]
             laplacian_var = cv2.Laplacian(gray_sampled, cv2.CV_64F).var()
             
-            # CONSERVATIVE THRESHOLDS - Only flag obvious macroblocks
-            has_severe_artifacts = artifact_percentage > 8.0  # Raised from 2% to 8% - must be obvious
-            is_severely_blurry = laplacian_var < 30  # Lowered from 100 to 30 - must be very blurry
-            
-            # Additional validation: both conditions should be somewhat present for true macroblocks
-            # If only one condition is met, require it to be very severe
-            if has_severe_artifacts and is_severely_blurry:
-                # Both conditions met - likely macroblocks
-                macroblocks_detected = True
-                confidence = "high"
-            elif has_severe_artifacts and artifact_percentage > 15.0:
-                # Very high artifact percentage alone
-                macroblocks_detected = True
-                confidence = "medium_artifacts"
-            elif is_severely_blurry and laplacian_var < 15:
-                # Extremely blurry alone
-                macroblocks_detected = True
-                confidence = "medium_blur"
-            else:
-                # Neither condition severe enough
-                macroblocks_detected = False
-                confidence = "none"
-            
-            quality_score = max(artifact_percentage, (200 - laplacian_var) / 2) if macroblocks_detected else 0.0
-            
-            # Detailed logging (same format as blackscreen detection)
-            print(f"VideoContent[{self.device_name}]: Macroblock check: {img_width}x{img_height} | artifacts={artifact_percentage:.1f}% (threshold: 8.0%), blur_var={laplacian_var:.1f} (threshold: 30), detected={macroblocks_detected} ({confidence})")
-            
-            return macroblocks_detected, quality_score
+            return self._classify_macroblocks(artifact_percentage, laplacian_var, img_width, img_height)
             
         except Exception as e:
             print(f"VideoContent[{self.device_name}]: Macroblock analysis error: {e}")
             return False, 0.0
 
+    def _classify_macroblocks(self, artifact_percentage: float, laplacian_var: float, img_width: int, img_height: int) -> Tuple[bool, float]:
+        """Conservative macroblock decision from artifact percentage and blur (Laplacian variance)"""
+        # CONSERVATIVE THRESHOLDS - Only flag obvious macroblocks
+        has_severe_artifacts = artifact_percentage > 8.0  # Raised from 2% to 8% - must be obvious
+        is_severely_blurry = laplacian_var < 30  # Lowered from 100 to 30 - must be very blurry
+        
+        # Additional validation: both conditions should be somewhat present for true macroblocks
+        # If only one condition is met, require it to be very severe
+        if has_severe_artifacts and is_severely_blurry:
+            # Both conditions met - likely macroblocks
+            macroblocks_detected = True
+            confidence = "high"
+        elif has_severe_artifacts and artifact_percentage > 15.0:
+            # Very high artifact percentage alone
+            macroblocks_detected = True
+            confidence = "medium_artifacts"
+        elif is_severely_blurry and laplacian_var < 15:
+            # Extremely blurry alone
+            macroblocks_detected = True
+            confidence = "medium_blur"
+        else:
+            # Neither condition severe enough
+            macroblocks_detected = False
+            confidence = "none"
+        
+        quality_score = max(artifact_percentage, (200 - laplacian_var) / 2) if macroblocks_detected else 0.0
+        
+        # Detailed logging (same format as blackscreen detection)
+        print(f"VideoContent[{self.device_name}]: Macroblock check: {img_width}x{img_height} | artifacts={artifact_percentage:.1f}% (threshold: 8.0%), blur_var={laplacian_var:.1f} (threshold: 30), detected={macroblocks_detected} ({confidence})")
+        
+        return macroblocks_detected, quality_score
+
     # =============================================================================
     # Freeze-based Zapping Detection
     # =============================================================================
@@ -1442,92 +1482,70 @@ class VideoContentHelpers:
             }
 
     def _get_images_after_timestamp(self, folder_path: str, start_timestamp: float, max_count: int = 10, use_thumbnails: bool = False) -> List[Dict]:
-        """Get images after timestamp for detection analysis - searches both HOT and COLD storage."""
+        """
+        Get images after timestamp for detection analysis - searches both HOT and COLD storage.
+        
+        Uses the device capture timeline index (binary search, maintained by capture_monitor)
+        and falls back to a directory scan when the index does not cover the timestamp.
+        """
         try:
-            from shared.src.lib.utils.storage_path_utils import get_capture_storage_path, get_cold_storage_path, is_ram_mode
+            from shared.src.lib.utils.capture_timeline_utils import get_capture_timeline
             
-            # Check if device is in RAM mode - if so, search BOTH hot and cold folders
-            # (images may have been archived from hot to cold during zap execution)
-            search_folders = []
+            timeline = get_capture_timeline(folder_path)
+            if timeline.refresh() and timeline.covers(start_timestamp):
+                images = timeline.frames_after(start_timestamp, max_count if max_count > 0 else 40, use_thumbnails)
+                if images:
+                    return images
+        except Exception as e:
+            print(f"VideoContent[{self.device_name}]: Capture timeline unavailable, scanning folders: {e}")
+        
+        return self._scan_images_after_timestamp(folder_path, start_timestamp, max_count, use_thumbnails)
+
+    def _scan_images_after_timestamp(self, folder_path: str, start_timestamp: float, max_count: int = 10, use_thumbnails: bool = False) -> List[Dict]:
+        """Directory scan fallback for _get_images_after_timestamp (no timeline index yet)."""
+        try:
+            from shared.src.lib.utils.storage_path_utils import get_capture_storage_path, get_cold_storage_path, is_ram_mode
             
+            subfolder = 'thumbnails' if use_thumbnails else 'captures'
+            search_folders = [get_capture_storage_path(folder_path, subfolder)]
             if is_ram_mode(folder_path):
-                # RAM mode: search both hot (active) and cold (recently archived)
-                if use_thumbnails:
-                    search_folders.append(get_capture_storage_path(folder_path, 'thumbnails'))  # Hot thumbnails
-                    search_folders.append(get_cold_storage_path(folder_path, 'thumbnails'))    # Cold thumbnails (if archived)
-                else:
-                    search_folders.append(get_capture_storage_path(folder_path, 'captures'))   # Hot captures
-                    search_folders.append(get_cold_storage_path(folder_path, 'captures'))      # Cold captures (archived)
-            else:
-                # SD mode: only one location
-                if use_thumbnails:
-                    search_folders.append(get_capture_storage_path(folder_path, 'thumbnails'))
-                else:
-                    search_folders.append(get_capture_storage_path(folder_path, 'captures'))
+                # RAM mode: images may have been archived from hot to cold during zap execution
+                search_folders.append(get_cold_storage_path(folder_path, subfolder))
             
-            image_pattern = 'capture_*_thumbnail.jpg' if use_thumbnails else 'capture_*.jpg'
-            MAX_TOTAL_IMAGES = max_count if max_count > 0 else 40
+            pattern = re.compile(r'capture_(\d+)_thumbnail\.jpg$' if use_thumbnails else r'capture_(\d+)\.jpg$')
             
-            import re
-            capture_files = []
-            
-            # Search all folders (hot + cold in RAM mode, single folder in SD mode)
+            # capture_number -> (mtime, path), newest copy wins (same file in hot and cold)
+            capture_files = {}
             for images_folder in search_folders:
-                if not os.path.exists(images_folder):
-                    continue
-                
                 try:
-                    if use_thumbnails:
-                        result = subprocess.run([
-                            'find', images_folder, '-name', image_pattern, '-type', 'f'
-                        ], capture_output=True, text=True, timeout=30)
-                    else:
-                        result = subprocess.run([
-                            'find', images_folder, '-name', 'capture_*.jpg', '!', '-name', '*_thumbnail.jpg', '-type', 'f'
-                        ], capture_output=True, text=True, timeout=30)
-                    
-                    if result.returncode != 0:
-                        continue
-                    
-                    for file_path in result.stdout.strip().split('\n'):
-                        if not file_path:
-                            continue
-                        
-                        filename = os.path.basename(file_path)
-                        pattern = r'capture_(\d+)_thumbnail\.jpg' if use_thumbnails else r'capture_(\d+)\.jpg'
-                        match = re.match(pattern, filename)
-                        
-                        if match:
+                    with os.scandir(images_folder) as entries:
+                        for entry in entries:
+                            match = pattern.match(entry.name)
+                            if not match:
+                                continue
                             try:
-                                file_mtime = os.path.getmtime(file_path)
-                                if file_mtime >= start_timestamp:
-                                    capture_number = int(match.group(1))
-                                    # Avoid duplicates (same file in hot and cold) - keep newest
-                                    existing = next((f for f in capture_files if f[0] == capture_number), None)
-                                    if existing:
-                                        if file_mtime > os.path.getmtime(existing[1]):
-                                            capture_files.remove(existing)
-                                            capture_files.append((capture_number, file_path))
-                                    else:
-                                        capture_files.append((capture_number, file_path))
+                                file_mtime = entry.stat().st_mtime
                             except OSError:
                                 continue
-                    
-                except (subprocess.TimeoutExpired, Exception):
+                            if file_mtime < start_timestamp:
+                                continue
+                            capture_number = int(match.group(1))
+                            existing = capture_files.get(capture_number)
+                            if not existing or file_mtime > existing[0]:
+                                capture_files[capture_number] = (file_mtime, entry.path)
+                except OSError:
                     continue
             
             # Sort by capture number and limit results
-            capture_files.sort(key=lambda x: x[0])
-            valid_files = [f[1] for f in capture_files][:max_count] if max_count > 0 else [f[1] for f in capture_files]
-            
-            images = []
-            for file_path in valid_files[:MAX_TOTAL_IMAGES]:
-                images.append({
-                    'path': file_path,
-                    'timestamp': os.path.getmtime(file_path),
-                    'filename': os.path.basename(file_path),
-                    'sequential_format': True
-                })
+            limit = max_count if max_count > 0 else 40
+            selected = [capture_files[number] for number in sorted(capture_files)][:limit]
+            
+            images = [{
+                'path': file_path,
+                'timestamp': file_mtime,
+                'filename': os.path.basename(file_path),
+                'sequential_format': True
+            } for file_mtime, file_path in selected]
             
             return sorted(images, key=lambda x: x['timestamp'])
             
@@ -1543,16 +1561,42 @@ class VideoContentHelpers:
         """Batch blackscreen detection with early stopping."""
         results = []
         blackscreen_detected = False
+        blackscreen_ended = False
         MAX_ANALYSIS_IMAGES = min(50, len(image_data))
+        threshold = 5
+        blackscreen_threshold = self._get_blackscreen_threshold(device_model)
         
-        for i, img_data in enumerate(image_data):
-            if i >= MAX_ANALYSIS_IMAGES:
-                break
-                
-            image_path = img_data['path']
-            
+        # PERFORMANCE: Windows of frames decoded in parallel at half resolution, dark ratio
+        # vectorized over each window - early stopping skips decoding the remaining windows
+        analysis_data = image_data[:MAX_ANALYSIS_IMAGES]
+        for offset, batch in iter_frame_batches([img_data['path'] for img_data in analysis_data]):
             try:
-                is_blackscreen, blackscreen_percentage = self._analyze_blackscreen_simple(image_path, analysis_rectangle, 5, device_model)
+                regions = [self._get_blackscreen_region(path, *batch.original_size(i), analysis_rectangle) if batch.loaded(i) else None
+                           for i, path in enumerate(batch.paths)]
+                percentages = dark_percentages(batch, threshold, regions)
+                error = None
+            except Exception as e:
+                error = str(e)
+            
+            for i, image_path in enumerate(batch.paths):
+                img_data = analysis_data[offset + i]
+                
+                if error:
+                    results.append({
+                        'path': image_path,
+                        'filename': img_data['filename'],
+                        'timestamp': img_data['timestamp'],
+                        'is_blackscreen': False,
+                        'blackscreen_percentage': 0.0,
+                        'success': False,
+                        'error': error
+                    })
+                    print(f"VideoContent[{self.device_name}]: ❌ {img_data['filename']}: Analysis error - {error}")
+                    continue
+                
+                # Unreadable image counts as not black (same as _analyze_blackscreen_simple)
+                blackscreen_percentage = 0.0 if np.isnan(percentages[i]) else float(percentages[i])
+                is_blackscreen = blackscreen_percentage > blackscreen_threshold
                 
                 result = {
                     'path': image_path,
@@ -1575,20 +1619,12 @@ class VideoContentHelpers:
                     print(f"VideoContent[{self.device_name}]: ⚡ Blackscreen START at {img_data['filename']} - continuing to find END...")
                 
                 elif blackscreen_detected and not is_blackscreen:
+                    blackscreen_ended = True
                     print(f"VideoContent[{self.device_name}]: ✅ Blackscreen END at {img_data['filename']} - STOPPING EARLY!")
                     break
-                
-            except Exception as e:
-                results.append({
-                    'path': image_path,
-                    'filename': img_data['filename'],
-                    'timestamp': img_data['timestamp'],
-                    'is_blackscreen': False,
-                    'blackscreen_percentage': 0.0,
-                    'success': False,
-                    'error': str(e)
-                })
-                print(f"VideoContent[{self.device_name}]: ❌ {img_data['filename']}: Analysis error - {e}")
+            
+            if blackscreen_ended:
+                break
         
         print(f"VideoContent[{self.device_name}]: Blackscreen analysis complete - {len(results)} images analyzed, early_stopped={blackscreen_detected}")
         return results
@@ -1612,38 +1648,7 @@ class VideoContentHelpers:
                 return False, 0.0
             
             img_height, img_width = img.shape
-            
-            # Smart detection: Is this a thumbnail or full-resolution image?
-            is_thumbnail = '_thumbnail' in image_path or img_width < 1000
-            
-            if is_thumbnail:
-                # Thumbnail: Analyze top 70% (exclude banner at bottom ~30%)
-                # Blackscreen happens in the center during zapping, not in banner area
-                x = 0
-                y = 0
-                width = img_width
-                height = int(img_height * 0.7)  # Top 70%
-            else:
-                # Full-resolution: Use provided rectangle or default
-                if analysis_rectangle:
-                    x = analysis_rectangle.get('x', 0)
-                    y = analysis_rectangle.get('y', 0)
-                    width = analysis_rectangle.get('width', img_width)
-                    height = analysis_rectangle.get('height', img_height)
-                    
-                    # Clamp to image bounds (same as old auto-correction logic)
-                    x = max(0, x)
-                    y = max(0, y)
-                    if x + width > img_width:
-                        width = img_width - x
-                    if y + height > img_height:
-                        height = img_height - y
-                else:
-                    # Default: top 70% of image
-                    x = 0
-                    y = 0
-                    width = img_width
-                    height = int(img_height * 0.7)
+            x, y, width, height = self._get_blackscreen_region(image_path, img_width, img_height, analysis_rectangle)
             
             # Crop to analysis region
             img = img[y:y+height, x:x+width]
@@ -1669,13 +1674,7 @@ class VideoContentHelpers:
                 very_dark_pixels = np.sum(img <= threshold)
                 dark_percentage = (very_dark_pixels / total_pixels) * 100
             
-            # Device-specific blackscreen thresholds to account for UI overlays
-            if device_model and 'mobile' in device_model.lower():
-                blackscreen_threshold = 70  # Mobile: 70% threshold (accounts for UI overlays)
-            else:
-                blackscreen_threshold = 85  # Desktop/STB: 85% threshold (minimal UI overlay)
-            
-            is_blackscreen = dark_percentage > blackscreen_threshold
+            is_blackscreen = dark_percentage > self._get_blackscreen_threshold(device_model)
             
             return is_blackscreen, dark_percentage
             
@@ -1683,6 +1682,40 @@ class VideoContentHelpers:
             print(f"VideoContent[{self.device_name}]: Blackscreen analysis error: {e}")
             return False, 0.0
 
+    def _get_blackscreen_region(self, image_path: str, img_width: int, img_height: int, analysis_rectangle: Dict[str, int] = None) -> Tuple[int, int, int, int]:
+        """
+        Blackscreen analysis region (x, y, width, height) for an image of this size.
+        Thumbnails use the top 70% (exclude banner); full-resolution images use the clamped rectangle.
+        """
+        # Smart detection: Is this a thumbnail or full-resolution image?
+        is_thumbnail = '_thumbnail' in image_path or img_width < 1000
+        
+        if is_thumbnail or not analysis_rectangle:
+            # Analyze top 70% (exclude banner at bottom ~30%)
+            # Blackscreen happens in the center during zapping, not in banner area
+            return 0, 0, img_width, int(img_height * 0.7)
+        
+        x = analysis_rectangle.get('x', 0)
+        y = analysis_rectangle.get('y', 0)
+        width = analysis_rectangle.get('width', img_width)
+        height = analysis_rectangle.get('height', img_height)
+        
+        # Clamp to image bounds (same as old auto-correction logic)
+        x = max(0, x)
+        y = max(0, y)
+        if x + width > img_width:
+            width = img_width - x
+        if y + height > img_height:
+            height = img_height - y
+        
+        return x, y, width, height
+
+    def _get_blackscreen_threshold(self, device_model: str = None) -> int:
+        """Device-specific blackscreen thresholds to account for UI overlays"""
+        if device_model and 'mobile' in device_model.lower():
+            return 70  # Mobile: 70% threshold (accounts for UI overlays)
+        return 85  # Desktop/STB: 85% threshold (minimal UI overlay)
+
     def _find_blackscreen_sequence(self, blackscreen_results: List[Dict]) -> Dict[str, Any]:
         """
         Find blackscreen start and end in the sequence of results.
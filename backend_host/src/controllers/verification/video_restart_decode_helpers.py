@@ -0,0 +1,270 @@
+"""
+Video Restart Decode Helpers - one demux/decode pass feeding every restart analysis stage
+
+The restart analysis used to open the same HLS segments three times (MP4 audio
+extraction for the transcript, MP4 audio extraction for dubbing prep, capture
+folder scan for screenshots). RestartDecodePass runs a single FFmpeg process over
+the restart segments and fans its outputs out through bounded queues:
+
+- 'frames':      1 JPEG per second (aligned screenshots, image2pipe)
+- 'speech_pcm':  16kHz mono s16le (Whisper transcript)
+- 'dubbing_pcm': 44.1kHz stereo s16le (restart_original_audio.wav for dubbing)
+
+Each output is a pipe read by its own thread into a bounded queue.Queue, so a slow
+consumer applies backpressure to FFmpeg instead of buffering the whole clip. A
+consumer that stops reading for RESTART_DECODE_PUT_TIMEOUT is detached and its
+stream discarded, so the other stages keep going.
+
+Usage:
+    decode = RestartDecodePass(segment_files, device_name='device1')
+    if decode.start():
+        wav_path = decode.write_wav('speech_pcm', '/tmp/restart_speech.wav')
+        frame_paths = decode.write_frames('/var/www/.../restart_frames/<video_id>')
+        result = decode.wait()   # {'success', 'decode_ms', 'frames', 'error'}
+"""
+
+import os
+import queue
+import subprocess
+import tempfile
+import threading
+import time
+import wave
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+RESTART_DECODE_QUEUE_SIZE = int(os.getenv('RESTART_DECODE_QUEUE_SIZE', '32'))         # chunks per stream
+RESTART_DECODE_CHUNK_BYTES = int(os.getenv('RESTART_DECODE_CHUNK_BYTES', str(64 * 1024)))
+RESTART_DECODE_PUT_TIMEOUT = float(os.getenv('RESTART_DECODE_PUT_TIMEOUT', '30'))      # detach stalled consumers
+RESTART_DECODE_TIMEOUT = float(os.getenv('RESTART_DECODE_TIMEOUT', '120'))
+RESTART_FRAME_QUALITY = int(os.getenv('RESTART_FRAME_QUALITY', '3'))                   # mjpeg -q:v (2-31)
+
+PCM_FORMATS = {
+    'speech_pcm': (16000, 1),
+    'dubbing_pcm': (44100, 2),
+}
+
+_END = object()
+
+
+def _has_audio_stream(segment_path: str) -> bool:
+    """Header-only check so the pass never maps an audio output that cannot exist"""
+    try:
+        result = subprocess.run(['ffmpeg', '-hide_banner', '-i', segment_path], capture_output=True, timeout=10)
+        return b'Audio:' in result.stderr
+    except Exception:
+        return False
+
+
+class RestartDecodePass:
+    """Single FFmpeg decode of the restart segments, fanned out to bounded per-stage queues"""
+
+    def __init__(self, segment_files: List[Tuple[str, str]], device_name: str = 'RestartVideo',
+                 frame_fps: float = 1.0, queue_size: int = RESTART_DECODE_QUEUE_SIZE):
+        self.segment_files = segment_files
+        self.device_name = device_name
+        self.frame_fps = frame_fps
+        self.has_audio = False
+        self.queues: Dict[str, queue.Queue] = {}
+        self._queue_size = queue_size
+        self._detached = set()
+        self._readers: List[threading.Thread] = []
+        self._process = None
+        self._concat_file = None
+        self._started_at = 0.0
+        self._result = None
+        self._wait_lock = threading.Lock()
+        self._frames = 0
+
+    def start(self) -> bool:
+        """Launch FFmpeg and the pipe readers (returns False if the pass cannot run)"""
+        if not self.segment_files:
+            return False
+
+        self.has_audio = _has_audio_stream(self.segment_files[0][1])
+        fd, self._concat_file = tempfile.mkstemp(suffix='.txt', prefix='restart_decode_')
+        with os.fdopen(fd, 'w') as f:
+            for _, segment_path in self.segment_files:
+                f.write(f"file '{segment_path}'\n")
+
+        cmd = ['ffmpeg', '-hide_banner', '-loglevel', 'error', '-f', 'concat', '-safe', '0', '-i', self._concat_file,
+               '-map', '0:v:0', '-vf', f'fps={self.frame_fps}', '-c:v', 'mjpeg', '-q:v', str(RESTART_FRAME_QUALITY),
+               '-f', 'image2pipe', 'pipe:1']
+        pipes = {'frames': None}
+        if self.has_audio:
+            for name, (rate, channels) in PCM_FORMATS.items():
+                read_fd, write_fd = os.pipe()
+                pipes[name] = (read_fd, write_fd)
+                cmd += ['-map', '0:a:0', '-ac', str(channels), '-ar', str(rate), '-f', 's16le', f'pipe:{write_fd}']
+
+        write_fds = [p[1] for p in pipes.values() if p]
+        try:
+            self._started_at = time.time()
+            self._process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, pass_fds=write_fds)
+        except Exception as e:
+            print(f"[@restart_decode] ❌ {self.device_name}: could not start FFmpeg: {e}")
+            for p in pipes.values():
+                if p:
+                    os.close(p[0])
+            self._cleanup()
+            return False
+        finally:
+            for fd in write_fds:
+                os.close(fd)  # Child owns the write ends now
+
+        for name, p in pipes.items():
+            self.queues[name] = queue.Queue(maxsize=self._queue_size)
+            stream = self._process.stdout if p is None else os.fdopen(p[0], 'rb')
+            reader = threading.Thread(target=self._read_stream, args=(name, stream), daemon=True,
+                                      name=f'restart-decode-{name}')
+            reader.start()
+            self._readers.append(reader)
+
+        print(f"[@restart_decode] 🎞️ {self.device_name}: decoding {len(self.segment_files)} segments in one pass "
+              f"(audio={'yes' if self.has_audio else 'no'})")
+        return True
+
+    def _read_stream(self, name: str, stream) -> None:
+        """Pipe -> bounded queue (frames are split on JPEG EOI so consumers get whole images)"""
+        pending = b''
+        try:
+            while True:
+                data = stream.read1(RESTART_DECODE_CHUNK_BYTES)
+                if not data:
+                    break
+                if name != 'frames':
+                    self._put(name, data)
+                    continue
+                pending += data
+                while True:
+                    end = pending.find(b'\xff\xd9')  # EOI (0xFF is byte-stuffed inside entropy-coded data)
+                    if end < 0:
+                        break
+                    self._frames += 1
+                    self._put(name, pending[:end + 2])
+                    pending = pending[end + 2:]
+        except Exception as e:
+            print(f"[@restart_decode] ⚠️ {self.device_name}: {name} reader failed: {e}")
+        finally:
+            try:
+                stream.close()
+            except Exception:
+                pass
+            # Sentinel always lands, even for a detached consumer (queue is drained on detach)
+            self._put(name, _END, force=True)
+
+    def _put(self, name: str, item, force: bool = False) -> None:
+        if name in self._detached and not force:
+            return
+        q = self.queues[name]
+        try:
+            q.put(item, timeout=RESTART_DECODE_PUT_TIMEOUT)
+        except queue.Full:
+            print(f"[@restart_decode] ⚠️ {self.device_name}: {name} consumer stalled, detaching stream")
+            self._detached.add(name)
+            while True:
+                try:
+                    q.get_nowait()
+                except queue.Empty:
+                    break
+            if force:
+                q.put_nowait(item)
+
+    def iter_stream(self, name: str) -> Iterator[bytes]:
+        """Yield a stream's chunks (PCM) or whole JPEG frames until the pass ends"""
+        q = self.queues.get(name)
+        if q is None:
+            return
+        while True:
+            item = q.get()
+            if item is _END:
+                return
+            yield item
+
+    def discard(self, name: str) -> None:
+        """Consumer is not interested (or failed): drop the stream without stalling FFmpeg"""
+        if name not in self.queues:
+            return
+        self._detached.add(name)
+        for _ in self.iter_stream(name):
+            pass
+
+    def write_wav(self, name: str, output_path: str) -> Optional[str]:
+        """Stream a PCM output into a WAV file, None if the segments carry no audio"""
+        if name not in self.queues:
+            return None
+        rate, channels = PCM_FORMATS[name]
+        written = 0
+        try:
+            with wave.open(output_path, 'wb') as wav:
+                wav.setnchannels(channels)
+                wav.setsampwidth(2)
+                wav.setframerate(rate)
+                for chunk in self.iter_stream(name):
+                    wav.writeframes(chunk)
+                    written += len(chunk)
+        except Exception:
+            self.discard(name)
+            raise
+        if not written:
+            os.remove(output_path)
+            return None
+        return output_path
+
+    def write_frames(self, output_dir: str, prefix: str = 'restart_frame') -> List[str]:
+        """Write the aligned 1 fps frames as JPEG files (replaces a previous restart's frames)"""
+        os.makedirs(output_dir, exist_ok=True)
+        for entry in os.scandir(output_dir):
+            if entry.name.startswith(prefix) and entry.name.endswith('.jpg'):
+                os.remove(entry.path)
+
+        paths = []
+        try:
+            for index, jpeg in enumerate(self.iter_stream('frames')):
+                path = os.path.join(output_dir, f'{prefix}_{index:04d}.jpg')
+                with open(path, 'wb') as f:
+                    f.write(jpeg)
+                paths.append(path)
+        except Exception:
+            self.discard('frames')
+            raise
+        return paths
+
+    def wait(self, timeout: float = RESTART_DECODE_TIMEOUT) -> Dict[str, Any]:
+        """Wait for FFmpeg + readers, return {'success', 'decode_ms', 'frames', 'error'} (safe from every stage)"""
+        with self._wait_lock:
+            if self._result is None:
+                self._result = self._wait_process(timeout)
+            return self._result
+
+    def _wait_process(self, timeout: float) -> Dict[str, Any]:
+        if self._process is None:
+            return {'success': False, 'decode_ms': 0, 'frames': 0, 'error': 'Decode pass not started'}
+
+        error = None
+        try:
+            self._process.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            self._process.kill()
+            self._process.wait()
+            error = f'FFmpeg decode timeout after {timeout}s'
+        decode_ms = int((time.time() - self._started_at) * 1000)
+        for reader in self._readers:
+            reader.join(timeout=5)
+
+        stderr = self._process.stderr.read().decode('utf-8', errors='replace') if self._process.stderr else ''
+        if error is None and self._process.returncode != 0:
+            error = stderr[-300:] or f'FFmpeg exited with {self._process.returncode}'
+        self._cleanup()
+
+        if error:
+            print(f"[@restart_decode] ❌ {self.device_name}: decode pass failed: {error}")
+        else:
+            print(f"[@restart_decode] ✅ {self.device_name}: decoded {self._frames} frames in {decode_ms}ms")
+        return {'success': error is None, 'decode_ms': decode_ms, 'frames': self._frames, 'error': error}
+
+    def _cleanup(self) -> None:
+        if self._concat_file and os.path.exists(self._concat_file):
+            try:
+                os.remove(self._concat_file)
+            except OSError:
+                pass
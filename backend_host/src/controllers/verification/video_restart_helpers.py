@@ -9,6 +9,7 @@ import os
 import time
 import uuid
 import re
+import shutil
 import subprocess
 import threading
 import json
@@ -16,6 +17,8 @@ from datetime import datetime
 from typing import Dict, Any, Optional, List, Tuple
 from backend_host.src.lib.utils.system_info_utils import get_files_by_pattern
 
+RESTART_ARTIFACT_RETENTION_HOURS = float(os.getenv('RESTART_ARTIFACT_RETENTION_HOURS', '6'))  # Status files + decoded frames
+
 
 class VideoRestartHelpers:
     """Helper class for restart video functionality."""
@@ -45,6 +48,9 @@ class VideoRestartHelpers:
         # Translation cache: {video_id: {language: {frame_data: {...}}}}
         self._translation_cache = {}
         
+        # Stage threads update the same status file concurrently
+        self._status_lock = threading.Lock()
+        
         # Status cache directory (use hot storage for temporary status files)
         from shared.src.lib.utils.storage_path_utils import is_ram_mode
         if is_ram_mode(self.video_capture_path):
@@ -541,6 +547,43 @@ class VideoRestartHelpers:
             # Fallback to stream path
             return self.video_stream_path + "/" + video_filename
     
+    def _get_screenshots_in_window(self, start_time: float, end_time: float) -> List[str]:
+        """Screenshot paths captured in [start_time, end_time] - capture timeline index, directory scan fallback"""
+        try:
+            from shared.src.lib.utils.capture_timeline_utils import get_capture_timeline
+            
+            timeline = get_capture_timeline(self.video_capture_path)
+            if timeline.refresh() and timeline.covers(start_time):
+                frames = timeline.frames_between(start_time, end_time)
+                if frames:
+                    print(f"RestartHelpers[{self.device_name}]: 📸 Capture timeline: {len(frames)} screenshots in window")
+                    return [frame['path'] for frame in frames]
+        except Exception as e:
+            print(f"RestartHelpers[{self.device_name}]: Capture timeline unavailable, scanning folder: {e}")
+        
+        from shared.src.lib.utils.storage_path_utils import get_capture_storage_path
+        
+        # Get captures folder using centralized path resolution
+        capture_folder = get_capture_storage_path(self.video_capture_path, 'captures')
+        print(f"RestartHelpers[{self.device_name}]:   - Scanning: {capture_folder}")
+        
+        # Get all screenshots in hot storage
+        all_screenshots = get_files_by_pattern(capture_folder, r'^capture_.*\.jpg$', exclude_pattern=r'_thumbnail\.jpg$')
+        print(f"RestartHelpers[{self.device_name}]: 📸 Found {len(all_screenshots)} total screenshots in hot storage")
+        
+        # Filter: Only screenshots within video time window (mtime read once per file)
+        screenshots_in_window = []
+        for screenshot_path in all_screenshots:
+            try:
+                screenshot_time = os.path.getmtime(screenshot_path)
+            except OSError:
+                continue
+            if start_time <= screenshot_time <= end_time:
+                screenshots_in_window.append((screenshot_time, screenshot_path))
+        
+        screenshots_in_window.sort()
+        return [path for _, path in screenshots_in_window]
+    
     def _get_aligned_screenshots(self, segment_files: List[Tuple[str, str]]) -> List[str]:
         """
         Get screenshots aligned with video segments using simple timestamp-based approach.
@@ -552,8 +595,6 @@ class VideoRestartHelpers:
         4. Pick every Nth frame (1 per second) based on FPS
         """
         try:
-            from shared.src.lib.utils.storage_path_utils import get_capture_storage_path
-            
             if not segment_files:
                 print(f"RestartHelpers[{self.device_name}]: ❌ No segment files provided")
                 return []
@@ -568,34 +609,14 @@ class VideoRestartHelpers:
             print(f"RestartHelpers[{self.device_name}]:   - End: {datetime.fromtimestamp(video_end_time).strftime('%H:%M:%S')}")
             print(f"RestartHelpers[{self.device_name}]:   - Duration: {video_duration:.1f}s")
             
-            # Get captures folder using centralized path resolution
-            capture_folder = get_capture_storage_path(self.video_capture_path, 'captures')
-            print(f"RestartHelpers[{self.device_name}]:   - Scanning: {capture_folder}")
-            
-            # Get all screenshots in hot storage
-            all_screenshots = get_files_by_pattern(capture_folder, r'^capture_.*\.jpg$', exclude_pattern=r'_thumbnail\.jpg$')
-            
-            if not all_screenshots:
-                print(f"RestartHelpers[{self.device_name}]: ❌ No screenshots found in hot storage")
-                return []
-            
-            print(f"RestartHelpers[{self.device_name}]: 📸 Found {len(all_screenshots)} total screenshots in hot storage")
-            
-            # Filter: Only screenshots within video time window
-            screenshots_in_window = []
-            for screenshot_path in all_screenshots:
-                screenshot_time = os.path.getmtime(screenshot_path)
-                if video_start_time <= screenshot_time <= video_end_time:
-                    screenshots_in_window.append(screenshot_path)
+            # Screenshots in the video time window (chronological order)
+            screenshots_in_window = self._get_screenshots_in_window(video_start_time, video_end_time)
             
             if not screenshots_in_window:
                 print(f"RestartHelpers[{self.device_name}]: ❌ No screenshots found in time window")
                 print(f"RestartHelpers[{self.device_name}]:   - This shouldn't happen - screenshots may have been archived")
                 return []
             
-            # Sort by timestamp (chronological order)
-            screenshots_in_window.sort(key=lambda p: os.path.getmtime(p))
-            
             print(f"RestartHelpers[{self.device_name}]: ✅ Found {len(screenshots_in_window)} screenshots in time window")
             print(f"RestartHelpers[{self.device_name}]:   - First: {os.path.basename(screenshots_in_window[0])}")
             print(f"RestartHelpers[{self.device_name}]:   - Last: {os.path.basename(screenshots_in_window[-1])}")
@@ -642,8 +663,13 @@ class VideoRestartHelpers:
             print(traceback.format_exc())
             return []
     
-    def _get_audio_transcript_locally(self, segment_files: List[Tuple[str, str]], duration_seconds: float) -> Dict[str, Any]:
-        """Get audio transcript locally by extracting from the already-created MP4 video (no double merging)"""
+    def _get_audio_transcript_locally(self, segment_files: List[Tuple[str, str]], duration_seconds: float,
+                                      audio_files: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Get audio transcript locally by extracting from the already-created MP4 video (no double merging).
+        
+        audio_files: 16kHz mono WAVs already produced by the shared decode pass (skips extraction)
+        """
         try:
             from backend_host.src.controllers.verification.audio_ai_helpers import AudioAIHelpers
             import subprocess
@@ -651,12 +677,12 @@ class VideoRestartHelpers:
             
             audio_ai = AudioAIHelpers(self.av_controller, f"RestartVideo-{self.device_name}")
             
-            print(f"RestartHelpers[{self.device_name}]: Extracting audio from existing MP4 video (avoiding double merge)")
-            
             # Extract audio directly from the already-created MP4 video (use correct path)
             video_file = self._get_restart_video_path("restart_original_video.mp4")
             
-            if not os.path.exists(video_file):
+            if audio_files is not None:
+                print(f"RestartHelpers[{self.device_name}]: Using {len(audio_files)} audio file(s) from shared decode pass")
+            elif not os.path.exists(video_file):
                 print(f"RestartHelpers[{self.device_name}]: MP4 video not found, falling back to segment merging")
                 audio_files = audio_ai.extract_audio_from_segments(segment_files, segment_count=len(segment_files))
             else:
@@ -722,6 +748,54 @@ class VideoRestartHelpers:
         """Get screenshot URLs aligned with video segments"""
         return self._get_aligned_screenshots(segment_files)
     
+    def _get_frames_dir(self, video_id: str) -> str:
+        """Decoded frames of one restart - kept as long as its status file, so the stored URLs stay valid"""
+        return os.path.join(self._get_storage_aware_base_dir(), 'restart_frames', video_id)
+    
+    def _cleanup_expired_restarts(self) -> None:
+        """Remove status files and frame dirs of restarts older than RESTART_ARTIFACT_RETENTION_HOURS"""
+        cutoff = time.time() - RESTART_ARTIFACT_RETENTION_HOURS * 3600
+        frames_root = os.path.join(self._get_storage_aware_base_dir(), 'restart_frames')
+        for directory in (self._status_dir, frames_root):
+            try:
+                entries = list(os.scandir(directory))
+            except OSError:
+                continue
+            for entry in entries:
+                if directory == self._status_dir and not entry.name.endswith('.json'):
+                    continue
+                try:
+                    if entry.stat().st_mtime >= cutoff:
+                        continue
+                    if entry.is_dir():
+                        shutil.rmtree(entry.path, ignore_errors=True)
+                    else:
+                        os.remove(entry.path)
+                except OSError:
+                    pass
+    
+    def _get_decoded_screenshots(self, video_id: str, decode) -> List[str]:
+        """
+        Aligned screenshots (1 per second) emitted by the shared decode pass.
+        
+        Frames come from the same segments as the restart video, so frame N is second N
+        of the video even when the capture JPEGs were already archived.
+        Returns [] if the pass failed (caller falls back to capture screenshots).
+        """
+        frame_paths = decode.write_frames(self._get_frames_dir(video_id))
+        if not frame_paths or not decode.wait()['success']:
+            return []
+        
+        from shared.src.lib.utils.build_url_utils import buildHostImageUrl
+        from backend_host.src.lib.utils.host_utils import get_host_instance
+        
+        try:
+            host_dict = get_host_instance().to_dict()
+            return [buildHostImageUrl(host_dict, path) for path in frame_paths]
+        except Exception as e:
+            print(f"RestartHelpers[{self.device_name}]: ⚠️ Decoded frame URL generation failed, using local paths: {e}")
+            return frame_paths
+    
     @property
     def dubbing_helpers(self):
         """Lazy initialization of dubbing helpers"""
@@ -1130,28 +1204,71 @@ class VideoRestartHelpers:
         else:
             print(f"[HOST] RestartHelpers[{self.device_name}]:   - ❌ WARNING: No screenshot URLs provided!")
         
+        self._cleanup_expired_restarts()
         self._save_status(video_id, {'audio': 'loading', 'visual': 'loading', 'heavy': 'loading'})
         
+        # PERFORMANCE: One demux/decode of the segments feeds all 3 stages (frames + 2 PCM formats)
+        decode = None
+        try:
+            from backend_host.src.controllers.verification.video_restart_decode_helpers import RestartDecodePass
+            decode = RestartDecodePass(segment_files or [], self.device_name)
+            if not decode.start():
+                decode = None
+        except Exception as e:
+            print(f"[HOST] RestartHelpers[{self.device_name}]: ⚠️ Shared decode pass unavailable, stages read the MP4: {e}")
+            decode = None
+        
+        if decode:
+            threading.Thread(target=self._t0_decode, args=(video_id, decode), daemon=True).start()
+        
         print(f"[HOST] RestartHelpers[{self.device_name}]: 🧵 Starting audio thread...")
-        threading.Thread(target=self._t1_audio, args=(video_id, segment_files, duration_seconds), daemon=True).start()
+        threading.Thread(target=self._t1_audio, args=(video_id, segment_files, duration_seconds, decode), daemon=True).start()
         
         print(f"[HOST] RestartHelpers[{self.device_name}]: 🧵 Starting visual thread...")
-        threading.Thread(target=self._t2_visual, args=(video_id, screenshot_urls), daemon=True).start()
+        threading.Thread(target=self._t2_visual, args=(video_id, screenshot_urls, decode), daemon=True).start()
         
         print(f"[HOST] RestartHelpers[{self.device_name}]: 🧵 Starting heavy thread...")
-        threading.Thread(target=self._t3_heavy, args=(video_id,), daemon=True).start()
+        threading.Thread(target=self._t3_heavy, args=(video_id, decode), daemon=True).start()
         
         print(f"[HOST] RestartHelpers[{self.device_name}]: ✅ All background threads launched for {video_id}")
     
-    def _t1_audio(self, video_id: str, segment_files: List[tuple], duration_seconds: float) -> None:
+    def _t0_decode(self, video_id: str, decode) -> None:
+        """Thread 0: Shared decode pass (records its timing once FFmpeg exits)"""
+        result = decode.wait()
+        self._save_status(video_id, {
+            'decode': 'completed' if result['success'] else 'error',
+            'frames_decoded': result['frames'],
+            'timings': {'decode_ms': result['decode_ms']}
+        })
+    
+    def _t1_audio(self, video_id: str, segment_files: List[tuple], duration_seconds: float, decode=None) -> None:
         """Thread 1: Audio analysis"""
+        stage_start = time.time()
         try:
-            audio_result = self._get_audio_transcript_locally(segment_files, duration_seconds)
-            self._save_status(video_id, {'audio': 'completed', 'audio_data': audio_result})
+            audio_files = None
+            if decode:
+                audio_files = self._get_decoded_speech_audio(decode)
+            audio_result = self._get_audio_transcript_locally(segment_files, duration_seconds, audio_files)
+            self._save_status(video_id, {'audio': 'completed', 'audio_data': audio_result,
+                                         'timings': {'audio_ms': int((time.time() - stage_start) * 1000)}})
         except Exception as e:
-            self._save_status(video_id, {'audio': 'error', 'audio_error': str(e)})
+            self._save_status(video_id, {'audio': 'error', 'audio_error': str(e),
+                                         'timings': {'audio_ms': int((time.time() - stage_start) * 1000)}})
     
-    def _t2_visual(self, video_id: str, screenshot_urls: List[str]) -> None:
+    def _get_decoded_speech_audio(self, decode) -> Optional[List[str]]:
+        """16kHz mono WAV from the decode pass ([] = no audio track, None = pass failed)"""
+        import tempfile
+        
+        fd, wav_path = tempfile.mkstemp(suffix='.wav', prefix='restart_speech_')
+        os.close(fd)
+        path = decode.write_wav('speech_pcm', wav_path)
+        if not decode.wait()['success']:
+            if path and os.path.exists(path):
+                os.remove(path)
+            return None
+        return [path] if path else []
+    
+    def _t2_visual(self, video_id: str, screenshot_urls: List[str], decode=None) -> None:
         """
         Thread 2: Visual analysis
         
@@ -1161,7 +1278,15 @@ class VideoRestartHelpers:
         print(f"[HOST] RestartHelpers[{self.device_name}]:   - Thread is running")
         print(f"[HOST] RestartHelpers[{self.device_name}]:   - Screenshot URLs received: {len(screenshot_urls) if screenshot_urls else 0}")
         
+        stage_start = time.time()
         try:
+            if decode:
+                decoded_urls = self._get_decoded_screenshots(video_id, decode)
+                if decoded_urls:
+                    print(f"[HOST] RestartHelpers[{self.device_name}]:   - Using {len(decoded_urls)} frames from shared decode pass")
+                    screenshot_urls = decoded_urls
+                    self._save_status(video_id, {'screenshot_urls': decoded_urls})
+            
             print(f"[HOST] RestartHelpers[{self.device_name}]: 🎬 Starting visual analysis for {video_id}")
             print(f"[HOST] RestartHelpers[{self.device_name}]:   - Screenshot URLs: {len(screenshot_urls)}")
             
@@ -1185,7 +1310,8 @@ class VideoRestartHelpers:
             self._save_status(video_id, {
                 'visual': 'completed',
                 'subtitle_analysis': result.get('subtitle_analysis'),
-                'video_analysis': result.get('video_analysis')
+                'video_analysis': result.get('video_analysis'),
+                'timings': {'visual_ms': int((time.time() - stage_start) * 1000)}
             })
             
         except ValueError as e:
@@ -1220,35 +1346,50 @@ class VideoRestartHelpers:
                 'error_type': 'unexpected_error'
             })
     
-    def _t3_heavy(self, video_id: str) -> None:
+    def _t3_heavy(self, video_id: str, decode=None) -> None:
         """Thread 3: Audio preparation only (dubbing/sync on-demand)"""
+        stage_start = time.time()
         try:
             # Audio prep - prepare for future dubbing operations
             self._save_status(video_id, {'heavy': 'audio_prep'})
-            result = self.prepare_dubbing_audio(video_id)
             
-            if result.get('success'):
-                self._save_status(video_id, {'heavy': 'completed', 'message': 'Audio prepared for dubbing'})
+            prepared = False
+            if decode:
+                # Write restart_original_audio.wav straight from the shared pass (44.1kHz stereo)
+                audio_file = self.dubbing_helpers.get_file_paths('temp', self._get_storage_aware_base_dir())['original_audio']
+                prepared = bool(decode.write_wav('dubbing_pcm', audio_file)) and decode.wait()['success']
+            
+            if not prepared:
+                result = self.prepare_dubbing_audio(video_id)
+                prepared = bool(result and result.get('success'))
+            
+            if prepared:
+                self._save_status(video_id, {'heavy': 'completed', 'message': 'Audio prepared for dubbing',
+                                             'timings': {'heavy_ms': int((time.time() - stage_start) * 1000)}})
             else:
                 raise Exception("Audio prep failed")
                 
         except Exception as e:
-            self._save_status(video_id, {'heavy': 'error', 'heavy_error': str(e)})
+            self._save_status(video_id, {'heavy': 'error', 'heavy_error': str(e),
+                                         'timings': {'heavy_ms': int((time.time() - stage_start) * 1000)}})
     
     def _save_status(self, video_id: str, update: Dict) -> None:
-        """Save status for polling"""
+        """Save status for polling ('timings' entries are merged, stages report their own)"""
         file_path = os.path.join(self._status_dir, f"{video_id}.json")
-        status = {}
-        if os.path.exists(file_path):
-            try:
-                with open(file_path, 'r') as f:
-                    status = json.load(f)
-            except:
-                pass
-        status.update(update)
-        status['updated'] = time.time()
-        with open(file_path, 'w') as f:
-            json.dump(status, f)
+        with self._status_lock:
+            status = {}
+            if os.path.exists(file_path):
+                try:
+                    with open(file_path, 'r') as f:
+                        status = json.load(f)
+                except:
+                    pass
+            if 'timings' in update:
+                update = dict(update, timings={**status.get('timings', {}), **update['timings']})
+            status.update(update)
+            status['updated'] = time.time()
+            with open(file_path, 'w') as f:
+                json.dump(status, f)
     
     def get_status(self, video_id: str) -> Dict:
         """Get status for polling"""
@@ -4,12 +4,12 @@ from flask import Blueprint, request, jsonify
 host_deployment_bp = Blueprint('host_deployment', __name__, url_prefix='/host/deployment')
 
 def get_deployment_scheduler():
-    """Lazy import to avoid APScheduler dependency at module level"""
+    """Lazy import to avoid croniter dependency at module level"""
     try:
         from backend_host.src.services.deployment_scheduler import get_deployment_scheduler as _get_scheduler
         return _get_scheduler()
     except ImportError as e:
-        print(f"[@host_deployment_routes] Warning: APScheduler not available: {e}")
+        print(f"[@host_deployment_routes] Warning: Deployment scheduler not available: {e}")
         return None
 
 @host_deployment_bp.route('/add', methods=['POST'])
@@ -71,6 +71,6 @@ def deployment_status():
     scheduler = get_deployment_scheduler()
     return jsonify({
         'available': scheduler is not None,
-        'message': 'Deployment scheduler ready' if scheduler else 'APScheduler dependency missing'
+        'message': 'Deployment scheduler ready' if scheduler else 'croniter dependency missing'
     })
 
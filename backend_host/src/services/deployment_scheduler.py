@@ -1,15 +1,24 @@
-"""Deployment Scheduler - Manages periodic script execution with cron expressions"""
-from apscheduler.schedulers.background import BackgroundScheduler
-from apscheduler.triggers.cron import CronTrigger
+"""Deployment Scheduler - Manages periodic script execution with cron expressions
+
+PERFORMANCE: deployments are cached in memory and indexed in a heap ordered by
+next fire time; a single loop thread sleeps until the earliest one is due.
+The cache follows the DB incrementally (rows with updated_at > last seen), run
+duration estimates are an EWMA updated after each run (one history query per
+deployment per process), and a per-device admission gate queues overlapping
+deployments on the same device instead of letting them fight over it.
+"""
+from concurrent.futures import ThreadPoolExecutor
 from croniter import croniter
 from shared.src.lib.utils.supabase_utils import get_supabase_client
 from shared.src.lib.executors.script_executor import ScriptExecutor
 from shared.src.lib.utils.storage_path_utils import get_running_log_path, get_capture_folder_from_device_id
 from datetime import datetime, timezone, timedelta
+import heapq
+import itertools
 import logging
 import threading
+import time
 import os
-import json
 
 # Configure deployment logger
 deployment_logger = logging.getLogger('deployment_scheduler')
@@ -21,23 +30,308 @@ deployment_handler.setFormatter(logging.Formatter(
 ))
 deployment_logger.addHandler(deployment_handler)
 
+SYNC_INTERVAL_SECONDS = int(os.getenv('DEPLOYMENT_SYNC_INTERVAL', '30'))
+FULL_SYNC_INTERVAL_SECONDS = int(os.getenv('DEPLOYMENT_FULL_SYNC_INTERVAL', '300'))
+MAX_CONCURRENT_RUNS = int(os.getenv('DEPLOYMENT_MAX_CONCURRENT', '10'))
+DURATION_EWMA_ALPHA = 0.3
+DEFAULT_DURATION_SECONDS = 60.0
+MISFIRE_GRACE_SECONDS = 60
+
+
 class DeploymentScheduler:
     def __init__(self, host_name):
         self.host_name = host_name
-        self.scheduler = BackgroundScheduler(timezone='UTC')
         self.supabase = get_supabase_client()
         self.db_lock = threading.Lock()  # Serialize concurrent DB operations
-        self.queued_executions = {}  # Queue for pending executions (max 1 per deployment)
+        
+        # In-memory deployment cache + next-fire heap of (fire_ts, seq, deployment_id, generation)
+        self.deployments = {}
+        self._heap = []
+        self._generation = {}  # deployment_id -> generation (stale heap entries are skipped)
+        self._sequence = itertools.count()
+        self._cond = threading.Condition()
+        self._sync_cursor = None  # Max updated_at seen (None = incremental sync unavailable)
+        self._last_sync = 0.0
+        self._last_full_sync = 0.0
+        self._last_sync_warning = None
+        self._schedule_day = None
+        
+        # Run duration estimates (EWMA, seconds)
+        self._duration_ewma = {}
+        
+        # Device admission: one deployment per device at a time, others wait in FIFO (max 1 per deployment)
+        self._state_lock = threading.Lock()
+        self._running = set()
+        self._device_busy = {}   # device_id -> deployment_id
+        self._device_queue = {}  # device_id -> [(deployment_id, scheduled_at)]
+        
+        self._executor = ThreadPoolExecutor(max_workers=MAX_CONCURRENT_RUNS, thread_name_prefix='deployment')
+        # Bookkeeping writes (queued/skipped rows, scheduled_today) - ordered, never on the scheduling loop
+        self._db_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix='deployment-db')
+        self._loop_thread = None
+        self._stop = False
         
     def start(self):
         """Start scheduler and sync from DB"""
         print(f"[@deployment_scheduler] Starting for {self.host_name}")
         deployment_logger.info(f"=== DEPLOYMENT SCHEDULER STARTING === Host: {self.host_name}")
-        self.scheduler.start()
-        print(f"[@deployment_scheduler] APScheduler state: {self.scheduler.state}")
-        print(f"[@deployment_scheduler] APScheduler running: {self.scheduler.running}")
         self._sync_from_db()
-        print(f"[@deployment_scheduler] Active jobs count: {len(self.scheduler.get_jobs())}")
+        self._loop_thread = threading.Thread(target=self._run_loop, name='deployment_scheduler', daemon=True)
+        self._loop_thread.start()
+        print(f"[@deployment_scheduler] Active jobs count: {len(self.deployments)}")
+    
+    def stop(self):
+        """Stop the scheduling loop (running executions finish in the background)"""
+        self._stop = True
+        with self._cond:
+            self._cond.notify()
+        self._executor.shutdown(wait=False)
+        self._db_writer.shutdown(wait=False)
+    
+    # =====================================================
+    # NEXT-FIRE INDEX
+    # =====================================================
+    
+    def _next_fire_time(self, deployment, after):
+        """Next cron occurrence strictly after `after` (UTC), or None"""
+        try:
+            return croniter(deployment['cron_expression'], after).get_next(datetime)
+        except Exception as e:
+            print(f"[@deployment_scheduler] Invalid cron expression for {deployment.get('name')}: {e}")
+            return None
+    
+    def _index(self, deployment, after=None):
+        """(Re)insert deployment in the next-fire heap, invalidating older entries"""
+        deployment_id = deployment['id']
+        next_run = self._next_fire_time(deployment, after or datetime.now(timezone.utc))
+        with self._cond:
+            generation = self._generation.get(deployment_id, 0) + 1
+            self._generation[deployment_id] = generation
+            if next_run is None:
+                return None
+            heapq.heappush(self._heap, (next_run.timestamp(), next(self._sequence), deployment_id, generation))
+            self._cond.notify()
+        return next_run
+    
+    def _unindex(self, deployment_id):
+        """Drop deployment from cache and heap (lazy - stale heap entries are skipped)"""
+        with self._cond:
+            self._generation[deployment_id] = self._generation.get(deployment_id, 0) + 1
+            self.deployments.pop(deployment_id, None)
+    
+    def get_next_run_time(self, deployment_id):
+        """Earliest indexed fire time for a deployment (UTC datetime) or None"""
+        with self._cond:
+            generation = self._generation.get(deployment_id)
+            times = [ts for ts, _, dep_id, gen in self._heap if dep_id == deployment_id and gen == generation]
+        return datetime.fromtimestamp(min(times), timezone.utc) if times else None
+    
+    def _run_loop(self):
+        """Sleep until the earliest fire time (or next sync), fire due deployments"""
+        while not self._stop:
+            due = []
+            with self._cond:
+                now = time.time()
+                while self._heap and self._heap[0][0] <= now:
+                    fire_ts, _, deployment_id, generation = heapq.heappop(self._heap)
+                    if self._generation.get(deployment_id) == generation:
+                        due.append((fire_ts, deployment_id))
+                if not due:
+                    next_fire = self._heap[0][0] if self._heap else now + SYNC_INTERVAL_SECONDS
+                    next_sync = self._last_sync + SYNC_INTERVAL_SECONDS
+                    timeout = min(next_fire, next_sync) - now
+                    if timeout > 0:
+                        self._cond.wait(timeout)
+                        continue
+            
+            for fire_ts, deployment_id in due:
+                self._on_fire(deployment_id, fire_ts)
+            
+            if time.time() >= self._last_sync + SYNC_INTERVAL_SECONDS:
+                self._poll_changes()
+    
+    def _on_fire(self, deployment_id, fire_ts):
+        """Reschedule the next occurrence and admit this one"""
+        deployment = self.deployments.get(deployment_id)
+        if not deployment:
+            return
+        
+        scheduled_at = datetime.fromtimestamp(fire_ts, timezone.utc)
+        self._index(deployment, after=max(scheduled_at, datetime.now(timezone.utc)))
+        
+        lateness = time.time() - fire_ts
+        if lateness > MISFIRE_GRACE_SECONDS:
+            print(f"[@deployment_scheduler] Misfire: {deployment.get('name')} was due {lateness:.0f}s ago, skipping")
+            deployment_logger.warning(f"⏭️  MISFIRE: {deployment.get('name')} | Due {lateness:.0f}s ago")
+            return
+        
+        self._admit(deployment_id, scheduled_at)
+    
+    # =====================================================
+    # DEVICE ADMISSION
+    # =====================================================
+    
+    def _admit(self, deployment_id, scheduled_at):
+        """Run now if the device is free, otherwise queue behind the current run (max 1 per deployment)"""
+        deployment = self.deployments.get(deployment_id)
+        if not deployment:
+            return
+        dep_name = deployment.get('name', deployment_id)
+        device_id = deployment['device_id']
+        
+        with self._state_lock:
+            busy_with = self._device_busy.get(device_id)
+            if busy_with is None:
+                self._device_busy[device_id] = deployment_id
+                self._running.add(deployment_id)
+                status = 'run'
+            else:
+                queue = self._device_queue.setdefault(device_id, [])
+                if any(queued_id == deployment_id for queued_id, _ in queue):
+                    status = 'skip'
+                else:
+                    queue.append((deployment_id, scheduled_at))
+                    status = 'queue'
+        
+        if status == 'run':
+            self._executor.submit(self._run_admitted, deployment_id, scheduled_at, device_id)
+            return
+        
+        if status == 'skip':
+            print(f"[@deployment_scheduler] Already queued, skipping this trigger: {dep_name}")
+            deployment_logger.warning(f"⏭️  SKIPPED: {dep_name} | Already queued (max 1)")
+            self._record_execution(deployment_id, scheduled_at, 'skipped', 'Already queued (max 1)')
+            return
+        
+        if busy_with == deployment_id:
+            reason = 'Previous execution still running'
+        else:
+            other = self.deployments.get(busy_with, {}).get('name', busy_with)
+            reason = f"Device {device_id} busy ({other})"
+        print(f"[@deployment_scheduler] Queued for execution after current completes: {dep_name} ({reason})")
+        deployment_logger.info(f"⏳ QUEUED: {dep_name} | {reason}")
+        self._record_execution(deployment_id, scheduled_at, 'queued', reason)
+    
+    def _run_admitted(self, deployment_id, scheduled_at, device_id):
+        """Execute, then hand the device to the next queued deployment (device_id fixed at admission)"""
+        try:
+            self._execute_deployment(deployment_id, scheduled_at)
+        finally:
+            next_item = None
+            with self._state_lock:
+                self._running.discard(deployment_id)
+                queue = self._device_queue.get(device_id) or []
+                if queue:
+                    next_item = queue.pop(0)
+                    self._device_busy[device_id] = next_item[0]
+                    self._running.add(next_item[0])
+                else:
+                    self._device_busy.pop(device_id, None)
+                    self._device_queue.pop(device_id, None)
+            
+            if next_item:
+                queued_id, queued_time = next_item
+                queued_name = self.deployments.get(queued_id, {}).get('name', queued_id)
+                print(f"[@deployment_scheduler] Found queued execution from {queued_time}, executing immediately")
+                deployment_logger.info(f"🔄 EXECUTING QUEUED: {queued_name} | Queued at: {queued_time}")
+                self._executor.submit(self._run_admitted, queued_id, queued_time, device_id)
+    
+    def _write_async(self, func, *args):
+        try:
+            self._db_writer.submit(func, *args)
+        except RuntimeError:
+            pass  # Scheduler stopped
+    
+    def _record_execution(self, deployment_id, scheduled_at, status, reason):
+        """Insert a skipped/queued execution row (off the scheduling loop - DB latency can't delay fires)"""
+        self._write_async(self._insert_execution_row, deployment_id, scheduled_at, status, reason)
+    
+    def _insert_execution_row(self, deployment_id, scheduled_at, status, reason):
+        try:
+            with self.db_lock:
+                self.supabase.table('deployment_executions').insert({
+                    'deployment_id': deployment_id,
+                    'scheduled_at': scheduled_at.isoformat(),
+                    'status': status,
+                    'skip_reason': reason
+                }).execute()
+        except Exception as e:
+            print(f"[@deployment_scheduler] Failed to record {status} execution: {e}")
+    
+    # =====================================================
+    # DB SYNC
+    # =====================================================
+    
+    def _apply_row(self, row, log_details=False):
+        """Apply a deployment row from the DB/API to the cache and index"""
+        deployment_id = row['id']
+        if row.get('status', 'active') != 'active':
+            if deployment_id in self.deployments:
+                self._unindex(deployment_id)
+                print(f"[@deployment_scheduler] Unscheduled ({row.get('status')}): {row.get('name', deployment_id)}")
+            return
+        
+        previous = self.deployments.get(deployment_id)
+        self.deployments[deployment_id] = row
+        schedule_keys = ('cron_expression', 'start_date', 'end_date', 'max_executions', 'device_id', 'script_name')
+        if previous and all(previous.get(k) == row.get(k) for k in schedule_keys):
+            return  # Only counters/bookkeeping changed - keep heap entry
+        
+        self._add_job(row, log_details=log_details)
+    
+    def _poll_changes(self):
+        """Incremental sync: fetch rows changed since the last seen updated_at"""
+        self._last_sync = time.time()
+        try:
+            full = self._sync_cursor is None or time.time() - self._last_full_sync >= FULL_SYNC_INTERVAL_SECONDS
+            if full:
+                self._full_resync()
+            else:
+                with self.db_lock:
+                    result = self.supabase.table('deployments').select('*')\
+                        .eq('host_name', self.host_name)\
+                        .gt('updated_at', self._sync_cursor)\
+                        .order('updated_at')\
+                        .execute()
+                for row in result.data or []:
+                    self._apply_row(row, log_details=True)
+                    self._advance_cursor(row)
+            
+            # Day rollover - refresh scheduled_today with current duration estimates
+            today = datetime.now(timezone.utc).date()
+            if self._schedule_day != today:
+                self._schedule_day = today
+                for deployment_id in list(self.deployments):
+                    self._update_scheduled_today(deployment_id)
+        except Exception as e:
+            print(f"[@deployment_scheduler] Sync error: {e}")
+            deployment_logger.error(f"Sync error: {e}")
+    
+    def _advance_cursor(self, row):
+        updated_at = row.get('updated_at')
+        if updated_at and (self._sync_cursor is None or updated_at > self._sync_cursor):
+            self._sync_cursor = updated_at
+    
+    def _full_resync(self):
+        """Reload active deployments, drop deleted/deactivated ones (catches what the change feed can't)"""
+        self._last_full_sync = time.time()
+        with self.db_lock:
+            result = self.supabase.table('deployments').select('*').eq('host_name', self.host_name).eq('status', 'active').execute()
+        rows = result.data or []
+        active_ids = {row['id'] for row in rows}
+        for deployment_id in list(self.deployments):
+            if deployment_id not in active_ids:
+                print(f"[@deployment_scheduler] Deployment {deployment_id} no longer active, removing from scheduler")
+                deployment_logger.warning(f"DELETED: {deployment_id} | Deployment no longer active in database")
+                self._unindex(deployment_id)
+        for row in rows:
+            self._apply_row(row)
+            self._advance_cursor(row)
+        if rows and self._sync_cursor is None and 'updated_at' not in rows[0]:
+            if self._last_sync_warning is None:
+                print(f"[@deployment_scheduler] deployments.updated_at not available - using full resync every {SYNC_INTERVAL_SECONDS}s")
+                self._last_sync_warning = time.time()
+        return rows
         
     def _sync_from_db(self):
         """Load active deployments from Supabase on startup"""
@@ -98,17 +392,15 @@ class DeploymentScheduler:
                 print(f"[@deployment_scheduler] Error cleaning up stale executions: {e}")
                 deployment_logger.error(f"Error during stale execution cleanup: {e}")
             
-            # Now load active deployments
-            result = self.supabase.table('deployments').select('*').eq('host_name', self.host_name).eq('status', 'active').execute()
-            
-            # Add jobs
-            for dep in result.data:
-                self._add_job(dep)
+            # Now load active deployments (cache + next-fire index)
+            self._last_sync = time.time()
+            self._schedule_day = datetime.now(timezone.utc).date()
+            rows = self._full_resync()
             
             # Format deployment summary for both console and log file
             separator = "=" * 80
             header = f"{'DEPLOYMENTS':^80}"
-            active_count = f"Active: {len(result.data)}"
+            active_count = f"Active: {len(rows)}"
             
             # Build the summary
             summary_lines = [
@@ -120,11 +412,11 @@ class DeploymentScheduler:
                 ""
             ]
             
-            if len(result.data) > 0:
-                for dep in result.data:
-                    # Get job info for next run time
-                    job = self.scheduler.get_job(dep['id'])
-                    next_run = job.next_run_time.strftime('%Y-%m-%d %H:%M:%S UTC') if job and job.next_run_time else 'N/A'
+            if len(rows) > 0:
+                for dep in rows:
+                    # Get next run time from the index
+                    next_run_time = self.get_next_run_time(dep['id'])
+                    next_run = next_run_time.strftime('%Y-%m-%d %H:%M:%S UTC') if next_run_time else 'N/A'
                     
                     # Format last execution
                     last_exec = dep.get('last_executed_at')
@@ -169,8 +461,27 @@ class DeploymentScheduler:
             print(f"[@deployment_scheduler] {error_msg}")
             deployment_logger.error(error_msg)
     
+    def _estimate_duration(self, deployment):
+        """Cached duration estimate (EWMA), seeded from history on first use"""
+        deployment_id = deployment.get('id')
+        estimate = self._duration_ewma.get(deployment_id)
+        if estimate is None:
+            estimate = self._get_estimated_duration(deployment['script_name'], deployment['device_id'], deployment_id)
+            self._duration_ewma[deployment_id] = estimate
+        return estimate
+    
+    def _observe_duration(self, deployment_id, duration_seconds):
+        """Fold a finished run into the duration EWMA"""
+        if duration_seconds <= 0:
+            return
+        previous = self._duration_ewma.get(deployment_id)
+        if previous is None:
+            self._duration_ewma[deployment_id] = duration_seconds
+        else:
+            self._duration_ewma[deployment_id] = DURATION_EWMA_ALPHA * duration_seconds + (1 - DURATION_EWMA_ALPHA) * previous
+    
     def _get_estimated_duration(self, script_name, device_id, deployment_id=None):
-        """Get estimated duration from deployment history or script_results
+        """Get estimated duration from deployment history or script_results (seed for the EWMA)
         
         Args:
             script_name: Name of the script
@@ -235,7 +546,7 @@ class DeploymentScheduler:
         
         # Default: 60 seconds
         print(f"[@deployment_scheduler] No history found, using default duration: 60s")
-        return 60.0
+        return DEFAULT_DURATION_SECONDS
     
     def _calculate_scheduled_today(self, deployment):
         """Calculate today's scheduled execution times with estimated durations
@@ -252,11 +563,7 @@ class DeploymentScheduler:
                 return []
             
             # Get estimated duration
-            duration_seconds = self._get_estimated_duration(
-                deployment['script_name'],
-                deployment['device_id'],
-                deployment.get('id')
-            )
+            duration_seconds = self._estimate_duration(deployment)
             
             # Generate today's scheduled times
             today_start = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
@@ -295,16 +602,15 @@ class DeploymentScheduler:
             return []
     
     def _update_scheduled_today(self, deployment_id):
-        """Update scheduled_today for a specific deployment"""
+        """Update scheduled_today for a specific deployment (off the scheduling loop)"""
+        self._write_async(self._write_scheduled_today, deployment_id)
+    
+    def _write_scheduled_today(self, deployment_id):
         try:
-            # Fetch deployment
-            with self.db_lock:
-                result = self.supabase.table('deployments').select('*').eq('id', deployment_id).execute()
-            
-            if not result.data:
+            deployment = self.deployments.get(deployment_id)
+            if not deployment:
                 return
             
-            deployment = result.data[0]
             scheduled_today = self._calculate_scheduled_today(deployment)
             
             # Update deployment (pass list directly, Supabase handles JSONB conversion)
@@ -329,38 +635,20 @@ class DeploymentScheduler:
         
         # Parse cron expression (format: minute hour day month day_of_week)
         parts = cron_expr.split()
-        if len(parts) != 5:
+        if len(parts) != 5 or not croniter.is_valid(cron_expr):
             print(f"[@deployment_scheduler] Invalid cron expression: {cron_expr}")
             deployment_logger.error(f"Invalid cron expression for {deployment.get('name')}: {cron_expr}")
             return
         
-        minute, hour, day, month, day_of_week = parts
-        
-        # Create cron trigger (always use UTC)
-        trigger = CronTrigger(
-            minute=minute,
-            hour=hour,
-            day=day,
-            month=month,
-            day_of_week=day_of_week,
-            timezone='UTC'
-        )
-        
-        self.scheduler.add_job(
-            func=self._execute_deployment,
-            args=[deployment['id']],
-            trigger=trigger,
-            id=deployment['id'],
-            replace_existing=True
-        )
+        # Cache + index next fire time (always UTC)
+        self.deployments[deployment['id']] = deployment
+        next_run = self._index(deployment)
         
         # Update scheduled_today when adding job
         self._update_scheduled_today(deployment['id'])
         
         # Only log detailed info when adding individual deployments (not during sync)
         if log_details:
-            job = self.scheduler.get_job(deployment['id'])
-            next_run = job.next_run_time if job else None
             print(f"[@deployment_scheduler] Added: {deployment['name']} with cron: {cron_expr}")
             deployment_logger.info(f"ADDED: {deployment['name']} | Cron: {cron_expr} | Next run: {next_run} UTC")
     
@@ -406,7 +694,7 @@ class DeploymentScheduler:
                     .update({'status': 'expired'})\
                     .eq('id', deployment_id)\
                     .execute()
-            self.scheduler.remove_job(deployment_id)
+            self._unindex(deployment_id)
             print(f"[@deployment_scheduler] Marked as expired: {deployment_id}")
             deployment_logger.warning(f"STATUS: {deployment_id} | EXPIRED - Removed from scheduler")
         except Exception as e:
@@ -421,15 +709,15 @@ class DeploymentScheduler:
                     .update({'status': 'completed'})\
                     .eq('id', deployment_id)\
                     .execute()
-            self.scheduler.remove_job(deployment_id)
+            self._unindex(deployment_id)
             print(f"[@deployment_scheduler] Marked as completed: {deployment_id}")
             deployment_logger.info(f"STATUS: {deployment_id} | COMPLETED - Removed from scheduler")
         except Exception as e:
             print(f"[@deployment_scheduler] Error marking completed: {e}")
             deployment_logger.error(f"Failed to mark deployment as completed: {e}")
     
-    def _execute_deployment(self, deployment_id):
-        """Execute deployment with constraint checks"""
+    def _execute_deployment(self, deployment_id, scheduled_at=None):
+        """Execute deployment with constraint checks (device already admitted by _admit)"""
         try:
             print(f"[@deployment_scheduler] ===== TRIGGERED: {deployment_id} =====")
             deployment_logger.info(f"===== TRIGGERED: {deployment_id} =====")
@@ -437,27 +725,13 @@ class DeploymentScheduler:
             exec_id = None
             start_time = datetime.now(timezone.utc)
             
-            # Get deployment config
-            try:
-                with self.db_lock:
-                    result = self.supabase.table('deployments').select('*').eq('id', deployment_id).execute()
-            except Exception as db_error:
-                error_type = type(db_error).__name__
-                print(f"[@deployment_scheduler] Failed to fetch deployment: {error_type}: {db_error}")
-                print(f"[@deployment_scheduler] Raw error: {repr(db_error)}")
-                deployment_logger.error(f"Failed to fetch deployment {deployment_id}: {error_type}: {db_error}")
-                deployment_logger.error(f"Raw error: {repr(db_error)}")
-                if hasattr(db_error, '__dict__'):
-                    deployment_logger.error(f"Error attributes: {db_error.__dict__}")
-                raise
-            
-            if not result.data or len(result.data) == 0:
-                print(f"[@deployment_scheduler] Deployment {deployment_id} no longer exists, removing from scheduler")
-                deployment_logger.warning(f"DELETED: {deployment_id} | Deployment no longer exists in database")
-                self.scheduler.remove_job(deployment_id)
+            # Get deployment config from cache (kept current by incremental sync)
+            dep = self.deployments.get(deployment_id)
+            if not dep:
+                print(f"[@deployment_scheduler] Deployment {deployment_id} no longer scheduled, skipping")
+                deployment_logger.warning(f"DELETED: {deployment_id} | Deployment no longer scheduled")
                 return
             
-            dep = result.data[0]
             dep_name = dep.get('name', deployment_id)
             
             deployment_logger.info(f"⚡ TRIGGERED: {dep_name} | Time: {start_time.strftime('%Y-%m-%d %H:%M:%S')} UTC")
@@ -468,96 +742,17 @@ class DeploymentScheduler:
                 print(f"[@deployment_scheduler] Skipping execution: {reason}")
                 deployment_logger.info(f"⏭️  SKIPPED: {dep_name} | Reason: {reason}")
                 # Create skipped execution record
-                with self.db_lock:
-                    self.supabase.table('deployment_executions').insert({
-                        'deployment_id': deployment_id,
-                        'scheduled_at': start_time.isoformat(),
-                        'status': 'skipped',
-                        'skip_reason': reason
-                    }).execute()
+                self._record_execution(deployment_id, scheduled_at or start_time, 'skipped', reason)
                 return
             
-            # Check if previous execution is still running
-            with self.db_lock:
-                running_check = self.supabase.table('deployment_executions')\
-                    .select('id, started_at')\
-                    .eq('deployment_id', deployment_id)\
-                    .eq('status', 'running')\
-                    .execute()
-            
-            if running_check.data and len(running_check.data) > 0:
-                running_exec = running_check.data[0]
-                started_at_str = running_exec.get('started_at', 'unknown')
-                
-                # Check if execution is stale (running for more than 1 hour)
-                try:
-                    started_at = datetime.fromisoformat(started_at_str.replace('Z', '+00:00'))
-                    age_seconds = (datetime.now(timezone.utc) - started_at).total_seconds()
-                    
-                    if age_seconds > 3600:  # 1 hour = 3600 seconds
-                        print(f"[@deployment_scheduler] Found stale execution (age: {age_seconds/3600:.1f} hours) - marking as failed")
-                        deployment_logger.warning(f"Stale execution detected: {running_exec['id']} (age: {age_seconds/3600:.1f} hours) - marking as failed")
-                        
-                        # Mark stale execution as failed
-                        with self.db_lock:
-                            self.supabase.table('deployment_executions').update({
-                                'completed_at': datetime.now(timezone.utc).isoformat(),
-                                'status': 'failed',
-                                'success': False,
-                                'error_message': f'Execution timed out - ran for {age_seconds/3600:.1f} hours'
-                            }).eq('id', running_exec['id']).execute()
-                        
-                        # Continue with new execution (don't skip)
-                        print(f"[@deployment_scheduler] Stale execution cleaned up, proceeding with new execution")
-                    else:
-                        # Execution is recent, check queue
-                        if deployment_id in self.queued_executions:
-                            # Already have 1 queued - skip this trigger
-                            print(f"[@deployment_scheduler] Already queued, skipping this trigger (age: {age_seconds:.0f}s)")
-                            deployment_logger.warning(f"⏭️  SKIPPED: {dep_name} | Already queued (max 1)")
-                            with self.db_lock:
-                                self.supabase.table('deployment_executions').insert({
-                                    'deployment_id': deployment_id,
-                                    'scheduled_at': start_time.isoformat(),
-                                    'status': 'skipped',
-                                    'skip_reason': 'Already queued (max 1)'
-                                }).execute()
-                            return
-                        else:
-                            # Queue this execution (max 1 per deployment)
-                            self.queued_executions[deployment_id] = start_time
-                            print(f"[@deployment_scheduler] Queued for execution after current completes (age: {age_seconds:.0f}s)")
-                            deployment_logger.info(f"⏳ QUEUED: {dep_name} | Will run after current execution")
-                            with self.db_lock:
-                                self.supabase.table('deployment_executions').insert({
-                                    'deployment_id': deployment_id,
-                                    'scheduled_at': start_time.isoformat(),
-                                    'status': 'queued',
-                                    'skip_reason': None
-                                }).execute()
-                            return
-                except (ValueError, TypeError) as e:
-                    # If we can't parse the date, skip this execution
-                    print(f"[@deployment_scheduler] Could not parse started_at date: {e}, skipping execution")
-                    deployment_logger.warning(f"⏭️  SKIPPED: {dep_name} | Reason: Previous execution still running (started: {started_at_str})")
-                    with self.db_lock:
-                        self.supabase.table('deployment_executions').insert({
-                            'deployment_id': deployment_id,
-                            'scheduled_at': start_time.isoformat(),
-                            'status': 'skipped',
-                            'skip_reason': 'Previous execution still running'
-                        }).execute()
-                    return
-            
             # Create execution record with UTC timestamp
             # Note: Supabase auto-generates unique UUID for 'id' field to avoid conflicts
-            scheduled_at = start_time.isoformat()
             try:
                 with self.db_lock:
                     exec_record = self.supabase.table('deployment_executions').insert({
                         'deployment_id': deployment_id,
-                        'scheduled_at': scheduled_at,
-                        'started_at': scheduled_at,
+                        'scheduled_at': (scheduled_at or start_time).isoformat(),
+                        'started_at': start_time.isoformat(),
                         'status': 'running'
                     }).execute().data[0]
                     exec_id = exec_record['id']
@@ -654,39 +849,8 @@ class DeploymentScheduler:
             print(f"[@deployment_scheduler] Executing command: python test_scripts/{dep['script_name']} {all_params}")
             deployment_logger.info(f"📋 COMMAND: python test_scripts/{dep['script_name']} {all_params}")
             
-            # Fetch average duration from last 100 executions for estimated end time
-            estimated_duration_seconds = None
-            try:
-                with self.db_lock:
-                    # Query last 100 completed executions for this deployment
-                    history = self.supabase.table('deployment_executions')\
-                        .select('started_at, completed_at')\
-                        .eq('deployment_id', deployment_id)\
-                        .in_('status', ['completed', 'failed'])\
-                        .not_.is_('started_at', 'null')\
-                        .not_.is_('completed_at', 'null')\
-                        .order('completed_at', desc=True)\
-                        .limit(100)\
-                        .execute()
-                    
-                    if history.data and len(history.data) > 0:
-                        # Calculate average duration
-                        durations = []
-                        for exec in history.data:
-                            try:
-                                started = datetime.fromisoformat(exec['started_at'].replace('Z', '+00:00'))
-                                completed = datetime.fromisoformat(exec['completed_at'].replace('Z', '+00:00'))
-                                duration_seconds = (completed - started).total_seconds()
-                                if duration_seconds > 0:  # Only count valid durations
-                                    durations.append(duration_seconds)
-                            except Exception:
-                                continue
-                        
-                        if durations:
-                            estimated_duration_seconds = sum(durations) / len(durations)
-                            print(f"[@deployment_scheduler] Estimated duration based on {len(durations)} executions: {estimated_duration_seconds:.1f}s")
-            except Exception as est_error:
-                print(f"[@deployment_scheduler] Failed to calculate estimated duration: {est_error}")
+            # Estimated end time from the cached duration EWMA (no history query per run)
+            estimated_duration_seconds = self._estimate_duration(dep)
             
             # Execute script with complete parameters
             executor = ScriptExecutor(self.host_name, dep['device_id'], 'unknown')
@@ -694,10 +858,11 @@ class DeploymentScheduler:
             
             end_time = datetime.now(timezone.utc)
             duration = (end_time - start_time).total_seconds()
+            self._observe_duration(deployment_id, duration)
             
             # Extract script_result_id from stdout if available
-            script_result_id = None
-            if result.get('stdout'):
+            script_result_id = result.get('script_result_id')
+            if not script_result_id and result.get('stdout'):
                 import re
                 match = re.search(r'SCRIPT_RESULT_ID:([a-f0-9-]+)', result['stdout'])
                 if match:
@@ -723,8 +888,10 @@ class DeploymentScheduler:
                     deployment_logger.error(f"Error attributes: {db_error.__dict__}")
                 raise
             
-            # Update deployment counters
+            # Update deployment counters (cache first, so constraints see them without a re-fetch)
             new_count = dep.get('execution_count', 0) + 1
+            dep['execution_count'] = new_count
+            dep['last_executed_at'] = end_time.isoformat()
             try:
                 with self.db_lock:
                     self.supabase.table('deployments').update({
@@ -759,21 +926,6 @@ class DeploymentScheduler:
             # Check if max executions reached after this run
             if dep.get('max_executions') and new_count >= dep['max_executions']:
                 self._mark_as_completed(deployment_id)
-            
-            # Check if there's a queued execution for this deployment
-            if deployment_id in self.queued_executions:
-                queued_time = self.queued_executions.pop(deployment_id)
-                print(f"[@deployment_scheduler] Found queued execution from {queued_time}, executing immediately")
-                deployment_logger.info(f"🔄 EXECUTING QUEUED: {dep_name} | Queued at: {queued_time}")
-                
-                # Execute immediately using APScheduler's date trigger (runs once, now)
-                self.scheduler.add_job(
-                    func=self._execute_deployment,
-                    args=[deployment_id],
-                    trigger='date',
-                    run_date=datetime.now(timezone.utc),
-                    id=f"{deployment_id}_queued"
-                )
                 
         except Exception as e:
             error_type = type(e).__name__
@@ -808,21 +960,6 @@ class DeploymentScheduler:
                     print(f"[@deployment_scheduler] Raw DB error: {repr(db_error)}")
                     deployment_logger.error(f"Failed to update execution record: {db_error_type}: {db_error}")
                     deployment_logger.error(f"Raw DB error: {repr(db_error)}")
-            
-            # Check if there's a queued execution even after error
-            if deployment_id in self.queued_executions:
-                queued_time = self.queued_executions.pop(deployment_id)
-                print(f"[@deployment_scheduler] Found queued execution from {queued_time}, executing immediately (after error)")
-                deployment_logger.info(f"🔄 EXECUTING QUEUED: {deployment_id} | Queued at: {queued_time} (after error)")
-                
-                # Execute immediately using APScheduler's date trigger
-                self.scheduler.add_job(
-                    func=self._execute_deployment,
-                    args=[deployment_id],
-                    trigger='date',
-                    run_date=datetime.now(timezone.utc),
-                    id=f"{deployment_id}_queued"
-                )
         except Exception as fatal_error:
             # Catch-all for ANY unhandled exception (syntax errors, missing imports, etc.)
             print(f"[@deployment_scheduler] 🔥 FATAL ERROR in deployment execution: {fatal_error}")
@@ -842,7 +979,7 @@ class DeploymentScheduler:
     def pause_deployment(self, deployment_id):
         """Pause deployment by removing from scheduler"""
         try:
-            self.scheduler.remove_job(deployment_id)
+            self._unindex(deployment_id)
             print(f"[@deployment_scheduler] Paused (removed from scheduler): {deployment_id}")
             deployment_logger.info(f"⏸️  PAUSED: {deployment_id} | Removed from scheduler")
         except Exception as e:
@@ -866,8 +1003,7 @@ class DeploymentScheduler:
             self._add_job(deployment, log_details=True)
             print(f"[@deployment_scheduler] Resumed (re-added to scheduler): {deployment_id}")
             
-            job = self.scheduler.get_job(deployment_id)
-            next_run = job.next_run_time if job else None
+            next_run = self.get_next_run_time(deployment_id)
             deployment_logger.info(f"▶️  RESUMED: {deployment.get('name', deployment_id)} | Next run: {next_run} UTC")
         except Exception as e:
             print(f"[@deployment_scheduler] Error resuming deployment: {e}")
@@ -875,7 +1011,7 @@ class DeploymentScheduler:
     
     def remove_deployment(self, deployment_id):
         """Remove deployment"""
-        self.scheduler.remove_job(deployment_id)
+        self._unindex(deployment_id)
         print(f"[@deployment_scheduler] Removed: {deployment_id}")
         deployment_logger.info(f"🗑️  REMOVED: {deployment_id}")
 
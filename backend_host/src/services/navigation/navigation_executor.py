@@ -1527,7 +1527,8 @@ class NavigationExecutor:
                 success=True,
                 execution_time_ms=0,  # Will be updated by KPI measurement
                 message="KPI measurement queued",
-                action_set_id=step.get('action_set_id')
+                action_set_id=step.get('action_set_id'),
+                immediate=True  # KPI executor updates this row by id - it must exist now
             )
             
             print(f"[@navigation_executor:KPI:DEBUG] execution_result_id={execution_result_id}")
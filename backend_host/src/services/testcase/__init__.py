@@ -6,6 +6,7 @@ Visual test case builder that executes graphs created in React Flow.
 
 from .testcase_executor import TestCaseExecutor
 from .testcase_validator import TestCaseValidator
+from .testcase_compiler import TestCaseCompiler, TestCasePlan, get_testcase_compiler
 
-__all__ = ['TestCaseExecutor', 'TestCaseValidator']
+__all__ = ['TestCaseExecutor', 'TestCaseValidator', 'TestCaseCompiler', 'TestCasePlan', 'get_testcase_compiler']
 
@@ -0,0 +1,359 @@
+"""
+TestCase Graph Compiler
+
+Compiles a test case graph (React Flow JSON from the TestCase Builder) into a
+validated, flattened execution plan that TestCaseExecutor walks at run time:
+- Graph validated once per compile (not once per run)
+- Success/failure edges resolved into next-block ids (no edge list scans)
+- Block handlers resolved per block (action / navigation / loop / standard),
+  standard block commands checked against the BlockRegistry
+- Action lists and navigation targets pre-built, params pre-bound
+  (typed schema objects {default, type} unwrapped to their values)
+- Loop blocks compiled recursively into nested plans
+- scriptConfig variable / metadata links indexed by source block id
+
+Plans are cached by (testcase_id, version) for saved test cases and by a hash
+of the graph JSON for unsaved ones. Plans are read-only once compiled - they
+are shared across runs and threads.
+
+Usage:
+    plan = get_testcase_compiler().compile(graph, userinterface_name, team_id,
+                                           testcase_id=..., version=...)
+    if not plan.is_valid: ...
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from .testcase_validator import TestCaseValidator
+
+TESTCASE_PLAN_CACHE_SIZE = int(os.getenv('TESTCASE_PLAN_CACHE_SIZE', '128'))
+
+TERMINAL_TYPES = ('success', 'failure')
+
+
+class CompiledBlock:
+    """One executable (or terminal) block of a compiled plan"""
+
+    def __init__(self, node: Dict[str, Any]):
+        self.node_id: str = node['id']
+        self.node_type: str = node.get('type')
+        self.data: Dict[str, Any] = node.get('data', {}) or {}
+        self.handler: str = _resolve_handler(self.node_type)
+
+        # Resolved edges
+        self.next_success: Optional[str] = None
+        self.next_failure: Optional[str] = None
+
+        # action / verification
+        self.actions: List[Dict[str, Any]] = []
+        self.retry_actions: List[Dict[str, Any]] = []
+        self.failure_actions: List[Dict[str, Any]] = []
+
+        # standard
+        self.command: Optional[str] = self.data.get('command')
+        self.params: Dict[str, Any] = {}
+        self.block_registered: Optional[bool] = None
+
+        # navigation
+        self.target_label: Optional[str] = None
+        self.target_id: Optional[str] = None
+
+        # loop
+        self.loop_plan: Optional['TestCasePlan'] = None
+        self.iterations: int = 1
+        self.on_failure: str = 'break'
+
+        self.message: str = ''
+
+    @property
+    def is_terminal(self) -> bool:
+        return self.node_type in TERMINAL_TYPES
+
+
+class TestCasePlan:
+    """Validated, flattened execution plan of one test case graph"""
+
+    def __init__(self, graph: Dict[str, Any], cache_key: Tuple):
+        self.graph = graph
+        self.cache_key = cache_key
+        self.is_valid = False
+        self.errors: List[str] = []
+        self.warnings: List[str] = []
+
+        self.blocks: Dict[str, CompiledBlock] = {}
+        self.start_node_id: Optional[str] = None
+        self.first_block_id: Optional[str] = None
+        self.executable_count = 0
+
+        # scriptConfig links: block_id -> [(variable_name, output_name)], metadata fields in config order
+        self.variable_links: Dict[str, List[Tuple[str, str]]] = {}
+        self.metadata_fields: List[Tuple[Optional[str], Optional[str], Optional[str]]] = []
+
+        self.compile_time_ms = 0.0
+
+    def get_block(self, node_id: str) -> Optional[CompiledBlock]:
+        return self.blocks.get(node_id)
+
+    def get_summary(self) -> Dict[str, Any]:
+        handlers: Dict[str, int] = {}
+        for block in self.blocks.values():
+            handlers[block.handler] = handlers.get(block.handler, 0) + 1
+        return {
+            'cache_key': self.cache_key,
+            'is_valid': self.is_valid,
+            'blocks': len(self.blocks),
+            'executable_blocks': self.executable_count,
+            'handlers': handlers,
+            'compile_time_ms': round(self.compile_time_ms, 2)
+        }
+
+
+class TestCaseCompiler:
+    """Compiles test case graphs into TestCasePlans with an LRU plan cache (thread-safe)"""
+
+    def __init__(self, max_plans: int = TESTCASE_PLAN_CACHE_SIZE):
+        self.max_plans = max_plans
+        self._plans: 'OrderedDict[Tuple, TestCasePlan]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def compile(self, graph: Dict[str, Any], userinterface_name: str = None, team_id: str = None,
+                testcase_id: str = None, version: Any = None) -> TestCasePlan:
+        """
+        Get the execution plan for a graph, compiling it on cache miss
+
+        Args:
+            graph: Graph JSON {nodes, edges, scriptConfig}
+            userinterface_name: Userinterface name (validation context)
+            team_id: Team ID (validation context)
+            testcase_id: Saved test case ID (None for unsaved graphs)
+            version: Saved test case version (updated_at or version number)
+
+        Returns:
+            TestCasePlan (check plan.is_valid / plan.errors before executing)
+        """
+        cache_key = self._get_cache_key(graph, userinterface_name, team_id, testcase_id, version)
+
+        with self._lock:
+            plan = self._plans.get(cache_key)
+            if plan is not None:
+                self._plans.move_to_end(cache_key)
+                self.hits += 1
+                print(f"[@testcase_compiler] ⚡ Plan cache hit ({len(plan.blocks)} blocks)")
+                return plan
+            self.misses += 1
+
+        plan = self._compile_graph(graph, cache_key, userinterface_name, team_id)
+        print(f"[@testcase_compiler] Compiled plan: {plan.executable_count} executable blocks in {plan.compile_time_ms:.1f}ms")
+
+        with self._lock:
+            self._plans[cache_key] = plan
+            self._plans.move_to_end(cache_key)
+            while len(self._plans) > self.max_plans:
+                self._plans.popitem(last=False)
+        return plan
+
+    def invalidate(self, testcase_id: str = None):
+        """Drop cached plans of one saved test case (all versions), or the whole cache"""
+        with self._lock:
+            if testcase_id is None:
+                self._plans.clear()
+                return
+            for key in [key for key in self._plans if key[0] == 'testcase' and key[1] == str(testcase_id)]:
+                del self._plans[key]
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {'plans': len(self._plans), 'hits': self.hits, 'misses': self.misses}
+
+    def _get_cache_key(self, graph: Dict[str, Any], userinterface_name: str, team_id: str,
+                       testcase_id: str, version: Any) -> Tuple:
+        if testcase_id and version is not None:
+            return ('testcase', str(testcase_id), str(version), userinterface_name or '', team_id or '')
+        # Unsaved graph - the content is the version
+        digest = hashlib.sha1(json.dumps(graph, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+        return ('graph', digest, userinterface_name or '', team_id or '')
+
+    # =====================================================
+    # COMPILATION
+    # =====================================================
+
+    def _compile_graph(self, graph: Dict[str, Any], cache_key: Tuple, userinterface_name: str = None,
+                       team_id: str = None, validate: bool = True) -> TestCasePlan:
+        start_time = time.perf_counter()
+        plan = TestCasePlan(graph, cache_key)
+
+        if validate:
+            # Fresh validator per compile - the compiler is shared across threads
+            plan.is_valid, plan.errors, plan.warnings = TestCaseValidator().validate_graph(
+                graph,
+                userinterface_name=userinterface_name,
+                team_id=team_id
+            )
+            if not plan.is_valid:
+                plan.compile_time_ms = (time.perf_counter() - start_time) * 1000
+                return plan
+        else:
+            plan.is_valid = True
+
+        nodes = graph.get('nodes', [])
+        edges = graph.get('edges', [])
+
+        for node in nodes:
+            block = CompiledBlock(node)
+            plan.blocks[block.node_id] = block
+            if block.node_type == 'start' and plan.start_node_id is None:
+                plan.start_node_id = block.node_id
+            elif block.node_type not in ('start',) + TERMINAL_TYPES:
+                plan.executable_count += 1
+
+        # First matching edge wins (same order the executor used to scan them in)
+        for edge in edges:
+            block = plan.blocks.get(edge.get('source'))
+            if block is None:
+                continue
+            # React Flow adds suffixes like '-hitarea' to handle names
+            edge_handle = edge.get('sourceHandle') or edge.get('type')
+            if not edge_handle:
+                continue
+            if edge_handle.startswith('success') and block.next_success is None:
+                block.next_success = edge.get('target')
+            elif edge_handle.startswith('failure') and block.next_failure is None:
+                block.next_failure = edge.get('target')
+
+        if plan.start_node_id:
+            plan.first_block_id = plan.blocks[plan.start_node_id].next_success
+
+        for block in plan.blocks.values():
+            self._compile_block(block, plan, userinterface_name, team_id)
+
+        self._compile_script_config_links(graph, plan)
+
+        plan.compile_time_ms = (time.perf_counter() - start_time) * 1000
+        return plan
+
+    def _compile_block(self, block: CompiledBlock, plan: TestCasePlan, userinterface_name: str, team_id: str):
+        data = block.data
+
+        if block.handler == 'action':
+            # Same action shape as UniversalBlock.tsx builds for executeActions
+            block.actions = [{
+                'command': block.command,
+                'params': _bind_params(data.get('params', {})),
+                'action_type': data.get('action_type'),
+                'verification_type': data.get('verification_type'),
+                'threshold': data.get('threshold'),
+                'reference': data.get('reference'),
+            }]
+            block.retry_actions = data.get('retry_actions', []) or []
+            block.failure_actions = data.get('failure_actions', []) or []
+            block.message = f"Action: {block.command}"
+
+        elif block.handler == 'navigation':
+            # Navigation accepts EXACTLY ONE target - label preferred over ID
+            block.target_label = data.get('target_node_label') or data.get('target_node')
+            if not block.target_label:
+                block.target_id = data.get('target_node_id')
+            target = block.target_label or block.target_id or 'unknown'
+            block.message = f"Navigate to: {target}"
+
+        elif block.handler == 'loop':
+            block.iterations = data.get('iterations', 1)
+            block.on_failure = data.get('on_failure', 'break')
+            nested_blocks = data.get('nested_blocks')
+            if nested_blocks:
+                # Nested graphs are validated as part of the parent graph
+                block.loop_plan = self._compile_graph(
+                    nested_blocks, plan.cache_key + (block.node_id,), userinterface_name, team_id, validate=False
+                )
+                plan.warnings.extend(f"Loop {block.node_id}: {warning}" for warning in block.loop_plan.warnings)
+
+        elif block.handler == 'standard':
+            block.params = _bind_params(data.get('params', {}))
+            block.block_registered = _is_registered_block(block.command)
+            if block.block_registered is False:
+                plan.warnings.append(f"Block {block.node_id} uses unknown block command: {block.command}")
+            block.message = f"Standard block: {block.command}"
+
+    def _compile_script_config_links(self, graph: Dict[str, Any], plan: TestCasePlan):
+        script_config = graph.get('scriptConfig') or {}
+
+        for variable in script_config.get('variables', []) or []:
+            variable_name = variable.get('name')
+            if not variable_name:
+                continue
+
+            source_links = variable.get('sourceLinks', [])
+            # Backward compatibility: old single-link format
+            if not source_links and variable.get('sourceBlockId'):
+                source_links = [{
+                    'sourceBlockId': variable.get('sourceBlockId'),
+                    'sourceOutputName': variable.get('sourceOutputName')
+                }]
+
+            for link in source_links:
+                source_block_id = link.get('sourceBlockId')
+                output_name = link.get('sourceOutputName')
+                if source_block_id and output_name:
+                    plan.variable_links.setdefault(source_block_id, []).append((variable_name, output_name))
+
+        metadata_config = script_config.get('metadata', {}) or {}
+        for field in metadata_config.get('fields', []) or []:
+            plan.metadata_fields.append((field.get('name'), field.get('sourceBlockId'), field.get('sourceOutputName')))
+
+
+def _resolve_handler(node_type: str) -> str:
+    if node_type in ('action', 'verification'):
+        # Verifications ARE actions (same as UniversalBlock.tsx)
+        return 'action'
+    if node_type in ('navigation', 'loop', 'start') or node_type in TERMINAL_TYPES:
+        return node_type
+    # Anything else is a BlockRegistry block (evaluate_condition, sleep, ...)
+    return 'standard'
+
+
+def _bind_params(raw_params: Dict[str, Any]) -> Dict[str, Any]:
+    """Unwrap typed param schema objects ({default: X, type: Y, ...}) to their values"""
+    if not raw_params:
+        return {}
+    params = {}
+    for key, value in raw_params.items():
+        if isinstance(value, dict) and 'default' in value and 'type' in value:
+            params[key] = value['default']
+        else:
+            params[key] = value
+    return params
+
+
+def _is_registered_block(command: Optional[str]) -> Optional[bool]:
+    """True/False if the BlockRegistry knows the command, None if the registry is unavailable"""
+    if not command:
+        return False
+    try:
+        from backend_host.src.builder.block_registry import discover_blocks
+        return command in discover_blocks()
+    except Exception as e:
+        print(f"[@testcase_compiler] ⚠️ Block registry unavailable, skipping command check: {e}")
+        return None
+
+
+# Global compiler instance (shared by all TestCaseExecutor instances)
+_compiler_instance: Optional[TestCaseCompiler] = None
+_compiler_lock = threading.Lock()
+
+
+def get_testcase_compiler() -> TestCaseCompiler:
+    """Get global test case compiler (plan cache) instance"""
+    global _compiler_instance
+    if _compiler_instance is None:
+        with _compiler_lock:
+            if _compiler_instance is None:
+                _compiler_instance = TestCaseCompiler()
+    return _compiler_instance
@@ -11,11 +11,12 @@ import threading
 import uuid
 import sys
 import io
-from typing import Dict, List, Any, Optional
+from typing import Dict, Any, Optional
 from shared.src.lib.executors.script_executor import ScriptExecutionContext
 from shared.src.lib.database.testcase_db import get_testcase_by_name, get_testcase
 from shared.src.lib.database.script_results_db import record_script_execution_start, update_script_execution_result
 from .testcase_validator import TestCaseValidator
+from .testcase_compiler import get_testcase_compiler, TestCasePlan, CompiledBlock
 
 
 class TestCaseExecutor:
@@ -26,6 +27,7 @@ class TestCaseExecutor:
     
     def __init__(self):
         self.validator = TestCaseValidator()
+        self.compiler = get_testcase_compiler()
         self.context = None
         self.device = None
         self.current_block_id = None
@@ -64,13 +66,14 @@ class TestCaseExecutor:
         start_time = time.time()
         
         try:
-            # Validate graph structure
-            print(f"[@testcase_executor] Validating graph...")
-            is_valid, errors, warnings = self.validator.validate_graph(
+            # Compile graph into a validated execution plan (cached per graph content)
+            print(f"[@testcase_executor] Compiling graph...")
+            plan = self.compiler.compile(
                 graph,
                 userinterface_name=userinterface_name,
                 team_id=team_id
             )
+            is_valid, errors, warnings = plan.is_valid, plan.errors, plan.warnings
             
             if not is_valid:
                 error_msg = '; '.join(errors)
@@ -138,7 +141,7 @@ class TestCaseExecutor:
             self.device = device
             
             import asyncio
-            execution_result = asyncio.run(self._execute_graph(graph, context))
+            execution_result = asyncio.run(self._execute_graph(plan, context))
             
             # Calculate execution time
             execution_time_ms = int((time.time() - start_time) * 1000)
@@ -276,13 +279,16 @@ class TestCaseExecutor:
             graph = testcase['graph_json']
             userinterface_name = testcase.get('userinterface_name')
             
-            # Validate graph structure
-            print(f"[@testcase_executor] Validating graph...")
-            is_valid, errors, warnings = self.validator.validate_graph(
+            # Compile graph into a validated execution plan (cached per testcase version)
+            print(f"[@testcase_executor] Compiling graph...")
+            plan = self.compiler.compile(
                 graph,
                 userinterface_name=userinterface_name,
-                team_id=team_id
+                team_id=team_id,
+                testcase_id=testcase.get('testcase_id'),
+                version=testcase.get('updated_at')
             )
+            is_valid, errors, warnings = plan.is_valid, plan.errors, plan.warnings
             
             if not is_valid:
                 error_msg = '; '.join(errors)
@@ -344,7 +350,7 @@ class TestCaseExecutor:
             self.device = device
             
             import asyncio
-            execution_result = asyncio.run(self._execute_graph(graph, context))
+            execution_result = asyncio.run(self._execute_graph(plan, context))
             
             # Calculate execution time
             execution_time_ms = int((time.time() - start_time) * 1000)
@@ -521,13 +527,14 @@ class TestCaseExecutor:
         start_time = time.time()
         
         try:
-            # Validate graph
-            print(f"[@testcase_executor:{execution_id}] Validating graph...")
-            is_valid, errors, warnings = self.validator.validate_graph(
+            # Compile graph into a validated execution plan
+            print(f"[@testcase_executor:{execution_id}] Compiling graph...")
+            plan = self.compiler.compile(
                 graph,
                 userinterface_name=userinterface_name,
                 team_id=team_id
             )
+            is_valid, errors = plan.is_valid, plan.errors
             
             if not is_valid:
                 error_msg = '; '.join(errors)
@@ -603,7 +610,7 @@ class TestCaseExecutor:
             # Execute graph with progress tracking
             print(f"[@testcase_executor:{execution_id}] Executing test case...")
             import asyncio
-            execution_result = asyncio.run(self._execute_graph_with_tracking(graph, context, execution_id))
+            execution_result = asyncio.run(self._execute_graph_with_tracking(plan, context, execution_id))
             
             # Calculate execution time
             execution_time_ms = int((time.time() - start_time) * 1000)
@@ -750,25 +757,18 @@ class TestCaseExecutor:
             
             return execution
     
-    async def _execute_graph_with_tracking(self, graph: Dict[str, Any], context: ScriptExecutionContext, execution_id: str) -> Dict[str, Any]:
+    async def _execute_graph_with_tracking(self, plan: TestCasePlan, context: ScriptExecutionContext, execution_id: str) -> Dict[str, Any]:
         """
-        Execute graph with real-time progress tracking for async execution.
+        Execute compiled plan with real-time progress tracking for async execution.
         Updates execution state as blocks are processed.
         """
-        nodes = {node['id']: node for node in graph['nodes']}
-        edges = graph['edges']
-        
-        # Find START block
-        start_node = next((node for node in graph['nodes'] if node['type'] == 'start'), None)
-        if not start_node:
+        if not plan.start_node_id:
             return {'success': False, 'error': 'No START block found'}
         
-        start_node_id = start_node['id']
-        current_node_id = self._find_next_node(start_node_id, 'success', edges)
+        current_node_id = plan.first_block_id
         
         if not current_node_id:
-            executable_blocks = [n for n in graph['nodes'] if n['type'] not in ['start', 'success', 'failure']]
-            if executable_blocks:
+            if plan.executable_count:
                 return {'success': False, 'error': 'START block is not connected to any executable block'}
             else:
                 context.overall_success = True
@@ -785,11 +785,11 @@ class TestCaseExecutor:
                 if execution_id in self._executions:
                     self._executions[execution_id]['current_block_id'] = current_node_id
             
-            current_node = nodes.get(current_node_id)
-            if not current_node:
+            block = plan.get_block(current_node_id)
+            if not block:
                 return {'success': False, 'error': f'Node not found: {current_node_id}'}
             
-            node_type = current_node['type']
+            node_type = block.node_type
             
             # Terminal blocks
             if node_type == 'success':
@@ -806,7 +806,7 @@ class TestCaseExecutor:
                 
                 # Resolve scriptConfig outputs and metadata before returning
                 print(f"[@testcase_executor:{execution_id}] 🔄 Calling _resolve_script_outputs_and_metadata...")
-                self._resolve_script_outputs_and_metadata(graph, context)
+                self._resolve_script_outputs_and_metadata(plan.graph, context)
                 print(f"[@testcase_executor:{execution_id}] ✅ Metadata resolution completed")
                 
                 return {'success': True, 'result_type': 'success'}
@@ -818,7 +818,7 @@ class TestCaseExecutor:
             # Execute block
             block_start_time = time.time()
             try:
-                block_result = await self._execute_block(current_node, context)
+                block_result = await self._execute_block(block, context)
             except Exception as e:
                 error_msg = f"Block {current_node_id} execution error: {str(e)}"
                 return {'success': False, 'result_type': 'error', 'error': error_msg}
@@ -833,10 +833,10 @@ class TestCaseExecutor:
                 print(f"[@testcase_executor:{execution_id}] ✅ Stored block outputs for {current_node_id}: {list(block_result['output_data'].keys())}")
                 
                 # 🆕 Immediately update any variables linked to this block's outputs
-                self._update_linked_variables(current_node_id, block_result['output_data'], graph, context, execution_id)
+                self._update_linked_variables(current_node_id, block_result['output_data'], plan, context, execution_id)
                 
                 # 🆕 Immediately update any metadata fields linked to this block's outputs or variables
-                self._update_linked_metadata(current_node_id, block_result['output_data'], graph, context, execution_id)
+                self._update_linked_metadata(current_node_id, block_result['output_data'], plan, context, execution_id)
             
             # Update block state in execution tracking
             with self._lock:
@@ -860,9 +860,9 @@ class TestCaseExecutor:
                 'step_category': 'testcase_block'
             })
             
-            # Find next node
+            # Next node (edges resolved at compile time)
             edge_type = 'success' if block_result['success'] else 'failure'
-            next_node_id = self._find_next_node(current_node_id, edge_type, edges)
+            next_node_id = block.next_success if block_result['success'] else block.next_failure
             
             if not next_node_id:
                 if edge_type == 'failure':
@@ -879,16 +879,16 @@ class TestCaseExecutor:
         
         return {'success': False, 'result_type': 'error', 'error': 'Graph execution ended unexpectedly'}
     
-    async def _execute_graph(self, graph: Dict[str, Any], context: ScriptExecutionContext) -> Dict[str, Any]:
+    async def _execute_graph(self, plan: TestCasePlan, context: ScriptExecutionContext) -> Dict[str, Any]:
         """
-        Execute a test case graph by traversing nodes.
+        Execute a compiled test case plan by walking its blocks.
         
         START block is never executed - it's only an entry point marker.
         SUCCESS/FAILURE blocks are terminal - they end execution immediately.
         Execution begins at the first executable block connected to START.
         
         Args:
-            graph: {nodes: [...], edges: [...]}
+            plan: Compiled plan (TestCaseCompiler.compile)
             context: Execution context
         
         Returns:
@@ -898,48 +898,22 @@ class TestCaseExecutor:
                 error: str (if error occurred)
             }
         """
-        nodes = {node['id']: node for node in graph['nodes']}
-        edges = graph['edges']
-        
-        # Debug: Print raw graph structure
-        print(f"[@testcase_executor] === RAW GRAPH DEBUG ===")
-        print(f"[@testcase_executor] Total nodes: {len(graph['nodes'])}")
-        for node in graph['nodes']:
-            print(f"[@testcase_executor]   Node: {node['id']} (type: {node['type']})")
-        
-        print(f"[@testcase_executor] Total edges: {len(edges)}")
-        for edge in edges:
-            edge_type = edge.get('sourceHandle') or edge.get('type', 'unknown')
-            print(f"[@testcase_executor]   Edge: {edge['source']} --[{edge_type}]--> {edge['target']}")
-        print(f"[@testcase_executor] === END RAW GRAPH DEBUG ===")
-        
         # Find START block - it's the entry point but never executed
-        start_node = next((node for node in graph['nodes'] if node['type'] == 'start'), None)
-        if not start_node:
+        if not plan.start_node_id:
             return {'success': False, 'error': 'No START block found'}
         
-        # Skip START and find the first executable block
+        # Skip START and begin at the first executable block
         # START is only a marker - execution begins at the first connected block
-        start_node_id = start_node['id']
-        print(f"[@testcase_executor] START node ID: {start_node_id}")
-        print(f"[@testcase_executor] Looking for 'success' edge from START...")
-        current_node_id = self._find_next_node(start_node_id, 'success', edges)
-        
-        if current_node_id:
-            print(f"[@testcase_executor] Found first executable block: {current_node_id}")
-        else:
-            print(f"[@testcase_executor] No block connected to START via 'success' edge")
+        current_node_id = plan.first_block_id
         
         # If START has no connection, check if graph has other blocks
         if not current_node_id:
-            # Count executable blocks (exclude START, SUCCESS, FAILURE)
-            executable_blocks = [n for n in graph['nodes'] if n['type'] not in ['start', 'success', 'failure']]
-            
-            if executable_blocks:
+            print(f"[@testcase_executor] No block connected to START via 'success' edge")
+            if plan.executable_count:
                 # Graph has blocks but START is not connected - this is an error
                 return {
                     'success': False,
-                    'error': f'START block is not connected to any executable block. Found {len(executable_blocks)} disconnected block(s).'
+                    'error': f'START block is not connected to any executable block. Found {plan.executable_count} disconnected block(s).'
                 }
             else:
                 # No executable blocks - minimal test case (just validates setup)
@@ -947,7 +921,6 @@ class TestCaseExecutor:
                 context.overall_success = True
                 return {'success': True, 'result_type': 'success'}
         
-        visited_blocks = set()
         max_iterations = 1000  # Prevent infinite loops
         iteration_count = 0
         
@@ -956,12 +929,12 @@ class TestCaseExecutor:
         while current_node_id and iteration_count < max_iterations:
             iteration_count += 1
             
-            # Get current node
-            current_node = nodes.get(current_node_id)
-            if not current_node:
+            # Get current block
+            block = plan.get_block(current_node_id)
+            if not block:
                 return {'success': False, 'error': f'Node not found: {current_node_id}'}
             
-            node_type = current_node['type']
+            node_type = block.node_type
             
             print(f"[@testcase_executor] Processing block: {current_node_id} (type: {node_type})")
             
@@ -980,7 +953,7 @@ class TestCaseExecutor:
                     print(f"  - {block_id}: {list(outputs.keys()) if isinstance(outputs, dict) else outputs}")
                 
                 # Resolve scriptConfig outputs and metadata before returning
-                self._resolve_script_outputs_and_metadata(graph, context)
+                self._resolve_script_outputs_and_metadata(plan.graph, context)
                 
                 return {'success': True, 'result_type': 'success'}
             
@@ -992,7 +965,7 @@ class TestCaseExecutor:
             # Execute block
             self.current_block_id = current_node_id  # Set for output storage
             try:
-                block_result = await self._execute_block(current_node, context)
+                block_result = await self._execute_block(block, context)
             except Exception as e:
                 error_msg = f"Block {current_node_id} execution error: {str(e)}"
                 print(f"[@testcase_executor] ERROR: {error_msg}")
@@ -1018,10 +991,9 @@ class TestCaseExecutor:
                 'step_category': 'testcase_block'
             })
             
-            # Find next node based on success/failure result
+            # Next node based on success/failure result (edges resolved at compile time)
             edge_type = 'success' if block_result['success'] else 'failure'
-            print(f"[@testcase_executor] Looking for {edge_type} edge from block {current_node_id}...")
-            next_node_id = self._find_next_node(current_node_id, edge_type, edges)
+            next_node_id = block.next_success if block_result['success'] else block.next_failure
             
             if not next_node_id:
                 # Block executed but has no outgoing connection for this result
@@ -1047,9 +1019,9 @@ class TestCaseExecutor:
         
         return {'success': False, 'result_type': 'error', 'error': 'Graph execution ended unexpectedly'}
     
-    async def _execute_block(self, node: Dict, context: ScriptExecutionContext) -> Dict[str, Any]:
+    async def _execute_block(self, block: CompiledBlock, context: ScriptExecutionContext) -> Dict[str, Any]:
         """
-        Execute a single block by delegating to appropriate executor.
+        Execute a single compiled block with the handler resolved at compile time.
         Captures all stdout/stderr logs during execution.
         
         Returns:
@@ -1065,28 +1037,22 @@ class TestCaseExecutor:
             sys.stdout = log_buffer
             sys.stderr = log_buffer
             
-            node_type = node['type']
-            data = node.get('data', {})
+            handler = block.handler
             
             # START block should never reach here - it's skipped in _execute_graph
-            if node_type == 'start':
+            if handler == 'start':
                 raise Exception('START block should not be executed - it is only an entry point marker')
             
-            # Execute based on type
-            if node_type == 'action':
-                result = await self._execute_action_block(data, context)
-            elif node_type == 'verification':
-                # ✅ Verifications ARE actions (same as UniversalBlock.tsx line 302)
-                # Just execute as action - no special handling needed
-                result = await self._execute_action_block(data, context)
-            elif node_type == 'navigation':
-                result = await self._execute_navigation_block(data, context)
-            elif node_type == 'loop':
-                result = await self._execute_loop_block(node, context)
+            # Execute based on handler (verifications ARE actions - same as UniversalBlock.tsx)
+            if handler == 'action':
+                result = await self._execute_action_block(block, context)
+            elif handler == 'navigation':
+                result = await self._execute_navigation_block(block, context)
+            elif handler == 'loop':
+                result = await self._execute_loop_block(block, context)
             else:
-                # Try to execute as standard block (evaluate_condition, sleep, etc.)
-                # Block registry auto-discovers all blocks from builder/blocks/ folder
-                result = await self._execute_standard_block(data, context)
+                # Standard block (evaluate_condition, sleep, etc.) from builder/blocks/ folder
+                result = await self._execute_standard_block(block, context)
             
             # Add captured logs to result
             result['logs'] = log_buffer.getvalue()
@@ -1097,41 +1063,23 @@ class TestCaseExecutor:
             sys.stdout = old_stdout
             sys.stderr = old_stderr
     
-    async def _execute_action_block(self, data: Dict, context: ScriptExecutionContext) -> Dict[str, Any]:
+    async def _execute_action_block(self, block: CompiledBlock, context: ScriptExecutionContext) -> Dict[str, Any]:
         """
         Execute action block using Orchestrator.
         
-        EXACT REPLICA of UniversalBlock.tsx lines 291-302:
-        - Build action with ALL fields from data
-        - Call executeActions with retry/failure arrays
+        Action list is pre-built at compile time exactly like UniversalBlock.tsx lines 291-302
+        (ALL fields, retry/failure arrays).
         """
         start_time = time.time()
         
         try:
-            # ✅ EXACT MATCH: UniversalBlock.tsx lines 291-299
-            # Extract ALL fields (not just command + params)
-            command = data.get('command')
-            params = data.get('params', {})  # Already cleaned/resolved by frontend
-            retry_actions = data.get('retry_actions', [])
-            failure_actions = data.get('failure_actions', [])
-            
-            # Build action with ALL fields (same as UniversalBlock.tsx)
-            actions = [{
-                'command': command,
-                'params': params,
-                'action_type': data.get('action_type'),           # ✅ For routing
-                'verification_type': data.get('verification_type'), # ✅ For verification routing
-                'threshold': data.get('threshold'),               # ✅ For verifications
-                'reference': data.get('reference'),               # ✅ For verifications
-            }]
-            
             # Use orchestrator for unified logging
             from backend_host.src.orchestrator import ExecutionOrchestrator
             result = await ExecutionOrchestrator.execute_actions(
                 device=self.device,
-                actions=actions,
-                retry_actions=retry_actions,
-                failure_actions=failure_actions,
+                actions=block.actions,
+                retry_actions=block.retry_actions,
+                failure_actions=block.failure_actions,
                 team_id=context.team_id,
                 context=context
             )
@@ -1142,7 +1090,7 @@ class TestCaseExecutor:
             return {
                 'success': result['success'],
                 'execution_time_ms': execution_time_ms,
-                'message': f"Action: {command}",
+                'message': block.message,
                 'error': result.get('error'),
                 'output_data': result.get('output_data', {})  # ✅ Pass through output_data
             }
@@ -1155,18 +1103,15 @@ class TestCaseExecutor:
                 'error': f'Action execution error: {str(e)}'
             }
     
-    async def _execute_standard_block(self, data: Dict, context: ScriptExecutionContext) -> Dict[str, Any]:
+    async def _execute_standard_block(self, block: CompiledBlock, context: ScriptExecutionContext) -> Dict[str, Any]:
         """Execute standard block (like evaluate_condition) using Orchestrator"""
         start_time = time.time()
         
         try:
-            command = data.get('command')
-            params = data.get('params', {})  # ✅ Already resolved by frontend
-            
-            # Build blocks array from single block
+            # Build blocks array from single block (params pre-bound at compile time)
             blocks = [{
-                'command': command,
-                'params': params  # ✅ Use directly - frontend already resolved {variables}
+                'command': block.command,
+                'params': dict(block.params)  # Copy - the plan is shared across runs
             }]
             
             # Use orchestrator for unified logging (same pattern as actions/verifications)
@@ -1191,7 +1136,7 @@ class TestCaseExecutor:
             return {
                 'success': result['success'],
                 'execution_time_ms': execution_time_ms,
-                'message': f"Standard block: {command}",
+                'message': block.message,
                 'error': result.get('error')
             }
             
@@ -1203,11 +1148,20 @@ class TestCaseExecutor:
                 'error': f'Standard block execution error: {str(e)}'
             }
     
-    async def _execute_navigation_block(self, data: Dict, context: ScriptExecutionContext) -> Dict[str, Any]:
+    async def _execute_navigation_block(self, block: CompiledBlock, context: ScriptExecutionContext) -> Dict[str, Any]:
         """Execute navigation block using ExecutionOrchestrator"""
         start_time = time.time()
         
         try:
+            # Target resolved at compile time - label preferred, ID only if no label
+            # (backend validation requires EXACTLY ONE parameter, not both)
+            if not block.target_label and not block.target_id:
+                return {
+                    'success': False,
+                    'execution_time_ms': int((time.time() - start_time) * 1000),
+                    'error': 'Navigation block missing both target_node_label and target_node_id'
+                }
+            
             navigation_executor = self.device.navigation_executor
             
             # Load navigation tree if not already loaded
@@ -1224,62 +1178,27 @@ class TestCaseExecutor:
                     }
                 context.tree_id = nav_result['tree_id']
             
-            # DEBUG: Check navigation context before execution
             nav_context = self.device.navigation_context
-            print(f"[@testcase_executor:_execute_navigation_block] 🔍 NAVIGATION CONTEXT CHECK:")
-            print(f"[@testcase_executor:_execute_navigation_block]   → current_node_id: {nav_context.get('current_node_id')}")
-            print(f"[@testcase_executor:_execute_navigation_block]   → current_node_label: {nav_context.get('current_node_label')}")
-            print(f"[@testcase_executor:_execute_navigation_block]   → target_node_label: {data.get('target_node_label')}")
-            print(f"[@testcase_executor:_execute_navigation_block]   → target_node_id: {data.get('target_node_id')}")
-            
-            # Call navigation through ExecutionOrchestrator for consistency
-            # PRIORITY: Use label if available (more human-readable), fallback to ID
-            # Backend validation requires EXACTLY ONE parameter, not both
-            target_label = data.get('target_node_label') or data.get('target_node')
-            target_id = data.get('target_node_id')
+            print(f"[@testcase_executor:_execute_navigation_block] {nav_context.get('current_node_label') or nav_context.get('current_node_id')} → {block.target_label or block.target_id}")
             
             # ✅ Use ExecutionOrchestrator for unified logging and consistent execution
             from backend_host.src.orchestrator import ExecutionOrchestrator
-            
-            # Prefer label over ID - only pass ID if no label exists
-            if target_label:
-                print(f"[@testcase_executor:_execute_navigation_block] Using target_node_label: {target_label}")
-                result = await ExecutionOrchestrator.execute_navigation(
-                    device=self.device,
-                    tree_id=context.tree_id,
-                    userinterface_name=context.userinterface_name,
-                    target_node_id=None,  # Explicitly set to None when using label
-                    target_node_label=target_label,
-                    team_id=context.team_id,
-                    context=context
-                )
-            elif target_id:
-                print(f"[@testcase_executor:_execute_navigation_block] Using target_node_id: {target_id}")
-                result = await ExecutionOrchestrator.execute_navigation(
-                    device=self.device,
-                    tree_id=context.tree_id,
-                    userinterface_name=context.userinterface_name,
-                    target_node_id=target_id,
-                    target_node_label=None,  # Explicitly set to None when using ID
-                    team_id=context.team_id,
-                    context=context
-                )
-            else:
-                return {
-                    'success': False,
-                    'execution_time_ms': int((time.time() - start_time) * 1000),
-                    'error': 'Navigation block missing both target_node_label and target_node_id'
-                }
+            result = await ExecutionOrchestrator.execute_navigation(
+                device=self.device,
+                tree_id=context.tree_id,
+                userinterface_name=context.userinterface_name,
+                target_node_id=block.target_id,
+                target_node_label=block.target_label,
+                team_id=context.team_id,
+                context=context
+            )
             
             execution_time_ms = int((time.time() - start_time) * 1000)
             
-            # Get the target for the message
-            target = data.get('target_node_label') or data.get('target_node') or data.get('target_node_id') or 'unknown'
-            
             return {
                 'success': result['success'],
                 'execution_time_ms': execution_time_ms,
-                'message': f"Navigate to: {target}",
+                'message': block.message,
                 'error': result.get('error')
             }
             
@@ -1291,34 +1210,30 @@ class TestCaseExecutor:
                 'error': f'Navigation execution error: {str(e)}'
             }
     
-    async def _execute_loop_block(self, node: Dict, context: ScriptExecutionContext) -> Dict[str, Any]:
-        """Execute loop block with nested graph"""
+    async def _execute_loop_block(self, block: CompiledBlock, context: ScriptExecutionContext) -> Dict[str, Any]:
+        """Execute loop block with its compiled nested plan"""
         start_time = time.time()
         
         try:
-            data = node.get('data', {})
-            iterations = data.get('iterations', 1)
-            nested_blocks = data.get('nested_blocks')
+            iterations = block.iterations
             
-            if not nested_blocks:
+            if not block.loop_plan:
                 return {
                     'success': False,
                     'execution_time_ms': 0,
                     'error': 'Loop block has no nested blocks'
                 }
             
-            # Execute nested graph for specified iterations
+            # Execute nested plan for specified iterations
             for i in range(iterations):
                 print(f"[@testcase_executor] Loop iteration {i+1}/{iterations}")
                 
-                result = await self._execute_graph(nested_blocks, context)
+                result = await self._execute_graph(block.loop_plan, context)
                 
                 # Check loop behavior (continue/break)
                 if not result['success']:
                     # Nested graph failed - should we break or continue?
-                    loop_behavior = data.get('on_failure', 'break')  # 'break' or 'continue'
-                    
-                    if loop_behavior == 'break':
+                    if block.on_failure == 'break':
                         execution_time_ms = int((time.time() - start_time) * 1000)
                         return {
                             'success': False,
@@ -1426,7 +1341,7 @@ class TestCaseExecutor:
         print(f"[@testcase_executor] ========================================================")
     
     def _update_linked_variables(self, block_id: str, output_data: Dict[str, Any], 
-                                  graph: Dict[str, Any], context: ScriptExecutionContext, 
+                                  plan: TestCasePlan, context: ScriptExecutionContext, 
                                   execution_id: str):
         """
         Immediately update any variables that link to this block's outputs.
@@ -1435,50 +1350,26 @@ class TestCaseExecutor:
         Args:
             block_id: The block that just executed
             output_data: The output_data from the block
-            graph: Graph JSON with scriptConfig
+            plan: Compiled plan (variable links indexed by source block)
             context: Execution context
             execution_id: Execution ID for logging
         """
-        script_config = graph.get('scriptConfig')
-        if not script_config:
-            return
-        
-        variables = script_config.get('variables', [])
-        if not variables:
+        links = plan.variable_links.get(block_id)
+        if not links:
             return
         
         # Initialize context.variables if not present
         if not hasattr(context, 'variables'):
             context.variables = {}
         
-        # Check each variable to see if it links to this block
-        for variable in variables:
-            variable_name = variable.get('name')
-            if not variable_name:
-                continue
-            
-            # Support both old single-link and new multi-link format
-            source_links = variable.get('sourceLinks', [])
-            
-            # Backward compatibility: convert old format to new
-            if not source_links and variable.get('sourceBlockId'):
-                source_links = [{
-                    'sourceBlockId': variable.get('sourceBlockId'),
-                    'sourceOutputName': variable.get('sourceOutputName'),
-                    'sourceOutputType': variable.get('sourceOutputType')
-                }]
-            
-            # Check if any source link matches this block
-            for link in source_links:
-                if link.get('sourceBlockId') == block_id:
-                    output_name = link.get('sourceOutputName')
-                    if output_name and output_name in output_data:
-                        value = output_data[output_name]
-                        context.variables[variable_name] = value
-                        print(f"[@testcase_executor:{execution_id}] 🔗 Updated variable '{variable_name}' = {value if not isinstance(value, dict) else '{...}'} (from block {block_id[:8]}... output '{output_name}')")
+        for variable_name, output_name in links:
+            if output_name in output_data:
+                value = output_data[output_name]
+                context.variables[variable_name] = value
+                print(f"[@testcase_executor:{execution_id}] 🔗 Updated variable '{variable_name}' = {value if not isinstance(value, dict) else '{...}'} (from block {block_id[:8]}... output '{output_name}')")
     
     def _update_linked_metadata(self, block_id: str, output_data: Dict[str, Any], 
-                                 graph: Dict[str, Any], context: ScriptExecutionContext, 
+                                 plan: TestCasePlan, context: ScriptExecutionContext, 
                                  execution_id: str):
         """
         Immediately update any metadata fields that link to this block's outputs OR variables.
@@ -1487,19 +1378,12 @@ class TestCaseExecutor:
         Args:
             block_id: The block that just executed
             output_data: The output_data from the block
-            graph: Graph JSON with scriptConfig
+            plan: Compiled plan (metadata fields extracted from scriptConfig)
             context: Execution context
             execution_id: Execution ID for logging
         """
-        script_config = graph.get('scriptConfig')
-        if not script_config:
-            print(f"[@testcase_executor:{execution_id}] 🔍 _update_linked_metadata: No scriptConfig found")
-            return
-        
-        metadata_config = script_config.get('metadata', {})
-        metadata_fields = metadata_config.get('fields', [])
+        metadata_fields = plan.metadata_fields
         if not metadata_fields:
-            print(f"[@testcase_executor:{execution_id}] 🔍 _update_linked_metadata: No metadata fields configured")
             return
         
         print(f"[@testcase_executor:{execution_id}] 🔍 _update_linked_metadata: Checking {len(metadata_fields)} metadata fields for block {block_id[:8]}...")
@@ -1509,21 +1393,12 @@ class TestCaseExecutor:
             context.metadata = {}
         
         # Check each metadata field
-        for field in metadata_fields:
-            field_name = field.get('name')
-            source_block_id = field.get('sourceBlockId')
-            source_output_name = field.get('sourceOutputName')
-            
-            print(f"[@testcase_executor:{execution_id}]   🔍 Metadata '{field_name}': sourceBlockId={source_block_id[:8] if source_block_id else 'None'}..., sourceOutputName={source_output_name}")
-            
+        for field_name, source_block_id, source_output_name in metadata_fields:
             if not field_name or not source_block_id or not source_output_name:
-                print(f"[@testcase_executor:{execution_id}]   ⚠️ Skipping '{field_name}': missing config")
                 continue
             
             # Check if this metadata field links to the block that just executed
             if source_block_id == block_id:
-                print(f"[@testcase_executor:{execution_id}]   ✅ Block ID matches! Checking output '{source_output_name}'...")
-                
                 # First check if source_output_name is a variable name
                 if hasattr(context, 'variables') and source_output_name in context.variables:
                     value = context.variables[source_output_name]
@@ -1543,8 +1418,6 @@ class TestCaseExecutor:
                     value = context.variables[source_output_name]
                     context.metadata[field_name] = value
                     print(f"[@testcase_executor:{execution_id}]   📋 Updated metadata '{field_name}' = {value if not isinstance(value, dict) else '{...}'} (from variable '{source_output_name}' - block mismatch ignored)")
-                else:
-                    print(f"[@testcase_executor:{execution_id}]   ⏭️ Block ID doesn't match (expected {source_block_id[:8]}..., got {block_id[:8]}...)")
     
     def _resolve_script_outputs_and_metadata(self, graph: Dict[str, Any], context: ScriptExecutionContext):
         """
@@ -1665,29 +1538,3 @@ class TestCaseExecutor:
         print(f"[@testcase_executor] ========== RESOLUTION COMPLETE ==========")
         print(f"[@testcase_executor] Script Outputs: {getattr(context, 'script_outputs', {})}")
         print(f"[@testcase_executor] Metadata: {context.metadata}")
-    
-    def _find_next_node(self, current_node_id: str, edge_type: str, edges: List[Dict]) -> Optional[str]:
-        """
-        Find the next node ID by following edges.
-        
-        Args:
-            current_node_id: Current node ID
-            edge_type: 'success' or 'failure'
-            edges: List of edges
-        
-        Returns:
-            Next node ID or None
-        """
-        for edge in edges:
-            if edge['source'] == current_node_id:
-                # Check edge type (can be in 'type' or 'sourceHandle')
-                edge_handle = edge.get('sourceHandle') or edge.get('type')
-                
-                # React Flow adds suffixes like '-hitarea' to handle names
-                # Match if edge_handle starts with the edge_type we're looking for
-                if edge_handle and edge_handle.startswith(edge_type):
-                    print(f"[@testcase_executor] Found edge: {current_node_id} --[{edge_handle}]--> {edge['target']}")
-                    return edge['target']
-        
-        return None
-
@@ -210,8 +210,8 @@ class TestCaseValidator:
                 nested_blocks = node.get('data', {}).get('nested_blocks')
                 
                 if nested_blocks:
-                    # Recursively validate nested graph
-                    is_valid, nested_errors, nested_warnings = self.validate_graph(nested_blocks)
+                    # Recursively validate nested graph (own validator - validate_graph resets errors/warnings)
+                    is_valid, nested_errors, nested_warnings = TestCaseValidator().validate_graph(nested_blocks)
                     
                     # Prefix errors with loop block ID
                     for error in nested_errors:
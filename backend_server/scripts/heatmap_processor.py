@@ -28,6 +28,7 @@ import logging
 from datetime import datetime, timezone
 from typing import Dict, List, Optional, Tuple
 from PIL import Image
+import numpy as np
 import io
 import math
 from concurrent.futures import ThreadPoolExecutor, as_completed
@@ -58,6 +59,33 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Mosaic cell geometry
+CELL_WIDTH, CELL_HEIGHT = 400, 300
+BORDER_WIDTH = 4
+STATUS_BORDER_COLORS = {
+    'ok': (0, 255, 0),
+    'ko': (255, 0, 0),
+    'unknown': (128, 128, 128)
+}
+
+
+def get_grid_layout(count: int) -> Tuple[int, int]:
+    """Return (cols, rows) for a mosaic of count cells"""
+    if count <= 1:
+        return 1, 1
+    elif count == 2:
+        return 2, 1
+    elif count <= 4:
+        return 2, 2
+    elif count <= 6:
+        return 3, 2
+    elif count <= 9:
+        return 3, 3
+    # For more than 9 devices, use 6 columns max
+    cols = min(6, count)
+    return cols, math.ceil(count / cols)
+
+
 def cleanup_logs_on_startup():
     """Clean up heatmap log file on service restart for fresh debugging"""
     try:
@@ -89,8 +117,22 @@ class HeatmapProcessor:
         self.session = requests.Session()
         # Performance: Cache fonts to avoid repeated loading
         self._fonts_cache = {}
+        # Performance: Decoded+resized cells keyed by (host, device) -> (sequence, array)
+        # Unchanged devices are not re-downloaded nor re-decoded every minute
+        self._cell_cache: Dict[Tuple[str, str], Tuple[str, np.ndarray]] = {}
+        self._placeholder_cache: Dict[Tuple[str, str, bool], np.ndarray] = {}
+        # Performance: Glyph atlas for labels (one alpha mask per character, composed per label)
+        self._glyph_atlas: Dict[str, np.ndarray] = {}
+        self._label_cache: Dict[str, np.ndarray] = {}
+        self._glyph_height = self._get_glyph_height()
         logger.info(f"🏷️ HeatmapProcessor server path: {self.server_path}")
     
+    def _get_glyph_height(self) -> int:
+        """Line height of the label font, shared by all glyphs so they can be stacked horizontally"""
+        font = self._get_cached_font('default')
+        bbox = font.getbbox('Ag_|')
+        return max(1, bbox[3])
+    
     def _get_server_path(self) -> str:
         """Get server path for R2 storage organization using SERVER_NAME"""
         # Use SERVER_NAME to organize heatmaps by deployment instance
@@ -141,16 +183,8 @@ class HeatmapProcessor:
             # Create complete device list with placeholders for missing captures
             complete_device_list = self.create_complete_device_list(hosts_devices, current_captures)
             
-            # Create mosaic image (always full grid)
-            mosaic_image = self.create_mosaic_image(complete_device_list)
-            
-            # Create OK and KO mosaics - OPTIMIZED: single pass filtering
-            ok_devices, ko_devices = self.filter_devices_by_status(complete_device_list)
-            
-            ko_mosaic_image = self.create_mosaic_image(ko_devices) if ko_devices else None
-            ok_mosaic_image = self.create_mosaic_image(ok_devices) if ok_devices else None
-            
-            logger.info(f"📊 Created mosaics: ALL({len(complete_device_list)}), OK({len(ok_devices)}), KO({len(ko_devices)})")
+            # Create ALL (always full grid), OK and KO mosaics - OPTIMIZED: single compositing pass
+            mosaic_image, ok_mosaic_image, ko_mosaic_image = self.create_mosaic_images(complete_device_list)
             
             # Create analysis JSON (includes all devices, even missing ones)
             analysis_json = self.create_analysis_json(complete_device_list, time_key)
@@ -505,32 +539,6 @@ class HeatmapProcessor:
             logger.info(f"   ✅ No incidents detected")
     
     
-    def filter_devices_by_status(self, devices_data: List[Dict]) -> Tuple[List[Dict], List[Dict]]:
-        """Filter devices into OK and KO lists in single pass (OPTIMIZED)"""
-        ok_devices = []
-        ko_devices = []
-        
-        for device in devices_data:
-            analysis_data = device.get('analysis', {})
-            is_placeholder = device.get('is_placeholder', False)
-            
-            has_incident = False
-            has_real_analysis = analysis_data and any(key in analysis_data for key in ['blackscreen', 'freeze', 'audio'])
-            
-            if not is_placeholder and has_real_analysis:
-                has_incident = (
-                    analysis_data.get('blackscreen', False) or
-                    analysis_data.get('freeze', False) or
-                    not analysis_data.get('audio', True)
-                )
-                
-                if has_incident:
-                    ko_devices.append(device)
-                else:
-                    ok_devices.append(device)
-        
-        return ok_devices, ko_devices
-    
     def _get_cached_font(self, font_name: str, size: int = None):
         """Get font from cache or load it (OPTIMIZED)"""
         from PIL import ImageFont
@@ -548,215 +556,224 @@ class HeatmapProcessor:
         
         return self._fonts_cache[cache_key]
     
-    def add_border_and_label(self, img: Image.Image, image_data: Dict, cell_width: int, cell_height: int) -> Image.Image:
-        """Add colored border and label to device image"""
-        from PIL import ImageDraw
-        
-        # Check for incidents in raw analysis data
+    def _get_device_status(self, image_data: Dict) -> str:
+        """Return 'ok', 'ko' or 'unknown' from the raw analysis of a device"""
         analysis_data = image_data.get('analysis_json', {}) or image_data.get('analysis', {})
         is_placeholder = image_data.get('is_placeholder', False)
         
         has_real_analysis = analysis_data and any(key in analysis_data for key in ['blackscreen', 'freeze', 'audio'])
-        
-        has_incident = False
-        if not is_placeholder and has_real_analysis:
-            has_incident = (
-                analysis_data.get('blackscreen', False) or
-                analysis_data.get('freeze', False) or
-                not analysis_data.get('audio', True)
-            )
-        
-        # Add border
         if is_placeholder or not has_real_analysis:
-            border_color = (128, 128, 128)
-        elif has_incident:
-            border_color = (255, 0, 0)
-        else:
-            border_color = (0, 255, 0)
-            
-        draw = ImageDraw.Draw(img)
-        draw.rectangle([0, 0, cell_width-1, cell_height-1], outline=border_color, width=4)
+            return 'unknown'
+        
+        has_incident = (
+            analysis_data.get('blackscreen', False) or
+            analysis_data.get('freeze', False) or
+            not analysis_data.get('audio', True)
+        )
+        return 'ko' if has_incident else 'ok'
+    
+    def _get_glyph(self, char: str) -> np.ndarray:
+        """Get alpha mask of a single character from the glyph atlas (rendered once)"""
+        glyph = self._glyph_atlas.get(char)
+        if glyph is None:
+            from PIL import ImageDraw
+            font = self._get_cached_font('default')
+            advance = max(1, int(math.ceil(font.getlength(char))))
+            glyph_img = Image.new('L', (advance, self._glyph_height), color=0)
+            ImageDraw.Draw(glyph_img).text((0, 0), char, fill=255, font=font)
+            glyph = np.asarray(glyph_img)
+            self._glyph_atlas[char] = glyph
+        return glyph
+    
+    def _get_label_mask(self, label: str) -> np.ndarray:
+        """Compose label alpha mask from cached glyphs (labels are cached too - device names rarely change)"""
+        mask = self._label_cache.get(label)
+        if mask is None:
+            glyphs = [self._get_glyph(char) for char in label] or [self._get_glyph(' ')]
+            mask = np.hstack(glyphs)
+            # Never let a label overflow the cell (border on the left side stays visible)
+            max_width = CELL_WIDTH - 2 * BORDER_WIDTH - 5
+            mask = mask[:, -max_width:] if mask.shape[1] > max_width else mask
+            self._label_cache[label] = mask
+        return mask
+    
+    def _decorate_cell(self, cell: np.ndarray, image_data: Dict, status: str):
+        """Draw colored border and bottom-right label directly into a canvas cell view (in place)"""
+        border_color = STATUS_BORDER_COLORS[status]
+        cell[:BORDER_WIDTH, :] = border_color
+        cell[-BORDER_WIDTH:, :] = border_color
+        cell[:, :BORDER_WIDTH] = border_color
+        cell[:, -BORDER_WIDTH:] = border_color
         
-        # Add label - use cached font (OPTIMIZED)
         host_name = image_data.get('host_name', '')
         device_name = image_data.get('device_name', image_data.get('device_id', ''))
-        label = f"{host_name}_{device_name}"
+        mask = self._get_label_mask(f"{host_name}_{device_name}")
+        
+        mask_height, mask_width = mask.shape
+        y_pos = CELL_HEIGHT - mask_height - 5
+        x_pos = CELL_WIDTH - mask_width - 5
+        region = cell[y_pos:y_pos + mask_height, x_pos:x_pos + mask_width]
+        region[mask > 127] = 255
+    
+    def _render_placeholder_cell(self, image_data: Dict) -> np.ndarray:
+        """Render (and cache) the placeholder cell shown for devices without an image"""
+        from PIL import ImageDraw
+        
+        is_placeholder = image_data.get('is_placeholder', False)
+        host_name = image_data['host_name']
+        device_name = image_data.get('device_name', image_data.get('device_id', 'Unknown'))
+        cache_key = (host_name, device_name, is_placeholder)
+        
+        cell = self._placeholder_cache.get(cache_key)
+        if cell is not None:
+            return cell
+        
+        # Dark gray for missing, dark red for None
+        placeholder_color = '#2a2a2a' if is_placeholder else '#4a2a2a'
+        placeholder = Image.new('RGB', (CELL_WIDTH, CELL_HEIGHT), color=placeholder_color)
         
         try:
-            font = self._get_cached_font('default')
-            bbox = draw.textbbox((0, 0), label, font=font)
-            text_width = bbox[2] - bbox[0]
-            text_height = bbox[3] - bbox[1]
+            draw = ImageDraw.Draw(placeholder)
+            font = self._get_cached_font("/System/Library/Fonts/Arial.ttf", 24)
+            small_font = self._get_cached_font("/System/Library/Fonts/Arial.ttf", 16)
+            
+            text1 = f"{host_name}"
+            text2 = f"{device_name}"
+            text3 = "NO CAPTURE" if is_placeholder else "NOT FOUND"
+            
+            bbox1 = draw.textbbox((0, 0), text1, font=font)
+            bbox2 = draw.textbbox((0, 0), text2, font=small_font)
+            bbox3 = draw.textbbox((0, 0), text3, font=small_font)
             
-            x_pos = cell_width - text_width - 5
-            y_pos = cell_height - text_height - 5
+            text1_x = (CELL_WIDTH - (bbox1[2] - bbox1[0])) // 2
+            text2_x = (CELL_WIDTH - (bbox2[2] - bbox2[0])) // 2
+            text3_x = (CELL_WIDTH - (bbox3[2] - bbox3[0])) // 2
             
-            draw.text((x_pos, y_pos), label, fill='white', font=font)
-        except:
-            draw.text((cell_width-150, cell_height-20), label, fill='white', font=self._get_cached_font('default'))
+            draw.text((text1_x, CELL_HEIGHT//2 - 40), text1, fill='white', font=font)
+            draw.text((text2_x, CELL_HEIGHT//2 - 10), text2, fill='lightgray', font=small_font)
+            draw.text((text3_x, CELL_HEIGHT//2 + 15), text3, fill='red', font=small_font)
+        except Exception as e:
+            logger.warning(f"⚠️ Could not add text to placeholder: {e}")
         
-        return img
+        cell = np.asarray(placeholder)
+        self._placeholder_cache[cache_key] = cell
+        return cell
     
-    def _download_and_process_image(self, image_data: Dict, cell_width: int, cell_height: int) -> Tuple[Optional[Image.Image], Dict]:
-        """Download and process a single image for mosaic (for parallel execution)"""
+    def _download_cell_image(self, image_data: Dict) -> Optional[np.ndarray]:
+        """Download, decode and resize a single device image to a cell array (for parallel execution)"""
         try:
-            image_url = image_data.get('image_url')
-            
-            if not image_url or image_url == 'None':
-                return None, image_data
-            
-            response = self.session.get(image_url, timeout=10)
-            if response.status_code == 200:
-                img = Image.open(io.BytesIO(response.content))
-                # PERFORMANCE: Use BILINEAR instead of LANCZOS (5x faster, minimal quality loss for thumbnails)
-                img = img.resize((cell_width, cell_height), Image.Resampling.BILINEAR)
-                img_with_border = self.add_border_and_label(img, image_data, cell_width, cell_height)
-                return img_with_border, image_data
-            else:
+            response = self.session.get(image_data['image_url'], timeout=10)
+            if response.status_code != 200:
                 raise Exception(f"HTTP {response.status_code}")
+            
+            img = Image.open(io.BytesIO(response.content))
+            # PERFORMANCE: let the JPEG decoder downscale by 1/2, 1/4 or 1/8 before resizing
+            img.draft('RGB', (CELL_WIDTH, CELL_HEIGHT))
+            # PERFORMANCE: Use BILINEAR instead of LANCZOS (5x faster, minimal quality loss for thumbnails)
+            img = img.convert('RGB').resize((CELL_WIDTH, CELL_HEIGHT), Image.Resampling.BILINEAR)
+            return np.asarray(img)
         except Exception as e:
             logger.error(f"❌ Error loading image {image_data.get('image_url')}: {e}")
-            return None, image_data
+            return None
+    
+    def refresh_cell_cache(self, images_data: List[Dict]):
+        """Download only devices whose sequence changed since the last minute, drop devices that disappeared"""
+        to_download = []
+        for image_data in images_data:
+            image_url = image_data.get('image_url')
+            if image_data.get('is_placeholder', False) or not image_url or image_url == 'None':
+                continue
+            key = (image_data['host_name'], image_data['device_id'])
+            cached = self._cell_cache.get(key)
+            if cached is None or cached[0] != image_data.get('sequence'):
+                to_download.append((key, image_data))
+        
+        # Evict devices that are no longer reported by the server
+        active_keys = {(d['host_name'], d['device_id']) for d in images_data}
+        for key in list(self._cell_cache):
+            if key not in active_keys:
+                del self._cell_cache[key]
+        
+        reused = len(images_data) - len(to_download)
+        if not to_download:
+            logger.info(f"♻️ Cell cache: all {reused} cells reused, nothing to download")
+            return
+        
+        logger.info(f"📥 Cell cache: downloading {len(to_download)} changed images in parallel ({reused} reused)...")
+        with ThreadPoolExecutor(max_workers=min(10, len(to_download))) as executor:
+            future_to_key = {
+                executor.submit(self._download_cell_image, img_data): (key, img_data)
+                for key, img_data in to_download
+            }
+            for future in as_completed(future_to_key):
+                key, img_data = future_to_key[future]
+                try:
+                    cell = future.result()
+                except Exception as e:
+                    logger.error(f"❌ Future failed for image {key}: {e}")
+                    cell = None
+                if cell is not None:
+                    self._cell_cache[key] = (img_data.get('sequence'), cell)
+                else:
+                    # Stale frame must not be shown as current
+                    self._cell_cache.pop(key, None)
     
-    def create_mosaic_image(self, images_data: List[Dict]) -> Image.Image:
-        """Create mosaic image from device images - OPTIMIZED with parallel downloads"""
+    def create_mosaic_images(self, images_data: List[Dict]) -> Tuple[Image.Image, Optional[Image.Image], Optional[Image.Image]]:
+        """Create ALL, OK and KO mosaics in a single pass over preallocated canvases
+        
+        Returns:
+            (all_mosaic, ok_mosaic or None, ko_mosaic or None)
+        """
         if not images_data:
             logger.warning("⚠️ No images provided for mosaic - creating empty black image")
-            return Image.new('RGB', (800, 600), color='black')
+            return Image.new('RGB', (800, 600), color='black'), None, None
         
-        logger.info(f"🎨 Creating mosaic from {len(images_data)} images")
         start_time = time.time()
+        self.refresh_cell_cache(images_data)
+        
+        statuses = [self._get_device_status(image_data) for image_data in images_data]
+        ok_count = statuses.count('ok')
+        ko_count = statuses.count('ko')
+        
+        canvases = {'all': self._allocate_canvas(len(images_data))}
+        if ok_count:
+            canvases['ok'] = self._allocate_canvas(ok_count)
+        if ko_count:
+            canvases['ko'] = self._allocate_canvas(ko_count)
+        slots = {'all': 0, 'ok': 0, 'ko': 0}
+        
+        for image_data, status in zip(images_data, statuses):
+            cached = self._cell_cache.get((image_data['host_name'], image_data['device_id']))
+            has_image = cached is not None and not image_data.get('is_placeholder', False)
+            
+            targets = ['all'] + ([status] if status in canvases else [])
+            for target in targets:
+                canvas, cols = canvases[target]
+                cell = self._cell_view(canvas, cols, slots[target])
+                slots[target] += 1
+                if has_image:
+                    cell[:] = cached[1]
+                    self._decorate_cell(cell, image_data, status)
+                else:
+                    cell[:] = self._render_placeholder_cell(image_data)
         
-        # Calculate grid layout
-        count = len(images_data)
-        if count <= 1:
-            cols, rows = 1, 1
-        elif count == 2:
-            cols, rows = 2, 1
-        elif count <= 4:
-            cols, rows = 2, 2
-        elif count <= 6:
-            cols, rows = 3, 2
-        elif count <= 9:
-            cols, rows = 3, 3
-        else:
-            # For more than 9 devices, use 6 columns max
-            cols = min(6, count)
-            rows = math.ceil(count / cols)
-        
-        logger.info(f"📐 Grid layout: {cols}x{rows} (total cells: {cols*rows})")
-        
-        # Create mosaic
-        cell_width, cell_height = 400, 300
-        mosaic_width = cols * cell_width
-        mosaic_height = rows * cell_height
-        
-        logger.info(f"🖼️ Mosaic dimensions: {mosaic_width}x{mosaic_height} pixels ({cell_width}x{cell_height} per cell)")
-        mosaic = Image.new('RGB', (mosaic_width, mosaic_height), color='black')
-        
-        # PERFORMANCE: Download and process images in parallel
-        processed_images = {}
-        images_to_download = []
-        
-        for i, image_data in enumerate(images_data):
-            if i >= cols * rows:
-                break
-            
-            image_url = image_data.get('image_url')
-            is_placeholder = image_data.get('is_placeholder', False)
-            
-            if not is_placeholder and image_url and image_url != 'None':
-                images_to_download.append((i, image_data))
-        
-        # Download images in parallel if there are any
-        if images_to_download:
-            logger.info(f"📥 Downloading {len(images_to_download)} images in parallel...")
-            with ThreadPoolExecutor(max_workers=min(10, len(images_to_download))) as executor:
-                future_to_index = {
-                    executor.submit(self._download_and_process_image, img_data, cell_width, cell_height): idx
-                    for idx, img_data in images_to_download
-                }
-                
-                for future in as_completed(future_to_index):
-                    idx = future_to_index[future]
-                    try:
-                        result_img, img_data = future.result()
-                        if result_img:
-                            processed_images[idx] = result_img
-                            device_name = img_data.get('device_name', 'Unknown')
-                            logger.debug(f"✅ Downloaded {img_data['host_name']}/{img_data['device_id']}/{device_name}")
-                    except Exception as e:
-                        logger.error(f"❌ Future failed for image {idx}: {e}")
-        
-        # Now assemble the mosaic
-        for i, image_data in enumerate(images_data):
-            if i >= cols * rows:
-                break
-                
-            row = i // cols
-            col = i % cols
-            
-            x = col * cell_width
-            y = row * cell_height
-            
-            # Check if we have a pre-downloaded image
-            if i in processed_images:
-                # Use pre-downloaded and processed image
-                mosaic.paste(processed_images[i], (x, y))
-                continue
-            
-            # Otherwise create placeholder
-            image_url = image_data.get('image_url')
-            is_placeholder = image_data.get('is_placeholder', False)
-            
-            if True:  # Always create placeholder for non-downloaded images
-                # Create placeholder with device info
-                placeholder_color = '#2a2a2a' if is_placeholder else '#4a2a2a'  # Dark gray for missing, dark red for None
-                placeholder = Image.new('RGB', (cell_width, cell_height), color=placeholder_color)
-                
-                # Add text overlay with device info
-                try:
-                    from PIL import ImageDraw
-                    draw = ImageDraw.Draw(placeholder)
-                    
-                    # Use cached fonts (OPTIMIZED)
-                    font = self._get_cached_font("/System/Library/Fonts/Arial.ttf", 24)
-                    small_font = self._get_cached_font("/System/Library/Fonts/Arial.ttf", 16)
-                    
-                    # Device info text
-                    host_name = image_data['host_name']
-                    device_name = image_data.get('device_name', image_data.get('device_id', 'Unknown'))
-                    
-                    # Center the text
-                    text1 = f"{host_name}"
-                    text2 = f"{device_name}"
-                    text3 = "NO CAPTURE" if is_placeholder else "NOT FOUND"
-                    
-                    # Calculate text positions (centered)
-                    bbox1 = draw.textbbox((0, 0), text1, font=font)
-                    bbox2 = draw.textbbox((0, 0), text2, font=small_font)
-                    bbox3 = draw.textbbox((0, 0), text3, font=small_font)
-                    
-                    text1_x = (cell_width - (bbox1[2] - bbox1[0])) // 2
-                    text2_x = (cell_width - (bbox2[2] - bbox2[0])) // 2
-                    text3_x = (cell_width - (bbox3[2] - bbox3[0])) // 2
-                    
-                    # Draw text
-                    draw.text((text1_x, cell_height//2 - 40), text1, fill='white', font=font)
-                    draw.text((text2_x, cell_height//2 - 10), text2, fill='lightgray', font=small_font)
-                    draw.text((text3_x, cell_height//2 + 15), text3, fill='red', font=small_font)
-                    
-                except Exception as e:
-                    logger.warning(f"⚠️ Could not add text to placeholder: {e}")
-                
-                mosaic.paste(placeholder, (x, y))
-                status_text = "placeholder" if is_placeholder else "not found"
-                device_name = image_data.get('device_name', 'Unknown')
-                logger.debug(f"📝 Added {status_text} for {image_data['host_name']}/{image_data['device_id']}/{device_name}")
+        mosaics = {name: Image.fromarray(canvas) for name, (canvas, _) in canvases.items()}
         
         elapsed = time.time() - start_time
-        logger.info(f"🎨 Mosaic created in {elapsed:.2f}s ({len(processed_images)} images downloaded in parallel)")
-        return mosaic
+        logger.info(f"🎨 Mosaics composed in {elapsed:.2f}s: ALL({len(images_data)}), OK({ok_count}), KO({ko_count})")
+        return mosaics['all'], mosaics.get('ok'), mosaics.get('ko')
+    
+    def _allocate_canvas(self, count: int) -> Tuple[np.ndarray, int]:
+        """Preallocate black RGB canvas for count cells, returns (canvas, cols)"""
+        cols, rows = get_grid_layout(count)
+        logger.info(f"📐 Grid layout: {cols}x{rows} → {cols * CELL_WIDTH}x{rows * CELL_HEIGHT} pixels")
+        return np.zeros((rows * CELL_HEIGHT, cols * CELL_WIDTH, 3), dtype=np.uint8), cols
+    
+    def _cell_view(self, canvas: np.ndarray, cols: int, index: int) -> np.ndarray:
+        """Return writable view on the canvas cell at index"""
+        y = (index // cols) * CELL_HEIGHT
+        x = (index % cols) * CELL_WIDTH
+        return canvas[y:y + CELL_HEIGHT, x:x + CELL_WIDTH]
     
     def create_analysis_json(self, images_data: List[Dict], time_key: str) -> Dict:
         """Create analysis JSON for the minute - replace local paths with R2 URLs from alerts"""
@@ -0,0 +1,404 @@
+"""
+Agent Loop Performance Benchmark
+
+Replays scripted sessions (benchmarks/perf_sessions/*.yaml) through the real
+QAManagerAgent.process_message loop with a stub LLM client and stub MCP tool
+backends, and measures the agent's own overhead per phase:
+
+- prompt:        system prompt construction (get_system_prompt)
+- tool_schema:   tool definition generation (ToolBridge.get_tool_definitions)
+- tool_dispatch: one model turn's tool calls (ToolBridge.execute_batch)
+- db:            time inside tool backends (scripted latency standing in for
+                 the server API / database round-trip)
+- streaming:     event serialization as done by the socket route
+- turn:          one user message end to end
+
+Timings come from plain iterations; allocation profiles (tracemalloc peak and
+top allocation sites) from one extra profiled iteration, so tracing overhead
+does not skew latency. A scenario fails if a phase p95 exceeds its budget, or
+exceeds a saved baseline by more than the tolerance.
+
+Usage (from backend_server/src):
+    python -m agent.benchmarks.perf
+    python -m agent.benchmarks.perf --scenario perf_loop_002 --iterations 50
+    python -m agent.benchmarks.perf --output perf.json
+    python -m agent.benchmarks.perf --baseline perf.json --tolerance 0.25
+"""
+
+import argparse
+import asyncio
+import contextlib
+import inspect
+import json
+import os
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+import yaml
+
+
+PHASES = ('prompt', 'tool_schema', 'tool_dispatch', 'db', 'streaming', 'turn')
+SRC_DIR = Path(__file__).resolve().parents[2]
+
+# Baseline comparison ignores p95 growth below this (sub-ms phases are timer noise)
+BASELINE_NOISE_FLOOR_MS = 0.5
+
+
+def get_sessions_dir() -> Path:
+    """Get the scripted perf sessions directory path."""
+    return Path(__file__).parent / "perf_sessions"
+
+
+def load_perf_scenarios(scenario_id: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Load scripted scenarios with their effective budgets (defaults + overrides)."""
+    scenarios = []
+    for yaml_file in sorted(get_sessions_dir().glob("*.yaml")):
+        with open(yaml_file, 'r') as f:
+            data = yaml.safe_load(f) or {}
+        defaults = data.get('budgets', {})
+        for scenario in data.get('scenarios', []):
+            if scenario_id and scenario['id'] != scenario_id:
+                continue
+            scenarios.append({**scenario, 'budgets': {**defaults, **scenario.get('budgets', {})}})
+    return scenarios
+
+
+# =====================================================
+# STUBS
+# =====================================================
+
+class ScriptedLLMClient:
+    """Stand-in for anthropic.Anthropic: messages.create() returns scripted responses in order"""
+
+    def __init__(self):
+        self.messages = self
+        self._responses: List[Dict[str, Any]] = []
+        self._next_id = 0
+        self.tool_calls_per_turn: List[int] = []
+
+    def load(self, responses: List[Dict[str, Any]]):
+        self._responses = list(responses)
+
+    def create(self, **kwargs) -> SimpleNamespace:
+        if not self._responses:
+            raise RuntimeError("Scripted session ran out of model responses")
+        scripted = self._responses.pop(0)
+
+        content = []
+        if scripted.get('text'):
+            content.append(SimpleNamespace(type='text', text=scripted['text']))
+        for call in scripted.get('tool_calls', []):
+            self._next_id += 1
+            content.append(SimpleNamespace(type='tool_use', id=f"toolu_bench_{self._next_id}", name=call['name'], input=call.get('input', {})))
+        self.tool_calls_per_turn.append(len(scripted.get('tool_calls', [])))
+
+        return SimpleNamespace(
+            content=content,
+            stop_reason='tool_use' if scripted.get('tool_calls') else 'end_turn',
+            usage=SimpleNamespace(input_tokens=len(kwargs.get('system', '')) // 4, output_tokens=32),
+        )
+
+
+class StubMCPServer:
+    """Stand-in for VirtualPyTestMCPServer: real tool schemas, scripted backend latency"""
+
+    def __init__(self, recorder: 'PhaseRecorder', latency_ms: float = 0):
+        self.recorder = recorder
+        self.latency_ms = latency_ms
+        self.calls = 0
+
+    def get_available_tools(self) -> List[Dict[str, Any]]:
+        from mcp.mcp_server import VirtualPyTestMCPServer
+        return VirtualPyTestMCPServer.get_available_tools(self)
+
+    def handle_tool_call(self, tool_name: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        start = time.perf_counter()
+        self.calls += 1
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+        self.recorder.add('db', start)
+        return {"content": [{"type": "text", "text": f"{tool_name}: ok"}], "isError": False}
+
+
+# =====================================================
+# MEASUREMENT
+# =====================================================
+
+class PhaseRecorder:
+    """Collects latency samples (ms) per phase"""
+
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = {phase: [] for phase in PHASES}
+        self.enabled = True
+
+    def add(self, phase: str, start: float):
+        if self.enabled:
+            self.samples[phase].append((time.perf_counter() - start) * 1000)
+
+    def wrap(self, owner: Any, method_name: str, phase: str):
+        """Replace owner.method_name with a timed version (sync or async)"""
+        original = getattr(owner, method_name)
+
+        if inspect.iscoroutinefunction(original):
+            async def timed(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return await original(*args, **kwargs)
+                finally:
+                    self.add(phase, start)
+        else:
+            def timed(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return original(*args, **kwargs)
+                finally:
+                    self.add(phase, start)
+
+        setattr(owner, method_name, timed)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        result = {}
+        for phase, samples in self.samples.items():
+            if not samples:
+                continue
+            ordered = sorted(samples)
+            result[phase] = {
+                'count': len(ordered),
+                'p50_ms': round(_percentile(ordered, 0.50), 3),
+                'p95_ms': round(_percentile(ordered, 0.95), 3),
+                'max_ms': round(ordered[-1], 3),
+            }
+        return result
+
+
+def _percentile(ordered: List[float], fraction: float) -> float:
+    index = min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+# =====================================================
+# RUNNER
+# =====================================================
+
+class AgentLoopBenchmark:
+    """Runs one scripted scenario through QAManagerAgent and checks its budgets"""
+
+    def __init__(self, scenario: Dict[str, Any], iterations: int = 20, warmup: int = 2):
+        from ..core.tool_bridge import ToolBridge
+
+        self.scenario = scenario
+        self.iterations = iterations
+        self.warmup = warmup
+        self.recorder = PhaseRecorder()
+        self.client = ScriptedLLMClient()
+        self.backend = StubMCPServer(self.recorder, scenario.get('backend_latency_ms', 0))
+        self.tool_bridge = ToolBridge(mcp_server=self.backend)
+        self.recorder.wrap(self.tool_bridge, 'get_tool_definitions', 'tool_schema')
+        self.recorder.wrap(self.tool_bridge, 'execute_batch', 'tool_dispatch')
+
+    def _create_agent(self, agent_id: str):
+        from ..core.manager import QAManagerAgent
+
+        agent = QAManagerAgent(api_key='benchmark', agent_id=agent_id, tool_bridge=self.tool_bridge, client=self.client)
+        self.recorder.wrap(agent, 'get_system_prompt', 'prompt')
+
+        # Delegated managers are created lazily - instrument them as they appear
+        create_delegate = agent._get_delegated_manager
+
+        def instrumented_delegate(delegate_id: str):
+            is_new = delegate_id not in agent._delegated_managers
+            manager = create_delegate(delegate_id)
+            if manager and is_new:
+                self.recorder.wrap(manager, 'get_system_prompt', 'prompt')
+            return manager
+
+        agent._get_delegated_manager = instrumented_delegate
+        return agent
+
+    async def _run_session(self):
+        from ..core.session import Session
+
+        # Every iteration starts cold so backends are exercised the same way each time
+        self.tool_bridge.invalidate()
+        agent = self._create_agent(self.scenario.get('agent', 'ai-assistant'))
+        session = Session(id=f"bench_{self.scenario['id']}")
+
+        for turn in self.scenario['turns']:
+            self.client.load(turn['responses'])
+            turn_start = time.perf_counter()
+            async for event in agent.process_message(turn['prompt'], session):
+                start = time.perf_counter()
+                json.dumps(event.to_dict(), default=str)
+                self.recorder.add('streaming', start)
+            self.recorder.add('turn', turn_start)
+
+    async def _run(self) -> Dict[str, Any]:
+        self.recorder.enabled = False
+        for _ in range(self.warmup):
+            await self._run_session()
+
+        self.recorder.enabled = True
+        self.client.tool_calls_per_turn.clear()
+        for _ in range(self.iterations):
+            await self._run_session()
+        tool_calls = list(self.client.tool_calls_per_turn)
+
+        # Allocation profile (separate pass - tracing slows everything down)
+        self.recorder.enabled = False
+        tracemalloc.start()
+        try:
+            await self._run_session()
+            snapshot = tracemalloc.take_snapshot()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        top_sites = snapshot.filter_traces([
+            tracemalloc.Filter(True, f"{SRC_DIR}{os.sep}*"),
+            tracemalloc.Filter(False, __file__),
+        ]).statistics('lineno')[:5]
+        return {
+            'phases': self.recorder.summary(),
+            'tool_calls_per_turn': {
+                'max': max(tool_calls, default=0),
+                'mean': round(sum(tool_calls) / len(tool_calls), 2) if tool_calls else 0,
+            },
+            'memory': {
+                'peak_alloc_kb': round(peak / 1024, 1),
+                'top_sites': [
+                    {
+                        'site': f"{os.path.relpath(stat.traceback[0].filename, SRC_DIR)}:{stat.traceback[0].lineno}",
+                        'size_kb': round(stat.size / 1024, 1),
+                        'count': stat.count,
+                    }
+                    for stat in top_sites
+                ],
+            },
+            'backend_calls': self.backend.calls,
+        }
+
+    def run(self) -> Dict[str, Any]:
+        # The agent loop prints debug lines for every event - keep them out of the report
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            result = asyncio.run(self._run())
+
+        result['test_id'] = self.scenario['id']
+        result['name'] = self.scenario.get('name', self.scenario['id'])
+        result['iterations'] = self.iterations
+        result['budgets'] = self.scenario['budgets']
+        return result
+
+
+def check_regressions(result: Dict[str, Any], baseline: Optional[Dict[str, Any]] = None, tolerance: float = 0.25) -> List[str]:
+    """Compare a scenario result against its budgets (and optionally a baseline result)"""
+    failures = []
+    budgets = result['budgets']
+
+    for phase, stats in result['phases'].items():
+        budget = budgets.get(f"{phase}_ms")
+        if budget is not None and stats['p95_ms'] > budget:
+            failures.append(f"{phase} p95 {stats['p95_ms']}ms > budget {budget}ms")
+
+    peak_budget = budgets.get('peak_alloc_kb')
+    if peak_budget is not None and result['memory']['peak_alloc_kb'] > peak_budget:
+        failures.append(f"peak alloc {result['memory']['peak_alloc_kb']}KB > budget {peak_budget}KB")
+
+    calls_budget = budgets.get('tool_calls_per_turn')
+    if calls_budget is not None and result['tool_calls_per_turn']['max'] > calls_budget:
+        failures.append(f"tool calls per turn {result['tool_calls_per_turn']['max']} > budget {calls_budget}")
+
+    if baseline:
+        for phase, stats in result['phases'].items():
+            previous = baseline.get('phases', {}).get(phase)
+            if not previous or stats['p95_ms'] - previous['p95_ms'] < BASELINE_NOISE_FLOOR_MS:
+                continue
+            if stats['p95_ms'] > previous['p95_ms'] * (1 + tolerance):
+                failures.append(f"{phase} p95 {stats['p95_ms']}ms regressed vs baseline {previous['p95_ms']}ms (+{tolerance:.0%} allowed)")
+        previous_peak = baseline.get('memory', {}).get('peak_alloc_kb')
+        if previous_peak and result['memory']['peak_alloc_kb'] > previous_peak * (1 + tolerance):
+            failures.append(f"peak alloc {result['memory']['peak_alloc_kb']}KB regressed vs baseline {previous_peak}KB")
+
+    return failures
+
+
+def run_perf_benchmarks(
+    scenario_id: Optional[str] = None,
+    iterations: int = 20,
+    baseline: Optional[Dict[str, Any]] = None,
+    tolerance: float = 0.25,
+) -> Dict[str, Any]:
+    """
+    Run all (or one) scripted perf scenarios.
+
+    Returns:
+        {'success': bool, 'results': [...]} - each result carries its 'failures'
+    """
+    scenarios = load_perf_scenarios(scenario_id)
+    if not scenarios:
+        return {'success': False, 'error': f"No perf scenarios found{f' for {scenario_id}' if scenario_id else ''}", 'results': []}
+
+    baseline_by_id = {r['test_id']: r for r in (baseline or {}).get('results', [])}
+    results = []
+    for scenario in scenarios:
+        print(f"[@perf] Running {scenario['id']} ({scenario.get('name', '')}) x{iterations}...")
+        result = AgentLoopBenchmark(scenario, iterations=iterations).run()
+        result['failures'] = check_regressions(result, baseline_by_id.get(scenario['id']), tolerance)
+        results.append(result)
+
+    return {'success': all(not r['failures'] for r in results), 'results': results}
+
+
+def _print_report(report: Dict[str, Any]):
+    for result in report['results']:
+        status = '✅' if not result['failures'] else '❌'
+        print(f"\n{status} {result['test_id']} - {result['name']}")
+        for phase, stats in result['phases'].items():
+            budget = result['budgets'].get(f"{phase}_ms")
+            budget_str = f" (budget {budget}ms)" if budget is not None else ""
+            print(f"   {phase:14} p50 {stats['p50_ms']:8.3f}ms  p95 {stats['p95_ms']:8.3f}ms  max {stats['max_ms']:8.3f}ms  n={stats['count']}{budget_str}")
+        calls = result['tool_calls_per_turn']
+        print(f"   tool calls/turn max {calls['max']}  mean {calls['mean']}  | backend calls {result['backend_calls']}")
+        print(f"   peak alloc {result['memory']['peak_alloc_kb']}KB")
+        for site in result['memory']['top_sites']:
+            print(f"      {site['size_kb']:8.1f}KB  x{site['count']:<6} {site['site']}")
+        for failure in result['failures']:
+            print(f"   ❌ {failure}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Agent loop performance benchmark")
+    parser.add_argument('--scenario', help="Run a single scenario id")
+    parser.add_argument('--iterations', type=int, default=20)
+    parser.add_argument('--baseline', help="Previous --output file to compare against")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="Allowed p95 growth vs baseline (0.25 = +25%%)")
+    parser.add_argument('--output', help="Write results as JSON (usable as a later --baseline)")
+    args = parser.parse_args(argv)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)
+
+    report = run_perf_benchmarks(args.scenario, args.iterations, baseline, args.tolerance)
+    if report.get('error'):
+        print(f"[@perf] ❌ {report['error']}")
+        return 1
+
+    _print_report(report)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\n[@perf] Results written to {args.output}")
+
+    failed = [r['test_id'] for r in report['results'] if r['failures']]
+    print(f"\n[@perf] {'❌ Budget exceeded: ' + ', '.join(failed) if failed else '✅ All scenarios within budget'}")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -75,12 +75,19 @@ Platform: {config['platform']} | Auto-nav: {str(allow_auto_nav).lower()} | Page:
 When delegating: Say ONLY `DELEGATE TO [agent_id]` (no explanation).
 Max 2 sentences. Be direct."""
 
-    def __init__(self, api_key: Optional[str] = None, user_identifier: Optional[str] = None, agent_id: Optional[str] = None):
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        user_identifier: Optional[str] = None,
+        agent_id: Optional[str] = None,
+        tool_bridge: Optional[ToolBridge] = None,
+        client: Optional[Any] = None,
+    ):
         self.logger = logging.getLogger(__name__)
         self.user_identifier = user_identifier
         self._api_key = api_key
-        self._client = None
-        self.tool_bridge = ToolBridge()
+        self._client = client
+        self.tool_bridge = tool_bridge or ToolBridge()
         
         # Load from YAML
         self.agent_id = agent_id or 'ai-assistant'
@@ -138,10 +145,11 @@ Max 2 sentences. Be direct."""
             manager = QAManagerAgent(
                 api_key=self._get_api_key_safe(),
                 user_identifier=self.user_identifier,
-                agent_id=agent_id
+                agent_id=agent_id,
+                # Share the tool_bridge so MCP connections are reused
+                tool_bridge=self.tool_bridge,
+                client=self._client,
             )
-            # Share the tool_bridge so MCP connections are reused
-            manager.tool_bridge = self.tool_bridge
             self._delegated_managers[agent_id] = manager
             self.logger.info(f"Loaded delegated manager: {manager.nickname} ({agent_id})")
             return manager
@@ -313,27 +321,34 @@ Max 2 sentences. Be direct."""
             
             turn_messages.append({"role": "assistant", "content": response.content})
             
-            tool_use = next((b for b in response.content if b.type == "tool_use"), None)
+            tool_uses = [b for b in response.content if b.type == "tool_use"]
             text_content = next((b.text for b in response.content if b.type == "text"), "")
             
-            if tool_use:
-                yield AgentEvent(type=EventType.TOOL_CALL, agent=self.nickname, content=f"Calling: {tool_use.name}", tool_name=tool_use.name, tool_params=tool_use.input, metrics=metrics)
+            if tool_uses:
+                for tool_use in tool_uses:
+                    yield AgentEvent(type=EventType.TOOL_CALL, agent=self.nickname, content=f"Calling: {tool_use.name}", tool_name=tool_use.name, tool_params=tool_use.input, metrics=metrics)
                 
-                try:
-                    result = self.tool_bridge.execute(tool_use.name, tool_use.input, allowed_tools=self.tool_names)
-                    if LANGFUSE_ENABLED:
-                        track_tool_call(self.nickname, tool_use.name, tool_use.input, result, True, session.id)
-                    yield AgentEvent(type=EventType.TOOL_RESULT, agent=self.nickname, content="Success", tool_name=tool_use.name, tool_result=result, success=True)
-                    
-                    # Tool results are part of turn_messages conversation - don't add to session
-                    turn_messages.append({"role": "user", "content": [{"type": "tool_result", "tool_use_id": tool_use.id, "content": str(result)}]})
-                except Exception as e:
-                    if LANGFUSE_ENABLED:
-                        track_tool_call(self.nickname, tool_use.name, tool_use.input, str(e), False, session.id)
-                    yield AgentEvent(type=EventType.ERROR, agent=self.nickname, content=f"Tool error: {e}", error=str(e))
-                    
-                    # Tool errors are part of turn_messages conversation - don't add to session
-                    turn_messages.append({"role": "user", "content": [{"type": "tool_result", "tool_use_id": tool_use.id, "content": f"Error: {e}", "is_error": True}]})
+                # Independent read-only calls of this turn run concurrently (results stay in call order)
+                outcomes = await self.tool_bridge.execute_batch(
+                    [(tool_use.name, tool_use.input) for tool_use in tool_uses],
+                    allowed_tools=self.tool_names
+                )
+                
+                # Tool results are part of turn_messages conversation - don't add to session
+                tool_results = []
+                for tool_use, (result, error) in zip(tool_uses, outcomes):
+                    if error is None:
+                        if LANGFUSE_ENABLED:
+                            track_tool_call(self.nickname, tool_use.name, tool_use.input, result, True, session.id)
+                        yield AgentEvent(type=EventType.TOOL_RESULT, agent=self.nickname, content="Success", tool_name=tool_use.name, tool_result=result, success=True)
+                        tool_results.append({"type": "tool_result", "tool_use_id": tool_use.id, "content": str(result)})
+                    else:
+                        if LANGFUSE_ENABLED:
+                            track_tool_call(self.nickname, tool_use.name, tool_use.input, str(error), False, session.id)
+                        yield AgentEvent(type=EventType.ERROR, agent=self.nickname, content=f"Tool error: {error}", error=str(error))
+                        tool_results.append({"type": "tool_result", "tool_use_id": tool_use.id, "content": f"Error: {error}", "is_error": True})
+                
+                turn_messages.append({"role": "user", "content": tool_results})
             else:
                 response_text = text_content
                 
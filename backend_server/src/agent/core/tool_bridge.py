@@ -2,10 +2,23 @@
 Tool Bridge
 
 Connects Claude Agent SDK to existing MCP tools and UI interaction tools.
+
+PERFORMANCE: tool metadata (names, Claude-format definitions) is built once.
+Results of read-only tools are kept in a TTL cache keyed by tool + params,
+shared by every agent using this bridge; tools that modify trees, testcases
+or requirements invalidate the affected entries (a result computed across an
+invalidation is not cached). Callers get copies, never the cached dict itself.
+execute_batch() runs the
+independent read-only calls of one model turn concurrently.
 """
 
+import asyncio
+import copy
+import json
 import logging
-from typing import Dict, Any, List
+import threading
+import time
+from typing import Dict, Any, List, Optional, Tuple
 
 from mcp.mcp_server import VirtualPyTestMCPServer
 from ..tools.page_interaction import (
@@ -20,13 +33,206 @@ from ..tools.page_interaction import (
 )
 
 
+# UI Interaction tools - manual definitions (Claude format)
+UI_TOOL_DEFINITIONS: Dict[str, Dict[str, Any]] = {
+    "get_available_pages": {
+        "name": "get_available_pages",
+        "description": "Returns a list of all navigable pages in the application with their descriptions. Use this to understand what pages exist.",
+        "input_schema": {
+            "type": "object",
+            "properties": {},
+            "required": []
+        }
+    },
+    "get_page_schema": {
+        "name": "get_page_schema",
+        "description": "Returns the interactive elements available on a specific page. Use this to understand what actions can be performed on a page.",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "page_path": {
+                    "type": "string",
+                    "description": "The page path (e.g., '/device-control', '/test-results/reports')"
+                }
+            },
+            "required": ["page_path"]
+        }
+    },
+    "navigate_to_page": {
+        "name": "navigate_to_page",
+        "description": "Navigates the user's browser to a specific page. Available pages: dashboard, device control, run tests, campaigns, test cases, incidents, heatmap, reports, test builder, settings, ai agent",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "page_name": {
+                    "type": "string",
+                    "description": "Page name or path (e.g., 'dashboard', 'device control', 'reports', 'heatmap', 'incidents')"
+                },
+                "context": {
+                    "type": "object",
+                    "description": "Optional parameters (e.g., {'device_id': 's21'})"
+                }
+            },
+            "required": ["page_name"]
+        }
+    },
+    "interact_with_element": {
+        "name": "interact_with_element",
+        "description": "Interact with a specific element on the current page. Actions: click, select, filter, open, close, type, scroll_to",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "element_id": {
+                    "type": "string",
+                    "description": "The element ID from the page schema (e.g., 'reports-table', 'run-btn')"
+                },
+                "action": {
+                    "type": "string",
+                    "description": "The action to perform (click, select, filter, open, close, type, scroll_to)"
+                },
+                "params": {
+                    "type": "object",
+                    "description": "Optional parameters for the action (e.g., {'value': 'failed'})"
+                }
+            },
+            "required": ["element_id", "action"]
+        }
+    },
+    "highlight_element": {
+        "name": "highlight_element",
+        "description": "Highlight an element on the page to draw user's attention",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "element_id": {
+                    "type": "string",
+                    "description": "The element ID to highlight"
+                },
+                "duration_ms": {
+                    "type": "integer",
+                    "description": "How long to show the highlight (default 2000ms)"
+                }
+            },
+            "required": ["element_id"]
+        }
+    },
+    "show_toast": {
+        "name": "show_toast",
+        "description": "Show a toast notification to the user",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "message": {
+                    "type": "string",
+                    "description": "The message to display"
+                },
+                "severity": {
+                    "type": "string",
+                    "enum": ["info", "success", "warning", "error"],
+                    "description": "Toast severity level"
+                }
+            },
+            "required": ["message"]
+        }
+    },
+    "get_alerts": {
+        "name": "get_alerts",
+        "description": "Fetch alerts from the monitoring system. Returns count and details of active and resolved alerts. Use this to answer questions about alerts/incidents.",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "status": {
+                    "type": "string",
+                    "enum": ["active", "resolved"],
+                    "description": "Filter by alert status. Omit to get both active and resolved."
+                },
+                "host_name": {
+                    "type": "string",
+                    "description": "Filter by host name"
+                },
+                "device_id": {
+                    "type": "string",
+                    "description": "Filter by device ID"
+                },
+                "incident_type": {
+                    "type": "string",
+                    "description": "Filter by incident type (e.g., 'freeze', 'blackscreen')"
+                },
+                "limit": {
+                    "type": "integer",
+                    "description": "Max alerts to return (default 20)"
+                }
+            },
+            "required": []
+        }
+    },
+}
+
+# Read-only tools whose results can be cached: tool -> (cache group, TTL seconds)
+CACHEABLE_TOOLS: Dict[str, Tuple[str, float]] = {
+    'get_available_pages': ('static', 3600),
+    'get_page_schema': ('static', 3600),
+    'list_userinterfaces': ('tree', 60),
+    'get_userinterface_complete': ('tree', 60),
+    'preview_userinterface': ('tree', 60),
+    'list_navigation_nodes': ('tree', 60),
+    'list_nodes': ('tree', 60),
+    'list_edges': ('tree', 60),
+    'get_node': ('tree', 60),
+    'get_edge': ('tree', 60),
+    'list_actions': ('tree', 60),
+    'list_verifications': ('tree', 60),
+    'list_testcases': ('testcase', 60),
+    'load_testcase': ('testcase', 60),
+    'list_scripts': ('testcase', 60),
+    'list_requirements': ('requirement', 60),
+    'get_requirement': ('requirement', 60),
+    'get_requirement_coverage': ('requirement', 60),
+    'get_coverage_summary': ('requirement', 60),
+    'get_uncovered_requirements': ('requirement', 60),
+    'get_testcase_requirements': ('requirement', 60),
+    'list_hosts': ('host', 10),
+    'get_compatible_hosts': ('host', 10),
+    'get_device_info': ('host', 10),
+    'list_services': ('host', 10),
+}
+
+# Read-only but live (status/logs) - run concurrently, never cached
+LIVE_READ_TOOLS = frozenset({
+    'get_alerts', 'get_execution_status', 'get_exploration_status', 'get_transcript',
+    'view_logs', 'list_deployments', 'get_deployment_history',
+})
+
+# Mutating tools -> cache groups they invalidate
+INVALIDATING_TOOLS: Dict[str, Tuple[str, ...]] = {
+    'create_node': ('tree',), 'update_node': ('tree',), 'delete_node': ('tree',),
+    'create_edge': ('tree',), 'update_edge': ('tree',), 'delete_edge': ('tree',),
+    'create_subtree': ('tree',), 'create_userinterface': ('tree',), 'delete_userinterface': ('tree',),
+    'save_node_screenshot': ('tree',), 'approve_node_verifications': ('tree',),
+    'approve_exploration_plan': ('tree',), 'validate_exploration_edges': ('tree',),
+    'finalize_exploration': ('tree',), 'start_ai_exploration': ('tree',),
+    'save_testcase': ('testcase', 'requirement'), 'rename_testcase': ('testcase', 'requirement'),
+    'generate_and_save_testcase': ('testcase', 'requirement'),
+    'create_requirement': ('requirement',), 'update_requirement': ('requirement',),
+    'link_testcase_to_requirement': ('requirement',), 'unlink_testcase_from_requirement': ('requirement',),
+    'take_control': ('host',), 'release_control': ('host',),
+}
+
+
 class ToolBridge:
     """Bridge between agents and MCP tools"""
     
-    def __init__(self):
+    def __init__(self, mcp_server: Optional[VirtualPyTestMCPServer] = None):
         self.logger = logging.getLogger(__name__)
-        self.mcp_server = VirtualPyTestMCPServer()
+        self.mcp_server = mcp_server or VirtualPyTestMCPServer()
         self._tool_cache = None
+        self._tool_names: Optional[List[str]] = None
+        self._tool_name_set: frozenset = frozenset()
+        self._definitions: Dict[str, Dict[str, Any]] = {}
+        self._result_cache: Dict[Tuple[str, str], Tuple[float, str, Dict[str, Any]]] = {}
+        self._cache_lock = threading.Lock()
+        self._generations: Dict[str, int] = {}  # Cache group -> invalidation count ('*' = invalidate all)
+        self.cache_stats = {'hits': 0, 'misses': 0, 'invalidations': 0}
         self.logger.info("ToolBridge initialized with MCP server")
     
     def _get_all_tools(self) -> List[Dict[str, Any]]:
@@ -36,6 +242,22 @@ class ToolBridge:
             self.logger.info(f"Cached {len(self._tool_cache)} MCP tools")
         return self._tool_cache
     
+    def _load_metadata(self):
+        """Build tool names and Claude-format definitions once"""
+        if self._tool_names is not None:
+            return
+        definitions = dict(UI_TOOL_DEFINITIONS)
+        for mcp_tool in self._get_all_tools():
+            # Convert MCP format to Claude format
+            definitions.setdefault(mcp_tool['name'], {
+                "name": mcp_tool['name'],
+                "description": mcp_tool['description'],
+                "input_schema": mcp_tool['inputSchema'],
+            })
+        self._definitions = definitions
+        self._tool_names = [t['name'] for t in self._get_all_tools()] + PAGE_INTERACTION_TOOLS
+        self._tool_name_set = frozenset(self._tool_names)
+    
     def get_tool_definitions(self, tool_names: List[str]) -> List[Dict[str, Any]]:
         """
         Get tool definitions for specified tools in Claude format
@@ -46,179 +268,22 @@ class ToolBridge:
         Returns:
             List of tool definitions in Claude's expected format
         """
-        all_tools = self._get_all_tools()
-        tools_by_name = {t['name']: t for t in all_tools}
+        self._load_metadata()
         
         result = []
         for name in tool_names:
-            # UI Interaction tools - manual definitions
-            if name == "get_available_pages":
-                result.append({
-                    "name": "get_available_pages",
-                    "description": "Returns a list of all navigable pages in the application with their descriptions. Use this to understand what pages exist.",
-                    "input_schema": {
-                        "type": "object",
-                        "properties": {},
-                        "required": []
-                    }
-                })
-                continue
-                
-            if name == "get_page_schema":
-                result.append({
-                    "name": "get_page_schema",
-                    "description": "Returns the interactive elements available on a specific page. Use this to understand what actions can be performed on a page.",
-                    "input_schema": {
-                        "type": "object",
-                        "properties": {
-                            "page_path": {
-                                "type": "string",
-                                "description": "The page path (e.g., '/device-control', '/test-results/reports')"
-                            }
-                        },
-                        "required": ["page_path"]
-                    }
-                })
-                continue
-                
-            if name == "navigate_to_page":
-                result.append({
-                    "name": "navigate_to_page",
-                    "description": "Navigates the user's browser to a specific page. Available pages: dashboard, device control, run tests, campaigns, test cases, incidents, heatmap, reports, test builder, settings, ai agent",
-                    "input_schema": {
-                        "type": "object",
-                        "properties": {
-                            "page_name": {
-                                "type": "string",
-                                "description": "Page name or path (e.g., 'dashboard', 'device control', 'reports', 'heatmap', 'incidents')"
-                            },
-                            "context": {
-                                "type": "object",
-                                "description": "Optional parameters (e.g., {'device_id': 's21'})"
-                            }
-                        },
-                        "required": ["page_name"]
-                    }
-                })
-                continue
-                
-            if name == "interact_with_element":
-                result.append({
-                    "name": "interact_with_element",
-                    "description": "Interact with a specific element on the current page. Actions: click, select, filter, open, close, type, scroll_to",
-                    "input_schema": {
-                        "type": "object",
-                        "properties": {
-                            "element_id": {
-                                "type": "string",
-                                "description": "The element ID from the page schema (e.g., 'reports-table', 'run-btn')"
-                            },
-                            "action": {
-                                "type": "string",
-                                "description": "The action to perform (click, select, filter, open, close, type, scroll_to)"
-                            },
-                            "params": {
-                                "type": "object",
-                                "description": "Optional parameters for the action (e.g., {'value': 'failed'})"
-                            }
-                        },
-                        "required": ["element_id", "action"]
-                    }
-                })
-                continue
-                
-            if name == "highlight_element":
-                result.append({
-                    "name": "highlight_element",
-                    "description": "Highlight an element on the page to draw user's attention",
-                    "input_schema": {
-                        "type": "object",
-                        "properties": {
-                            "element_id": {
-                                "type": "string",
-                                "description": "The element ID to highlight"
-                            },
-                            "duration_ms": {
-                                "type": "integer",
-                                "description": "How long to show the highlight (default 2000ms)"
-                            }
-                        },
-                        "required": ["element_id"]
-                    }
-                })
-                continue
-                
-            if name == "show_toast":
-                result.append({
-                    "name": "show_toast",
-                    "description": "Show a toast notification to the user",
-                    "input_schema": {
-                        "type": "object",
-                        "properties": {
-                            "message": {
-                                "type": "string",
-                                "description": "The message to display"
-                            },
-                            "severity": {
-                                "type": "string",
-                                "enum": ["info", "success", "warning", "error"],
-                                "description": "Toast severity level"
-                            }
-                        },
-                        "required": ["message"]
-                    }
-                })
-                continue
-            
-            if name == "get_alerts":
-                result.append({
-                    "name": "get_alerts",
-                    "description": "Fetch alerts from the monitoring system. Returns count and details of active and resolved alerts. Use this to answer questions about alerts/incidents.",
-                    "input_schema": {
-                        "type": "object",
-                        "properties": {
-                            "status": {
-                                "type": "string",
-                                "enum": ["active", "resolved"],
-                                "description": "Filter by alert status. Omit to get both active and resolved."
-                            },
-                            "host_name": {
-                                "type": "string",
-                                "description": "Filter by host name"
-                            },
-                            "device_id": {
-                                "type": "string",
-                                "description": "Filter by device ID"
-                            },
-                            "incident_type": {
-                                "type": "string",
-                                "description": "Filter by incident type (e.g., 'freeze', 'blackscreen')"
-                            },
-                            "limit": {
-                                "type": "integer",
-                                "description": "Max alerts to return (default 20)"
-                            }
-                        },
-                        "required": []
-                    }
-                })
-                continue
-
-            # MCP tools
-            if name in tools_by_name:
-                mcp_tool = tools_by_name[name]
-                # Convert MCP format to Claude format
-                claude_tool = {
-                    "name": mcp_tool['name'],
-                    "description": mcp_tool['description'],
-                    "input_schema": mcp_tool['inputSchema'],
-                }
-                result.append(claude_tool)
+            definition = self._definitions.get(name)
+            if definition:
+                result.append(definition)
             else:
                 self.logger.warning(f"Tool not found: {name}")
         
         return result
     
+    def is_read_only(self, tool_name: str) -> bool:
+        """True if the tool has no side effects (safe to run concurrently)"""
+        return tool_name in CACHEABLE_TOOLS or tool_name in LIVE_READ_TOOLS
+    
     def execute(self, tool_name: str, params: Dict[str, Any], allowed_tools: List[str] = None) -> Dict[str, Any]:
         """
         Execute an MCP tool or UI interaction tool
@@ -238,8 +303,9 @@ class ToolBridge:
         self.logger.debug(f"Params: {params}")
         
         # VALIDATION: Check if tool exists in the system
-        all_available = self.get_available_tool_names()
-        if tool_name not in all_available:
+        self._load_metadata()
+        if tool_name not in self._tool_name_set:
+            all_available = self._tool_names
             error_msg = f"❌ Tool '{tool_name}' does not exist. "
             # Suggest similar tools
             similar = [t for t in all_available if tool_name.split('_')[0] in t or t.split('_')[0] in tool_name]
@@ -262,6 +328,66 @@ class ToolBridge:
                 "isError": True
             }
         
+        cache_key = self._cache_key(tool_name, params) if tool_name in CACHEABLE_TOOLS else None
+        if cache_key:
+            cached = self._cache_get(cache_key)
+            if cached is not None:
+                self.logger.info(f"Tool {tool_name} served from cache")
+                return cached
+            generation = self._cache_generation(CACHEABLE_TOOLS[tool_name][0])
+        
+        try:
+            result = self._dispatch(tool_name, params)
+        finally:
+            # Invalidate even on failure - the change may have been partially applied
+            if tool_name in INVALIDATING_TOOLS:
+                self.invalidate(*INVALIDATING_TOOLS[tool_name])
+        
+        if cache_key and not (isinstance(result, dict) and result.get('isError')):
+            self._cache_put(cache_key, CACHEABLE_TOOLS[tool_name], result, generation)
+        
+        self.logger.info(f"Tool {tool_name} completed")
+        return result
+    
+    async def execute_batch(
+        self,
+        calls: List[Tuple[str, Dict[str, Any]]],
+        allowed_tools: List[str] = None
+    ) -> List[Tuple[Optional[Dict[str, Any]], Optional[Exception]]]:
+        """
+        Execute the tool calls of one model turn, in order
+        
+        Consecutive read-only calls run concurrently (threads); any other tool
+        waits for everything before it and blocks everything after it.
+        
+        Returns:
+            (result, error) per call, in call order
+        """
+        outcomes: List[Tuple[Optional[Dict[str, Any]], Optional[Exception]]] = [(None, None)] * len(calls)
+        
+        async def run(index: int):
+            tool_name, params = calls[index]
+            try:
+                outcomes[index] = (await asyncio.to_thread(self.execute, tool_name, params, allowed_tools), None)
+            except Exception as e:
+                outcomes[index] = (None, e)
+        
+        group: List[int] = []
+        for index, (tool_name, _) in enumerate(calls):
+            if self.is_read_only(tool_name):
+                group.append(index)
+                continue
+            if group:
+                await asyncio.gather(*(run(i) for i in group))
+                group = []
+            await run(index)
+        if group:
+            await asyncio.gather(*(run(i) for i in group))
+        
+        return outcomes
+    
+    def _dispatch(self, tool_name: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Run a validated tool"""
         # UI Interaction tools
         if tool_name == "get_available_pages":
             result = get_available_pages()
@@ -311,12 +437,56 @@ class ToolBridge:
             return {"result": result}
 
         # MCP tools
-        result = self.mcp_server.handle_tool_call(tool_name, params)
-        
-        self.logger.info(f"Tool {tool_name} completed")
-        return result
+        return self.mcp_server.handle_tool_call(tool_name, params)
+    
+    # =====================================================
+    # RESULT CACHE
+    # =====================================================
+    
+    @staticmethod
+    def _cache_key(tool_name: str, params: Dict[str, Any]) -> Tuple[str, str]:
+        return tool_name, json.dumps(params or {}, sort_keys=True, default=str)
+    
+    def _cache_get(self, key: Tuple[str, str]) -> Optional[Dict[str, Any]]:
+        with self._cache_lock:
+            entry = self._result_cache.get(key)
+            if entry and entry[0] > time.monotonic():
+                self.cache_stats['hits'] += 1
+                return copy.deepcopy(entry[2])
+            if entry:
+                del self._result_cache[key]
+            self.cache_stats['misses'] += 1
+            return None
+    
+    def _cache_generation(self, group: str) -> Tuple[int, int]:
+        with self._cache_lock:
+            return self._generations.get('*', 0), self._generations.get(group, 0)
+    
+    def _cache_put(self, key: Tuple[str, str], policy: Tuple[str, float], result: Dict[str, Any],
+                   generation: Tuple[int, int]):
+        """Cache result unless its group was invalidated since generation was taken (result may be stale)"""
+        group, ttl = policy
+        with self._cache_lock:
+            if (self._generations.get('*', 0), self._generations.get(group, 0)) != generation:
+                return
+            self._result_cache[key] = (time.monotonic() + ttl, group, copy.deepcopy(result))
+    
+    def invalidate(self, *groups: str):
+        """Drop cached results of the given groups (all groups if none given)"""
+        with self._cache_lock:
+            if groups:
+                stale = [key for key, entry in self._result_cache.items() if entry[1] in groups]
+            else:
+                stale = list(self._result_cache)
+            for key in stale:
+                del self._result_cache[key]
+            for group in groups or ('*',):
+                self._generations[group] = self._generations.get(group, 0) + 1
+            self.cache_stats['invalidations'] += 1
+        if stale:
+            self.logger.info(f"Invalidated {len(stale)} cached tool results ({', '.join(groups) or 'all'})")
     
     def get_available_tool_names(self) -> List[str]:
         """Get list of all available tool names"""
-        base_tools = [t['name'] for t in self._get_all_tools()]
-        return base_tools + PAGE_INTERACTION_TOOLS
+        self._load_metadata()
+        return list(self._tool_names)
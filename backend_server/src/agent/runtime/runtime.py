@@ -10,6 +10,7 @@ from typing import Dict, Optional, List
 from datetime import datetime
 
 from events import EventBus, Event, EventPriority, get_event_bus
+from events.priority_queue import PriorityEventQueue
 from resources import ResourceLockManager, get_lock_manager
 from agent.registry import AgentRegistry, get_agent_registry, AgentDefinition
 from agent.runtime.state import AgentState, AgentInstanceState
@@ -47,6 +48,9 @@ class AgentRuntime:
         # Task tracking
         self.tasks: Dict[str, asyncio.Task] = {}
         
+        # Events received while an instance is busy (priority order, repeats coalesced)
+        self.pending_events: Dict[str, PriorityEventQueue] = {}
+        
         self._running = False
     
     async def start(self, team_id: str = 'default'):
@@ -194,6 +198,9 @@ class AgentRuntime:
         
         instance = self.instances[instance_id]
         
+        # Drop backlog so the cancelled task does not pick up the next event
+        self.pending_events.pop(instance_id, None)
+        
         # Cancel running task if any
         if instance.task_id and instance.task_id in self.tasks:
             self.tasks[instance.task_id].cancel()
@@ -295,8 +302,13 @@ class AgentRuntime:
         
         # Check if agent is available
         if instance.state == AgentState.RUNNING:
-            # Agent busy - could queue or skip
-            print(f"[@runtime] ⏳ Instance {instance_id} busy, queuing event {event.id}")
+            # Agent busy - queue by priority, merging repeats of an already queued event
+            backlog = self.pending_events.setdefault(instance_id, PriorityEventQueue())
+            if backlog.push(event):
+                print(f"[@runtime] ⏳ Instance {instance_id} busy, queuing event {event.id} "
+                      f"({event.priority.name}, {len(backlog)} pending)")
+            else:
+                print(f"[@runtime] 🧩 Instance {instance_id} busy, coalesced {event.type} into queued event")
             return
         
         # Update state to running
@@ -427,6 +439,24 @@ class AgentRuntime:
                 instance.current_task,
                 instance.task_id
             )
+        
+        # Completed or failed, the task hands over to the backlog (a cancellation re-raised above)
+        await self._dispatch_next_event(instance_id)
+    
+    async def _dispatch_next_event(self, instance_id: str):
+        """Start the highest-priority queued event once the instance is free (IDLE or ERROR, never PAUSED/STOPPED)"""
+        backlog = self.pending_events.get(instance_id)
+        instance = self.instances.get(instance_id)
+        if not backlog or not instance or instance.state not in (AgentState.IDLE, AgentState.ERROR):
+            return
+        
+        event, _ = backlog.pop()
+        if not backlog:
+            self.pending_events.pop(instance_id, None)
+        
+        suffix = f" x{event.count}" if event.count > 1 else ""
+        print(f"[@runtime] ▶️ {instance_id} dequeued {event.type}{suffix} ({event.priority.name})")
+        await self.handle_event(instance_id, event)
     
     async def _subscribe_to_events(self, instance_id: str, agent_def: AgentDefinition):
         """Subscribe instance to its configured events"""
@@ -454,7 +484,9 @@ class AgentRuntime:
         if not instance:
             return None
         
-        return instance.to_dict()
+        status = instance.to_dict()
+        status['pending_events'] = len(self.pending_events.get(instance_id) or ())
+        return status
     
     def list_instances(self, team_id: Optional[str] = None) -> List[Dict]:
         """
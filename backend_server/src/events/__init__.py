@@ -7,8 +7,9 @@ This module provides event-driven architecture components:
 - Event Sources: Generate events from various triggers
 """
 
-from .event_bus import EventBus, Event, EventPriority, get_event_bus
+from .event_bus import EventBus, Event, EventPriority, EventLogWriter, get_event_bus
+from .local_redis import LocalRedis
 from .event_router import EventRouter, get_event_router
 
-__all__ = ['EventBus', 'Event', 'EventPriority', 'get_event_bus', 'EventRouter', 'get_event_router']
+__all__ = ['EventBus', 'Event', 'EventPriority', 'EventLogWriter', 'LocalRedis', 'get_event_bus', 'EventRouter', 'get_event_router']
 
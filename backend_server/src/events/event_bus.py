@@ -3,18 +3,38 @@ Event Bus - Central Pub/Sub System
 
 Provides Redis-based event distribution for the multi-agent platform.
 All events flow through this bus and are logged to PostgreSQL.
+
+PERFORMANCE: publish() never waits on the database - events are handed to a
+bounded EventLogWriter that batch-inserts them in the background. Incoming
+messages are fanned out to per-subscriber priority queues, so one slow callback
+does not delay the others (a full queue applies backpressure to the listener).
+CRITICAL events overtake queued lower-priority ones, and repeats of the same
+device-scoped event still waiting in a queue are coalesced into one (count).
+Set REDIS_URL=memory:// to run on the in-process LocalRedis stand-in.
 """
 
 import asyncio
 import json
 import os
-from typing import Callable, Dict, List, Any, Optional
+import time
+import uuid
+from collections import deque
+from typing import Callable, Dict, List, Any, Optional, Tuple
 from enum import Enum
 from datetime import datetime
 from dataclasses import dataclass, asdict
 import redis.asyncio as redis
 
 from shared.src.lib.database import events_db
+from .local_redis import LocalRedis
+from .priority_queue import PriorityEventQueue
+
+
+LOG_QUEUE_SIZE = int(os.getenv('EVENT_LOG_QUEUE_SIZE', '10000'))
+LOG_BATCH_SIZE = int(os.getenv('EVENT_LOG_BATCH_SIZE', '200'))
+LOG_FLUSH_INTERVAL = float(os.getenv('EVENT_LOG_FLUSH_INTERVAL', '0.5'))
+SUBSCRIBER_QUEUE_SIZE = int(os.getenv('EVENT_SUBSCRIBER_QUEUE_SIZE', '1000'))
+LATENCY_SAMPLES = 1000
 
 
 class EventPriority(Enum):
@@ -34,11 +54,13 @@ class Event:
     id: Optional[str] = None     # Unique event ID
     timestamp: Optional[datetime] = None  # When event occurred
     team_id: str = 'default'     # Team namespace
+    count: int = 1               # Occurrences merged into this event (coalescing)
     
     def __post_init__(self):
         if self.id is None:
+            # Millisecond prefix keeps ids time-sortable, random suffix makes them unique under bursts
             timestamp_ms = int(datetime.utcnow().timestamp() * 1000)
-            self.id = f"evt_{timestamp_ms}"
+            self.id = f"evt_{timestamp_ms}_{uuid.uuid4().hex[:12]}"
         if self.timestamp is None:
             self.timestamp = datetime.utcnow()
     
@@ -50,9 +72,17 @@ class Event:
             'payload': self.payload,
             'priority': self.priority.value,
             'timestamp': self.timestamp.isoformat(),
-            'team_id': self.team_id
+            'team_id': self.team_id,
+            'count': self.count
         }
     
+    def coalesce_key(self) -> Optional[Tuple[str, str, str]]:
+        """Key for merging repeats (same type, device and team); None if the event is not device-scoped"""
+        device_id = self.payload.get('device_id') if isinstance(self.payload, dict) else None
+        if device_id is None:
+            return None
+        return (self.type, str(device_id), self.team_id)
+    
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'Event':
         """Create Event from dictionary"""
@@ -62,10 +92,141 @@ class Event:
             payload=data['payload'],
             priority=EventPriority(data['priority']),
             timestamp=datetime.fromisoformat(data['timestamp']),
-            team_id=data.get('team_id', 'default')
+            team_id=data.get('team_id', 'default'),
+            count=data.get('count', 1)
         )
 
 
+class EventLogWriter:
+    """
+    Bounded background writer for the event_log table
+
+    Events are buffered and batch-inserted (LOG_BATCH_SIZE rows or every
+    LOG_FLUSH_INTERVAL seconds). When the buffer is full new events are
+    dropped from the log (never from the bus) and counted.
+    """
+
+    def __init__(self, write_batch: Optional[Callable[[List[Dict[str, Any]]], int]] = None,
+                 max_queue: int = LOG_QUEUE_SIZE, batch_size: int = LOG_BATCH_SIZE,
+                 flush_interval: float = LOG_FLUSH_INTERVAL):
+        self.write_batch = write_batch or events_db.log_events
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {'logged': 0, 'dropped': 0, 'failed': 0, 'batches': 0}
+
+    def submit(self, event: Event):
+        """Queue event for logging (non-blocking)"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        try:
+            self._queue.put_nowait({
+                'event_id': event.id,
+                'event_type': event.type,
+                'payload': event.payload,
+                'priority': event.priority.value,
+                'timestamp': event.timestamp.isoformat(),
+                'team_id': event.team_id
+            })
+        except asyncio.QueueFull:
+            self.stats['dropped'] += 1
+            if self.stats['dropped'] % 1000 == 1:
+                print(f"[@event_bus] ⚠️ Event log buffer full, dropped {self.stats['dropped']} log rows so far")
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    async def _run(self):
+        while True:
+            batch = [await self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+                except asyncio.TimeoutError:
+                    break
+            await self._write(batch)
+
+    async def _write(self, batch: List[Dict[str, Any]]):
+        try:
+            written = await asyncio.to_thread(self.write_batch, batch)
+            self.stats['logged'] += written or 0
+            self.stats['failed'] += len(batch) - (written or 0)
+            self.stats['batches'] += 1
+        except Exception as e:
+            self.stats['failed'] += len(batch)
+            print(f"[@event_bus] ⚠️ Failed to log {len(batch)} events to database: {e}")
+            # Don't raise - event publishing should continue even if logging fails
+        finally:
+            for _ in batch:
+                self._queue.task_done()
+
+    async def flush(self):
+        """Wait until every queued event has been written"""
+        if self._task is not None and not self._task.done():
+            await self._queue.join()
+
+    async def close(self):
+        await self.flush()
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+class _Subscriber:
+    """Subscriber callback with its own priority delivery queue and worker"""
+
+    def __init__(self, event_type: str, callback: Callable, queue_size: int):
+        self.event_type = event_type
+        self.callback = callback
+        self.max_size = queue_size
+        self.queue = PriorityEventQueue()
+        self.task: Optional[asyncio.Task] = None
+        self.delivered = 0
+        self.errors = 0
+        self._changed = asyncio.Condition()
+        self._in_flight = 0
+
+    async def put(self, event: Event, published_at: Optional[float]) -> bool:
+        """Queue (or coalesce) event; waits while the queue is full. Returns False if it had to wait."""
+        waited = False
+        async with self._changed:
+            while len(self.queue) >= self.max_size:
+                waited = True
+                await self._changed.wait()
+            self.queue.push(event, published_at)
+            self._changed.notify_all()
+        return not waited
+
+    async def get(self) -> Tuple[Event, Optional[float]]:
+        async with self._changed:
+            while not len(self.queue):
+                await self._changed.wait()
+            self._in_flight += 1
+            item = self.queue.pop()
+            self._changed.notify_all()
+            return item
+
+    async def task_done(self):
+        async with self._changed:
+            self._in_flight -= 1
+            self._changed.notify_all()
+
+    async def join(self):
+        async with self._changed:
+            while len(self.queue) or self._in_flight:
+                await self._changed.wait()
+
+
 class EventBus:
     """
     Redis-based Event Bus
@@ -73,19 +234,33 @@ class EventBus:
     Provides pub/sub for event distribution and logs all events to PostgreSQL.
     """
     
-    def __init__(self, redis_url: Optional[str] = None):
+    def __init__(
+        self,
+        redis_url: Optional[str] = None,
+        redis_client: Optional[Any] = None,
+        log_writer: Optional[EventLogWriter] = None,
+        subscriber_queue_size: int = SUBSCRIBER_QUEUE_SIZE
+    ):
         """
         Initialize Event Bus
         
         Args:
-            redis_url: Redis connection URL (default: from environment)
+            redis_url: Redis connection URL (default: from environment, 'memory://' for LocalRedis)
+            redis_client: Pre-built client (e.g. LocalRedis in tests)
+            log_writer: Event log writer (default: batched writer to event_log)
+            subscriber_queue_size: Max pending events per subscriber before backpressure
         """
         self.redis_url = redis_url or os.getenv('REDIS_URL', 'redis://localhost:6379')
-        self.redis_client: Optional[redis.Redis] = None
+        self.redis_client: Optional[redis.Redis] = redis_client
         self.pubsub: Optional[redis.client.PubSub] = None
         self.subscribers: Dict[str, List[Callable]] = {}
         self.running = False
         self._listen_task: Optional[asyncio.Task] = None
+        self._log_writer = log_writer
+        self._subscriber_queue_size = subscriber_queue_size
+        self._subscriptions: Dict[str, List[_Subscriber]] = {}
+        self._latencies_ms: deque = deque(maxlen=LATENCY_SAMPLES)
+        self.stats = {'published': 0, 'received': 0, 'delivered': 0, 'callback_errors': 0, 'backpressure_waits': 0}
     
     async def connect(self):
         """Connect to Redis"""
@@ -93,11 +268,14 @@ class EventBus:
             return
         
         try:
-            self.redis_client = redis.from_url(
-                self.redis_url,
-                encoding="utf-8",
-                decode_responses=True
-            )
+            if self.redis_url.startswith('memory://'):
+                self.redis_client = LocalRedis()
+            else:
+                self.redis_client = redis.from_url(
+                    self.redis_url,
+                    encoding="utf-8",
+                    decode_responses=True
+                )
             # Test connection
             await self.redis_client.ping()
             print(f"[@event_bus] ✅ Connected to Redis at {self.redis_url}")
@@ -116,8 +294,21 @@ class EventBus:
             except asyncio.CancelledError:
                 pass
         
+        for subscriber in self._iter_subscribers():
+            if subscriber.task:
+                subscriber.task.cancel()
+                try:
+                    await subscriber.task
+                except asyncio.CancelledError:
+                    pass
+                subscriber.task = None
+        
+        if self._log_writer:
+            await self._log_writer.close()
+        
         if self.pubsub:
             await self.pubsub.close()
+            self.pubsub = None
         
         if self.redis_client:
             await self.redis_client.close()
@@ -135,15 +326,18 @@ class EventBus:
         if self.redis_client is None:
             await self.connect()
         
-        # Log event to database (sync call)
+        # Queue event for batched database logging (non-blocking)
         self._log_event(event)
         
-        # Publish to Redis
-        event_json = json.dumps(event.to_dict())
+        # Publish to Redis (publish time travels with the message for latency metrics)
+        message = event.to_dict()
+        message['published_at'] = time.time()
+        event_json = json.dumps(message)
         channel = f"events:{event.type}"
         
         try:
             await self.redis_client.publish(channel, event_json)
+            self.stats['published'] += 1
             print(f"[@event_bus] 📤 Published: {event.type} (id={event.id}, priority={event.priority.name})")
         except Exception as e:
             print(f"[@event_bus] ❌ Failed to publish event: {e}")
@@ -157,10 +351,20 @@ class EventBus:
             event_type: Event type pattern (e.g., 'alert.blackscreen')
             callback: Async function to call when event received
         """
-        if event_type not in self.subscribers:
+        is_new_channel = event_type not in self.subscribers
+        if is_new_channel:
             self.subscribers[event_type] = []
+            self._subscriptions[event_type] = []
         
         self.subscribers[event_type].append(callback)
+        subscriber = _Subscriber(event_type, callback, self._subscriber_queue_size)
+        self._subscriptions[event_type].append(subscriber)
+        
+        if self.running:
+            self._start_subscriber(subscriber)
+            if is_new_channel:
+                await self.pubsub.subscribe(f"events:{event_type}")
+        
         print(f"[@event_bus] 📥 Subscribed to: {event_type}")
     
     async def start(self):
@@ -180,6 +384,9 @@ class EventBus:
             await self.pubsub.subscribe(*channels)
             print(f"[@event_bus] 🎧 Listening on {len(channels)} channels")
         
+        for subscriber in self._iter_subscribers():
+            self._start_subscriber(subscriber)
+        
         # Start listening task
         self._listen_task = asyncio.create_task(self._listen())
     
@@ -198,45 +405,103 @@ class EventBus:
             print(f"[@event_bus] ❌ Listener error: {e}")
     
     async def _handle_message(self, message: Dict[str, Any]):
-        """Handle incoming message"""
+        """Handle incoming message (fan out to subscriber queues)"""
         try:
             # Parse event
             event_data = json.loads(message['data'])
             event = Event.from_dict(event_data)
+            published_at = event_data.get('published_at')
+            self.stats['received'] += 1
             
             # Get event type from channel name
             channel = message['channel']
             event_type = channel.replace('events:', '')
             
-            # Call all subscribers for this event type
-            callbacks = self.subscribers.get(event_type, [])
-            
-            for callback in callbacks:
-                try:
-                    if asyncio.iscoroutinefunction(callback):
-                        await callback(event)
-                    else:
-                        callback(event)
-                except Exception as e:
-                    print(f"[@event_bus] ❌ Callback error for {event_type}: {e}")
+            subscribers = self._subscriptions.get(event_type, [])
+            for index, subscriber in enumerate(subscribers):
+                # Each subscriber may merge/mutate its copy (count), so don't share the instance
+                delivered_event = event if index == 0 else Event.from_dict(event_data)
+                # Backpressure: a full queue stops reading from Redis until the subscriber catches up
+                if not await subscriber.put(delivered_event, published_at):
+                    self.stats['backpressure_waits'] += 1
         
         except Exception as e:
             print(f"[@event_bus] ❌ Failed to handle message: {e}")
     
+    def _start_subscriber(self, subscriber: _Subscriber):
+        if subscriber.task is None or subscriber.task.done():
+            subscriber.task = asyncio.create_task(self._deliver(subscriber))
+    
+    async def _deliver(self, subscriber: _Subscriber):
+        """Deliver events to one subscriber, highest priority first"""
+        callback = subscriber.callback
+        is_async = asyncio.iscoroutinefunction(callback)
+        while True:
+            event, published_at = await subscriber.get()
+            try:
+                if is_async:
+                    await callback(event)
+                else:
+                    callback(event)
+                subscriber.delivered += 1
+                self.stats['delivered'] += 1
+                if published_at is not None:
+                    self._latencies_ms.append((time.time() - published_at) * 1000)
+            except Exception as e:
+                subscriber.errors += 1
+                self.stats['callback_errors'] += 1
+                print(f"[@event_bus] ❌ Callback error for {subscriber.event_type}: {e}")
+            finally:
+                await subscriber.task_done()
+    
+    def _iter_subscribers(self):
+        for subscribers in self._subscriptions.values():
+            yield from subscribers
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Get throughput, publish→deliver latency and queue depth metrics
+        
+        Returns:
+            Metrics dictionary (latencies in milliseconds over the last LATENCY_SAMPLES deliveries)
+        """
+        latencies = sorted(self._latencies_ms)
+        
+        def percentile(p: float) -> Optional[float]:
+            if not latencies:
+                return None
+            return round(latencies[min(len(latencies) - 1, int(p * len(latencies)))], 3)
+        
+        return {
+            **self.stats,
+            'latency_ms': {
+                'p50': percentile(0.50),
+                'p95': percentile(0.95),
+                'p99': percentile(0.99),
+                'max': round(latencies[-1], 3) if latencies else None,
+                'samples': len(latencies)
+            },
+            'subscriber_queues': {
+                event_type: [len(subscriber.queue) for subscriber in subscribers]
+                for event_type, subscribers in self._subscriptions.items()
+            },
+            'coalesced': sum(subscriber.queue.coalesced for subscriber in self._iter_subscribers()),
+            'event_log': {**self._log_writer.stats, 'pending': self._log_writer.pending} if self._log_writer else None
+        }
+    
+    async def drain(self):
+        """Wait until all received events were delivered and logged (tests, shutdown)"""
+        for subscriber in list(self._iter_subscribers()):
+            if subscriber.task is not None:
+                await subscriber.join()
+        if self._log_writer:
+            await self._log_writer.flush()
+    
     def _log_event(self, event: Event):
-        """Log event to database (sync)"""
-        try:
-            events_db.log_event(
-                event_id=event.id,
-                event_type=event.type,
-                payload=event.payload,
-                priority=event.priority.value,
-                timestamp=event.timestamp,
-                team_id=event.team_id
-            )
-        except Exception as e:
-            print(f"[@event_bus] ⚠️ Failed to log event to database: {e}")
-            # Don't raise - event publishing should continue even if logging fails
+        """Queue event for batched database logging"""
+        if self._log_writer is None:
+            self._log_writer = EventLogWriter()
+        self._log_writer.submit(event)
 
 
 # Global instance
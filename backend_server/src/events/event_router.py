@@ -3,12 +3,19 @@ Event Router
 
 Routes events to appropriate agents based on event type and agent triggers.
 Integrates with Agent Registry to find matching agents.
+
+Device-scoped events are coalesced: the first occurrence is routed
+immediately, repeats within the coalescing window are folded into one summary
+event (count = number of repeats) published when the window closes.
+CRITICAL events are never coalesced - every occurrence is published at once.
 """
 
-from typing import List, Dict, Any
+import asyncio
+from typing import List, Dict, Any, Optional, Tuple
 
 from agent.registry import AgentRegistry, get_agent_registry
 from events.event_bus import EventBus, Event, EventPriority, get_event_bus
+from events.priority_queue import COALESCE_WINDOW_SECONDS
 from shared.src.lib.database import events_db
 
 
@@ -23,7 +30,8 @@ class EventRouter:
     def __init__(
         self,
         event_bus: EventBus = None,
-        registry: AgentRegistry = None
+        registry: AgentRegistry = None,
+        coalesce_window: float = COALESCE_WINDOW_SECONDS
     ):
         """
         Initialize Event Router
@@ -31,9 +39,13 @@ class EventRouter:
         Args:
             event_bus: Event bus for publishing (optional)
             registry: Agent registry for lookup (optional)
+            coalesce_window: Seconds during which repeats of a routed event are merged (0 disables)
         """
         self.event_bus = event_bus or get_event_bus()
         self.registry = registry or get_agent_registry()
+        self.coalesce_window = coalesce_window
+        self._windows: Dict[Tuple[str, str, str], Dict[str, Any]] = {}
+        self.stats = {'routed': 0, 'coalesced': 0, 'unhandled': 0, 'critical': 0}
     
     async def route_event(self, event: Event) -> bool:
         """
@@ -43,8 +55,20 @@ class EventRouter:
             event: Event to route
             
         Returns:
-            True if routed to at least one agent, False if unhandled
+            True if routed to at least one agent (or merged into a routed one), False if unhandled
         """
+        critical = event.priority == EventPriority.CRITICAL
+        key = event.coalesce_key() if self.coalesce_window > 0 and not critical else None
+        window = self._windows.get(key) if key else None
+        if window is not None:
+            # Repeat inside the coalescing window - fold into the pending summary
+            window['count'] += event.count
+            window['latest'] = event
+            if event.priority.value < window['priority'].value:
+                window['priority'] = event.priority
+            self.stats['coalesced'] += 1
+            return True
+        
         # Get agents that should handle this event (sync call)
         agents = self.registry.get_agents_for_event(
             event.type,
@@ -67,15 +91,50 @@ class EventRouter:
             ))
             
             print(f"[@router] ⚠️ Unhandled: {event.type} (no agents registered)")
+            self.stats['unhandled'] += 1
             return False
         
         # Publish event for registered agents
         await self.event_bus.publish(event)
+        self.stats['routed'] += 1
+        if critical:
+            self.stats['critical'] += 1
+        
+        if key:
+            self._open_window(key, event.priority)
         
         print(f"[@router] ✅ Routed: {event.type} → {len(agents)} agent(s)")
         
         return True
     
+    def _open_window(self, key: Tuple[str, str, str], priority: EventPriority):
+        """Start coalescing repeats of key for coalesce_window seconds"""
+        loop = asyncio.get_running_loop()
+        self._windows[key] = {'count': 0, 'latest': None, 'priority': priority}
+        loop.call_later(self.coalesce_window, lambda: loop.create_task(self._close_window(key)))
+    
+    async def _close_window(self, key: Tuple[str, str, str]):
+        """Publish merged repeats (if any) and keep coalescing while the storm lasts"""
+        window = self._windows.pop(key, None)
+        if not window or not window['count']:
+            return
+        
+        latest: Optional[Event] = window['latest']
+        summary = Event(
+            type=latest.type,
+            payload={**latest.payload, 'coalesced_count': window['count']},
+            priority=window['priority'],
+            team_id=latest.team_id,
+            count=window['count']
+        )
+        self._open_window(key, summary.priority)
+        
+        try:
+            await self.event_bus.publish(summary)
+            print(f"[@router] 🧩 Coalesced: {latest.type} ({key[1]}) x{window['count']}")
+        except Exception as e:
+            print(f"[@router] ❌ Failed to publish coalesced {latest.type}: {e}")
+    
     def get_routing_stats(self, team_id: str = 'default') -> Dict[str, Any]:
         """
         Get event routing statistics
@@ -0,0 +1,73 @@
+"""
+Local Redis Stand-in
+
+In-process replacement for the subset of redis.asyncio pub/sub used by the
+Event Bus (ping/publish/pubsub/close). Used when REDIS_URL is 'memory://'
+and by tests, so the bus can run without a Redis server.
+"""
+
+import asyncio
+from typing import Any, AsyncIterator, Dict, List, Set
+
+
+class LocalPubSub:
+    """Pub/sub connection bound to a LocalRedis instance"""
+
+    def __init__(self, server: 'LocalRedis'):
+        self._server = server
+        self._channels: Set[str] = set()
+        self._messages: asyncio.Queue = asyncio.Queue()
+        self._closed = False
+
+    async def subscribe(self, *channels: str):
+        for channel in channels:
+            if channel in self._channels:
+                continue
+            self._channels.add(channel)
+            self._server._subscribers.setdefault(channel, []).append(self)
+            self._messages.put_nowait({'type': 'subscribe', 'channel': channel, 'data': len(self._channels)})
+
+    async def unsubscribe(self, *channels: str):
+        for channel in channels or list(self._channels):
+            if channel not in self._channels:
+                continue
+            self._channels.discard(channel)
+            self._server._subscribers.get(channel, []).remove(self)
+            self._messages.put_nowait({'type': 'unsubscribe', 'channel': channel, 'data': len(self._channels)})
+
+    async def listen(self) -> AsyncIterator[Dict[str, Any]]:
+        while not self._closed:
+            message = await self._messages.get()
+            if message is None:
+                break
+            yield message
+
+    async def close(self):
+        await self.unsubscribe()
+        self._closed = True
+        self._messages.put_nowait(None)
+
+    def _deliver(self, channel: str, data: str):
+        self._messages.put_nowait({'type': 'message', 'channel': channel, 'data': data})
+
+
+class LocalRedis:
+    """Minimal in-memory Redis (pub/sub only)"""
+
+    def __init__(self):
+        self._subscribers: Dict[str, List[LocalPubSub]] = {}
+
+    async def ping(self) -> bool:
+        return True
+
+    async def publish(self, channel: str, message: str) -> int:
+        receivers = self._subscribers.get(channel, [])
+        for pubsub in receivers:
+            pubsub._deliver(channel, message)
+        return len(receivers)
+
+    def pubsub(self) -> LocalPubSub:
+        return LocalPubSub(self)
+
+    async def close(self):
+        self._subscribers.clear()
@@ -0,0 +1,87 @@
+"""
+Priority Event Queue
+
+Orders pending events by EventPriority (CRITICAL first, FIFO within a level)
+and coalesces repeats: an event whose coalesce key (type, device, team) matches
+one still pending within the coalescing window is merged into it (count += n)
+instead of being queued again. Used by EventBus subscriber queues and
+AgentRuntime per-instance backlogs.
+"""
+
+import heapq
+import itertools
+import os
+import time
+from typing import TYPE_CHECKING, Any, Dict, List, Tuple
+
+if TYPE_CHECKING:
+    from .event_bus import Event
+
+
+COALESCE_WINDOW_SECONDS = float(os.getenv('EVENT_COALESCE_WINDOW', '5.0'))
+
+
+class PriorityEventQueue:
+    """Heap of pending events with per-key coalescing (not thread-safe, event loop only)"""
+
+    def __init__(self, coalesce_window: float = COALESCE_WINDOW_SECONDS):
+        self.coalesce_window = coalesce_window
+        self._heap: List[list] = []
+        self._pending: Dict[Tuple, list] = {}
+        self._sequence = itertools.count()
+        self._size = 0
+        self.coalesced = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def push(self, event: 'Event', meta: Any = None) -> bool:
+        """
+        Queue event (or merge it into a pending duplicate)
+
+        Returns:
+            True if queued as a new entry, False if coalesced into an existing one
+        """
+        now = time.monotonic()
+        key = event.coalesce_key()
+        entry = self._pending.get(key) if key else None
+
+        if entry is not None and now - entry[4] <= self.coalesce_window:
+            pending_event = entry[2]
+            pending_event.count += event.count
+            self.coalesced += 1
+            if event.priority.value < entry[0]:
+                # Escalated - re-queue at the higher priority, drop the old heap slot
+                pending_event.priority = event.priority
+                entry[2] = None
+                upgraded = [event.priority.value, next(self._sequence), pending_event, entry[3], entry[4]]
+                self._pending[key] = upgraded
+                heapq.heappush(self._heap, upgraded)
+            return False
+
+        entry = [event.priority.value, next(self._sequence), event, meta, now]
+        heapq.heappush(self._heap, entry)
+        if key:
+            self._pending[key] = entry
+        self._size += 1
+        return True
+
+    def pop(self) -> Tuple['Event', Any]:
+        """Remove and return (event, meta) with the highest priority; IndexError if empty"""
+        while self._heap:
+            entry = heapq.heappop(self._heap)
+            event = entry[2]
+            if event is None:
+                continue  # Stale slot left by a priority escalation
+            key = event.coalesce_key()
+            if key and self._pending.get(key) is entry:
+                del self._pending[key]
+            self._size -= 1
+            return event, entry[3]
+        raise IndexError("pop from empty PriorityEventQueue")
+
+    def clear(self):
+        self._heap.clear()
+        self._pending.clear()
+        self._size = 0
+        self.coalesced = 0
@@ -3,11 +3,25 @@ Resource Lock Manager
 
 Manages exclusive locks on resources (devices, trees, userinterfaces)
 to enable safe parallel execution. Includes priority-based queuing.
+
+The in-process lease table is authoritative: acquire/release only touch memory
+(no DB round-trip on the event loop). Every change is written through to the
+resource_locks / resource_lock_queue tables by a background writer, and the
+table is rebuilt from the DB on start(). Locks taken directly in the DB by other
+processes (e.g. campaign executors on hosts) are adopted at each reconcile.
+
+A new lease is granted from memory at once. Its conditional insert (unique
+resource_id, ON CONFLICT DO NOTHING) is checked in the background: if another
+process already held the resource in the DB, the lease is revoked, the owner is
+notified (resource.revoked) and queued, and the DB holder adopted.
 """
 
 import asyncio
-from typing import Dict, Optional, List
-from dataclasses import dataclass
+import heapq
+import itertools
+import time
+from typing import Any, Callable, Dict, Optional, List, Tuple
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from enum import Enum
 
@@ -15,6 +29,11 @@ from events import EventBus, Event, EventPriority, get_event_bus
 from shared.src.lib.database import resource_locks_db
 
 
+RECONCILE_INTERVAL_SECONDS = 30
+
+_WRITE_FAILED = object()  # Result of a write-through that raised
+
+
 class LockStatus(Enum):
     """Resource lock status"""
     AVAILABLE = "available"
@@ -35,36 +54,71 @@ class ResourceLock:
     team_id: str = 'default'
 
 
+@dataclass(order=True)
+class QueuedRequest:
+    """Pending lock request (heap ordered by priority, then arrival)"""
+    priority: int
+    sequence: int
+    owner_id: str = field(compare=False)
+    resource_type: str = field(compare=False, default='device')
+    owner_type: str = field(compare=False, default='agent')
+    timeout_seconds: int = field(compare=False, default=3600)
+    team_id: str = field(compare=False, default='default')
+
+
 class ResourceLockManager:
     """
     Resource Lock Manager
-    
+
     Provides exclusive lock acquisition and priority-based queuing.
     Integrates with Event Bus to notify on lock changes.
+
+    On release/expiry the lease is handed to the highest-priority queued owner,
+    whose wait_for_lock() (if any) is woken immediately.
     """
-    
+
     def __init__(self, event_bus: Optional[EventBus] = None):
         """
         Initialize Resource Lock Manager
-        
+
         Args:
             event_bus: Event bus for publishing lock events (optional)
         """
         self.event_bus = event_bus or get_event_bus()
         self._cleanup_task: Optional[asyncio.Task] = None
         self._running = False
-    
+
+        # Authoritative in-memory state (only mutated on the event loop)
+        self._leases: Dict[str, ResourceLock] = {}
+        self._expiry_timers: Dict[str, asyncio.TimerHandle] = {}
+        self._queues: Dict[str, List[QueuedRequest]] = {}
+        self._waiters: Dict[Tuple[str, str], asyncio.Future] = {}
+        self._sequence = itertools.count()
+
+        # DB write-through (ordered, off the event loop)
+        self._writes: Optional[asyncio.Queue] = None
+        self._writer_task: Optional[asyncio.Task] = None
+        self._pending_writes = 0
+        self._has_db: Optional[bool] = None
+        self._claims: set = set()  # Background checks of conditional inserts
+
+        self.stats = {'acquired': 0, 'queued': 0, 'released': 0, 'expired': 0,
+                      'acquire_calls': 0, 'acquire_us_total': 0.0, 'db_writes': 0, 'db_errors': 0, 'lost_races': 0}
+
     async def start(self):
-        """Start periodic cleanup of expired locks"""
+        """Recover lease state from DB, then start write-through and periodic reconcile"""
         if self._running:
             return
-        
+
         self._running = True
+        self._ensure_writer()
+        await self._recover_from_db()
         self._cleanup_task = asyncio.create_task(self._periodic_cleanup())
-        print("[@lock_manager] ✅ Started periodic cleanup")
-    
+        print(f"[@lock_manager] ✅ Started ({len(self._leases)} leases, "
+              f"{sum(len(q) for q in self._queues.values())} queued requests recovered)")
+
     async def stop(self):
-        """Stop cleanup task"""
+        """Stop cleanup task and flush pending DB writes"""
         self._running = False
         if self._cleanup_task:
             self._cleanup_task.cancel()
@@ -72,21 +126,39 @@ class ResourceLockManager:
                 await self._cleanup_task
             except asyncio.CancelledError:
                 pass
+
+        # Claim checks can queue more writes (queue entry, release) - wait until both are drained
+        while self._claims or (self._writes is not None and self._pending_writes):
+            if self._writes is not None:
+                await self._writes.join()
+            if self._claims:
+                await asyncio.gather(*list(self._claims), return_exceptions=True)
+        if self._writer_task:
+            self._writer_task.cancel()
+            try:
+                await self._writer_task
+            except asyncio.CancelledError:
+                pass
+            self._writer_task = None
+
+        for timer in self._expiry_timers.values():
+            timer.cancel()
+        self._expiry_timers.clear()
         print("[@lock_manager] Stopped")
-    
+
     async def acquire(
-        self, 
-        resource_id: str, 
+        self,
+        resource_id: str,
         resource_type: str,
         owner_id: str,
         owner_type: str = 'agent',
-        timeout_seconds: int = 3600, 
+        timeout_seconds: int = 3600,
         priority: int = 3,
         team_id: str = 'default'
     ) -> bool:
         """
         Try to acquire lock on resource
-        
+
         Args:
             resource_id: Resource identifier (e.g., 'device1', 'tree_abc')
             resource_type: Resource type ('device', 'tree', 'userinterface')
@@ -95,50 +167,26 @@ class ResourceLockManager:
             timeout_seconds: Lock duration in seconds
             priority: Lock priority (lower = higher priority)
             team_id: Team namespace
-            
+
         Returns:
-            True if lock acquired, False if queued
+            True if lock acquired (or already held by owner), False if queued
         """
-        # Clean up expired locks first (sync call)
-        resource_locks_db.cleanup_expired_locks()
-        
-        # Try to acquire lock (sync call)
-        lock_id = resource_locks_db.acquire_lock(
-            resource_id=resource_id,
-            resource_type=resource_type,
-            owner_id=owner_id,
-            owner_type=owner_type,
-            timeout_seconds=timeout_seconds,
-            priority=priority,
-            team_id=team_id
-        )
-        
-        if lock_id:
-            # Publish event
-            expires_at = datetime.utcnow() + timedelta(seconds=timeout_seconds)
-            await self.event_bus.publish(Event(
-                type="resource.acquired",
-                payload={
-                    "resource_id": resource_id,
-                    "resource_type": resource_type,
-                    "owner_id": owner_id,
-                    "expires_at": expires_at.isoformat()
-                },
-                priority=EventPriority.NORMAL,
-                team_id=team_id
-            ))
-            
+        start = time.perf_counter()
+        self.stats['acquire_calls'] += 1
+        lease = self._get_lease(resource_id)
+        request = QueuedRequest(priority, next(self._sequence), owner_id, resource_type, owner_type, timeout_seconds, team_id)
+
+        if lease is None or lease.owner_id == owner_id:
+            # Concurrent acquirers already see the in-memory lease and queue; only a lock taken
+            # directly in the DB by another process can still win - checked in the background
+            lease = self._grant(resource_id, request)
+            await self._publish_acquired(lease, timeout_seconds)
+            self.stats['acquire_us_total'] += (time.perf_counter() - start) * 1_000_000
             return True
-        
-        # Resource locked - add to queue (sync call)
-        resource_locks_db.add_to_queue(
-            resource_id=resource_id,
-            owner_id=owner_id,
-            priority=priority,
-            timeout_seconds=timeout_seconds,
-            team_id=team_id
-        )
-        
+
+        # Resource locked - add to queue (once per owner)
+        self._enqueue(resource_id, request)
+
         # Publish queued event
         await self.event_bus.publish(Event(
             type="resource.queued",
@@ -150,32 +198,71 @@ class ResourceLockManager:
             priority=EventPriority.NORMAL,
             team_id=team_id
         ))
-        
+        self.stats['acquire_us_total'] += (time.perf_counter() - start) * 1_000_000
+
         return False
-    
+
+    async def wait_for_lock(
+        self,
+        resource_id: str,
+        resource_type: str,
+        owner_id: str,
+        owner_type: str = 'agent',
+        timeout_seconds: int = 3600,
+        priority: int = 3,
+        team_id: str = 'default',
+        wait_timeout: Optional[float] = None
+    ) -> bool:
+        """
+        Acquire lock, waiting in the priority queue until it is handed over
+
+        Returns:
+            True once the lock is held, False if wait_timeout elapsed (request removed from queue)
+        """
+        key = (resource_id, owner_id)
+        future = self._waiters.get(key)
+        if future is None or future.done():
+            future = asyncio.get_running_loop().create_future()
+            self._waiters[key] = future
+
+        if await self.acquire(resource_id, resource_type, owner_id, owner_type, timeout_seconds, priority, team_id):
+            self._waiters.pop(key, None)
+            return True
+
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), timeout=wait_timeout)
+        except asyncio.TimeoutError:
+            self._cancel_request(resource_id, owner_id, team_id)
+            return False
+        finally:
+            if self._waiters.get(key) is future:
+                self._waiters.pop(key, None)
+
     async def release(
-        self, 
-        resource_id: str, 
+        self,
+        resource_id: str,
         owner_id: str,
         team_id: str = 'default'
     ) -> bool:
         """
         Release lock on resource
-        
+
         Args:
             resource_id: Resource identifier
             owner_id: Lock owner (must match)
             team_id: Team namespace
-            
+
         Returns:
             True if released, False if not locked or wrong owner
         """
-        # Release lock (sync call)
-        released = resource_locks_db.release_lock(resource_id, owner_id, team_id)
-        
-        if not released:
+        lease = self._get_lease(resource_id)
+        if lease is None or lease.owner_id != owner_id:
             return False
-        
+
+        self._drop_lease(resource_id)
+        self.stats['released'] += 1
+        self._persist(resource_locks_db.release_lock, resource_id, owner_id, lease.team_id)
+
         # Publish event
         await self.event_bus.publish(Event(
             type="resource.released",
@@ -186,76 +273,353 @@ class ResourceLockManager:
             priority=EventPriority.NORMAL,
             team_id=team_id
         ))
-        
+
         # Process queue for this resource
         await self._process_queue(resource_id, team_id)
-        
+
         return True
-    
+
     def is_available(self, resource_id: str) -> bool:
         """
         Check if resource is available
-        
+
         Args:
             resource_id: Resource identifier
-            
+
         Returns:
             True if available, False if locked
         """
-        return resource_locks_db.is_resource_available(resource_id)
-    
+        return self._get_lease(resource_id) is None
+
     def get_status(
-        self, 
+        self,
         resource_id: str,
         team_id: str = 'default'
     ) -> Dict:
         """
         Get current status of resource
-        
+
         Args:
             resource_id: Resource identifier
             team_id: Team namespace
-            
+
         Returns:
             Dictionary with status, owner, and queue information
         """
-        return resource_locks_db.get_lock_status(resource_id, team_id)
-    
+        lease = self._get_lease(resource_id)
+        queue_length = sum(1 for request in self._queues.get(resource_id, []) if request.team_id == team_id)
+
+        if lease:
+            return {
+                'status': LockStatus.LOCKED.value,
+                'owner_id': lease.owner_id,
+                'expires_at': lease.expires_at.isoformat(),
+                'queue_length': queue_length
+            }
+
+        return {
+            'status': LockStatus.AVAILABLE.value,
+            'owner_id': None,
+            'expires_at': None,
+            'queue_length': queue_length
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Lease table counters and average acquire() latency (in-memory grant + event publish, no DB wait)"""
+        attempts = self.stats['acquire_calls']
+        return {
+            **self.stats,
+            'active_leases': len(self._leases),
+            'queued_requests': sum(len(q) for q in self._queues.values()),
+            'pending_db_writes': self._pending_writes,
+            'avg_acquire_us': round(self.stats['acquire_us_total'] / attempts, 2) if attempts else 0.0
+        }
+
+    # =====================================================
+    # LEASE TABLE (in-memory, event loop only)
+    # =====================================================
+
+    def _get_lease(self, resource_id: str) -> Optional[ResourceLock]:
+        lease = self._leases.get(resource_id)
+        if lease and lease.expires_at <= datetime.utcnow():
+            return None  # Expiry timer not fired yet - treat as free
+        return lease
+
+    def _grant(self, resource_id: str, request: QueuedRequest) -> ResourceLock:
+        """Take the lease in memory, queue the conditional DB insert and check it in the background"""
+        now = datetime.utcnow()
+        previous = self._leases.get(resource_id)
+        lease = ResourceLock(
+            resource_id=resource_id,
+            resource_type=request.resource_type,
+            owner_id=request.owner_id,
+            owner_type=request.owner_type,
+            acquired_at=now,
+            expires_at=now + timedelta(seconds=request.timeout_seconds),
+            priority=request.priority,
+            team_id=request.team_id
+        )
+        self._leases[resource_id] = lease
+        self._schedule_expiry(resource_id, request.timeout_seconds)
+        self.stats['acquired'] += 1
+
+        if previous is not None:
+            # Re-acquire by owner extends the lease; expired foreign lease is replaced
+            self._persist(resource_locks_db.release_lock, resource_id, previous.owner_id, previous.team_id)
+        claim = self._persist(resource_locks_db.insert_lock, resource_id, request.resource_type, request.owner_id,
+                              request.owner_type, request.timeout_seconds, request.priority, request.team_id, now)
+        task = asyncio.create_task(self._confirm_grant(lease, claim, request))
+        self._claims.add(task)
+        task.add_done_callback(self._claims.discard)
+        return lease
+
+    def _db_enabled(self) -> bool:
+        if self._has_db is None:
+            self._has_db = resource_locks_db.get_supabase() is not None
+        return self._has_db
+
+    async def _confirm_grant(self, lease: ResourceLock, claim: asyncio.Future, request: QueuedRequest):
+        """
+        Check the conditional DB insert of a lease already granted in memory (background task)
+
+        The insert is ordered after every earlier write of this manager (releases included), so
+        a conflict means another process holds the resource in the DB (e.g. a campaign executor):
+        the lease is revoked, its owner notified and queued, and the DB holder adopted. DB
+        unavailable or failing keeps the in-memory grant (same assumption as is_resource_available()).
+        """
+        lock_id = await claim  # Lock ID, _WRITE_FAILED, or None (conflict / DB not connected)
+        if lock_id is not None or not self._db_enabled():
+            return
+
+        resource_id = lease.resource_id
+        held = self._leases.get(resource_id) is lease
+        if held:
+            self._drop_lease(resource_id)
+        self.stats['acquired'] -= 1
+        self.stats['lost_races'] += 1
+        print(f"[@lock_manager] ⚔️ Lost race for {resource_id} (held in DB by another process) - {lease.owner_id} revoked")
+
+        try:
+            holder = await asyncio.to_thread(resource_locks_db.get_active_lock, resource_id)
+        except Exception as e:
+            print(f"[@lock_manager] ⚠️ Could not read DB holder of {resource_id}: {e}")
+            holder = None
+        if holder:
+            self._adopt_locks([holder])
+        if not held:
+            return  # Already released / expired - nothing to take back
+
+        self._enqueue(resource_id, request)
+        await self.event_bus.publish(Event(
+            type="resource.revoked",
+            payload={
+                "resource_id": resource_id,
+                "owner_id": lease.owner_id,
+                "holder_id": holder.get('owner_id') if holder else None
+            },
+            priority=EventPriority.HIGH,
+            team_id=lease.team_id
+        ))
+        await self._process_queue(resource_id, lease.team_id)  # DB holder gone meanwhile
+
+    def _enqueue(self, resource_id: str, request: QueuedRequest):
+        queue = self._queues.setdefault(resource_id, [])
+        if not any(queued.owner_id == request.owner_id for queued in queue):
+            heapq.heappush(queue, request)
+            self.stats['queued'] += 1
+            self._persist(resource_locks_db.add_to_queue, resource_id, request.owner_id, request.priority,
+                          request.timeout_seconds, request.team_id)
+
+    def _drop_lease(self, resource_id: str):
+        self._leases.pop(resource_id, None)
+        timer = self._expiry_timers.pop(resource_id, None)
+        if timer:
+            timer.cancel()
+
+    def _schedule_expiry(self, resource_id: str, delay_seconds: float):
+        timer = self._expiry_timers.pop(resource_id, None)
+        if timer:
+            timer.cancel()
+        loop = asyncio.get_running_loop()
+        self._expiry_timers[resource_id] = loop.call_later(
+            max(0.0, delay_seconds), lambda: loop.create_task(self._on_expired(resource_id))
+        )
+
+    async def _on_expired(self, resource_id: str):
+        lease = self._leases.get(resource_id)
+        if lease is None or lease.expires_at > datetime.utcnow():
+            return  # Released or extended meanwhile
+
+        self._expiry_timers.pop(resource_id, None)
+        self._leases.pop(resource_id, None)
+        self.stats['expired'] += 1
+        self._persist(resource_locks_db.release_lock, resource_id, lease.owner_id, lease.team_id)
+        print(f"[@lock_manager] ⌛ Expired: {resource_id} (owner {lease.owner_id})")
+        await self._process_queue(resource_id, lease.team_id)
+
+    def _cancel_request(self, resource_id: str, owner_id: str, team_id: str):
+        queue = self._queues.get(resource_id)
+        if not queue:
+            return
+        remaining = [request for request in queue if request.owner_id != owner_id]
+        if len(remaining) != len(queue):
+            heapq.heapify(remaining)
+            self._queues[resource_id] = remaining
+            self._persist(resource_locks_db.remove_from_queue, resource_id, owner_id, team_id)
+
+    async def _publish_acquired(self, lease: ResourceLock, timeout_seconds: int):
+        await self.event_bus.publish(Event(
+            type="resource.acquired",
+            payload={
+                "resource_id": lease.resource_id,
+                "resource_type": lease.resource_type,
+                "owner_id": lease.owner_id,
+                "expires_at": lease.expires_at.isoformat()
+            },
+            priority=EventPriority.NORMAL,
+            team_id=lease.team_id
+        ))
+
     async def _process_queue(self, resource_id: str, team_id: str):
-        """Process queue for released resource"""
-        # Get next in queue (sync call)
-        next_request = resource_locks_db.get_next_in_queue(resource_id, team_id)
-        
-        if next_request:
-            # Notify the waiting owner that resource is ready
-            await self.event_bus.publish(Event(
-                type="resource.ready",
-                payload={
-                    "resource_id": resource_id,
-                    "owner_id": next_request['owner_id']
-                },
-                priority=EventPriority.HIGH,
-                team_id=team_id
+        """Hand the free resource to the next queued owner and wake its waiter"""
+        queue = self._queues.get(resource_id)
+        if not queue or self._get_lease(resource_id) is not None:
+            return
+
+        next_request = heapq.heappop(queue)
+        if not queue:
+            self._queues.pop(resource_id, None)
+
+        lease = self._grant(resource_id, next_request)
+        self._persist(resource_locks_db.remove_from_queue, resource_id, next_request.owner_id, next_request.team_id)
+
+        waiter = self._waiters.get((resource_id, next_request.owner_id))
+        if waiter and not waiter.done():
+            waiter.set_result(True)
+
+        # Notify the waiting owner that resource is ready (and now held by it)
+        await self.event_bus.publish(Event(
+            type="resource.ready",
+            payload={
+                "resource_id": resource_id,
+                "owner_id": next_request.owner_id
+            },
+            priority=EventPriority.HIGH,
+            team_id=next_request.team_id
+        ))
+        await self._publish_acquired(lease, next_request.timeout_seconds)
+
+        print(f"[@lock_manager] 🔔 Ready: {resource_id} for {next_request.owner_id}")
+
+    # =====================================================
+    # DB WRITE-THROUGH / RECOVERY
+    # =====================================================
+
+    def _ensure_writer(self):
+        if self._writes is None:
+            self._writes = asyncio.Queue()
+        if self._writer_task is None or self._writer_task.done():
+            self._writer_task = asyncio.create_task(self._db_writer())
+
+    def _persist(self, func: Callable, *args) -> asyncio.Future:
+        """Queue a DB write (applied in order by the background writer), future resolves to its result"""
+        self._ensure_writer()
+        self._pending_writes += 1
+        future = asyncio.get_running_loop().create_future()
+        self._writes.put_nowait((func, args, future))
+        return future
+
+    async def _db_writer(self):
+        while True:
+            func, args, future = await self._writes.get()
+            try:
+                result = await asyncio.to_thread(func, *args)
+                self.stats['db_writes'] += 1
+                if not future.done():
+                    future.set_result(result)
+            except Exception as e:
+                self.stats['db_errors'] += 1
+                print(f"[@lock_manager] ❌ DB write-through error ({func.__name__}): {e}")
+                if not future.done():
+                    future.set_result(_WRITE_FAILED)
+            finally:
+                self._pending_writes -= 1
+                self._writes.task_done()
+
+    @staticmethod
+    def _parse_timestamp(value: str) -> datetime:
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        if parsed.tzinfo is not None:
+            parsed = (parsed - parsed.utcoffset()).replace(tzinfo=None)
+        return parsed
+
+    async def _recover_from_db(self):
+        """Rebuild leases and queues from the DB (startup)"""
+        try:
+            locks = await asyncio.to_thread(resource_locks_db.get_active_locks)
+            queue_entries = await asyncio.to_thread(resource_locks_db.get_queue_entries)
+        except Exception as e:
+            print(f"[@lock_manager] ⚠️ Could not recover lock state from DB: {e}")
+            return
+
+        self._adopt_locks(locks)
+
+        for entry in queue_entries:
+            queue = self._queues.setdefault(entry['resource_id'], [])
+            if any(request.owner_id == entry['owner_id'] for request in queue):
+                continue
+            heapq.heappush(queue, QueuedRequest(
+                entry.get('priority', 3), next(self._sequence), entry['owner_id'],
+                timeout_seconds=entry.get('timeout_seconds', 3600),
+                team_id=entry.get('team_id', 'default')
             ))
-            
-            print(f"[@lock_manager] 🔔 Ready: {resource_id} for {next_request['owner_id']}")
-    
+
+    def _adopt_locks(self, locks: List[Dict[str, Any]]) -> int:
+        """Add DB locks unknown to the lease table (taken by other processes)"""
+        adopted = 0
+        now = datetime.utcnow()
+        for row in locks:
+            resource_id = row['resource_id']
+            if self._get_lease(resource_id) is not None:
+                continue
+            expires_at = self._parse_timestamp(row['expires_at'])
+            if expires_at <= now:
+                continue
+            self._leases[resource_id] = ResourceLock(
+                resource_id=resource_id,
+                resource_type=row.get('resource_type', 'device'),
+                owner_id=row['owner_id'],
+                owner_type=row.get('owner_type', 'agent'),
+                acquired_at=self._parse_timestamp(row['acquired_at']) if row.get('acquired_at') else now,
+                expires_at=expires_at,
+                priority=row.get('priority', 3),
+                team_id=row.get('team_id', 'default')
+            )
+            self._schedule_expiry(resource_id, (expires_at - now).total_seconds())
+            adopted += 1
+        return adopted
+
     async def _periodic_cleanup(self):
-        """Periodic cleanup task (runs every 30 seconds)"""
+        """Periodic DB cleanup + reconcile with locks taken by other processes (every 30 seconds)"""
         while self._running:
             try:
-                await asyncio.sleep(30)
-                
-                # Cleanup expired locks (sync call)
-                expired = resource_locks_db.cleanup_expired_locks()
-                
+                await asyncio.sleep(RECONCILE_INTERVAL_SECONDS)
+
+                # Cleanup expired rows (in-memory expiry is handled by timers)
+                expired = await asyncio.to_thread(resource_locks_db.cleanup_expired_locks)
                 if expired:
                     print(f"[@lock_manager] 🧹 Cleaned up {len(expired)} expired locks")
-                    
-                    # Process queues for released resources
-                    for lock in expired:
-                        await self._process_queue(lock['resource_id'], 'default')
-                        
+
+                # Skip while our own writes are in flight (DB may still show leases released in memory)
+                if self._pending_writes:
+                    continue
+                locks = await asyncio.to_thread(resource_locks_db.get_active_locks)
+                if self._pending_writes:
+                    continue
+                adopted = self._adopt_locks(locks)
+                if adopted:
+                    print(f"[@lock_manager] 🔄 Adopted {adopted} external locks from DB")
+
             except asyncio.CancelledError:
                 break
             except Exception as e:
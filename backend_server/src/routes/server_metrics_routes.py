@@ -17,6 +17,7 @@ No legacy code or backward compatibility - follows the clean embedded architectu
 from flask import Blueprint, jsonify, request
 from shared.src.lib.database.navigation_metrics_db import (
     get_tree_metrics,
+    get_tree_window_metrics,
     get_action_execution_history,
     get_verification_execution_history
 )
@@ -177,6 +178,47 @@ def get_tree_metrics_api(tree_id):
         }), 500
 
 
+@server_metrics_bp.route('/tree/<tree_id>/windows', methods=['GET'])
+def get_tree_window_metrics_api(tree_id):
+    """
+    Get rolling window metrics (volume, success rate, avg/p50/p95 duration) for a tree.
+    
+    Query params: team_id, windows (comma-separated subset of 1h,24h,7d - default all)
+    Served from the pre-aggregated rollup cache (no execution_results scan).
+    """
+    error = check_supabase()
+    if error:
+        return error
+        
+    team_id = request.args.get('team_id')
+    if not team_id:
+        return jsonify({'success': False, 'error': 'team_id is required'}), 400
+    
+    try:
+        from shared.src.lib.utils.navigation_metrics_rollup import ROLLUP_WINDOWS
+        
+        windows = [w for w in request.args.get('windows', '').split(',') if w] or list(ROLLUP_WINDOWS)
+        unknown = [w for w in windows if w not in ROLLUP_WINDOWS]
+        if unknown:
+            return jsonify({
+                'success': False,
+                'error': f"Unknown window(s): {', '.join(unknown)} (available: {', '.join(ROLLUP_WINDOWS)})"
+            }), 400
+        
+        return jsonify({
+            'success': True,
+            'tree_id': tree_id,
+            'windows': get_tree_window_metrics(team_id, tree_id, windows)
+        })
+        
+    except Exception as e:
+        print(f"[@route:metrics:get_tree_window_metrics] ERROR: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': f'Server error: {str(e)}'
+        }), 500
+
+
 # =====================================================
 # INDIVIDUAL METRICS ENDPOINTS
 # =====================================================
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Navigation Metrics Rollup Benchmark
+
+Generates synthetic execution_results rows spread over 7 days for one tree,
+folds them batch by batch exactly like the execution results recorder does
+(fold_execution_results + a local stand-in for merge_navigation_metric_rollups),
+then measures the read side served by NavigationMetricsCache:
+
+- fold:        client-side aggregation throughput (rows/s)
+- compact:     store after the hourly compaction of buckets older than 25h
+- cold load:   first cache fill from the rollup store
+- window:      1h / 24h / 7d query (uncached, then cached)
+- refresh:     incremental refresh after a new batch is recorded
+- raw scan:    the same 24h metrics computed from the raw rows (what a
+               query over execution_results would have to do)
+
+Usage (from repository root):
+    python scripts/benchmark_navigation_metrics.py
+    python scripts/benchmark_navigation_metrics.py --rows 1000000 --edges 150 --nodes 100
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from shared.src.lib.utils.navigation_metrics_rollup import (  # noqa: E402
+    HISTOGRAM_SIZE,
+    NavigationMetricsCache,
+    ROLLUP_COMPACT_AFTER_SECONDS,
+    ROLLUP_COMPACT_BUCKET_SECONDS,
+    ROLLUP_WINDOWS,
+    fold_execution_results,
+)
+
+TEAM_ID = 'benchmark-team'
+TREE_ID = 'benchmark-tree'
+BATCH_SIZE = 200  # EXECUTION_RESULTS_BATCH_SIZE
+
+
+class RollupStore:
+    """In-memory stand-in for navigation_metric_rollups (merge + compaction functions)"""
+
+    def __init__(self):
+        self.rows = {}
+
+    def compact(self, now):
+        """retention.compact_navigation_metric_rollups: old buckets -> hour buckets"""
+        cutoff = (now - ROLLUP_COMPACT_AFTER_SECONDS) // ROLLUP_COMPACT_BUCKET_SECONDS * ROLLUP_COMPACT_BUCKET_SECONDS
+        moved = {}
+        for key, row in list(self.rows.items()):
+            epoch = datetime.fromisoformat(row['bucket_start']).timestamp()
+            if epoch < cutoff and epoch % ROLLUP_COMPACT_BUCKET_SECONDS:
+                del self.rows[key]
+                hour = epoch // ROLLUP_COMPACT_BUCKET_SECONDS * ROLLUP_COMPACT_BUCKET_SECONDS
+                moved.setdefault(hour, []).append(dict(row, bucket_start=datetime.fromtimestamp(hour, tz=timezone.utc).isoformat()))
+        for hour, rows in moved.items():
+            # Stamped when the hourly job would have compacted this hour
+            self.merge(rows, hour + ROLLUP_COMPACT_AFTER_SECONDS + ROLLUP_COMPACT_BUCKET_SECONDS)
+
+    def merge(self, deltas, updated_at=None):
+        """merge_navigation_metric_rollups: add deltas, stamp updated_at (epoch, default: now)"""
+        updated_at = datetime.fromtimestamp(updated_at or time.time(), tz=timezone.utc).isoformat()
+        for delta in deltas:
+            key = (delta['element_type'], delta['element_id'], delta['action_set_id'], delta['bucket_start'])
+            row = self.rows.get(key)
+            if row is None:
+                self.rows[key] = dict(delta, duration_histogram=list(delta['duration_histogram']), updated_at=updated_at)
+                continue
+            row['executions'] += delta['executions']
+            row['successes'] += delta['successes']
+            row['total_ms'] += delta['total_ms']
+            row['duration_histogram'] = [a + b for a, b in zip(row['duration_histogram'], delta['duration_histogram'])]
+            row['updated_at'] = updated_at
+
+    def fetch(self, team_id, tree_id, since, updated_since=None):
+        since = datetime.fromisoformat(since).timestamp()
+        updated_since = datetime.fromisoformat(updated_since).timestamp() if updated_since else None
+        rows = (row for row in self.rows.values()
+                if datetime.fromisoformat(row['bucket_start']).timestamp() >= since
+                and (updated_since is None or datetime.fromisoformat(row['updated_at']).timestamp() > updated_since))
+        return sorted(rows, key=lambda row: row['bucket_start'])
+
+
+def generate_rows(count, edges, nodes, now, seed=42):
+    """Execution rows in time order over the last 7 days (edge actions + node verifications)"""
+    rng = random.Random(seed)
+    start = now - ROLLUP_WINDOWS['7d']
+    step = ROLLUP_WINDOWS['7d'] / count
+    # Per-element characteristics: base duration and success probability
+    edge_profile = [(f"edge_{i}", f"edge_{i}_{d}", rng.uniform(300, 4000), rng.uniform(0.7, 1.0)) for i in range(edges) for d in ('fwd', 'rev')]
+    node_profile = [(f"node_{i}", rng.uniform(100, 1500), rng.uniform(0.8, 1.0)) for i in range(nodes)]
+
+    for n in range(count):
+        executed_at = datetime.fromtimestamp(start + n * step, tz=timezone.utc).isoformat()
+        if rng.random() < 0.6:
+            edge_id, action_set_id, base_ms, success_p = rng.choice(edge_profile)
+            yield {'team_id': TEAM_ID, 'tree_id': TREE_ID, 'edge_id': edge_id, 'action_set_id': action_set_id,
+                   'success': rng.random() < success_p, 'execution_time_ms': int(rng.lognormvariate(0, 0.4) * base_ms),
+                   'executed_at': executed_at}
+        else:
+            node_id, base_ms, success_p = rng.choice(node_profile)
+            yield {'team_id': TEAM_ID, 'tree_id': TREE_ID, 'node_id': node_id,
+                   'success': rng.random() < success_p, 'execution_time_ms': int(rng.lognormvariate(0, 0.4) * base_ms),
+                   'executed_at': executed_at}
+
+
+def raw_scan_24h(rows, now):
+    """Baseline: 24h window metrics computed from raw rows (volume, success rate, p50/p95)"""
+    cutoff = datetime.fromtimestamp(now - ROLLUP_WINDOWS['24h'], tz=timezone.utc).isoformat()
+    durations = {}
+    successes = {}
+    for row in rows:
+        if row['executed_at'] < cutoff:
+            continue
+        key = row.get('edge_id') or row.get('node_id')
+        durations.setdefault(key, []).append(row['execution_time_ms'])
+        successes[key] = successes.get(key, 0) + (1 if row['success'] else 0)
+    result = {}
+    for key, values in durations.items():
+        values.sort()
+        result[key] = {'volume': len(values), 'success_rate': successes[key] / len(values),
+                       'p50': values[len(values) // 2], 'p95': values[int(len(values) * 0.95) - 1]}
+    return result
+
+
+def timed(fn, repeat=1):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        value = fn()
+        elapsed = (time.perf_counter() - started) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return value, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Navigation metrics rollup benchmark')
+    parser.add_argument('--rows', type=int, default=1_000_000, help='Synthetic execution rows (default: 1M)')
+    parser.add_argument('--edges', type=int, default=150, help='Edges in the tree (2 directions each)')
+    parser.add_argument('--nodes', type=int, default=100, help='Nodes in the tree')
+    args = parser.parse_args()
+
+    now = time.time()
+    store = RollupStore()
+    raw_rows = []
+
+    print(f"[@benchmark:navigation_metrics] Generating and folding {args.rows:,} rows in batches of {BATCH_SIZE}...")
+    fold_ms = 0.0
+    batch = []
+    for row in generate_rows(args.rows, args.edges, args.nodes, now):
+        raw_rows.append(row)
+        batch.append(row)
+        if len(batch) == BATCH_SIZE:
+            started = time.perf_counter()
+            store.merge(fold_execution_results(batch), datetime.fromisoformat(row['executed_at']).timestamp())
+            fold_ms += (time.perf_counter() - started) * 1000
+            batch = []
+    if batch:
+        store.merge(fold_execution_results(batch), datetime.fromisoformat(batch[-1]['executed_at']).timestamp())
+
+    rollup_rows = len(store.rows)
+    _, compact_ms = timed(lambda: store.compact(now))
+
+    cache = NavigationMetricsCache(fetch_rows=store.fetch, ttl=30)
+    rollup, cold_ms = timed(lambda: cache.get_tree(TEAM_ID, TREE_ID))
+
+    results = [
+        ('fold + merge (all batches)', fold_ms, f"{args.rows / (fold_ms / 1000):,.0f} rows/s"),
+        ('rollup rows (5-minute buckets)', None, f"{rollup_rows:,}"),
+        ('rollup rows after compaction', None, f"{len(store.rows):,} ({len(store.rows) * (4 * HISTOGRAM_SIZE + 64) / 1e6:.1f} MB, ~{args.rows / len(store.rows):.0f} executions/row)"),
+        ('cold cache load', cold_ms, f"{len(rollup):,} buckets in memory"),
+    ]
+
+    for window in ROLLUP_WINDOWS:
+        rollup._windows.clear()
+        metrics, uncached_ms = timed(lambda: rollup.window_metrics(window))
+        _, cached_ms = timed(lambda: cache.get_window_metrics(TEAM_ID, TREE_ID, [window]), repeat=100)
+        elements = len(metrics['nodes']) + len(metrics['edges'])
+        results.append((f"window {window} (uncached)", uncached_ms, f"{elements} elements"))
+        results.append((f"window {window} (cached)", cached_ms, ''))
+
+    # Incremental refresh after one more recorder batch
+    new_batch = [dict(row, executed_at=datetime.fromtimestamp(now, tz=timezone.utc).isoformat()) for row in raw_rows[-BATCH_SIZE:]]
+    store.merge(fold_execution_results(new_batch))
+    _, refresh_ms = timed(lambda: cache.get_tree(TEAM_ID, TREE_ID, force_refresh=True))
+    results.append(('incremental refresh (+1 batch)', refresh_ms, f"{cache.stats['rows_fetched']:,} rows fetched in total"))
+
+    _, scan_ms = timed(lambda: raw_scan_24h(raw_rows, now))
+    results.append(('raw scan 24h (baseline)', scan_ms, f"{len(raw_rows):,} rows"))
+
+    print()
+    print(f"{'operation':<34} {'ms':>10}  notes")
+    print('-' * 90)
+    for name, ms, note in results:
+        print(f"{name:<34} {(f'{ms:.3f}' if ms is not None else '-'):>10}  {note}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
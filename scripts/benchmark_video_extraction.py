@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Test Video Extraction Benchmark
+
+Builds a synthetic recording with FFmpeg that looks like a capture folder
+(1s HOT segments at 5fps / keyint 5, one COLD 10-minute chunk built with
++faststart like hot_cold_archiver), then extracts the same test window with:
+
+- legacy:   last N HOT segments merged to MP4, COLD gap cut to its own MP4,
+            both concatenated (_extract_test_video_legacy)
+- segment:  timeline-selected HOT segments + keyframe-aligned COLD cut,
+            stream copy, output probed (segment_extraction_utils.extract_video_window)
+
+Requires ffmpeg and ffprobe on PATH.
+
+Usage (from repository root):
+    python scripts/benchmark_video_extraction.py
+    python scripts/benchmark_video_extraction.py --cold-seconds 540 --hot-seconds 90 --runs 5
+"""
+
+import argparse
+import glob
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from shared.src.lib.utils.segment_extraction_utils import extract_video_window  # noqa: E402
+from shared.src.lib.utils.storage_path_utils import _extract_test_video_legacy  # noqa: E402
+
+
+def build_recording(root: str, cold_seconds: int, hot_seconds: int, segment_format: str) -> float:
+    """Generate segments + COLD chunk under root, return the chunk start timestamp"""
+    src_dir = os.path.join(root, 'src')
+    os.makedirs(src_dir)
+    total = cold_seconds + hot_seconds
+    subprocess.run([
+        'ffmpeg', '-loglevel', 'error', '-y',
+        '-f', 'lavfi', '-i', f'testsrc=size=1280x720:rate=5:duration={total}',
+        '-f', 'lavfi', '-i', f'sine=frequency=440:duration={total}',
+        '-c:v', 'libx264', '-preset', 'ultrafast', '-g', '5', '-keyint_min', '5', '-sc_threshold', '0',
+        '-c:a', 'aac', '-b:a', '64k',
+        '-f', 'segment', '-segment_time', '1', '-segment_format', segment_format, '-reset_timestamps', '1',
+        os.path.join(src_dir, 'segment_%09d.ts')
+    ], check=True)
+    segments = sorted(glob.glob(os.path.join(src_dir, 'segment_*.ts')))
+
+    chunk_start = datetime.now().replace(hour=10, minute=0, second=0, microsecond=0).timestamp()
+    cold_dir = os.path.join(root, 'segments')
+    os.makedirs(os.path.join(cold_dir, '10'))
+    chunk_path = os.path.join(cold_dir, '10', 'chunk_10min_0.mp4')
+    list_path = os.path.join(root, 'chunk_list.txt')
+    with open(list_path, 'w') as f:
+        for segment in segments[:cold_seconds]:
+            f.write(f"file '{segment}'\n")
+    subprocess.run(['ffmpeg', '-loglevel', 'error', '-y', '-f', 'concat', '-safe', '0', '-i', list_path,
+                    '-c', 'copy', '-movflags', '+faststart', chunk_path], check=True)
+    os.utime(chunk_path, (chunk_start + cold_seconds, chunk_start + cold_seconds))
+
+    # HOT keeps a small overlap with the chunk, like the archiver does between runs
+    hot_dir = os.path.join(root, 'hot', 'segments')
+    os.makedirs(hot_dir)
+    for i in range(max(0, cold_seconds - 10), len(segments)):
+        dest = os.path.join(hot_dir, os.path.basename(segments[i]))
+        shutil.copy(segments[i], dest)
+        os.utime(dest, (chunk_start + i + 1, chunk_start + i + 1))
+    return chunk_start
+
+
+def probe(path: str) -> str:
+    result = subprocess.run(['ffmpeg', '-i', path], capture_output=True, text=True)
+    match = re.search(r'Duration: (\d+):(\d+):([\d.]+)', result.stderr)
+    duration = int(match.group(1)) * 3600 + int(match.group(2)) * 60 + float(match.group(3)) if match else 0.0
+    return f"{duration:.1f}s, {os.path.getsize(path) / 1024 / 1024:.1f}MB"
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Test video extraction benchmark')
+    parser.add_argument('--cold-seconds', type=int, default=300, help='Seconds recorded in the COLD chunk')
+    parser.add_argument('--hot-seconds', type=int, default=30, help='Seconds only present in HOT segments')
+    parser.add_argument('--window', type=int, default=200, help='Test duration to extract (ends at the last segment)')
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--segment-format', default='mpegts', help='Container of the 1s segments (mpegts like capture)')
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix='bench_video_extraction_')
+    try:
+        print(f"[@benchmark:video_extraction] Building {args.cold_seconds}s COLD + {args.hot_seconds}s HOT recording in {root}...")
+        chunk_start = build_recording(root, args.cold_seconds, args.hot_seconds, args.segment_format)
+        hot_dir = os.path.join(root, 'hot', 'segments')
+        cold_dir = os.path.join(root, 'segments')
+        end_ts = chunk_start + args.cold_seconds + args.hot_seconds
+        start_ts = end_ts - args.window
+
+        rows = []
+        for name in ('legacy', 'segment'):
+            timings, output = [], os.path.join(root, f'{name}.mp4')
+            for _ in range(args.runs):
+                started = time.perf_counter()
+                if name == 'legacy':
+                    result = _extract_test_video_legacy('bench', datetime.fromtimestamp(start_ts), args.window, output,
+                                                        hot_segments_dir=hot_dir, cold_segments_dir=cold_dir,
+                                                        segment_duration=1.0)
+                    ok = bool(result)
+                else:
+                    ok = extract_video_window(start_ts, end_ts, output, hot_dir, cold_dir, 1.0)['success']
+                timings.append((time.perf_counter() - started) * 1000)
+                if not ok:
+                    break
+            rows.append((name, ok, sorted(timings)[len(timings) // 2], probe(output) if ok else 'failed'))
+
+        print()
+        print(f"{'path':<12} {'median ms':>10}  output")
+        print('-' * 60)
+        for name, ok, ms, note in rows:
+            print(f"{name:<12} {ms:>10.1f}  {note}")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
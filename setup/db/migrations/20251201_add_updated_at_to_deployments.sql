@@ -0,0 +1,39 @@
+-- Migration: Add updated_at column (auto-maintained) to deployments table
+-- Purpose: Let host schedulers sync incrementally (WHERE updated_at > last seen) instead of reloading every deployment
+-- Date: 2025-12-01
+
+-- Add updated_at column if it doesn't exist
+DO $$ 
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM information_schema.columns 
+        WHERE table_name = 'deployments' 
+        AND column_name = 'updated_at'
+    ) THEN
+        ALTER TABLE deployments 
+        ADD COLUMN updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW() NOT NULL;
+        
+        RAISE NOTICE 'Added updated_at column to deployments table';
+    ELSE
+        RAISE NOTICE 'Column updated_at already exists in deployments table';
+    END IF;
+END $$;
+
+-- Bump updated_at on every change
+CREATE OR REPLACE FUNCTION set_deployments_updated_at()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.updated_at = NOW();
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS deployments_set_updated_at ON deployments;
+CREATE TRIGGER deployments_set_updated_at
+    BEFORE UPDATE ON deployments
+    FOR EACH ROW
+    EXECUTE FUNCTION set_deployments_updated_at();
+
+CREATE INDEX IF NOT EXISTS idx_deployments_host_updated ON deployments(host_name, updated_at);
+
+COMMENT ON COLUMN deployments.updated_at IS 'Last modification time (trigger-maintained) - used by host schedulers for incremental sync';
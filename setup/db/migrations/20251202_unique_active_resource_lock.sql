@@ -0,0 +1,18 @@
+-- Migration: One lock row per resource in resource_locks
+-- Purpose: Let lock owners (server ResourceLockManager, host campaign executors) acquire with a
+--          conditional insert (INSERT ... ON CONFLICT (resource_id) DO NOTHING) so two owners can
+--          never hold the same resource. Expired rows are deleted by trigger_cleanup_expired_locks
+--          before every insert, so the index only ever sees active locks.
+-- Date: 2025-12-02
+
+-- Drop expired rows, then keep only the most recent lock of each resource
+DELETE FROM resource_locks WHERE expires_at < NOW();
+
+DELETE FROM resource_locks a
+USING resource_locks b
+WHERE a.resource_id = b.resource_id
+  AND (a.acquired_at, a.id) < (b.acquired_at, b.id);
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_resource_locks_resource_unique ON resource_locks(resource_id);
+
+COMMENT ON INDEX idx_resource_locks_resource_unique IS 'One active lock per resource (expired rows are removed by trigger_cleanup_expired_locks before insert)';
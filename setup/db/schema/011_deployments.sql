@@ -38,6 +38,7 @@ CREATE TABLE deployments (
     
     -- Timestamps and audit
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW() NOT NULL,
     created_by UUID REFERENCES auth.users(id)
 );
 
@@ -67,10 +68,25 @@ CREATE INDEX idx_deployments_status ON deployments(status);
 CREATE INDEX idx_deployments_cron ON deployments(cron_expression) WHERE status = 'active';
 CREATE INDEX idx_deployments_next_run ON deployments(last_executed_at) WHERE status = 'active';
 CREATE INDEX idx_deployments_scheduled_today ON deployments USING GIN (scheduled_today);
+CREATE INDEX idx_deployments_host_updated ON deployments(host_name, updated_at);
 CREATE INDEX idx_deployment_executions_deployment ON deployment_executions(deployment_id);
 CREATE INDEX idx_deployment_executions_started ON deployment_executions(started_at DESC);
 CREATE INDEX idx_deployment_executions_status ON deployment_executions(status, scheduled_at);
 
+-- Bump updated_at on every change (host schedulers sync incrementally on it)
+CREATE OR REPLACE FUNCTION set_deployments_updated_at()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.updated_at = NOW();
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER deployments_set_updated_at
+    BEFORE UPDATE ON deployments
+    FOR EACH ROW
+    EXECUTE FUNCTION set_deployments_updated_at();
+
 -- Enable Row Level Security
 ALTER TABLE deployments ENABLE ROW LEVEL SECURITY;
 ALTER TABLE deployment_executions ENABLE ROW LEVEL SECURITY;
@@ -91,7 +107,7 @@ GRANT SELECT, INSERT, UPDATE, DELETE ON deployments TO authenticated;
 GRANT SELECT, INSERT, UPDATE, DELETE ON deployment_executions TO authenticated;
 
 -- Add comments for documentation
-COMMENT ON TABLE deployments IS 'Periodic Deployment System - scheduled script executions managed by APScheduler with cron expressions';
+COMMENT ON TABLE deployments IS 'Periodic Deployment System - scheduled script executions managed by the host deployment scheduler with cron expressions';
 COMMENT ON COLUMN deployments.name IS 'User-friendly deployment name';
 COMMENT ON COLUMN deployments.host_name IS 'Target host for deployment execution';
 COMMENT ON COLUMN deployments.device_id IS 'Target device identifier';
@@ -103,6 +119,7 @@ COMMENT ON COLUMN deployments.max_executions IS 'Optional: Maximum number of exe
 COMMENT ON COLUMN deployments.execution_count IS 'Number of times this deployment has executed';
 COMMENT ON COLUMN deployments.last_executed_at IS 'Timestamp of last execution';
 COMMENT ON COLUMN deployments.status IS 'Deployment status: active, paused, stopped, completed, or expired';
+COMMENT ON COLUMN deployments.updated_at IS 'Last modification time (trigger-maintained) - used by host schedulers for incremental sync';
 COMMENT ON COLUMN deployments.scheduled_today IS 'JSON array of scheduled execution times for today with estimated durations [{"start": "...", "end": "..."}]';
 COMMENT ON TABLE deployment_executions IS 'History of deployment executions - skips if device locked';
 COMMENT ON COLUMN deployment_executions.script_result_id IS 'Link to script_results table for execution details';
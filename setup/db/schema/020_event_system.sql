@@ -66,8 +66,11 @@ CREATE INDEX idx_resource_locks_expires ON resource_locks(expires_at);
 CREATE INDEX idx_resource_locks_team ON resource_locks(team_id);
 CREATE INDEX idx_resource_locks_type ON resource_locks(resource_type);
 
--- Note: Removed partial unique index due to NOW() not being IMMUTABLE
--- Lock uniqueness enforced at application level
+-- One lock row per resource: a partial index on active rows is impossible (NOW() is not
+-- IMMUTABLE), but expired rows are deleted by trigger_cleanup_expired_locks before every
+-- insert, so a plain unique index only ever sees active locks. Owners acquire with
+-- INSERT ... ON CONFLICT (resource_id) DO NOTHING.
+CREATE UNIQUE INDEX idx_resource_locks_resource_unique ON resource_locks(resource_id);
 
 -- Add comments
 COMMENT ON TABLE resource_locks IS 'Tracks exclusive locks on resources for parallel execution safety';
@@ -0,0 +1,227 @@
+-- Rolling window navigation metrics (1h / 24h / 7d)
+-- Compact pre-aggregated buckets of execution_results per node / edge direction,
+-- merged by hosts as execution results are recorded and served by the metrics API
+-- from an in-memory cache - history is never re-scanned.
+-- Created: 2025-12-08
+
+-- ============================================================================
+-- ROLLUP TABLE
+-- One row per element and 5-minute bucket (hour bucket once older than 25h):
+-- counters + fixed log-spaced duration histogram
+-- (bounds in shared/src/lib/utils/navigation_metrics_rollup.py)
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS navigation_metric_rollups (
+    team_id uuid NOT NULL REFERENCES teams(id) ON DELETE CASCADE,
+    tree_id uuid NOT NULL REFERENCES navigation_trees(id) ON DELETE CASCADE,
+    element_type varchar(4) NOT NULL CHECK (element_type IN ('node', 'edge')),
+    element_id varchar NOT NULL,
+    action_set_id varchar NOT NULL DEFAULT '',  -- Edge direction ('' for nodes)
+    bucket_start timestamp with time zone NOT NULL,
+    executions integer NOT NULL DEFAULT 0,
+    successes integer NOT NULL DEFAULT 0,
+    total_ms bigint NOT NULL DEFAULT 0,
+    duration_histogram integer[] NOT NULL,
+    updated_at timestamp with time zone NOT NULL DEFAULT NOW(),  -- Bumped by every merge / compaction
+    CONSTRAINT navigation_metric_rollups_pkey PRIMARY KEY (team_id, tree_id, element_type, element_id, action_set_id, bucket_start)
+);
+
+-- Cold cache load: one tree, buckets of the longest window
+CREATE INDEX IF NOT EXISTS idx_navigation_metric_rollups_tree_bucket
+ON navigation_metric_rollups(team_id, tree_id, bucket_start);
+
+-- Incremental cache refresh: rows of one tree changed since the last refresh
+CREATE INDEX IF NOT EXISTS idx_navigation_metric_rollups_tree_updated
+ON navigation_metric_rollups(team_id, tree_id, updated_at);
+
+ALTER TABLE navigation_metric_rollups ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "navigation_metric_rollups_access_policy" ON navigation_metric_rollups;
+CREATE POLICY "navigation_metric_rollups_access_policy" ON navigation_metric_rollups
+FOR ALL 
+TO public
+USING ((auth.uid() IS NULL) OR (auth.role() = 'service_role'::text) OR true);
+
+COMMENT ON TABLE navigation_metric_rollups IS 'Pre-aggregated 5-minute buckets of execution_results per node/edge direction for rolling window metrics';
+COMMENT ON COLUMN navigation_metric_rollups.duration_histogram IS 'Execution time counts per log-spaced bin (last bin = overflow)';
+
+-- ============================================================================
+-- MERGE FUNCTION
+-- Adds a batch of client-folded deltas (unique per key) to the stored buckets
+-- ============================================================================
+
+CREATE OR REPLACE FUNCTION public.merge_navigation_metric_rollups(p_rows jsonb)
+RETURNS integer
+LANGUAGE plpgsql
+SET search_path = ''
+AS $$
+DECLARE
+    v_merged integer;
+BEGIN
+    INSERT INTO public.navigation_metric_rollups AS r (
+        team_id, tree_id, element_type, element_id, action_set_id, bucket_start,
+        executions, successes, total_ms, duration_histogram
+    )
+    SELECT
+        (x->>'team_id')::uuid,
+        (x->>'tree_id')::uuid,
+        x->>'element_type',
+        x->>'element_id',
+        COALESCE(x->>'action_set_id', ''),
+        (x->>'bucket_start')::timestamptz,
+        (x->>'executions')::integer,
+        (x->>'successes')::integer,
+        (x->>'total_ms')::bigint,
+        ARRAY(SELECT jsonb_array_elements_text(x->'duration_histogram')::integer)
+    FROM jsonb_array_elements(p_rows) AS x
+    ON CONFLICT (team_id, tree_id, element_type, element_id, action_set_id, bucket_start) DO UPDATE SET
+        executions = r.executions + EXCLUDED.executions,
+        successes = r.successes + EXCLUDED.successes,
+        total_ms = r.total_ms + EXCLUDED.total_ms,
+        duration_histogram = ARRAY(
+            SELECT COALESCE(a, 0) + COALESCE(b, 0)
+            FROM unnest(r.duration_histogram, EXCLUDED.duration_histogram) AS t(a, b)
+        ),
+        updated_at = NOW();
+
+    GET DIAGNOSTICS v_merged = ROW_COUNT;
+    RETURN v_merged;
+END;
+$$;
+
+COMMENT ON FUNCTION public.merge_navigation_metric_rollups(jsonb) IS
+  'Adds rollup deltas (counters + histogram) to navigation_metric_rollups - called with one batch per execution_results flush';
+
+-- ============================================================================
+-- COMPACTION
+-- 5-minute buckets older than 25 hours are merged into hour buckets
+-- (1h window keeps its resolution, 24h/7d windows need ~12x fewer rows)
+-- ============================================================================
+
+CREATE SCHEMA IF NOT EXISTS retention;
+
+CREATE OR REPLACE FUNCTION retention.compact_navigation_metric_rollups()
+RETURNS integer
+LANGUAGE plpgsql
+SECURITY DEFINER
+AS $$
+DECLARE
+    v_compacted integer;
+BEGIN
+    -- Hour-aligned buckets stay in place and absorb the other buckets of their hour
+    WITH moved AS (
+        DELETE FROM public.navigation_metric_rollups
+        WHERE bucket_start < date_trunc('hour', NOW() - INTERVAL '25 hours')
+          AND bucket_start <> date_trunc('hour', bucket_start)
+        RETURNING *
+    ),
+    histograms AS (
+        SELECT team_id, tree_id, element_type, element_id, action_set_id,
+               date_trunc('hour', bucket_start) AS hour_start, h.i, SUM(h.v)::integer AS v
+        FROM moved, unnest(duration_histogram) WITH ORDINALITY AS h(v, i)
+        GROUP BY 1, 2, 3, 4, 5, 6, 7
+    ),
+    totals AS (
+        SELECT team_id, tree_id, element_type, element_id, action_set_id,
+               date_trunc('hour', bucket_start) AS hour_start,
+               SUM(executions)::integer AS executions, SUM(successes)::integer AS successes, SUM(total_ms)::bigint AS total_ms
+        FROM moved
+        GROUP BY 1, 2, 3, 4, 5, 6
+    )
+    INSERT INTO public.navigation_metric_rollups AS r (
+        team_id, tree_id, element_type, element_id, action_set_id, bucket_start,
+        executions, successes, total_ms, duration_histogram
+    )
+    SELECT t.team_id, t.tree_id, t.element_type, t.element_id, t.action_set_id, t.hour_start,
+           t.executions, t.successes, t.total_ms,
+           ARRAY(
+               SELECT h.v FROM histograms h
+               WHERE h.team_id = t.team_id AND h.tree_id = t.tree_id AND h.element_type = t.element_type
+                 AND h.element_id = t.element_id AND h.action_set_id = t.action_set_id AND h.hour_start = t.hour_start
+               ORDER BY h.i
+           )
+    FROM totals t
+    ON CONFLICT (team_id, tree_id, element_type, element_id, action_set_id, bucket_start) DO UPDATE SET
+        executions = r.executions + EXCLUDED.executions,
+        successes = r.successes + EXCLUDED.successes,
+        total_ms = r.total_ms + EXCLUDED.total_ms,
+        duration_histogram = ARRAY(
+            SELECT COALESCE(a, 0) + COALESCE(b, 0)
+            FROM unnest(r.duration_histogram, EXCLUDED.duration_histogram) AS t(a, b)
+        ),
+        updated_at = NOW();
+
+    GET DIAGNOSTICS v_compacted = ROW_COUNT;
+    RETURN v_compacted;
+END;
+$$;
+
+COMMENT ON FUNCTION retention.compact_navigation_metric_rollups() IS
+  'Merges 5-minute navigation_metric_rollups buckets older than 25 hours into hour buckets. Scheduled hourly via pg_cron.';
+
+SELECT cron.schedule(
+  'navigation-rollups-compact',
+  '7 * * * *',
+  'SELECT retention.compact_navigation_metric_rollups();'
+);
+
+-- ============================================================================
+-- RETENTION (8 days - longest window is 7d)
+-- ============================================================================
+
+CREATE OR REPLACE FUNCTION retention.cleanup_navigation_metric_rollups()
+RETURNS TABLE(
+  deleted_count INTEGER,
+  table_name TEXT,
+  retention_days INTEGER
+)
+LANGUAGE plpgsql
+SECURITY DEFINER
+AS $$
+DECLARE
+  v_deleted_count INTEGER;
+BEGIN
+  DELETE FROM public.navigation_metric_rollups
+  WHERE bucket_start < NOW() - INTERVAL '8 days';
+  
+  GET DIAGNOSTICS v_deleted_count = ROW_COUNT;
+  
+  RAISE NOTICE '[retention] Deleted % records from navigation_metric_rollups (8 day retention)', v_deleted_count;
+  
+  RETURN QUERY SELECT v_deleted_count, 'navigation_metric_rollups'::TEXT, 8;
+END;
+$$;
+
+COMMENT ON FUNCTION retention.cleanup_navigation_metric_rollups() IS 
+  'Deletes navigation_metric_rollups buckets older than 8 days (longest rolling window is 7 days)';
+
+CREATE OR REPLACE FUNCTION retention.cleanup_all()
+RETURNS TABLE(
+  deleted_count INTEGER,
+  table_name TEXT,
+  retention_days INTEGER,
+  executed_at TIMESTAMPTZ
+)
+LANGUAGE plpgsql
+SECURITY DEFINER
+AS $$
+BEGIN
+  RAISE NOTICE '[retention] Starting scheduled cleanup at %', NOW();
+  
+  RETURN QUERY
+  SELECT *, NOW() as executed_at FROM retention.cleanup_system_device_metrics()
+  UNION ALL
+  SELECT *, NOW() as executed_at FROM retention.cleanup_system_metrics()
+  UNION ALL
+  SELECT *, NOW() as executed_at FROM retention.cleanup_alerts()
+  UNION ALL
+  SELECT *, NOW() as executed_at FROM retention.cleanup_execution_results()
+  UNION ALL
+  SELECT *, NOW() as executed_at FROM retention.cleanup_navigation_metric_rollups();
+  
+  RAISE NOTICE '[retention] Completed scheduled cleanup at %', NOW();
+END;
+$$;
+
+GRANT EXECUTE ON FUNCTION retention.cleanup_navigation_metric_rollups() TO postgres, service_role;
+GRANT EXECUTE ON FUNCTION retention.compact_navigation_metric_rollups() TO postgres, service_role;
@@ -47,6 +47,31 @@ def log_event(
         return False
 
 
+def log_events(events: List[Dict[str, Any]]) -> int:
+    """
+    Batch-insert events into event_log (one round-trip).
+
+    Args:
+        events: Rows with event_id, event_type, payload, priority, timestamp (ISO string), team_id
+
+    Returns:
+        Number of rows inserted (0 on failure)
+    """
+    if not events:
+        return 0
+
+    supabase = get_supabase()
+    if not supabase:
+        return 0
+
+    try:
+        supabase.table('event_log').insert(events).execute()
+        return len(events)
+    except Exception as e:
+        print(f"[@events_db] ⚠️ Failed to log {len(events)} events: {e}")
+        return 0
+
+
 def get_routing_stats(team_id: str = DEFAULT_TEAM_ID) -> Dict[str, Any]:
     """Get event routing statistics for last 24 hours."""
     supabase = get_supabase()
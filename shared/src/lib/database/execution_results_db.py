@@ -4,6 +4,11 @@ Execution Results Database Operations
 This module provides functions for managing execution results in the database.
 Execution results track edge actions and node verifications with metrics.
 Now aligned with embedded actions/verifications architecture.
+
+PERFORMANCE: record_* and update_*_metrics_* hand their rows to the batching
+ExecutionResultsRecorder (bulk insert/upsert from a background thread) and
+return immediately. Pass immediate=True when the row must exist right away
+(e.g. an execution_result the KPI executor updates by id).
 """
 
 from datetime import datetime, timezone
@@ -11,11 +16,52 @@ from typing import Dict, List, Optional
 from uuid import uuid4
 
 from shared.src.lib.utils.supabase_utils import get_supabase_client
+from shared.src.lib.database.execution_results_recorder import EXECUTION_RESULTS_BATCHING, get_execution_results_recorder
 
 def get_supabase():
     """Get the Supabase client instance."""
     return get_supabase_client()
 
+def write_execution_batch(table: str, rows: List[Dict], on_conflict: Optional[str] = None) -> bool:
+    """
+    Bulk insert (or upsert when on_conflict is given) rows in one round-trip. Used by the recorder.
+    Client errors are raised, so the recorder can tell rejected rows from an unreachable database.
+    """
+    if not rows:
+        return True
+    supabase = get_supabase()
+    if on_conflict:
+        result = supabase.table(table).upsert(rows, on_conflict=on_conflict).execute()
+    else:
+        result = supabase.table(table).insert(rows).execute()
+
+    if not result.data:
+        return False
+    
+    if table == 'execution_results':
+        _merge_rollups(rows)
+    return True
+
+def _merge_rollups(rows: List[Dict]):
+    """Fold written execution_results into rolling window rollups (1h/24h/7d metrics) - no history re-scan"""
+    from shared.src.lib.utils.navigation_metrics_rollup import fold_execution_results
+    from shared.src.lib.database.navigation_metrics_db import merge_metric_rollups
+    merge_metric_rollups(fold_execution_results(rows))
+
+def _defer_insert(table: str, row: Dict, immediate: bool) -> bool:
+    """Queue row on the batching recorder. False when it must be written synchronously."""
+    if immediate or not EXECUTION_RESULTS_BATCHING:
+        return False
+    get_execution_results_recorder().record(table, row)
+    return True
+
+def _defer_upsert(table: str, row: Dict, on_conflict: str, immediate: bool) -> bool:
+    """Queue metrics upsert on the batching recorder (aggregated per conflict key)."""
+    if immediate or not EXECUTION_RESULTS_BATCHING:
+        return False
+    get_execution_results_recorder().record_upsert(table, row, on_conflict)
+    return True
+
 def get_execution_results(
     team_id: str,
     execution_type: Optional[str] = None,
@@ -173,9 +219,10 @@ def record_edge_execution(
     script_result_id: Optional[str] = None,
     script_context: str = 'direct',
     action_set_id: Optional[str] = None,
-    device_name: Optional[str] = None
+    device_name: Optional[str] = None,
+    immediate: bool = False
 ) -> Optional[str]:
-    """Record edge action execution directly to database."""
+    """Record edge action execution (batched unless immediate=True)."""
     try:
         execution_id = str(uuid4())
         
@@ -200,10 +247,14 @@ def record_edge_execution(
         
         print(f"[@db:execution_results:record_edge_execution] {execution_id[:8]} | {action_set_id or 'N/A'} | {host_name}:{device_model} | {'✓' if success else '✗'} {execution_time_ms}ms | {message}")
         
+        if _defer_insert('execution_results', execution_data, immediate):
+            return execution_id
+        
         supabase = get_supabase()
         result = supabase.table('execution_results').insert(execution_data).execute()
         
         if result.data:
+            _merge_rollups([execution_data])  # Direct writes (immediate / batching disabled) feed the rollups too
             print(f"[@db:execution_results:record_edge_execution] ✓ Recorded: {execution_id[:8]}")
             return execution_id
         else:
@@ -226,9 +277,10 @@ def record_node_execution(
     error_details: Optional[Dict] = None,
     script_result_id: Optional[str] = None,
     script_context: str = 'direct',
-    device_name: Optional[str] = None
+    device_name: Optional[str] = None,
+    immediate: bool = False
 ) -> Optional[str]:
-    """Record node verification execution directly to database."""
+    """Record node verification execution (batched unless immediate=True)."""
     try:
         execution_id = str(uuid4())
         
@@ -255,10 +307,14 @@ def record_node_execution(
         node_id_short = node_id[:8] if node_id else 'none'
         print(f"[@db:execution_results:record_node_execution] {execution_id_short} | node:{node_id_short} | {host_name}:{device_model} | {'✓' if success else '✗'} {execution_time_ms}ms | {message}")
         
+        if _defer_insert('execution_results', execution_data, immediate):
+            return execution_id
+        
         supabase = get_supabase()
         result = supabase.table('execution_results').insert(execution_data).execute()
         
         if result.data:
+            _merge_rollups([execution_data])  # Direct writes (immediate / batching disabled) feed the rollups too
             print(f"[@db:execution_results:record_node_execution] ✓ Recorded: {execution_id[:8]}")
             return execution_id
         else:
@@ -285,9 +341,10 @@ def record_action_execution(
     error_message: Optional[str] = None,
     error_details: Optional[Dict] = None,
     device_name: Optional[str] = None,
-    device_model: Optional[str] = None
+    device_model: Optional[str] = None,
+    immediate: bool = False
 ) -> Optional[str]:
-    """Record individual action execution to history table."""
+    """Record individual action execution to history table (batched unless immediate=True)."""
     try:
         action_execution_id = execution_id or str(uuid4())
         
@@ -318,6 +375,9 @@ def record_action_execution(
         print(f"  - success: {success}")
         print(f"  - execution_time_ms: {execution_time_ms}")
         
+        if _defer_insert('action_execution_history', action_data, immediate):
+            return action_execution_id
+        
         supabase = get_supabase()
         result = supabase.table('action_execution_history').insert(action_data).execute()
         
@@ -349,9 +409,10 @@ def record_verification_execution(
     confidence_score: Optional[float] = None,
     result_data: Optional[Dict] = None,
     device_name: Optional[str] = None,
-    device_model: Optional[str] = None
+    device_model: Optional[str] = None,
+    immediate: bool = False
 ) -> Optional[str]:
-    """Record individual verification execution to history table."""
+    """Record individual verification execution to history table (batched unless immediate=True)."""
     try:
         verification_execution_id = execution_id or str(uuid4())
         
@@ -383,6 +444,9 @@ def record_verification_execution(
         print(f"  - success: {success}")
         print(f"  - execution_time_ms: {execution_time_ms}")
         
+        if _defer_insert('verification_execution_history', verification_data, immediate):
+            return verification_execution_id
+        
         supabase = get_supabase()
         result = supabase.table('verification_execution_history').insert(verification_data).execute()
         
@@ -569,9 +633,10 @@ def update_node_metrics_from_embedded_verifications(
     team_id: str,
     tree_id: str,
     node_id: str,
-    verifications: List[Dict]
+    verifications: List[Dict],
+    immediate: bool = False
 ) -> bool:
-    """Update node metrics by analyzing embedded verifications count and types."""
+    """Update node metrics by analyzing embedded verifications count and types (aggregated per node unless immediate=True)."""
     try:
         verification_types = []
         for verification in verifications:
@@ -579,8 +644,6 @@ def update_node_metrics_from_embedded_verifications(
             if v_type and v_type not in verification_types:
                 verification_types.append(v_type)
         
-        supabase = get_supabase()
-        
         # Upsert node metrics with verification metadata
         upsert_data = {
             'node_id': node_id,
@@ -591,6 +654,10 @@ def update_node_metrics_from_embedded_verifications(
             'updated_at': datetime.now(timezone.utc).isoformat()
         }
         
+        if _defer_upsert('node_metrics', upsert_data, 'node_id,tree_id,team_id', immediate):
+            return True
+        
+        supabase = get_supabase()
         result = supabase.table('node_metrics').upsert(
             upsert_data,
             on_conflict='node_id,tree_id,team_id'
@@ -609,9 +676,10 @@ def update_edge_metrics_from_embedded_actions(
     actions: List[Dict],
     retry_actions: List[Dict] = None,
 
-    final_wait_time: int = 2000
+    final_wait_time: int = 2000,
+    immediate: bool = False
 ) -> bool:
-    """Update edge metrics by analyzing embedded actions count and types."""
+    """Update edge metrics by analyzing embedded actions count and types (aggregated per edge unless immediate=True)."""
     try:
         retry_actions = retry_actions or []
 
@@ -627,8 +695,6 @@ def update_edge_metrics_from_embedded_actions(
             if a_type and a_type not in action_types:
                 action_types.append(a_type)
         
-        supabase = get_supabase()
-        
         # Upsert edge metrics with action metadata
         upsert_data = {
             'edge_id': edge_id,
@@ -642,6 +708,10 @@ def update_edge_metrics_from_embedded_actions(
             'updated_at': datetime.now(timezone.utc).isoformat()
         }
         
+        if _defer_upsert('edge_metrics', upsert_data, 'edge_id,tree_id,team_id', immediate):
+            return True
+        
+        supabase = get_supabase()
         result = supabase.table('edge_metrics').upsert(
             upsert_data,
             on_conflict='edge_id,tree_id,team_id'
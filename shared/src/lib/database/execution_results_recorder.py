@@ -0,0 +1,380 @@
+"""
+Execution Results Recorder
+
+Batching writer for execution_results_db. record_*_execution() and the
+embedded-metrics updates hand their rows to this recorder instead of doing one
+synchronous Supabase request per action/verification:
+- Rows are buffered per table and bulk-inserted by a background thread
+  (EXECUTION_RESULTS_BATCH_SIZE rows or every EXECUTION_RESULTS_FLUSH_INTERVAL seconds)
+- Metric upserts are aggregated client-side: one row per conflict key (latest
+  snapshot wins), so a 1000-iteration zap writes each edge's metrics once per flush
+- Memory is bounded: at EXECUTION_RESULTS_MAX_PENDING rows the caller flushes synchronously
+- Batches that cannot be written (database unreachable, timeout) are spooled to a
+  local JSONL file and replayed on the next successful flush / recorder start,
+  at most EXECUTION_RESULTS_MAX_REPLAYS times
+- Batches the database rejects (constraint violation, invalid data) are bisected:
+  the valid rows are written, the offending rows go to a dead_letter/ file
+- flush() is called at script end (ScriptExecutor.cleanup_and_exit), at the end of
+  a pooled script run and at interpreter exit. A forked child starts with an empty recorder.
+
+Set EXECUTION_RESULTS_BATCHING=false to write every row synchronously (previous behavior).
+
+Usage:
+    recorder = get_execution_results_recorder()
+    recorder.record('execution_results', row)
+    recorder.record_upsert('edge_metrics', row, on_conflict='edge_id,tree_id,team_id')
+    recorder.flush()
+"""
+
+import atexit
+import glob
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+EXECUTION_RESULTS_BATCHING = os.getenv('EXECUTION_RESULTS_BATCHING', 'true').lower() != 'false'
+EXECUTION_RESULTS_BATCH_SIZE = int(os.getenv('EXECUTION_RESULTS_BATCH_SIZE', '200'))
+EXECUTION_RESULTS_FLUSH_INTERVAL = float(os.getenv('EXECUTION_RESULTS_FLUSH_INTERVAL', '2.0'))
+EXECUTION_RESULTS_MAX_PENDING = int(os.getenv('EXECUTION_RESULTS_MAX_PENDING', '5000'))
+EXECUTION_RESULTS_MAX_REPLAYS = int(os.getenv('EXECUTION_RESULTS_MAX_REPLAYS', '10'))
+EXECUTION_RESULTS_SPOOL_DIR = os.getenv('EXECUTION_RESULTS_SPOOL_DIR', os.path.join(tempfile.gettempdir(), 'virtualpytest', 'execution_results_spool'))
+
+# Errors where retrying the same rows can never succeed (PostgreSQL SQLSTATE / PostgREST codes)
+REJECTED_ERROR_CLASSES = ('22', '23')                       # data exception, integrity constraint violation
+REJECTED_ERROR_CODES = {'42703', 'PGRST102', 'PGRST204'}    # undefined column, invalid body, unknown column
+
+
+def is_rejected_error(error: Exception) -> bool:
+    """True when the database refused the rows themselves, False for connection / server errors"""
+    code = str(getattr(error, 'code', '') or '')
+    return code[:2] in REJECTED_ERROR_CLASSES or code in REJECTED_ERROR_CODES
+
+
+class ExecutionResultsRecorder:
+    """Buffers execution rows and writes them in bulk from a background thread"""
+
+    def __init__(self, write_batch: Optional[Callable[[str, List[Dict[str, Any]], Optional[str]], bool]] = None,
+                 batch_size: int = EXECUTION_RESULTS_BATCH_SIZE, flush_interval: float = EXECUTION_RESULTS_FLUSH_INTERVAL,
+                 max_pending: int = EXECUTION_RESULTS_MAX_PENDING, spool_dir: Optional[str] = EXECUTION_RESULTS_SPOOL_DIR,
+                 max_replays: int = EXECUTION_RESULTS_MAX_REPLAYS, background: bool = True):
+        self._write_batch = write_batch
+        self.background = background
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.max_replays = max_replays
+        self.spool_dir = spool_dir
+        spool_name = f"execution_results_{os.getpid()}_{int(time.time())}.jsonl"
+        self.spool_path = os.path.join(spool_dir, spool_name) if spool_dir else None
+        self.dead_letter_path = os.path.join(spool_dir, 'dead_letter', spool_name) if spool_dir else None
+
+        self._inserts: Dict[str, List[Dict[str, Any]]] = {}        # table -> rows
+        self._upserts: Dict[str, Dict[tuple, Dict[str, Any]]] = {}  # table -> conflict key -> latest row
+        self._conflicts: Dict[str, str] = {}                        # table -> on_conflict columns
+        self._pending = 0
+        self._unwritten = 0                  # Rows spooled / dropped since the last flush() returned
+        self._spooled_since_replay = False
+
+        self._lock = threading.Lock()        # Protects the buffers
+        self._flush_lock = threading.Lock()  # One writer at a time (background thread / caller / exit)
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+
+        self.stats = {'queued': 0, 'coalesced': 0, 'written': 0, 'batches': 0, 'spooled': 0, 'replayed': 0, 'dead_lettered': 0}
+
+    @property
+    def write_batch(self) -> Callable[[str, List[Dict[str, Any]], Optional[str]], bool]:
+        if self._write_batch is None:
+            from shared.src.lib.database.execution_results_db import write_execution_batch
+            self._write_batch = write_execution_batch
+        return self._write_batch
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    # =====================================================
+    # INPUT
+    # =====================================================
+
+    def record(self, table: str, row: Dict[str, Any]):
+        """Queue a row for bulk insert (non-blocking unless the buffer is full)"""
+        with self._lock:
+            self._inserts.setdefault(table, []).append(row)
+            self._pending += 1
+            self.stats['queued'] += 1
+        self._after_queue()
+
+    def record_upsert(self, table: str, row: Dict[str, Any], on_conflict: str):
+        """Queue a metrics upsert - repeats for the same conflict key are merged (latest row wins)"""
+        key = tuple(row.get(column) for column in on_conflict.split(','))
+        with self._lock:
+            rows = self._upserts.setdefault(table, {})
+            self._conflicts[table] = on_conflict
+            if key in rows:
+                self.stats['coalesced'] += 1
+            else:
+                self._pending += 1
+            rows[key] = row
+            self.stats['queued'] += 1
+        self._after_queue()
+
+    def _after_queue(self):
+        self._ensure_started()
+        if self._pending >= self.max_pending:
+            # Backpressure: bounded memory beats an unbounded buffer on a long run
+            print(f"[@execution_results_recorder] ⚠️ {self._pending} rows pending - flushing synchronously")
+            self._flush_buffers()
+        elif self._pending >= self.batch_size:
+            self._wakeup.set()
+
+    def _ensure_started(self):
+        if self._thread is not None or self._closed or not self.background:
+            return
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name="execution-results-recorder", daemon=True)
+            self._thread.start()
+        atexit.register(self.close)
+
+    def _run(self):
+        self.replay()  # Rows spooled by earlier runs (database was unreachable)
+        while not self._closed:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            if self._pending:
+                self._flush_buffers()
+
+    # =====================================================
+    # OUTPUT
+    # =====================================================
+
+    def flush(self) -> bool:
+        """
+        Write every buffered row now.
+
+        False if rows recorded since the previous flush() could not be written (spooled to
+        disk or dropped) - whether this call or the background thread drained them.
+        """
+        self._flush_buffers()
+        with self._lock:
+            unwritten, self._unwritten = self._unwritten, 0
+        return not unwritten
+
+    def _flush_buffers(self) -> bool:
+        """Drain the buffers (caller or background thread). False if the database was unreachable."""
+        with self._flush_lock:
+            with self._lock:
+                inserts, self._inserts = self._inserts, {}
+                upserts, self._upserts = self._upserts, {}
+                conflicts = dict(self._conflicts)
+                self._pending = 0
+
+            batches = []
+            for table, rows in inserts.items():
+                for i in range(0, len(rows), self.batch_size):
+                    batches.append((table, rows[i:i + self.batch_size], None))
+            for table, rows_by_key in upserts.items():
+                rows = list(rows_by_key.values())
+                for i in range(0, len(rows), self.batch_size):
+                    batches.append((table, rows[i:i + self.batch_size], conflicts[table]))
+
+            database_ok = True
+            delivered_before = self.stats['written'] + self.stats['dead_lettered']
+            for table, rows, on_conflict in batches:
+                # After a failure the rest of the flush goes straight to the spool (no timeout per batch)
+                if database_ok:
+                    database_ok = self._deliver(table, rows, on_conflict)
+                else:
+                    self._spool(table, rows, on_conflict)
+            # Rejected rows are dead-lettered on purpose - only rows left for a replay (or lost) count
+            unwritten = sum(len(rows) for _, rows, _ in batches) - (self.stats['written'] + self.stats['dead_lettered'] - delivered_before)
+            if unwritten:
+                with self._lock:
+                    self._unwritten += unwritten
+
+            if database_ok and batches and self._spooled_since_replay:
+                self._replay_locked()
+            return database_ok
+
+    def _deliver(self, table: str, rows: List[Dict[str, Any]], on_conflict: Optional[str], attempts: int = 0) -> bool:
+        """
+        Write rows, bisecting a rejected batch down to the offending rows (dead-lettered).
+        False when the database is unreachable - the unwritten rows are spooled.
+        """
+        status, error = self._write(table, rows, on_conflict)
+        if status == 'written':
+            return True
+        if status == 'failed':
+            self._spool(table, rows, on_conflict, attempts)
+            return False
+        if len(rows) == 1:
+            self._dead_letter(table, rows, on_conflict, error)
+            return True
+        middle = len(rows) // 2
+        if not self._deliver(table, rows[:middle], on_conflict, attempts):
+            self._spool(table, rows[middle:], on_conflict, attempts)
+            return False
+        return self._deliver(table, rows[middle:], on_conflict, attempts)
+
+    def _write(self, table: str, rows: List[Dict[str, Any]], on_conflict: Optional[str]):
+        """Returns ('written' | 'rejected' | 'failed', error message)"""
+        try:
+            ok = self.write_batch(table, rows, on_conflict)
+        except Exception as e:
+            if is_rejected_error(e):
+                return 'rejected', str(e)
+            print(f"[@execution_results_recorder] ⚠️ Failed to write {len(rows)} rows to {table}: {e}")
+            return 'failed', str(e)
+        if not ok:
+            return 'failed', 'no rows returned'
+        self.stats['written'] += len(rows)
+        self.stats['batches'] += 1
+        return 'written', None
+
+    def _spool(self, table: str, rows: List[Dict[str, Any]], on_conflict: Optional[str], attempts: int = 0):
+        if attempts > self.max_replays:
+            self._dead_letter(table, rows, on_conflict, f"not written after {self.max_replays} replays")
+            return
+        if not self.spool_path:
+            print(f"[@execution_results_recorder] ❌ Dropped {len(rows)} {table} rows (database unreachable, no spool dir)")
+            return
+        batch = {'table': table, 'on_conflict': on_conflict, 'rows': rows, 'attempts': attempts}
+        if self._append(self.spool_path, batch):
+            self.stats['spooled'] += len(rows)
+            self._spooled_since_replay = True
+            print(f"[@execution_results_recorder] 💾 Spooled {len(rows)} {table} rows to {self.spool_path}")
+
+    def _dead_letter(self, table: str, rows: List[Dict[str, Any]], on_conflict: Optional[str], error: Optional[str]):
+        """Keep rows that will never be written out of the replay path (inspect / fix / re-import by hand)"""
+        self.stats['dead_lettered'] += len(rows)
+        if not self.dead_letter_path:
+            print(f"[@execution_results_recorder] ❌ Dropped {len(rows)} {table} rows: {error}")
+            return
+        batch = {'table': table, 'on_conflict': on_conflict, 'rows': rows, 'error': error}
+        if self._append(self.dead_letter_path, batch):
+            print(f"[@execution_results_recorder] ❌ Dead-lettered {len(rows)} {table} rows to {self.dead_letter_path}: {error}")
+
+    def _append(self, path: str, batch: Dict[str, Any]) -> bool:
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(batch, default=str) + '\n')
+            return True
+        except OSError as e:
+            print(f"[@execution_results_recorder] ❌ Dropped {len(batch['rows'])} {batch['table']} rows (write to {path} failed: {e})")
+            return False
+
+    # =====================================================
+    # REPLAY
+    # =====================================================
+
+    def replay(self) -> int:
+        """Write rows spooled by this or earlier processes. Returns the number of rows replayed."""
+        with self._flush_lock:
+            return self._replay_locked()
+
+    def _replay_locked(self) -> int:
+        if not self.spool_dir or not os.path.isdir(self.spool_dir):
+            return 0
+
+        self._spooled_since_replay = False
+        replayed = 0
+        for path in sorted(glob.glob(os.path.join(self.spool_dir, '*.jsonl'))):
+            # Claim the file first so concurrent recorders never replay it twice
+            claimed = path + '.replaying'
+            try:
+                os.rename(path, claimed)
+            except OSError:
+                continue
+
+            database_ok = True
+            try:
+                with open(claimed, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        try:
+                            batch = json.loads(line)
+                        except ValueError:
+                            continue  # Torn line from a crash mid-write
+                        table, rows, on_conflict = batch['table'], batch['rows'], batch.get('on_conflict')
+                        attempts = batch.get('attempts', 0)
+                        if not database_ok:
+                            self._spool(table, rows, on_conflict, attempts)   # Not attempted - keeps its count
+                            continue
+                        written_before = self.stats['written']
+                        database_ok = self._deliver(table, rows, on_conflict, attempts + 1)
+                        replayed += self.stats['written'] - written_before
+                os.remove(claimed)
+            except OSError as e:
+                print(f"[@execution_results_recorder] ⚠️ Replay of {path} failed: {e}")
+
+            if not database_ok:
+                break
+
+        if replayed:
+            self.stats['replayed'] += replayed
+            print(f"[@execution_results_recorder] ✅ Replayed {replayed} spooled rows")
+        return replayed
+
+    def close(self):
+        """Flush remaining rows and stop the background thread (script end / interpreter exit)"""
+        if self._closed:
+            return
+        self._closed = True
+        self._wakeup.set()
+        if self._pending:
+            self.flush()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, 'pending': self._pending}
+
+
+# Global recorder instance (one per process)
+_recorder: Optional[ExecutionResultsRecorder] = None
+_recorder_lock = threading.Lock()
+
+
+def get_execution_results_recorder() -> ExecutionResultsRecorder:
+    """Get the process-wide execution results recorder"""
+    global _recorder
+    if _recorder is None:
+        with _recorder_lock:
+            if _recorder is None:
+                _recorder = ExecutionResultsRecorder()
+    return _recorder
+
+
+def _reset_after_fork():
+    """Forked child: start with a fresh recorder (the buffered rows belong to the parent, its thread does not exist here)"""
+    global _recorder, _recorder_lock
+    if _recorder is not None:
+        # The inherited instance is still registered with atexit - it must not write the parent's rows again
+        _recorder._closed = True
+        _recorder._inserts, _recorder._upserts, _recorder._pending, _recorder._unwritten = {}, {}, 0, 0
+    _recorder = None
+    _recorder_lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def flush_execution_results() -> bool:
+    """Write buffered execution results now (no-op if nothing was recorded)"""
+    if _recorder is None:
+        return True
+    return _recorder.flush()
+
+
+def replay_execution_results() -> int:
+    """Replay execution results spooled while the database was unreachable"""
+    return get_execution_results_recorder().replay()
+
+
+if __name__ == '__main__':
+    print(f"[@execution_results_recorder] Replayed {replay_execution_results()} rows from {EXECUTION_RESULTS_SPOOL_DIR}")
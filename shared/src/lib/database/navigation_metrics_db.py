@@ -443,3 +443,69 @@ def update_edge_metrics_from_embedded_actions(
     except Exception as e:
         print(f"[@db:navigation_metrics:update_edge_metrics_from_embedded] Error: {str(e)}")
         return False
+
+
+# =====================================================
+# ROLLING WINDOW METRICS (navigation_metric_rollups)
+# =====================================================
+
+ROLLUP_PAGE_SIZE = 1000
+
+
+def merge_metric_rollups(rollups: List[Dict]) -> bool:
+    """
+    Add rollup deltas (from fold_execution_results) to navigation_metric_rollups in one RPC.
+    Counters and histograms are summed server-side, so concurrent writers never overwrite each other.
+    """
+    if not rollups:
+        return True
+    try:
+        supabase = get_supabase()
+        supabase.rpc('merge_navigation_metric_rollups', {'p_rows': rollups}).execute()
+        return True
+    except Exception as e:
+        print(f"[@db:navigation_metrics:merge_metric_rollups] Error merging {len(rollups)} rollups: {str(e)}")
+        return False
+
+
+def get_metric_rollups(team_id: str, tree_id: str, since: str, updated_since: Optional[str] = None) -> Optional[List[Dict]]:
+    """
+    Rollup buckets of a tree starting at or after `since` (ISO timestamp), oldest first.
+    With updated_since, only the buckets merged or compacted after that time.
+
+    Returns:
+        List of rollup rows, or None on error (the cache keeps its current data)
+    """
+    try:
+        supabase = get_supabase()
+        rows = []
+        offset = 0
+        while True:
+            query = supabase.table('navigation_metric_rollups').select(
+                'element_type, element_id, action_set_id, bucket_start, executions, successes, total_ms, duration_histogram, updated_at'
+            ).eq('team_id', team_id).eq('tree_id', tree_id).gte('bucket_start', since)
+            if updated_since:
+                query = query.gt('updated_at', updated_since)
+            result = query.order('bucket_start')\
+                .range(offset, offset + ROLLUP_PAGE_SIZE - 1)\
+                .execute()
+            page = result.data or []
+            rows.extend(page)
+            if len(page) < ROLLUP_PAGE_SIZE:
+                return rows
+            offset += ROLLUP_PAGE_SIZE
+    except Exception as e:
+        print(f"[@db:navigation_metrics:get_metric_rollups] Error: {str(e)}")
+        return None
+
+
+def get_tree_window_metrics(team_id: str, tree_id: str, windows: List[str] = None) -> Dict:
+    """
+    Rolling window metrics (1h/24h/7d) per node and edge of a tree, served from the rollup cache.
+
+    Returns:
+        {window: {'nodes': {node_id: metrics}, 'edges': {edge_id#action_set_id: metrics}}}
+        metrics = {volume, successes, success_rate, avg_execution_time, p50_execution_time, p95_execution_time}
+    """
+    from shared.src.lib.utils.navigation_metrics_rollup import get_navigation_metrics_cache
+    return get_navigation_metrics_cache().get_window_metrics(team_id, tree_id, windows)
@@ -49,11 +49,37 @@ def acquire_lock(
     if not supabase:
         return None
     
-    # Check availability first
-    if not is_resource_available(resource_id):
+    try:
+        return insert_lock(resource_id, resource_type, owner_id, owner_type, timeout_seconds, priority, team_id)
+    except Exception as e:
+        print(f"[@resource_locks_db] ❌ Failed to acquire lock: {e}")
         return None
+
+
+def insert_lock(
+    resource_id: str,
+    resource_type: str,
+    owner_id: str,
+    owner_type: str = 'agent',
+    timeout_seconds: int = 3600,
+    priority: int = 3,
+    team_id: str = DEFAULT_TEAM_ID,
+    acquired_at: Optional[datetime] = None
+) -> Optional[str]:
+    """
+    Insert lock row only if the resource has no active lock (atomic, unique index on resource_id).
+    
+    Expired rows are removed by the cleanup trigger before the insert, so a conflict
+    always means another owner holds the resource. DB errors are raised to the caller.
     
-    now = datetime.utcnow()
+    Returns:
+        Lock ID if inserted, None if the resource is locked (or DB not connected)
+    """
+    supabase = get_supabase()
+    if not supabase:
+        return None
+    
+    now = acquired_at or datetime.utcnow()
     expires_at = now + timedelta(seconds=timeout_seconds)
     
     data = {
@@ -67,17 +93,32 @@ def acquire_lock(
         'team_id': team_id
     }
     
-    try:
-        result = supabase.table('resource_locks').insert(data).execute()
-        if result.data:
-            print(f"[@resource_locks_db] 🔒 Acquired: {resource_id} by {owner_id}")
-            return result.data[0].get('id')
-    except Exception as e:
-        print(f"[@resource_locks_db] ❌ Failed to acquire lock: {e}")
+    # INSERT ... ON CONFLICT (resource_id) DO NOTHING - empty result means the lock is held
+    result = supabase.table('resource_locks').upsert(
+        data, on_conflict='resource_id', ignore_duplicates=True
+    ).execute()
+    if result.data:
+        print(f"[@resource_locks_db] 🔒 Acquired: {resource_id} by {owner_id}")
+        return result.data[0].get('id')
     
+    print(f"[@resource_locks_db] ⏳ Already locked: {resource_id} (requested by {owner_id})")
     return None
 
 
+def get_active_lock(resource_id: str) -> Optional[Dict[str, Any]]:
+    """Current holder row of a resource (None if available)."""
+    supabase = get_supabase()
+    if not supabase:
+        return None
+    
+    now = datetime.utcnow().isoformat()
+    result = supabase.table('resource_locks').select(
+        'resource_id, resource_type, owner_id, owner_type, acquired_at, expires_at, priority, team_id'
+    ).eq('resource_id', resource_id).gt('expires_at', now).limit(1).execute()
+    
+    return result.data[0] if result.data else None
+
+
 def release_lock(
     resource_id: str,
     owner_id: str,
@@ -168,6 +209,48 @@ def add_to_queue(
     return False
 
 
+def remove_from_queue(
+    resource_id: str,
+    owner_id: str,
+    team_id: str = DEFAULT_TEAM_ID
+) -> bool:
+    """Remove an owner's pending request(s) for a resource from the queue."""
+    supabase = get_supabase()
+    if not supabase:
+        return False
+    
+    result = supabase.table('resource_lock_queue').delete().eq(
+        'resource_id', resource_id
+    ).eq('owner_id', owner_id).eq('team_id', team_id).execute()
+    
+    return bool(result.data)
+
+
+def get_active_locks() -> List[Dict[str, Any]]:
+    """All non-expired locks (used to recover in-memory lease state on startup)."""
+    supabase = get_supabase()
+    if not supabase:
+        return []
+    
+    now = datetime.utcnow().isoformat()
+    result = supabase.table('resource_locks').select(
+        'resource_id, resource_type, owner_id, owner_type, acquired_at, expires_at, priority, team_id'
+    ).gt('expires_at', now).execute()
+    
+    return result.data or []
+
+
+def get_queue_entries() -> List[Dict[str, Any]]:
+    """All pending queue requests ordered by priority then queue time."""
+    supabase = get_supabase()
+    if not supabase:
+        return []
+    
+    result = supabase.table('resource_lock_queue').select('*').order('priority').order('queued_at').execute()
+    
+    return result.data or []
+
+
 def get_next_in_queue(
     resource_id: str,
     team_id: str = DEFAULT_TEAM_ID
@@ -13,10 +13,12 @@ Usage:
 """
 
 import os
+import re
 import sys
 import time
 import subprocess
 import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 from datetime import datetime
 from typing import Dict, List, Any, Optional
 from uuid import uuid4
@@ -30,13 +32,45 @@ if project_root not in sys.path:
 
 from shared.src.lib.database.campaign_executions_db import (
     record_campaign_execution_start,
-    update_campaign_execution_result
+    update_campaign_execution_result,
+    add_script_result_to_campaign
 )
+from shared.src.lib.database import resource_locks_db
 from shared.src.lib.utils.app_utils import load_environment_variables
 # REMOVED top-level import: from backend_host.src.lib.utils.host_utils import get_host_instance
 # Now lazy-loaded where needed
 from .script_executor import DEFAULT_TEAM_ID
 
+DEVICE_LOCK_POLL_SECONDS = 5
+# Max scripts running at once on one host, across all campaigns (0 = one per device)
+MAX_PARALLEL_PER_HOST = int(os.getenv('CAMPAIGN_MAX_PARALLEL_PER_HOST', '0'))
+
+_host_slots: Dict[str, threading.BoundedSemaphore] = {}
+_host_slots_lock = threading.Lock()
+
+
+def _get_host_slots(host_name: str, limit: int) -> threading.BoundedSemaphore:
+    """Process-wide concurrency cap per host (shared by concurrent campaigns)"""
+    with _host_slots_lock:
+        if host_name not in _host_slots:
+            _host_slots[host_name] = threading.BoundedSemaphore(max(1, limit))
+        return _host_slots[host_name]
+
+
+class CampaignStep:
+    """One script/testcase of a campaign with its device lane and dependencies"""
+    
+    def __init__(self, execution_order: int, script_config: Dict[str, Any], device_id: str):
+        self.execution_order = execution_order
+        self.script_config = script_config
+        self.device_id = device_id
+        self.depends_on: set = set()          # Must complete before this step starts
+        self.requires_success: set = set()    # Explicit depends_on: skipped if one of them failed
+    
+    @property
+    def label(self) -> str:
+        return f"script_{self.execution_order}"
+
 
 class CampaignExecutionContext:
     """Context object that holds campaign execution state"""
@@ -54,6 +88,8 @@ class CampaignExecutionContext:
         # Execution tracking
         self.campaign_result_id = None
         self.script_executions = []
+        self.results_by_order: Dict[int, Dict[str, Any]] = {}
+        self.lock = threading.Lock()  # Steps complete concurrently in parallel mode
         self.overall_success = False
         self.error_message = ""
         
@@ -92,7 +128,8 @@ class CampaignExecutor:
             "execution_config": {
                 "continue_on_failure": True,
                 "timeout_minutes": 60,
-                "parallel": False
+                "parallel": False,      # True: independent steps run concurrently (one at a time per device)
+                "max_parallel": 4       # Optional cap for this campaign (default: one per host device)
             },
             "script_configurations": [
                 {
@@ -107,6 +144,8 @@ class CampaignExecutor:
                 {
                     "script_name": "fullzap.py", 
                     "script_type": "fullzap",
+                    "device": "device2",  # Optional per-step device lane (default: campaign device)
+                    "depends_on": [1],    # Optional: execution orders that must succeed first
                     "parameters": {
                         "action": "live_chdown", 
                         "max_iteration": 3,
@@ -115,6 +154,14 @@ class CampaignExecutor:
                 }
             ]
         }
+        
+        Scheduling:
+            parallel=False keeps the historical behaviour (one step after the other).
+            parallel=True runs every step whose dependencies are done as soon as its device
+            is free: each device is an exclusive lane (resource lock), so wall-clock time
+            follows the longest lane. ${script_N.x}/${previous.x} templates add ordering
+            dependencies automatically. Results are streamed to the campaign record as
+            each step finishes.
         """
         context = CampaignExecutionContext(
             campaign_config["campaign_id"],
@@ -156,33 +203,7 @@ class CampaignExecutor:
             print(f"📊 [Campaign] Executing {context.total_scripts} script configurations")
             
             execution_config = campaign_config.get("execution_config", {})
-            continue_on_failure = execution_config.get("continue_on_failure", True)
-            
-            for i, script_config in enumerate(script_configs, 1):
-                print(f"\n{'='*60}")
-                print(f"🎯 [Campaign] Executing script {i}/{context.total_scripts}")
-                print(f"📜 Script: {script_config.get('script_name')}")
-                print(f"🔧 Type: {script_config.get('script_type')}")
-                print(f"{'='*60}")
-                
-                script_result = self._execute_single_script(
-                    context, campaign_config, script_config, i
-                )
-                
-                context.script_executions.append(script_result)
-                context.completed_scripts += 1
-                
-                if script_result["success"]:
-                    context.successful_scripts += 1
-                    print(f"✅ [Campaign] Script {i} completed successfully")
-                else:
-                    context.failed_scripts += 1
-                    print(f"❌ [Campaign] Script {i} failed: {script_result.get('error')}")
-                    
-                    if not continue_on_failure:
-                        context.error_message = f"Campaign stopped after script {i} failure"
-                        print(f"🛑 [Campaign] {context.error_message}")
-                        break
+            self._execute_steps(context, campaign_config, script_configs, execution_config)
             
             # Determine overall success
             context.overall_success = (
@@ -218,6 +239,234 @@ class CampaignExecutor:
             
             return self._build_failure_result(context, context.error_message)
     
+    def _build_steps(self, campaign_config: Dict[str, Any], script_configs: List[Dict[str, Any]],
+                     parallel: bool) -> Dict[int, CampaignStep]:
+        """Build steps with device lanes and dependency sets (1-based execution orders)"""
+        default_device = campaign_config.get("device", "device1")
+        steps = {}
+        
+        for order, script_config in enumerate(script_configs, 1):
+            step = CampaignStep(order, script_config, script_config.get("device") or default_device)
+            
+            if not parallel and order > 1:
+                # Sequential campaign: strict order, failures handled by continue_on_failure
+                step.depends_on.add(order - 1)
+            
+            for dep in script_config.get("depends_on", []) or []:
+                dep_order = int(str(dep).replace("script_", ""))
+                if 1 <= dep_order < order:
+                    step.depends_on.add(dep_order)
+                    step.requires_success.add(dep_order)
+                else:
+                    print(f"⚠️ [Campaign] Ignoring invalid dependency {dep} for script {order}")
+            
+            # Template outputs can only be resolved once the source step has finished
+            for value in (script_config.get("parameters") or {}).values():
+                if not isinstance(value, str):
+                    continue
+                for source in re.findall(r'\$\{([^}.]+)\.[^}]+\}', value):
+                    if source == "previous" and order > 1:
+                        step.depends_on.add(order - 1)
+                    elif source.startswith("script_") and source[7:].isdigit() and 1 <= int(source[7:]) < order:
+                        step.depends_on.add(int(source[7:]))
+            
+            steps[order] = step
+        
+        return steps
+    
+    def _execute_steps(self, context: CampaignExecutionContext, campaign_config: Dict[str, Any],
+                       script_configs: List[Dict[str, Any]], execution_config: Dict[str, Any]):
+        """Dependency-aware scheduler: one step per device at a time, capped per host"""
+        parallel = execution_config.get("parallel", False)
+        continue_on_failure = execution_config.get("continue_on_failure", True)
+        steps = self._build_steps(campaign_config, script_configs, parallel)
+        
+        device_count = context.host.get_device_count() if context.host else 1
+        host_limit = MAX_PARALLEL_PER_HOST or device_count
+        max_parallel = min(execution_config.get("max_parallel") or host_limit, host_limit) if parallel else 1
+        host_slots = _get_host_slots(context.host.host_name, host_limit)
+        lanes = len({step.device_id for step in steps.values()})
+        
+        print(f"🧭 [Campaign] Scheduling {len(steps)} steps on {lanes} device lane(s) (parallel={parallel}, max_parallel={max_parallel})")
+        
+        pending = dict(steps)
+        finished: Dict[int, bool] = {}  # execution_order -> success
+        busy_devices = set()
+        running = {}
+        stop_requested = False
+        
+        with ThreadPoolExecutor(max_workers=max(1, min(max_parallel, len(steps))), thread_name_prefix="campaign-step") as pool:
+            while True:
+                rescan = not stop_requested
+                while rescan:
+                    rescan = False
+                    for order in sorted(pending):
+                        if len(running) >= max_parallel:
+                            break
+                        step = pending[order]
+                        if step.device_id in busy_devices or not step.depends_on.issubset(finished):
+                            continue
+                        
+                        failed_deps = [dep for dep in step.requires_success if not finished[dep]]
+                        del pending[order]
+                        if failed_deps:
+                            result = self._build_skipped_result(step, f"Skipped: dependency script_{failed_deps[0]} failed")
+                            finished[order] = False
+                            self._record_step_result(context, step, result)
+                            rescan = True  # Steps depending on this one can now be resolved
+                            continue
+                        
+                        busy_devices.add(step.device_id)
+                        print(f"\n{'='*60}")
+                        print(f"🎯 [Campaign] Executing script {order}/{context.total_scripts} on {step.device_id}")
+                        print(f"📜 Script: {step.script_config.get('script_name')}")
+                        print(f"🔧 Type: {step.script_config.get('script_type')}")
+                        print(f"{'='*60}")
+                        future = pool.submit(self._run_step, context, campaign_config, execution_config, step,
+                                             host_slots if parallel else None)
+                        running[future] = step
+                
+                if not running:
+                    break
+                
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    step = running.pop(future)
+                    busy_devices.discard(step.device_id)
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        result = self._build_skipped_result(step, f"Script execution error: {str(e)}")
+                        result["skipped"] = False
+                    
+                    finished[step.execution_order] = result["success"]
+                    self._record_step_result(context, step, result)
+                    
+                    if not result["success"] and not continue_on_failure and not stop_requested:
+                        stop_requested = True
+                        context.error_message = f"Campaign stopped after script {step.execution_order} failure"
+                        print(f"🛑 [Campaign] {context.error_message}")
+            
+            if pending and not stop_requested:
+                # Only reachable with dependencies that can never be satisfied
+                for order in sorted(pending):
+                    result = self._build_skipped_result(pending[order], "Skipped: unresolvable dependencies")
+                    self._record_step_result(context, pending[order], result)
+        
+        context.script_executions.sort(key=lambda r: r.get("execution_order", 0))
+    
+    def _run_step(self, context: CampaignExecutionContext, campaign_config: Dict[str, Any],
+                  execution_config: Dict[str, Any], step: CampaignStep,
+                  host_slots: Optional[threading.BoundedSemaphore]) -> Dict[str, Any]:
+        """
+        Run one step in its device lane: exclusive device lock, then host slot
+
+        host_slots=None (sequential campaigns) keeps the historical behaviour: the step
+        runs directly, without DB lock polling or the cross-campaign host cap.
+        """
+        if host_slots is None:
+            return self._execute_single_script(
+                context, campaign_config, step.script_config, step.execution_order, step.device_id
+            )
+        
+        timeout_seconds = int(execution_config.get("timeout_minutes", 60) * 60)
+        resource_id = f"{context.host.host_name}:{step.device_id}"
+        
+        # Device lock first: a step waiting on a locked device must not hold a host slot
+        # that steps on other (free) devices of this host could use
+        if not self._acquire_device_lock(context, resource_id, timeout_seconds):
+            return self._build_skipped_result(step, f"Device {step.device_id} busy (lock not acquired within {timeout_seconds}s)")
+        try:
+            with host_slots:
+                return self._execute_single_script(
+                    context, campaign_config, step.script_config, step.execution_order, step.device_id
+                )
+        finally:
+            self._release_device_lock(context, resource_id)
+    
+    def _acquire_device_lock(self, context: CampaignExecutionContext, resource_id: str, timeout_seconds: int) -> bool:
+        """Exclusive device lock shared with the agent ResourceLockManager (resource_locks table)"""
+        if not resource_locks_db.get_supabase():
+            return True  # Locking not available without DB - same assumption as is_resource_available()
+        
+        deadline = time.time() + timeout_seconds
+        waiting_logged = False
+        while True:
+            lock_id = resource_locks_db.acquire_lock(
+                resource_id=resource_id,
+                resource_type='device',
+                owner_id=context.campaign_execution_id,
+                owner_type='campaign',
+                timeout_seconds=timeout_seconds,
+                team_id=context.team_id or resource_locks_db.DEFAULT_TEAM_ID
+            )
+            if lock_id:
+                return True
+            if time.time() >= deadline:
+                return False
+            if not waiting_logged:
+                print(f"⏳ [Campaign] Waiting for device lock: {resource_id}")
+                waiting_logged = True
+            time.sleep(DEVICE_LOCK_POLL_SECONDS)
+    
+    def _release_device_lock(self, context: CampaignExecutionContext, resource_id: str):
+        if not resource_locks_db.get_supabase():
+            return
+        try:
+            resource_locks_db.release_lock(
+                resource_id, context.campaign_execution_id, context.team_id or resource_locks_db.DEFAULT_TEAM_ID
+            )
+        except Exception as e:
+            print(f"⚠️ [Campaign] Failed to release device lock {resource_id}: {e}")
+    
+    def _record_step_result(self, context: CampaignExecutionContext, step: CampaignStep, result: Dict[str, Any]):
+        """Update counters and stream the finished step into the campaign execution record"""
+        order = step.execution_order
+        result.setdefault("device_id", step.device_id)
+        
+        with context.lock:
+            context.results_by_order[order] = result
+            context.script_executions.append(result)
+            if result.get("skipped"):
+                context.failed_scripts += 1
+            else:
+                context.completed_scripts += 1
+                if result["success"]:
+                    context.successful_scripts += 1
+                else:
+                    context.failed_scripts += 1
+        
+        if result.get("skipped"):
+            print(f"⏭️ [Campaign] Script {order} {result.get('error')}")
+        elif result["success"]:
+            print(f"✅ [Campaign] Script {order} completed successfully")
+        else:
+            print(f"❌ [Campaign] Script {order} failed: {result.get('error')}")
+        
+        if not context.campaign_result_id:
+            return
+        if result.get("script_result_id"):
+            add_script_result_to_campaign(context.campaign_result_id, result["script_result_id"])
+        update_campaign_execution_result(
+            campaign_execution_id_uuid=context.campaign_result_id,
+            status="running",
+            execution_time_ms=context.get_execution_time_ms()
+        )
+    
+    def _build_skipped_result(self, step: CampaignStep, error_message: str) -> Dict[str, Any]:
+        return {
+            "success": False,
+            "skipped": True,
+            "script_name": step.script_config.get("script_name"),
+            "script_result_id": None,
+            "execution_time_ms": 0,
+            "error": error_message,
+            "execution_order": step.execution_order,
+            "device_id": step.device_id,
+            "report_url": None,
+            "logs_url": None
+        }
+    
     def _setup_campaign_environment(self, context: CampaignExecutionContext, campaign_config: Dict[str, Any]) -> bool:
         """Setup campaign execution environment at host level"""
         try:
@@ -257,8 +506,10 @@ class CampaignExecutor:
             return False
     
     def _execute_single_script(self, context: CampaignExecutionContext, campaign_config: Dict[str, Any], 
-                             script_config: Dict[str, Any], execution_order: int) -> Dict[str, Any]:
+                             script_config: Dict[str, Any], execution_order: int,
+                             device_id: Optional[str] = None) -> Dict[str, Any]:
         """Execute a single script or testcase within the campaign"""
+        device_id = device_id or campaign_config.get("device", "device1")
         script_start_time = time.time()
         script_name = script_config.get("script_name")
         script_type = script_config.get("script_type", script_name)
@@ -276,7 +527,8 @@ class CampaignExecutor:
                     campaign_config, 
                     script_config, 
                     execution_order,
-                    resolved_parameters
+                    resolved_parameters,
+                    device_id
                 )
             
             # EXISTING: Script execution via ScriptExecutor
@@ -284,7 +536,6 @@ class CampaignExecutor:
             
             # Use shared script executor instead of device-specific one
             from .script_executor import ScriptExecutor
-            device_id = campaign_config.get("device", "device1")
             
             # Get actual device model
             device_model = "unknown"
@@ -316,11 +567,11 @@ class CampaignExecutor:
             if campaign_config.get("host") and campaign_config["host"] != "auto":
                 param_parts.extend(["--host", campaign_config["host"]])
             
-            if campaign_config.get("device") and campaign_config["device"] != "auto":
-                param_parts.extend(["--device", campaign_config["device"]])
+            if device_id and device_id != "auto":
+                param_parts.extend(["--device", device_id])
             
-            # Add script-specific parameters
-            for param_name, param_value in parameters.items():
+            # Add script-specific parameters (templates resolved from finished steps)
+            for param_name, param_value in resolved_parameters.items():
                 param_parts.extend([f"--{param_name}", str(param_value)])
             
             # Join parameters with proper shell quoting to handle special characters
@@ -350,9 +601,9 @@ class CampaignExecutor:
                 print(f"📊 [Campaign] Using exit code for success status: {success} (code: {result.get('exit_code')})")
             
             # Extract script result ID from stdout if available
-            script_result_id = None
+            script_result_id = result.get('script_result_id')
             stdout = result.get('stdout', '')
-            if stdout and 'SCRIPT_RESULT_ID:' in stdout:
+            if not script_result_id and stdout and 'SCRIPT_RESULT_ID:' in stdout:
                 import re
                 result_id_match = re.search(r'SCRIPT_RESULT_ID:([^\s\n]+)', stdout)
                 if result_id_match:
@@ -415,7 +666,7 @@ class CampaignExecutor:
         Supports: ${previous.output_name} and ${script_N.output_name}
         
         Args:
-            context: Campaign execution context with script_executions history
+            context: Campaign execution context with finished step results (results_by_order)
             parameters: Parameters dict with potential template strings
             current_order: Current script execution order (1-based)
             
@@ -457,8 +708,8 @@ class CampaignExecutor:
                 # Resolve based on source
                 if source == "previous":
                     # Get previous script's outputs
-                    if current_order > 1 and len(context.script_executions) >= current_order - 1:
-                        prev_script = context.script_executions[current_order - 2]  # 0-indexed
+                    prev_script = context.results_by_order.get(current_order - 1)
+                    if prev_script is not None:
                         output_value = prev_script.get('script_outputs', {}).get(output_name)
                         if output_value is not None:
                             resolved_value = resolved_value.replace(template_var, str(output_value))
@@ -472,8 +723,8 @@ class CampaignExecutor:
                     # Get specific script's outputs by order
                     try:
                         script_order = int(source.split('_')[1])
-                        if script_order >= 1 and len(context.script_executions) >= script_order:
-                            target_script = context.script_executions[script_order - 1]  # 0-indexed
+                        target_script = context.results_by_order.get(script_order)
+                        if target_script is not None:
                             output_value = target_script.get('script_outputs', {}).get(output_name)
                             if output_value is not None:
                                 resolved_value = resolved_value.replace(template_var, str(output_value))
@@ -493,7 +744,7 @@ class CampaignExecutor:
     
     def _execute_testcase(self, context: CampaignExecutionContext, campaign_config: Dict[str, Any],
                          script_config: Dict[str, Any], execution_order: int,
-                         resolved_parameters: Dict[str, Any]) -> Dict[str, Any]:
+                         resolved_parameters: Dict[str, Any], device_id: Optional[str] = None) -> Dict[str, Any]:
         """
         Execute a testcase within the campaign.
         
@@ -503,6 +754,7 @@ class CampaignExecutor:
             script_config: Testcase script configuration
             execution_order: Execution order number
             resolved_parameters: Resolved input parameters
+            device_id: Device lane of this step (default: campaign device)
             
         Returns:
             Dict with execution result including script_outputs
@@ -519,7 +771,7 @@ class CampaignExecutor:
             from backend_host.src.services.testcase.testcase_executor import TestCaseExecutor
             
             # Get device info
-            device_id = campaign_config.get("device", "device1")
+            device_id = device_id or campaign_config.get("device", "device1")
             device_name = device_id
             device_model = "unknown"
             
@@ -22,6 +22,7 @@ import uuid
 import glob
 import select
 import shlex
+import threading
 from datetime import datetime
 from typing import Dict, List, Optional, Any, Tuple
 
@@ -29,9 +30,14 @@ from typing import Dict, List, Optional, Any, Tuple
 from shared.src.lib.utils.app_utils import load_environment_variables
 from shared.src.lib.utils.report_generation_utils import generate_and_upload_script_report
 from shared.src.lib.database.script_results_db import record_script_execution_start, update_script_execution_result
+from shared.src.lib.executors.script_worker_pool import get_script_worker_pool, is_script_worker_pool_enabled
+from shared.src.lib.executors.script_output import ScriptOutputStream
 
 DEFAULT_TEAM_ID = '7fdeb4bb-3639-4ec3-959f-b54769a219ce'
 
+# Minimum seconds between running.log rewrites (frontend overlay polls it)
+RUNNING_LOG_MIN_INTERVAL = float(os.getenv('RUNNING_LOG_MIN_INTERVAL', '1.0'))
+
 
 class ScriptExecutionContext:
     """Context object that holds all execution state"""
@@ -89,6 +95,11 @@ class ScriptExecutionContext:
         self.total_steps = 0
         self.planned_steps: List[Dict[str, Any]] = []
         self.estimated_duration_seconds = None
+        self._running_log_completed: List[Dict[str, Any]] = []
+        self._running_log_durations = [0.0, 0]  # [total seconds, steps with a duration] over completed steps
+        self._running_log_written_at = 0.0
+        self._running_log_timer: Optional[threading.Timer] = None
+        self._running_log_lock = threading.Lock()
     
     def get_execution_time_ms(self) -> int:
         """Get current execution time in milliseconds"""
@@ -128,108 +139,6 @@ class ScriptExecutionContext:
             
             self.screenshot_paths.append(screenshot_path)
     
-    def upload_screenshots_to_r2(self) -> Dict[str, str]:
-        """
-        Batch upload all local screenshots to R2 at script end.
-        
-        Returns:
-            Dict mapping local paths to R2 URLs for report generation
-        """
-        url_mapping = {}  # Map local_path -> r2_url
-        
-        if not self.screenshot_paths:
-            return url_mapping
-        
-        print(f"📤 [Context] Batch uploading {len(self.screenshot_paths)} screenshots to R2...")
-        
-        try:
-            from shared.src.lib.utils.cloudflare_utils import get_cloudflare_utils
-            uploader = get_cloudflare_utils()
-            device_id = self.selected_device.device_id if hasattr(self, 'selected_device') else 'unknown'
-            
-            # Store original paths for mapping
-            original_paths = self.screenshot_paths.copy()
-            
-            # Separate already-uploaded URLs and local files
-            already_uploaded = []
-            file_mappings = []
-            path_to_index = {}  # Track original index for each file
-            
-            for idx, path in enumerate(self.screenshot_paths):
-                # Skip None paths - keep as None in final result
-                if not path:
-                    print(f"⚠️ [Context] Skipping None screenshot at index {idx}")
-                    already_uploaded.append((idx, None))  # Track the None
-                    continue
-                
-                # Already R2 URL - keep as-is
-                if path.startswith('https://'):
-                    already_uploaded.append((idx, path))
-                    continue
-                
-                # Local path - check if exists
-                if not os.path.exists(path):
-                    print(f"⚠️ [Context] Screenshot not found: {path}")
-                    already_uploaded.append((idx, path))  # Keep original path (even if missing)
-                    continue
-                
-                # Add to batch upload
-                filename = os.path.basename(path)
-                remote_path = f"script-screenshots/{device_id}/{filename}"
-                file_mappings.append({
-                    'local_path': path,
-                    'remote_path': remote_path
-                })
-                path_to_index[path] = idx
-            
-            # Upload all files at once with signed URLs for report assets
-            if file_mappings:
-                upload_result = uploader.upload_files(file_mappings, for_report_assets=True)
-                
-                # Build updated paths list maintaining original order
-                updated_paths = [None] * len(self.screenshot_paths)
-                
-                # Place already uploaded URLs back
-                for idx, url in already_uploaded:
-                    updated_paths[idx] = url
-                
-                # Place successfully uploaded files and delete local copies
-                for uploaded_file in upload_result['uploaded_files']:
-                    original_idx = path_to_index[uploaded_file['local_path']]
-                    updated_paths[original_idx] = uploaded_file['url']
-                    # Build mapping: local -> R2 URL
-                    url_mapping[uploaded_file['local_path']] = uploaded_file['url']
-                    
-                    # Delete local file from cold storage after successful upload
-                    local_path = uploaded_file['local_path']
-                    try:
-                        if os.path.exists(local_path):
-                            os.remove(local_path)
-                            print(f"🗑️  [Context] Deleted local file after upload: {os.path.basename(local_path)}")
-                    except Exception as e:
-                        print(f"⚠️ [Context] Failed to delete local file {os.path.basename(local_path)}: {e}")
-                
-                # Place failed uploads (keep original path)
-                for failed_file in upload_result['failed_uploads']:
-                    original_idx = path_to_index[failed_file['local_path']]
-                    filename = os.path.basename(failed_file['local_path'])
-                    print(f"⚠️ [Context] Upload failed for {filename}: {failed_file['error']}")
-                    updated_paths[original_idx] = failed_file['local_path']
-                
-                self.screenshot_paths = updated_paths
-                print(f"✅ [Context] Uploaded {upload_result['uploaded_count']}/{len(file_mappings)} screenshots to R2")
-                print(f"📋 [Context] Built mapping with {len(url_mapping)} local->R2 URL pairs")
-            else:
-                print(f"✅ [Context] All {len(already_uploaded)} screenshots already uploaded")
-            
-            return url_mapping
-            
-        except Exception as e:
-            print(f"❌ [Context] Batch upload error: {e}")
-            import traceback
-            traceback.print_exc()
-            return url_mapping  # Return empty mapping on error
-    
     def start_stdout_capture(self):
         """Start capturing stdout for log upload"""
         import sys
@@ -282,11 +191,43 @@ class ScriptExecutionContext:
         self.planned_steps = steps
         self.total_steps = len(steps)
     
-    def write_running_log(self):
-        """Write current execution state to running.log for frontend overlay - uses existing step_results"""
+    def write_running_log(self, force: bool = False):
+        """
+        Write current execution state to running.log for frontend overlay - uses existing step_results
+        
+        PERFORMANCE: at most one write per RUNNING_LOG_MIN_INTERVAL seconds. Calls in between
+        schedule a single trailing write so the latest state always lands; completed step
+        entries are built once and reused by every later write.
+        """
         if not self.running_log_path:
             return
         
+        with self._running_log_lock:
+            wait = self._running_log_written_at + RUNNING_LOG_MIN_INTERVAL - time.monotonic()
+            if not force and wait > 0:
+                if self._running_log_timer is None:
+                    self._running_log_timer = threading.Timer(wait, self._on_running_log_timer)
+                    self._running_log_timer.daemon = True
+                    self._running_log_timer.start()
+                return
+            
+            if self._running_log_timer is not None:
+                self._running_log_timer.cancel()
+                self._running_log_timer = None
+            self._running_log_written_at = time.monotonic()
+            self._write_running_log_now()
+    
+    def _on_running_log_timer(self):
+        with self._running_log_lock:
+            self._running_log_timer = None
+        self.write_running_log(force=True)
+    
+    def flush_running_log(self):
+        """Write a pending (throttled) running log update immediately"""
+        if self._running_log_timer is not None:
+            self.write_running_log(force=True)
+    
+    def _write_running_log_now(self):
         try:
             import json
             from datetime import datetime, timezone
@@ -329,32 +270,37 @@ class ScriptExecutionContext:
                 # Fallback
                 return 'unknown'
             
-            # Add all completed steps (for scrollable timeline) - user can scroll through all
-            all_completed_steps = []
-            if len(self.step_results) >= 2:
-                # Get ALL completed steps (excluding current step which is the last one)
-                for step in self.step_results[:-1]:  # All except the last (current) step
-                    all_completed_steps.append({
-                        "step_number": step.get('step_number'),
-                        "description": get_step_description(step),
-                        "command": get_step_command(step),
-                        "status": "completed",
-                        "actions": step.get('actions', []),
-                        "verifications": step.get('verifications', []),
-                    })
-                log_data["completed_steps"] = all_completed_steps
-            
-            # LEGACY: Keep previous_step for backward compatibility
-            if len(self.step_results) >= 2:
-                prev_step = self.step_results[-2]
-                log_data["previous_step"] = {
-                    "step_number": prev_step.get('step_number'),
-                    "description": get_step_description(prev_step),
-                    "command": get_step_command(prev_step),
+            def get_step_duration(step):
+                """Step duration in seconds (execution_time_ms or duration), None if unknown"""
+                if step.get('execution_time_ms') is not None:
+                    return step['execution_time_ms'] / 1000.0
+                return step.get('duration')
+            
+            # Completed steps = all except the last (current) one. Entries are appended
+            # incrementally - earlier ones were built by previous writes.
+            completed_count = max(0, len(self.step_results) - 1)
+            if len(self._running_log_completed) > completed_count:
+                self._running_log_completed = []  # step_results was reset
+                self._running_log_durations = [0.0, 0]
+            for step in self.step_results[len(self._running_log_completed):completed_count]:
+                self._running_log_completed.append({
+                    "step_number": step.get('step_number'),
+                    "description": get_step_description(step),
+                    "command": get_step_command(step),
                     "status": "completed",
-                    "actions": prev_step.get('actions', []),
-                    "verifications": prev_step.get('verifications', []),
-                }
+                    "actions": step.get('actions', []),
+                    "verifications": step.get('verifications', []),
+                })
+                duration = get_step_duration(step)
+                if duration is not None:
+                    self._running_log_durations[0] += duration
+                    self._running_log_durations[1] += 1
+            
+            # Add all completed steps (for scrollable timeline) - user can scroll through all
+            if self._running_log_completed:
+                log_data["completed_steps"] = self._running_log_completed
+                # LEGACY: Keep previous_step for backward compatibility
+                log_data["previous_step"] = self._running_log_completed[-1]
             
             # Add current step (from step_results - last recorded step)
             if len(self.step_results) >= 1:
@@ -385,39 +331,30 @@ class ScriptExecutionContext:
             
             # Calculate estimated end time based on average step duration
             if len(self.step_results) >= 2:
-                # Calculate average duration per step (execution_time_ms converted to seconds)
-                total_duration = 0
-                step_count = 0
-                for step in self.step_results:
-                    # Check both 'execution_time_ms' and 'duration' for compatibility
-                    if step.get('execution_time_ms') is not None:
-                        total_duration += step['execution_time_ms'] / 1000.0  # Convert ms to seconds
-                        step_count += 1
-                    elif step.get('duration') is not None:
-                        total_duration += step['duration']
-                        step_count += 1
+                total_duration, step_count = self._running_log_durations
+                current_duration = get_step_duration(self.step_results[-1])
+                if current_duration is not None:
+                    total_duration += current_duration
+                    step_count += 1
                 
                 if step_count > 0 and total_steps > 0:
                     avg_duration = total_duration / step_count
                     remaining_steps = max(0, total_steps - current_step_number)
                     estimated_remaining = remaining_steps * avg_duration
-                    estimated_end = datetime.fromtimestamp(time.time() + estimated_remaining, tz=timezone.utc).isoformat()
-                    log_data["estimated_end"] = estimated_end
-                    print(f"[@script_executor] Estimated end time: avg_duration={avg_duration:.1f}s, remaining_steps={remaining_steps}, estimated_remaining={estimated_remaining:.1f}s")
+                    log_data["estimated_end"] = datetime.fromtimestamp(time.time() + estimated_remaining, tz=timezone.utc).isoformat()
             
             # Fallback to historical average from deployment_scheduler
             if "estimated_end" not in log_data and self.estimated_duration_seconds:
                 elapsed = time.time() - self.start_time
                 remaining = max(0, self.estimated_duration_seconds - elapsed)
-                estimated_end = datetime.fromtimestamp(time.time() + remaining, tz=timezone.utc).isoformat()
-                log_data["estimated_end"] = estimated_end
-                print(f"[@script_executor] Using historical average: total={self.estimated_duration_seconds:.1f}s, elapsed={elapsed:.1f}s, remaining={remaining:.1f}s")
+                log_data["estimated_end"] = datetime.fromtimestamp(time.time() + remaining, tz=timezone.utc).isoformat()
             
             # Write atomically (write to temp file, then move)
             temp_path = self.running_log_path + '.tmp'
             with open(temp_path, 'w') as f:
-                json.dump(log_data, f, indent=2)
+                json.dump(log_data, f)
             os.replace(temp_path, self.running_log_path)
+            # Parsed by the parent executor as a step event - keep the format
             print(f"[@script_executor] Wrote running log: {self.running_log_path} (step {current_step_number}/{total_steps})")
             
         except Exception as e:
@@ -441,6 +378,33 @@ class ScriptExecutionContext:
                 self.add_screenshot(screenshot)
 
 
+class _SubprocessRun:
+    """Cold-spawn process with the same streaming interface as PooledScriptRun"""
+    
+    def __init__(self, process: subprocess.Popen):
+        self.process = process
+        self.pid = process.pid
+    
+    def readline(self, timeout: float = 1.0) -> Optional[str]:
+        """Next output line, '' if nothing within timeout, None at end of output"""
+        ready = select.select([self.process.stdout], [], [], timeout)[0]
+        if not ready:
+            return None if self.process.poll() is not None else ''
+        output = self.process.stdout.readline()
+        if output:
+            return output
+        return None if self.process.poll() is not None else ''
+    
+    def poll(self) -> Optional[int]:
+        return self.process.poll()
+    
+    def kill(self):
+        self.process.kill()
+    
+    def wait(self) -> int:
+        return self.process.wait()
+
+
 class ScriptExecutor:
     """
     Unified script executor that handles:
@@ -484,27 +448,22 @@ class ScriptExecutor:
             
             print(f"[@script_executor] Redirecting to: {actual_script} with params: {parameters}")
             
-            # Pass the original AI script name via environment so executor can find the test case
-            original_env = os.environ.copy()
-            os.environ['AI_SCRIPT_NAME'] = script_name
+            # Pass the original AI script name via the child environment so executor can find the test case
+            # (per-run env instead of mutating os.environ - campaigns run scripts from several threads)
+            script_env = os.environ.copy()
+            script_env['AI_SCRIPT_NAME'] = script_name
             
             # Set team_id if available in parameters (passed from route)
             if hasattr(self, 'current_team_id') and self.current_team_id:
-                os.environ['TEAM_ID'] = self.current_team_id
+                script_env['TEAM_ID'] = self.current_team_id
             
-            try:
-                # DIRECT EXECUTION: Execute the actual script directly without recursive call
-                actual_script_path = self._get_script_path(actual_script)
-                
-                # Execute directly using the same subprocess logic as normal scripts
-                result = self._execute_script_subprocess(actual_script_path, parameters, script_name, start_time)
-                
-                return result
-                
-            finally:
-                # Restore original environment
-                os.environ.clear()
-                os.environ.update(original_env)
+            # DIRECT EXECUTION: Execute the actual script directly without recursive call
+            actual_script_path = self._get_script_path(actual_script)
+            
+            # Execute directly using the same subprocess logic as normal scripts
+            result = self._execute_script_subprocess(actual_script_path, parameters, script_name, start_time, env=script_env)
+            
+            return result
         
         try:
             script_path = self._get_script_path(script_name)
@@ -572,8 +531,24 @@ class ScriptExecutor:
         # Use test_scripts folder as the primary scripts location
         return os.path.join(project_root, 'test_scripts')
     
-    def _execute_script_subprocess(self, script_path: str, parameters: str, script_name: str, start_time: float) -> Dict[str, Any]:
-        """Execute script using subprocess with real-time output streaming"""
+    def _execute_script_subprocess(self, script_path: str, parameters: str, script_name: str, start_time: float,
+                                   env: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        """Execute script with real-time output streaming (warm worker pool, cold subprocess as fallback)"""
+        if is_script_worker_pool_enabled():
+            argv = shlex.split(parameters.strip()) if parameters and parameters.strip() else []
+            try:
+                run = get_script_worker_pool().start_run(script_path, argv, env=env, cwd=os.getcwd())
+            except Exception as e:
+                print(f"[@script_executor] Worker pool error: {e}")
+                run = None
+            
+            if run is not None:
+                print(f"[@script_executor] Executing on warm worker (pid {run.pid}): {script_path} {' '.join(shlex.quote(a) for a in argv)}")
+                print(f"[@script_executor] === SCRIPT OUTPUT START ===")
+                return self._stream_script_output(run, script_path, parameters, script_name, start_time)
+            
+            print(f"[@script_executor] No warm worker available, falling back to cold spawn")
+        
         # Use PROJECT_ROOT environment variable or detect from current script location
         project_root = os.getenv('PROJECT_ROOT')
         if not project_root:
@@ -615,115 +590,91 @@ class ScriptExecutor:
             stderr=subprocess.STDOUT,  # Merge stderr into stdout for unified streaming
             text=True,
             bufsize=1,  # Line buffered
-            universal_newlines=True
+            universal_newlines=True,
+            env=env  # None = inherit current environment
         )
         
-        # Stream output in real-time with timeout
-        stdout_lines = []
-        report_url = ""
-        logs_url = ""
+        return self._stream_script_output(_SubprocessRun(process), script_path, parameters, script_name, start_time)
+    
+    def _stream_script_output(self, process, script_path: str, parameters: str, script_name: str, start_time: float) -> Dict[str, Any]:
+        """
+        Stream script output in real-time and build the result dictionary
+        
+        process: _SubprocessRun (cold spawn) or PooledScriptRun (warm worker) -
+        both expose readline(timeout) ('' = no output yet, None = end of output), poll(), kill(), wait()
+        
+        PERFORMANCE: output goes through a ScriptOutputStream - tail ring buffer in memory,
+        full log spilled to disk, markers parsed per line, console echo batched.
+        """
+        stream = ScriptOutputStream(script_name)
         timeout_seconds = 3600  # 1 hour timeout
         start_time_for_timeout = time.time()
+        next_progress_log = start_time_for_timeout + 30
         
-        while True:
-            # Use select to wait for output with timeout
-            ready = select.select([process.stdout], [], [], 1.0)[0]  # 1 second timeout
-            
-            poll_result = process.poll()
-            
-            if ready:
-                output = process.stdout.readline()
+        try:
+            while True:
+                # Wait for output with timeout
+                output = process.readline(timeout=1.0)  # 1 second timeout
+                
                 if output:
-                    line = output.rstrip()
-                    
-                    # Extract report URL from cloudflare upload logs  
-                    if '[@cloudflare_utils:upload_script_report] INFO: Uploaded script report:' in line:
-                        try:
-                            report_path = line.split('Uploaded script report: ')[1]
-                            base_url = os.environ.get('CLOUDFLARE_R2_PUBLIC_URL', 'https://pub-604f1a4ce32747778c6d5ac5e3100217.r2.dev')
-                            report_url = f"{base_url.rstrip('/')}/{report_path}"
-                            print(f"📊 [Script] Report URL captured: {report_url}")
-                        except Exception as e:
-                            print(f"⚠️ [Script] Failed to extract report URL: {e}")
-                    
-                    # Extract logs URL from upload logs
-                    if '[@utils:report_utils:generate_and_upload_script_report] Logs uploaded:' in line:
-                        try:
-                            logs_url = line.split('Logs uploaded: ')[1].strip()
-                            print(f"📝 [Script] Logs URL captured: {logs_url}")
-                        except Exception as e:
-                            print(f"⚠️ [Script] Failed to extract logs URL: {e}")
-                    
-                    # Stream all output with prefix
-                    print(f"[{script_name}] {line}")
-                    
-                    stdout_lines.append(output)
-                elif poll_result is not None:
-                    print(f"[@script_executor] LOOP EXIT: Empty output and process ended (exit code: {poll_result})")
+                    stream.feed(output)
+                elif output is None:
+                    stream.flush_echo()
+                    print(f"[@script_executor] LOOP EXIT: End of output and process ended (exit code: {process.wait()})")
                     break
-            elif poll_result is not None:
-                print(f"[@script_executor] LOOP EXIT: No output ready and process ended (exit code: {poll_result})")
-                break
-            
-            # Check for timeout
-            current_time = time.time()
-            elapsed_time = current_time - start_time_for_timeout
-            if elapsed_time > timeout_seconds:
-                print(f"❌ [Script] Script execution timed out after {timeout_seconds} seconds (elapsed: {elapsed_time:.1f}s)")
-                if poll_result is None:
-                    print(f"❌ [Script] Process still running, force killing...")
-                    process.kill()
-                    process.wait()
-                else:
-                    print(f"❌ [Script] Process already ended but loop didn't exit properly")
-                stdout_lines.append(f"\n[TIMEOUT] Script execution timed out after {timeout_seconds} seconds\n")
-                break
-            
-            # Log progress every 30 seconds to track long-running scripts
-            if int(elapsed_time) % 30 == 0 and int(elapsed_time) > 0:
-                poll_status = poll_result
-                if poll_status is None:
-                    print(f"[@script_executor] PROGRESS: Script running for {elapsed_time:.0f}s, process still active")
                 else:
-                    print(f"[@script_executor] PROGRESS: Script at {elapsed_time:.0f}s, process ended with code {poll_status} but loop still running")
+                    stream.flush_echo()  # Idle - don't hold back buffered echo
+                
+                # Check for timeout
+                current_time = time.time()
+                elapsed_time = current_time - start_time_for_timeout
+                if elapsed_time > timeout_seconds:
+                    stream.flush_echo()
+                    print(f"❌ [Script] Script execution timed out after {timeout_seconds} seconds (elapsed: {elapsed_time:.1f}s)")
+                    if process.poll() is None:
+                        print(f"❌ [Script] Process still running, force killing...")
+                        process.kill()
+                        process.wait()
+                    else:
+                        print(f"❌ [Script] Process already ended but loop didn't exit properly")
+                    stream.note(f"[TIMEOUT] Script execution timed out after {timeout_seconds} seconds")
+                    break
+                
+                # Log progress every 30 seconds to track long-running scripts
+                if current_time >= next_progress_log:
+                    next_progress_log = current_time + 30
+                    poll_status = process.poll()
+                    step_info = f", step {stream.current_step}/{stream.total_steps}" if stream.current_step else ""
+                    if poll_status is None:
+                        print(f"[@script_executor] PROGRESS: Script running for {elapsed_time:.0f}s, process still active ({stream.line_count} lines{step_info})")
+                    else:
+                        print(f"[@script_executor] PROGRESS: Script at {elapsed_time:.0f}s, process ended with code {poll_status} but loop still running")
+        finally:
+            stream.close()
         
         # Wait for process completion
         exit_code = process.wait()
-        stdout = ''.join(stdout_lines)
+        stdout = stream.get_stdout()
         
         print(f"[@script_executor] === SCRIPT OUTPUT END ===")
         print(f"[@script_executor] Process completed with exit code: {exit_code}")
-        print(f"[@script_executor] DEBUG: Total stdout lines captured: {len(stdout_lines)}")
-        print(f"[@script_executor] DEBUG: Final stdout length: {len(stdout)}")
+        print(f"[@script_executor] Output: {stream.line_count} lines, {stream.byte_count} chars"
+              f"{f' (tail kept, full log: {stream.log_path})' if stream.truncated else ''}")
         
         total_execution_time = int((time.time() - start_time) * 1000)
         
-        print(f"[@script_executor] PREPARE RETURN: Creating return dictionary...")
         print(f"[@script_executor] EXIT_CODE: {exit_code}, EXECUTION_TIME: {total_execution_time}ms")
-        print(f"[@script_executor] REPORT_URL: {report_url}")
-        
-        # Extract SCRIPT_SUCCESS marker from stdout (critical for frontend result accuracy)
-        script_success = None
-        print(f"[@script_executor] DEBUG: Checking for SCRIPT_SUCCESS marker in stdout...")
-        print(f"[@script_executor] DEBUG: stdout length: {len(stdout) if stdout else 0}")
-        print(f"[@script_executor] DEBUG: stdout contains 'SCRIPT_SUCCESS:': {'SCRIPT_SUCCESS:' in stdout if stdout else False}")
-        
-        if stdout and 'SCRIPT_SUCCESS:' in stdout:
-            import re
-            success_match = re.search(r'SCRIPT_SUCCESS:(true|false)', stdout)
-            if success_match:
-                script_success = success_match.group(1) == 'true'
-                print(f"[@script_executor] SCRIPT_SUCCESS extracted: {script_success}")
-            else:
-                print(f"[@script_executor] DEBUG: SCRIPT_SUCCESS found but regex didn't match")
+        print(f"[@script_executor] REPORT_URL: {stream.report_url}")
+        
+        # SCRIPT_SUCCESS marker (critical for frontend result accuracy) - parsed while streaming
+        script_success = stream.script_success
+        if script_success is not None:
+            print(f"[@script_executor] SCRIPT_SUCCESS extracted: {script_success}")
         else:
-            print(f"[@script_executor] DEBUG: No SCRIPT_SUCCESS marker found in stdout")
-            # Print last 500 chars of stdout to see what's there
-            if stdout:
-                stdout_tail = stdout[-500:] if len(stdout) > 500 else stdout
-                print(f"[@script_executor] DEBUG: Last 500 chars of stdout: {repr(stdout_tail)}")
-            else:
-                print(f"[@script_executor] DEBUG: stdout is empty or None")
+            print(f"[@script_executor] DEBUG: No SCRIPT_SUCCESS marker found in output")
+            tail = stream.get_tail(10)
+            if tail:
+                print(f"[@script_executor] DEBUG: Last lines of output: {repr(tail[-500:])}")
         
         result = {
             'stdout': stdout,
@@ -734,12 +685,15 @@ class ScriptExecutor:
             'script_path': script_path,
             'parameters': parameters,
             'execution_time_ms': total_execution_time,
-            'report_url': report_url,
-            'logs_url': logs_url,
-            'script_success': script_success  # Extracted from SCRIPT_SUCCESS marker
+            'report_url': stream.report_url,
+            'logs_url': stream.logs_url,
+            'script_success': script_success,  # Extracted from SCRIPT_SUCCESS marker
+            'script_result_id': stream.script_result_id,
+            'stdout_truncated': stream.truncated,
+            'stdout_log_path': stream.log_path,
+            'events': list(stream.events),
         }
         
-        print(f"[@script_executor] RETURNING: About to return result dictionary")
         return result
     
     # =====================================================
@@ -931,10 +885,6 @@ class ScriptExecutor:
                 print(f"⚠️ [{self.script_name}] Video capture failed: {e}")
                 context.test_video_url = ""
             
-            # Batch upload all screenshots to R2 BEFORE report generation
-            url_mapping = context.upload_screenshots_to_r2()
-            context.screenshot_url_mapping = url_mapping
-            
             # Stop stdout capture and get logs
             context.stop_stdout_capture()
             captured_stdout = context.get_captured_stdout()
@@ -947,8 +897,7 @@ class ScriptExecutor:
                 execution_time=actual_execution_time_ms,
                 success=context.overall_success,
                 step_results=context.step_results,
-                screenshot_paths=context.screenshot_paths,
-                screenshot_url_mapping=url_mapping,
+                screenshot_paths=context.screenshot_paths,  # Uploaded by the report asset pipeline
                 error_message=context.error_message,
                 userinterface_name=userinterface_name,
                 execution_summary=getattr(context, 'execution_summary', ''),
@@ -963,6 +912,15 @@ class ScriptExecutor:
                 print(f"📊 [{self.script_name}] Report generated: {report_result.get('report_url')}")
                 if report_result.get('logs_url'):
                     print(f"📝 [{self.script_name}] Logs uploaded: {report_result.get('logs_url')}")
+                
+                # Delete local screenshots now in R2
+                context.screenshot_url_mapping = report_result.get('screenshot_url_mapping', {})
+                for local_path in context.screenshot_url_mapping:
+                    try:
+                        if os.path.exists(local_path):
+                            os.remove(local_path)
+                    except Exception as e:
+                        print(f"⚠️ [{self.script_name}] Failed to delete local file {os.path.basename(local_path)}: {e}")
             
             return report_result
             
@@ -981,6 +939,9 @@ class ScriptExecutor:
     def cleanup_and_exit(self, context: ScriptExecutionContext, userinterface_name: str):
         """Cleanup resources and exit with appropriate code - NO DEVICE UNLOCKING"""
         try:
+            # Land any throttled overlay update before the final steps
+            context.flush_running_log()
+            
             # Output results for execution system FIRST
             success_str = str(context.overall_success).lower()
             print(f"SCRIPT_SUCCESS:{success_str}")
@@ -1001,6 +962,10 @@ class ScriptExecutor:
             
             report_result = self.generate_report_for_context(context, device_info, host_info, userinterface_name)
             
+            # Write execution results batched during the run before the script result is finalized
+            from shared.src.lib.database.execution_results_recorder import flush_execution_results
+            flush_execution_results()
+            
             # Store report URLs for final summary
             if report_result and report_result.get('success') and report_result.get('report_url'):
                 if not hasattr(context, 'custom_data'):
@@ -0,0 +1,249 @@
+"""
+Streaming Script Output for VirtualPyTest
+
+Bounded-memory sink for the merged stdout/stderr of a script run (cold
+subprocess or warm worker), used by ScriptExecutor._stream_script_output:
+- Full output is spilled line by line to a log file on disk
+- Only the last tail_lines lines are kept in memory (ring buffer)
+- Marker lines are parsed as they arrive into structured events:
+  REPORT_URL / LOGS_URL upload lines, SCRIPT_RESULT_ID, SCRIPT_SUCCESS and
+  running-log step updates ("Wrote running log: ... (step N/M)")
+- Echo to the host console is batched (one write per interval, not per line)
+
+get_stdout() returns the tail, prefixed with any marker lines that fell out
+of it, so callers that regex the returned stdout (SCRIPT_RESULT_ID,
+SCRIPT_SUCCESS) keep working on hour-long runs.
+
+Usage:
+    stream = ScriptOutputStream(script_name)
+    for line in ...:
+        stream.feed(line)
+    stream.close()
+    result = {'stdout': stream.get_stdout(), 'report_url': stream.report_url, ...}
+"""
+
+import os
+import re
+import sys
+import tempfile
+import time
+import uuid
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+SCRIPT_OUTPUT_TAIL_LINES = int(os.getenv('SCRIPT_OUTPUT_TAIL_LINES', '5000'))
+SCRIPT_OUTPUT_ECHO = os.getenv('SCRIPT_OUTPUT_ECHO', 'true').lower() != 'false'
+SCRIPT_OUTPUT_ECHO_INTERVAL = 0.5
+SCRIPT_OUTPUT_LOG_DIR = os.getenv('SCRIPT_OUTPUT_LOG_DIR', os.path.join(tempfile.gettempdir(), 'virtualpytest', 'script_output'))
+SCRIPT_OUTPUT_LOG_RETENTION_HOURS = float(os.getenv('SCRIPT_OUTPUT_LOG_RETENTION_HOURS', '24'))
+
+MAX_TAIL_LINE_CHARS = 16384  # Longer lines are cut in the tail (kept whole in the log file)
+MAX_EVENTS = 1000
+
+REPORT_MARKER = '[@cloudflare_utils:upload_script_report] INFO: Uploaded script report:'
+LOGS_MARKER = '[@utils:report_utils:generate_and_upload_script_report] Logs uploaded:'
+RESULT_ID_MARKER = 'SCRIPT_RESULT_ID:'
+SUCCESS_MARKER = 'SCRIPT_SUCCESS:'
+STEP_MARKER = 'Wrote running log:'
+
+_RESULT_ID_RE = re.compile(r'SCRIPT_RESULT_ID:([^\s]+)')
+_SUCCESS_RE = re.compile(r'SCRIPT_SUCCESS:(true|false)')
+_STEP_RE = re.compile(r'\(step (\d+)/(\d+)\)')
+
+_last_prune = 0.0
+
+
+class ScriptOutputStream:
+    """Ring-buffered, disk-spilled output of one script run with incremental marker parsing"""
+
+    def __init__(self, script_name: str, tail_lines: int = SCRIPT_OUTPUT_TAIL_LINES,
+                 log_dir: Optional[str] = SCRIPT_OUTPUT_LOG_DIR, echo: bool = SCRIPT_OUTPUT_ECHO,
+                 on_event: Optional[Callable[[Dict[str, Any]], None]] = None):
+        self.script_name = script_name
+        self.echo = echo
+        self.on_event = on_event
+
+        self._tail: Deque[str] = deque(maxlen=tail_lines)
+        self._marker_lines: List[tuple] = []  # (line_number, line) - kept even when rotated out of the tail
+        self._echo_pending: List[str] = []
+        self._echo_flushed_at = time.monotonic()
+
+        self.line_count = 0
+        self.byte_count = 0
+        self.events: Deque[Dict[str, Any]] = deque(maxlen=MAX_EVENTS)
+        self.report_url = ""
+        self.logs_url = ""
+        self.script_result_id: Optional[str] = None
+        self.script_success: Optional[bool] = None
+        self.current_step: Optional[int] = None
+        self.total_steps: Optional[int] = None
+
+        self.log_path: Optional[str] = None
+        self._log_file = None
+        if log_dir:
+            self._open_log(log_dir)
+
+    def _open_log(self, log_dir: str):
+        try:
+            os.makedirs(log_dir, exist_ok=True)
+            _prune_old_logs(log_dir)
+            safe_name = re.sub(r'[^\w.-]', '_', self.script_name)[:64]
+            self.log_path = os.path.join(log_dir, f"{safe_name}_{int(time.time())}_{uuid.uuid4().hex[:8]}.log")
+            self._log_file = open(self.log_path, 'w', encoding='utf-8', errors='replace')
+        except OSError as e:
+            print(f"[@script_output] ⚠️ Cannot spill output to disk ({e}), keeping tail only")
+            self.log_path = None
+            self._log_file = None
+
+    # =====================================================
+    # INPUT
+    # =====================================================
+
+    def feed(self, output: str) -> Optional[Dict[str, Any]]:
+        """
+        Consume one output line (with or without trailing newline)
+
+        Returns:
+            The structured event parsed from the line, if it was a marker line
+        """
+        if not output.endswith('\n'):
+            output += '\n'
+        self.line_count += 1
+        self.byte_count += len(output)
+
+        if self._log_file:
+            self._log_file.write(output)
+
+        self._tail.append(output if len(output) <= MAX_TAIL_LINE_CHARS else output[:MAX_TAIL_LINE_CHARS] + ' [...]\n')
+
+        event = self._parse_marker(output.rstrip())
+
+        if self.echo:
+            self._echo_pending.append(f"[{self.script_name}] {output}")
+            # Markers are flushed right away so they show up next to the lines that produced them
+            if event or time.monotonic() - self._echo_flushed_at >= SCRIPT_OUTPUT_ECHO_INTERVAL:
+                self.flush_echo()
+
+        if event:
+            if event['type'] != 'step':  # Step updates are superseded - only result markers stay sticky
+                self._marker_lines.append((self.line_count, output))
+            self.events.append(event)
+            if event['type'] == 'report_url':
+                print(f"📊 [Script] Report URL captured: {self.report_url}")
+            elif event['type'] == 'logs_url':
+                print(f"📝 [Script] Logs URL captured: {self.logs_url}")
+            if self.on_event:
+                try:
+                    self.on_event(event)
+                except Exception as e:
+                    print(f"[@script_output] ⚠️ Event callback failed: {e}")
+
+        return event
+
+    def note(self, text: str):
+        """Append an executor-generated line (e.g. timeout notice) to the output"""
+        self.feed(text.lstrip('\n'))
+
+    def _parse_marker(self, line: str) -> Optional[Dict[str, Any]]:
+        """Cheap substring checks first - the regexes only run on candidate lines"""
+        if 'SCRIPT_' not in line and '[@' not in line:
+            return None
+
+        if STEP_MARKER in line:
+            match = _STEP_RE.search(line)
+            if match:
+                self.current_step, self.total_steps = int(match.group(1)), int(match.group(2))
+                return {'type': 'step', 'step': self.current_step, 'total': self.total_steps, 'line': self.line_count}
+            return None
+
+        if REPORT_MARKER in line:
+            try:
+                report_path = line.split('Uploaded script report: ')[1]
+                base_url = os.environ.get('CLOUDFLARE_R2_PUBLIC_URL', 'https://pub-604f1a4ce32747778c6d5ac5e3100217.r2.dev')
+                self.report_url = f"{base_url.rstrip('/')}/{report_path}"
+                return {'type': 'report_url', 'url': self.report_url, 'line': self.line_count}
+            except Exception as e:
+                print(f"⚠️ [Script] Failed to extract report URL: {e}")
+            return None
+
+        if LOGS_MARKER in line:
+            try:
+                self.logs_url = line.split('Logs uploaded: ')[1].strip()
+                return {'type': 'logs_url', 'url': self.logs_url, 'line': self.line_count}
+            except Exception as e:
+                print(f"⚠️ [Script] Failed to extract logs URL: {e}")
+            return None
+
+        if RESULT_ID_MARKER in line:
+            match = _RESULT_ID_RE.search(line)
+            if match and self.script_result_id is None:
+                self.script_result_id = match.group(1)
+                return {'type': 'script_result_id', 'script_result_id': self.script_result_id, 'line': self.line_count}
+            return None
+
+        if SUCCESS_MARKER in line:
+            match = _SUCCESS_RE.search(line)
+            if match and self.script_success is None:
+                self.script_success = match.group(1) == 'true'
+                return {'type': 'script_success', 'success': self.script_success, 'line': self.line_count}
+            return None
+
+        return None
+
+    # =====================================================
+    # OUTPUT
+    # =====================================================
+
+    @property
+    def truncated(self) -> bool:
+        return self.line_count > len(self._tail)
+
+    def flush_echo(self):
+        if self._echo_pending:
+            sys.stdout.write(''.join(self._echo_pending))
+            sys.stdout.flush()
+            self._echo_pending.clear()
+        self._echo_flushed_at = time.monotonic()
+
+    def get_stdout(self) -> str:
+        """Tail of the output; marker lines that rotated out are kept in front of it"""
+        if not self.truncated:
+            return ''.join(self._tail)
+
+        first_tail_line = self.line_count - len(self._tail) + 1
+        dropped_markers = [line for number, line in self._marker_lines if number < first_tail_line]
+        omitted = first_tail_line - 1
+        location = f" - full output: {self.log_path}" if self.log_path else ""
+        notice = f"[... {omitted} earlier lines omitted{location} ...]\n"
+        return ''.join(dropped_markers) + notice + ''.join(self._tail)
+
+    def get_tail(self, lines: int = 50) -> str:
+        """Last `lines` lines (for error summaries)"""
+        return ''.join(list(self._tail)[-lines:])
+
+    def close(self):
+        self.flush_echo()
+        if self._log_file:
+            try:
+                self._log_file.close()
+            except OSError:
+                pass
+            self._log_file = None
+
+
+def _prune_old_logs(log_dir: str):
+    """Delete spilled logs older than the retention period (at most once per hour)"""
+    global _last_prune
+    now = time.time()
+    if now - _last_prune < 3600:
+        return
+    _last_prune = now
+
+    cutoff = now - SCRIPT_OUTPUT_LOG_RETENTION_HOURS * 3600
+    try:
+        with os.scandir(log_dir) as entries:
+            for entry in entries:
+                if entry.name.endswith('.log') and entry.stat().st_mtime < cutoff:
+                    os.remove(entry.path)
+    except OSError:
+        pass
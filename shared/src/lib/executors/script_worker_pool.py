@@ -0,0 +1,506 @@
+"""
+Warm Script Worker Pool for VirtualPyTest
+
+Removes the per-run interpreter cold start of ScriptExecutor:
+- Each worker is a long-lived interpreter that has already imported the heavy
+  third-party libraries (NumPy, OpenCV, requests, Supabase client) and the project
+  stack every script loads (executors, controller factory, navigation graph)
+- Runs are requested over a local UNIX socket
+- For every run the worker forks a child that executes the script as __main__.
+  The worker itself never runs a script, so each child starts from the post-import
+  state: module singletons and caches are fresh without being re-imported
+- Project modules are only dropped (and re-imported by the child) when the run env
+  differs from the worker env beyond RUN_ENV_KEYS, since module-level config reads env
+- Child stdout/stderr is the socket itself: output streams line by line exactly
+  like the subprocess pipe (REPORT_URL/LOGS_URL/SCRIPT_SUCCESS parsing unchanged)
+- Workers exit after max_runs runs and are respawned by the pool (bounded memory,
+  picks up code changes)
+
+Protocol (one connection per run):
+    client → worker: one JSON line {"script_path", "argv", "env", "cwd"}
+    worker → client: one JSON line {"pid": <child pid>}, then raw script output,
+                     then a final EXIT_MARKER line with the exit code
+
+Usage:
+    pool = get_script_worker_pool()
+    run = pool.start_run(script_path, argv, env)   # None → fall back to cold spawn
+    line = run.readline(timeout=1.0)               # '' = nothing yet, None = end of output
+    exit_code = run.wait()
+
+Benchmark (cold spawn vs warm worker):
+    python -m shared.src.lib.executors.script_worker_pool --benchmark 10
+"""
+
+import os
+import sys
+import json
+import time
+import queue
+import signal
+import socket
+import argparse
+import threading
+import subprocess
+from typing import Dict, List, Optional
+
+DEFAULT_POOL_SIZE = int(os.getenv('SCRIPT_WORKER_POOL_SIZE', '2'))
+DEFAULT_MAX_RUNS = int(os.getenv('SCRIPT_WORKER_MAX_RUNS', '50'))
+WORKER_READY_TIMEOUT = 60.0
+EXIT_MARKER = '\x00__SCRIPT_EXIT__:'
+
+# Imported once per worker, shared copy-on-write with every forked run
+PRELOAD_MODULES = [
+    'numpy',
+    'cv2',
+    'requests',
+    'supabase',
+    # Project stack imported by every script (script_decorators -> ScriptExecutor, reports, DB)
+    'shared.src.lib.executors',
+    'shared.src.lib.executors.script_decorators',
+    'backend_host.src.controllers.controller_manager',
+    'backend_host.src.controllers.controller_config_factory',
+    'shared.src.lib.utils.navigation_graph',
+]
+
+# Packages whose modules are dropped in the child when the run env changes their import-time config
+PROJECT_PACKAGES = ('shared', 'backend_host', 'backend_server', 'test_scripts')
+
+# Env vars set per run (ScriptExecutor / venv activation) that project modules only read at call time
+RUN_ENV_KEYS = {'AI_SCRIPT_NAME', 'TEAM_ID', 'VIRTUAL_ENV', 'PATH'}
+
+_worker_env: Dict[str, str] = {}  # Env the worker preloaded under
+
+
+def _get_project_root() -> str:
+    project_root = os.getenv('PROJECT_ROOT')
+    if project_root:
+        return project_root
+    current_dir = os.path.dirname(os.path.abspath(__file__))  # /shared/src/lib/executors
+    return os.path.abspath(os.path.join(current_dir, '..', '..', '..', '..'))
+
+
+def get_worker_python(project_root: str) -> str:
+    """Same interpreter as the cold spawn: venv python if present (Raspberry Pi), else current one (Docker)"""
+    venv_python = os.path.join(project_root, 'venv', 'bin', 'python')
+    return venv_python if os.path.exists(venv_python) else sys.executable
+
+
+# =====================================================
+# WORKER SIDE (runs inside the warm interpreter)
+# =====================================================
+
+def _preload_modules(module_names: List[str]) -> List[str]:
+    import importlib
+
+    loaded = []
+    for module_name in module_names:
+        try:
+            importlib.import_module(module_name)
+            loaded.append(module_name)
+        except Exception as e:
+            print(f"[@script_worker_pool] Preload skipped {module_name}: {e}", file=sys.stderr)
+    return loaded
+
+
+def _import_env_changed(run_env: Dict[str, str]) -> bool:
+    """True when the run env differs from the preload env in a variable read at import time"""
+    keys = (set(run_env) | set(_worker_env)) - RUN_ENV_KEYS
+    return any(run_env.get(key) != _worker_env.get(key) for key in keys)
+
+
+def _drop_project_modules():
+    """Forget project modules imported by the worker itself (the run re-imports them under its env)"""
+    for name in list(sys.modules):
+        if name.split('.', 1)[0] in PROJECT_PACKAGES:
+            del sys.modules[name]
+
+
+def _run_child(conn: socket.socket, request: Dict):
+    """Forked child: run one script as __main__ with stdout/stderr on the socket (never returns)"""
+    import runpy
+
+    exit_code = 0
+    fd = conn.fileno()
+    try:
+        os.setsid()  # Own process group: a kill from the client also stops the script's subprocesses
+        os.dup2(fd, 1)
+        os.dup2(fd, 2)
+        sys.stdout = os.fdopen(1, 'w', buffering=1, encoding='utf-8', errors='replace', closefd=False)
+        sys.stderr = sys.stdout
+
+        run_env = request.get('env') or {}
+        if _import_env_changed(run_env):
+            _drop_project_modules()  # Module-level env config must come from this run's env
+        os.environ.clear()
+        os.environ.update(run_env)
+        os.chdir(request.get('cwd') or os.getcwd())
+
+        script_path = request['script_path']
+        sys.argv = [script_path] + list(request.get('argv') or [])
+        sys.path.insert(0, os.path.dirname(script_path))
+
+        runpy.run_path(script_path, run_name='__main__')
+    except SystemExit as e:
+        if e.code is None:
+            exit_code = 0
+        elif isinstance(e.code, int):
+            exit_code = e.code
+        else:
+            print(e.code)
+            exit_code = 1
+    except BaseException:
+        import traceback
+        traceback.print_exc()
+        exit_code = 1
+    finally:
+        try:
+            _flush_execution_results()
+            sys.stdout.flush()
+            os.write(1, f"\n{EXIT_MARKER}{exit_code}\n".encode())
+        finally:
+            os._exit(exit_code if 0 <= exit_code < 256 else 1)
+
+
+def _flush_execution_results():
+    """Write the rows the script recorded - os._exit() skips the recorder's atexit flush"""
+    recorder = sys.modules.get('shared.src.lib.database.execution_results_recorder')
+    if recorder is None:
+        return  # Script never recorded anything
+    try:
+        recorder.flush_execution_results()
+    except Exception as e:
+        print(f"[@script_worker_pool] ⚠️ Execution results flush failed: {e}")
+
+
+def _reap_children():
+    while True:
+        try:
+            pid, _ = os.waitpid(-1, os.WNOHANG)
+        except ChildProcessError:
+            return
+        if pid == 0:
+            return
+
+
+def serve(socket_path: str, max_runs: int, preload_modules: Optional[List[str]] = None):
+    """Worker main loop: single-threaded accept + fork (fork-safe)"""
+    global _worker_env
+    _worker_env = dict(os.environ)  # Before the preload: imports that touch os.environ do that again in the run
+    loaded = _preload_modules(PRELOAD_MODULES if preload_modules is None else preload_modules)
+
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(socket_path)
+    os.chmod(socket_path, 0o600)
+    server.listen(8)
+    server.settimeout(1.0)
+    print(f"[@script_worker_pool] Worker {os.getpid()} ready on {socket_path} ({len(loaded)} modules preloaded)", flush=True)
+
+    runs = 0
+    try:
+        while runs < max_runs:
+            _reap_children()
+            try:
+                conn, _ = server.accept()
+            except socket.timeout:
+                if os.getppid() == 1:  # Pool owner died
+                    break
+                continue
+
+            conn.settimeout(10.0)
+            try:
+                with conn.makefile('r', encoding='utf-8') as reader:
+                    request = json.loads(reader.readline())
+            except Exception as e:
+                print(f"[@script_worker_pool] Bad request: {e}", file=sys.stderr, flush=True)
+                conn.close()
+                continue
+            conn.settimeout(None)
+
+            pid = os.fork()
+            if pid == 0:
+                server.close()
+                conn.sendall((json.dumps({'pid': os.getpid()}) + '\n').encode())
+                _run_child(conn, request)
+            conn.close()
+            runs += 1
+    finally:
+        server.close()
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        print(f"[@script_worker_pool] Worker {os.getpid()} recycled after {runs} runs", flush=True)
+
+
+# =====================================================
+# POOL SIDE (runs inside the host process)
+# =====================================================
+
+class PooledScriptRun:
+    """One script run on a warm worker - streams output lines and exposes exit code / kill"""
+
+    def __init__(self, conn: socket.socket):
+        self.conn = conn
+        self.exit_code: Optional[int] = None
+        self._reader = conn.makefile('r', encoding='utf-8', errors='replace', newline='')
+        header = json.loads(self._reader.readline())
+        self.pid: int = header['pid']
+        self._lines: "queue.Queue[Optional[str]]" = queue.Queue()
+        self._thread = threading.Thread(target=self._read_loop, daemon=True, name=f"script-run-{self.pid}")
+        self._thread.start()
+
+    def _read_loop(self):
+        pending_newline = False
+        try:
+            for line in self._reader:
+                if line.startswith(EXIT_MARKER):
+                    self.exit_code = int(line[len(EXIT_MARKER):].strip() or 1)
+                    continue
+                # Marker is preceded by a newline of its own - don't emit it as an empty output line
+                if pending_newline:
+                    self._lines.put('\n')
+                    pending_newline = False
+                if line == '\n':
+                    pending_newline = True
+                    continue
+                self._lines.put(line)
+        except (OSError, ValueError):
+            pass
+        finally:
+            self._lines.put(None)
+
+    def poll(self) -> Optional[int]:
+        """Exit code once the run has finished (EOF on the socket), else None"""
+        if self._thread.is_alive():
+            return None
+        return self.exit_code if self.exit_code is not None else 1
+
+    def readline(self, timeout: float = 1.0) -> Optional[str]:
+        """Next output line, '' if nothing within timeout, None at end of output"""
+        try:
+            return self._lines.get(timeout=timeout)
+        except queue.Empty:
+            return ''
+
+    def kill(self):
+        try:
+            os.killpg(self.pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            pass
+
+    def wait(self) -> int:
+        self._thread.join()
+        self.close()
+        return self.poll()
+
+    def close(self):
+        try:
+            self._reader.close()
+            self.conn.close()
+        except OSError:
+            pass
+
+
+class ScriptWorkerPool:
+    """Keeps pool_size warm workers alive and hands runs to them"""
+
+    def __init__(self, pool_size: int = DEFAULT_POOL_SIZE, max_runs: int = DEFAULT_MAX_RUNS,
+                 socket_dir: str = '/tmp', preload_modules: Optional[List[str]] = None):
+        self.pool_size = max(1, pool_size)
+        self.max_runs = max(1, max_runs)
+        self.preload_modules = preload_modules
+        self.project_root = _get_project_root()
+        self.python = get_worker_python(self.project_root)
+        self.socket_paths = [
+            os.path.join(socket_dir, f"vpt_script_worker_{os.getpid()}_{i}.sock") for i in range(self.pool_size)
+        ]
+        self._workers: List[Optional[subprocess.Popen]] = [None] * self.pool_size
+        self._next = 0
+        self._lock = threading.Lock()
+        self.stats = {'pooled_runs': 0, 'fallbacks': 0, 'worker_starts': 0}
+
+    def _spawn(self, index: int):
+        socket_path = self.socket_paths[index]
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        command = [self.python, '-m', 'shared.src.lib.executors.script_worker_pool',
+                   '--serve', socket_path, '--max-runs', str(self.max_runs)]
+        if self.preload_modules is not None:
+            command += ['--preload', ','.join(self.preload_modules)]
+        self._workers[index] = subprocess.Popen(
+            command,
+            cwd=self.project_root,
+            env=dict(os.environ),
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True
+        )
+        self.stats['worker_starts'] += 1
+        print(f"[@script_worker_pool] Started warm worker {index} (pid {self._workers[index].pid})")
+
+    def start(self):
+        """Spawn all workers (they warm up in the background)"""
+        with self._lock:
+            for index in range(self.pool_size):
+                worker = self._workers[index]
+                if worker is None or worker.poll() is not None:
+                    self._spawn(index)
+
+    def _connect(self, index: int, timeout: float) -> Optional[socket.socket]:
+        deadline = time.time() + timeout
+        socket_path = self.socket_paths[index]
+        while True:
+            worker = self._workers[index]
+            if worker is None or worker.poll() is not None:
+                return None
+            if os.path.exists(socket_path):
+                conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                try:
+                    conn.connect(socket_path)
+                    return conn
+                except OSError:
+                    conn.close()
+            if time.time() >= deadline:
+                return None
+            time.sleep(0.05)
+
+    def start_run(self, script_path: str, argv: List[str], env: Optional[Dict[str, str]] = None,
+                  cwd: Optional[str] = None, ready_timeout: float = WORKER_READY_TIMEOUT) -> Optional[PooledScriptRun]:
+        """
+        Start a script on a warm worker
+
+        Returns:
+            PooledScriptRun, or None if no worker could take the run (caller falls back to cold spawn)
+        """
+        self.start()  # Respawn recycled/dead workers so the next run finds them warm
+
+        with self._lock:
+            order = [(self._next + i) % self.pool_size for i in range(self.pool_size)]
+            self._next = (self._next + 1) % self.pool_size
+
+        run_env = dict(os.environ if env is None else env)
+        if self.python != sys.executable:
+            # Equivalent of `source venv/bin/activate` in the cold spawn
+            venv_dir = os.path.dirname(os.path.dirname(self.python))
+            run_env['VIRTUAL_ENV'] = venv_dir
+            run_env['PATH'] = os.path.join(venv_dir, 'bin') + os.pathsep + run_env.get('PATH', '')
+        request = {
+            'script_path': script_path,
+            'argv': argv,
+            'env': run_env,
+            'cwd': cwd or self.project_root
+        }
+        for index in order:
+            conn = self._connect(index, ready_timeout if index == order[-1] else 0.5)
+            if conn is None:
+                continue
+            try:
+                conn.sendall((json.dumps(request) + '\n').encode())
+                run = PooledScriptRun(conn)
+                self.stats['pooled_runs'] += 1
+                return run
+            except (OSError, ValueError, KeyError) as e:
+                print(f"[@script_worker_pool] Worker {index} failed to start run: {e}")
+                conn.close()
+
+        self.stats['fallbacks'] += 1
+        return None
+
+    def shutdown(self):
+        with self._lock:
+            for worker in self._workers:
+                if worker is not None and worker.poll() is None:
+                    worker.terminate()
+            self._workers = [None] * self.pool_size
+
+
+_pool: Optional[ScriptWorkerPool] = None
+_pool_lock = threading.Lock()
+
+
+def is_script_worker_pool_enabled() -> bool:
+    return os.getenv('SCRIPT_WORKER_POOL', 'true').lower() == 'true' and hasattr(os, 'fork')
+
+
+def get_script_worker_pool() -> ScriptWorkerPool:
+    """Get the process-wide ScriptWorkerPool (singleton, workers started on first use)"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ScriptWorkerPool()
+                _pool.start()
+    return _pool
+
+
+# =====================================================
+# STARTUP BENCHMARK
+# =====================================================
+
+def benchmark_startup(runs: int = 5, imports: Optional[List[str]] = None) -> Dict[str, float]:
+    """
+    Compare time-to-first-output of the cold spawn (bash + python + imports) with a warm worker
+
+    The probe script imports the same modules as PRELOAD_MODULES (or `imports`) and prints one line.
+    """
+    import tempfile
+    import statistics
+
+    project_root = _get_project_root()
+    modules = imports or PRELOAD_MODULES
+    probe = (
+        "import importlib\n"
+        f"for name in {modules!r}:\n"
+        "    try:\n"
+        "        importlib.import_module(name)\n"
+        "    except Exception:\n"
+        "        pass\n"
+        "print('READY', flush=True)\n"
+    )
+    with tempfile.NamedTemporaryFile('w', suffix='.py', delete=False) as f:
+        f.write(probe)
+        probe_path = f.name
+
+    python = get_worker_python(project_root)
+    env = dict(os.environ, PYTHONPATH=project_root)
+    cold, warm = [], []
+    pool = ScriptWorkerPool(pool_size=1, max_runs=runs + 1)
+    try:
+        for _ in range(runs):
+            start = time.perf_counter()
+            subprocess.run([python, probe_path], cwd=project_root, env=env, capture_output=True, check=False)
+            cold.append((time.perf_counter() - start) * 1000)
+
+        pool.start()
+        pool.start_run(probe_path, [], env).wait()  # Wait until the worker is warm
+        for _ in range(runs):
+            start = time.perf_counter()
+            pool.start_run(probe_path, [], env).wait()
+            warm.append((time.perf_counter() - start) * 1000)
+    finally:
+        pool.shutdown()
+        os.unlink(probe_path)
+
+    results = {
+        'cold_median_ms': statistics.median(cold),
+        'warm_median_ms': statistics.median(warm),
+        'speedup': statistics.median(cold) / max(statistics.median(warm), 0.001)
+    }
+    print(f"[@script_worker_pool] Startup benchmark ({runs} runs): cold={results['cold_median_ms']:.0f}ms "
+          f"warm={results['warm_median_ms']:.0f}ms ({results['speedup']:.1f}x)")
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Warm script worker (fork server)')
+    parser.add_argument('--serve', metavar='SOCKET_PATH', help='Run a worker listening on SOCKET_PATH')
+    parser.add_argument('--max-runs', type=int, default=DEFAULT_MAX_RUNS, help='Runs before the worker recycles')
+    parser.add_argument('--preload', help='Comma-separated modules to preload (default: PRELOAD_MODULES)')
+    parser.add_argument('--benchmark', type=int, metavar='RUNS', help='Compare cold spawn vs warm worker startup')
+    cli_args = parser.parse_args()
+
+    if cli_args.serve:
+        serve(cli_args.serve, cli_args.max_runs,
+              [name for name in cli_args.preload.split(',') if name] if cli_args.preload is not None else None)
+    else:
+        benchmark_startup(cli_args.benchmark or 5)
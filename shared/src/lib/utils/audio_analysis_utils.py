@@ -0,0 +1,351 @@
+"""
+Audio Analysis Utilities
+Single-pass audio level analysis of HLS/TS/MP4/MP3 segments - NO controller dependencies
+
+Each segment is decoded to PCM exactly ONCE (in-process with PyAV when available,
+otherwise one ffmpeg pipe read) and every metric is computed from that PCM with NumPy:
+RMS/mean volume, peak, silence runs, continuity and gated loudness.
+
+Results are cached per segment (path + mtime + size) and published to subscribers,
+so the audio detection worker, zapping dropout checks, dubbing and incident logic
+all reuse the same decode instead of each spawning ffmpeg volumedetect/silencedetect.
+
+Reused by: audio_transcription_utils, transcript_accumulator, capture_monitor
+"""
+import os
+import time
+import logging
+import subprocess
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+# Audio detection threshold (dB)
+AUDIO_THRESHOLD_DB = -50.0  # Volume above this = audio detected, below = silent
+
+ANALYSIS_SAMPLE_RATE = 16000     # Enough for level/silence metrics, same rate as Whisper
+SILENCE_FRAME_MS = 10            # Silence detection resolution
+LOUDNESS_BLOCK_MS = 400          # BS.1770 gating block
+LOUDNESS_ABSOLUTE_GATE_DB = -70.0
+METRICS_CACHE_SIZE = 256         # Segments kept in the metrics cache (all devices)
+
+
+# =====================================================
+# DECODING (one pass per file, no process spawn with PyAV)
+# =====================================================
+
+def _decode_with_pyav(file_path: str, sample_rate: int, max_duration: Optional[float], timeout: int):
+    import av
+    import numpy as np
+
+    chunks = []
+    decoded = 0
+    max_samples = int(max_duration * sample_rate) if max_duration else None
+    deadline = time.monotonic() + timeout  # Same budget as the ffmpeg subprocess it replaces
+
+    with av.open(file_path) as container:
+        if not container.streams.audio:
+            return np.zeros(0, dtype=np.float32)
+        stream = container.streams.audio[0]
+        resampler = av.AudioResampler(format='flt', layout='mono', rate=sample_rate)
+
+        for frame in container.decode(stream):
+            for out in resampler.resample(frame):
+                samples = out.to_ndarray().reshape(-1)
+                chunks.append(samples)
+                decoded += len(samples)
+            if max_samples and decoded >= max_samples:
+                break
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"decode exceeded {timeout}s")
+        else:
+            for out in resampler.resample(None):
+                chunks.append(out.to_ndarray().reshape(-1))
+
+    audio = np.concatenate(chunks).astype(np.float32, copy=False) if chunks else np.zeros(0, dtype=np.float32)
+    return audio[:max_samples] if max_samples else audio
+
+
+def _decode_with_ffmpeg(file_path: str, sample_rate: int, max_duration: Optional[float], timeout: int):
+    import numpy as np
+
+    cmd = ['ffmpeg', '-hide_banner', '-loglevel', 'error', '-i', file_path]
+    if max_duration:
+        cmd += ['-t', str(max_duration)]
+    cmd += ['-vn', '-f', 's16le', '-acodec', 'pcm_s16le', '-ac', '1', '-ar', str(sample_rate), '-']
+
+    result = subprocess.run(cmd, capture_output=True, timeout=timeout)
+    if result.returncode != 0:
+        return None
+    return np.frombuffer(result.stdout, dtype=np.int16).astype(np.float32) / 32768.0
+
+
+def decode_pcm(file_path: str, sample_rate: int = ANALYSIS_SAMPLE_RATE, max_duration: Optional[float] = None,
+               timeout: int = 60, context: str = ""):
+    """
+    Decode audio of a file to mono float32 PCM in [-1.0, 1.0]
+
+    Uses PyAV (in-process, no fork/exec) and falls back to a single ffmpeg pipe read.
+
+    Returns:
+        numpy float32 array (empty if file has no audio stream) or None on failure
+    """
+    prefix = f"[{context}] " if context else ""
+    try:
+        try:
+            return _decode_with_pyav(file_path, sample_rate, max_duration, timeout)
+        except ImportError:
+            return _decode_with_ffmpeg(file_path, sample_rate, max_duration, timeout)
+    except (subprocess.TimeoutExpired, TimeoutError):
+        logger.warning(f"{prefix}Audio decode timeout for: {file_path}")
+        return None
+    except Exception as e:
+        logger.warning(f"{prefix}Failed to decode audio from {os.path.basename(file_path)}: {e}")
+        return None
+
+
+# =====================================================
+# METRICS (pure NumPy)
+# =====================================================
+
+def compute_volume_db(audio) -> float:
+    """Mean volume in dBFS of float PCM (same definition as ffmpeg volumedetect mean_volume)"""
+    import numpy as np
+
+    if audio is None or len(audio) == 0:
+        return -100.0
+    mean_square = float(np.mean(np.square(audio, dtype=np.float64)))
+    if mean_square <= 0.0:
+        return -100.0
+    return max(-100.0, float(10.0 * np.log10(mean_square)))
+
+
+def find_silence_runs(audio, sample_rate: int = ANALYSIS_SAMPLE_RATE, threshold_db: float = AUDIO_THRESHOLD_DB,
+                      min_silence_duration: float = 0.1) -> List[Dict[str, float]]:
+    """Silence periods (like ffmpeg silencedetect): runs of 10ms frames below threshold_db"""
+    import numpy as np
+
+    frame_len = max(1, int(sample_rate * SILENCE_FRAME_MS / 1000))
+    num_frames = len(audio) // frame_len
+    if num_frames == 0:
+        return []
+
+    frames = audio[:num_frames * frame_len].reshape(num_frames, frame_len)
+    peak_db = 20.0 * np.log10(np.maximum(np.abs(frames).max(axis=1), 1e-10))
+    silent = peak_db < threshold_db
+
+    padded = np.concatenate(([False], silent, [False]))
+    edges = np.flatnonzero(padded[1:] != padded[:-1])
+    frame_s = frame_len / sample_rate
+
+    periods = []
+    for start, end in zip(edges[0::2], edges[1::2]):
+        duration = float(end - start) * frame_s
+        if duration >= min_silence_duration:
+            periods.append({'start': float(start) * frame_s, 'end': float(end) * frame_s, 'duration': duration})
+    return periods
+
+
+def compute_gated_loudness(audio, sample_rate: int = ANALYSIS_SAMPLE_RATE) -> float:
+    """
+    Integrated loudness with BS.1770 gating (400ms blocks, -70 absolute gate, -10 relative gate)
+
+    NOTE: No K-weighting pre-filter - value is an unweighted approximation of LUFS,
+    consistent between segments which is what incident/dubbing comparisons need.
+    """
+    import numpy as np
+
+    block = int(sample_rate * LOUDNESS_BLOCK_MS / 1000)
+    num_blocks = len(audio) // block
+    if num_blocks == 0:
+        return compute_volume_db(audio)
+
+    blocks = audio[:num_blocks * block].reshape(num_blocks, block)
+    power = np.mean(np.square(blocks, dtype=np.float64), axis=1)
+    loudness = -0.691 + 10.0 * np.log10(np.maximum(power, 1e-12))
+
+    gated = power[loudness > LOUDNESS_ABSOLUTE_GATE_DB]
+    if len(gated) == 0:
+        return -100.0
+    relative_gate = -0.691 + 10.0 * np.log10(np.mean(gated)) - 10.0
+    gated = power[(loudness > LOUDNESS_ABSOLUTE_GATE_DB) & (loudness > relative_gate)]
+    if len(gated) == 0:
+        return -100.0
+    return float(-0.691 + 10.0 * np.log10(np.mean(gated)))
+
+
+def compute_audio_metrics(audio, sample_rate: int = ANALYSIS_SAMPLE_RATE, threshold_db: float = AUDIO_THRESHOLD_DB,
+                          min_silence_duration: float = 0.1) -> Dict[str, Any]:
+    """
+    All level metrics from one PCM buffer
+
+    Returns:
+        Dict with 'audio', 'mean_volume_db', 'peak_db', 'loudness_db', 'duration',
+        'silence_periods', 'total_silence', 'has_continuous_audio'
+    """
+    import numpy as np
+
+    duration = len(audio) / sample_rate if audio is not None else 0.0
+    if audio is None or len(audio) == 0:
+        return {
+            'audio': False,
+            'mean_volume_db': -100.0,
+            'peak_db': -100.0,
+            'loudness_db': -100.0,
+            'duration': duration,
+            'silence_periods': [],
+            'total_silence': 0.0,
+            'has_continuous_audio': False
+        }
+
+    mean_volume_db = compute_volume_db(audio)
+    peak = float(np.abs(audio).max())
+    silence_periods = find_silence_runs(audio, sample_rate, threshold_db, min_silence_duration)
+
+    return {
+        'audio': mean_volume_db > threshold_db,
+        'mean_volume_db': mean_volume_db,
+        'peak_db': max(-100.0, float(20.0 * np.log10(peak))) if peak > 0 else -100.0,
+        'loudness_db': compute_gated_loudness(audio, sample_rate),
+        'duration': duration,
+        'silence_periods': silence_periods,
+        'total_silence': sum(p['duration'] for p in silence_periods),
+        'has_continuous_audio': len(silence_periods) == 0
+    }
+
+
+# =====================================================
+# ENGINE (cache + publish)
+# =====================================================
+
+class AudioAnalysisEngine:
+    """
+    Per-segment audio metrics with caching and publication
+
+    Usage:
+        engine = get_audio_analysis_engine()
+        metrics = engine.analyze_segment(segment_path, context='capture1')
+        engine.subscribe(lambda path, metrics, context: ...)
+    """
+
+    def __init__(self, cache_size: int = METRICS_CACHE_SIZE):
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[Tuple, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._subscribers: List[Callable[[str, Dict[str, Any], str], None]] = []
+        self._latest: Dict[str, Dict[str, Any]] = {}
+        self.stats = {'decodes': 0, 'cache_hits': 0, 'decode_seconds': 0.0}
+
+    def subscribe(self, callback: Callable[[str, Dict[str, Any], str], None]):
+        """Register callback(segment_path, metrics, context) called for each newly analyzed segment"""
+        self._subscribers.append(callback)
+
+    def get_latest(self, context: str) -> Optional[Dict[str, Any]]:
+        """Latest published metrics for a context (device folder)"""
+        return self._latest.get(context)
+
+    def _cache_key(self, file_path: str, max_duration: Optional[float], threshold_db: float, min_silence_duration: float):
+        stat = os.stat(file_path)
+        return (file_path, stat.st_mtime_ns, stat.st_size, max_duration, threshold_db, min_silence_duration)
+
+    def _decode(self, file_path: str, max_duration: Optional[float], timeout: int, context: str):
+        start = time.time()
+        audio = decode_pcm(file_path, max_duration=max_duration, timeout=timeout, context=context)
+        with self._lock:
+            self.stats['decodes'] += 1
+            self.stats['decode_seconds'] += time.time() - start
+        return audio
+
+    def analyze_segment(self, file_path: str, max_duration: Optional[float] = None,
+                        threshold_db: float = AUDIO_THRESHOLD_DB, min_silence_duration: float = 0.1,
+                        timeout: int = 10, context: str = "") -> Optional[Dict[str, Any]]:
+        """
+        Metrics of one segment (decoded at most once per content version)
+
+        Returns:
+            compute_audio_metrics() dict (+ 'segment_path', 'analyzed_at') or None on decode failure
+        """
+        try:
+            key = self._cache_key(file_path, max_duration, threshold_db, min_silence_duration)
+        except OSError as e:
+            logger.warning(f"[{context}] Segment not accessible: {file_path} ({e})")
+            return None
+
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                self.stats['cache_hits'] += 1
+                return cached
+
+        audio = self._decode(file_path, max_duration, timeout, context)
+        if audio is None:
+            return None
+
+        metrics = compute_audio_metrics(audio, threshold_db=threshold_db, min_silence_duration=min_silence_duration)
+        metrics['segment_path'] = file_path
+        metrics['analyzed_at'] = time.time()
+
+        with self._lock:
+            self._cache[key] = metrics
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+            if context:
+                self._latest[context] = metrics
+
+        for callback in self._subscribers:
+            try:
+                callback(file_path, metrics, context)
+            except Exception as e:
+                logger.warning(f"[{context}] Audio metrics subscriber error: {e}")
+
+        return metrics
+
+    def analyze_segments(self, file_paths: List[str], max_duration: Optional[float] = None,
+                         threshold_db: float = AUDIO_THRESHOLD_DB, min_silence_duration: float = 0.1,
+                         timeout: int = 10, context: str = "") -> Optional[Dict[str, Any]]:
+        """
+        Metrics of consecutive segments as one timeline (replaces concat+merge before silencedetect)
+
+        Each segment is decoded once; PCM is concatenated in memory, no merged temp file.
+        """
+        import numpy as np
+
+        chunks = []
+        for path in file_paths:
+            audio = self._decode(path, None, timeout, context)
+            if audio is None:
+                return None
+            chunks.append(audio)
+        if not chunks:
+            return None
+
+        audio = np.concatenate(chunks)
+        if max_duration:
+            audio = audio[:int(max_duration * ANALYSIS_SAMPLE_RATE)]
+        metrics = compute_audio_metrics(audio, threshold_db=threshold_db, min_silence_duration=min_silence_duration)
+        metrics['segment_paths'] = list(file_paths)
+        return metrics
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self.stats)
+            stats['cached_segments'] = len(self._cache)
+        return stats
+
+
+_engine: Optional[AudioAnalysisEngine] = None
+_engine_lock = threading.Lock()
+
+
+def get_audio_analysis_engine() -> AudioAnalysisEngine:
+    """Get the process-wide AudioAnalysisEngine (singleton)"""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = AudioAnalysisEngine()
+    return _engine
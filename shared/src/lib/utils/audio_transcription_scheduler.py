@@ -0,0 +1,473 @@
+"""
+Audio Transcription Scheduler
+Batched faster-whisper transcription across devices - NO controller dependencies
+
+Collects pending audio files (1min/10min MP3) from all devices into a single priority queue
+and feeds them to a pool of worker PROCESSES, each holding one Whisper model instance.
+
+Per batch, each worker:
+  1. Decodes every file to 16kHz PCM once (ffmpeg pipe, no temp WAV)
+  2. Runs the numpy speech pre-segmenter (segment_speech) on that PCM - files without
+     speech never reach the Whisper decoder, silent stretches inside a file are skipped
+  3. Transcribes the speech regions of all files sharing a language in ONE batched
+     inference call (BatchedInferencePipeline), then maps timestamps back per file
+
+Reused by: transcript_accumulator
+"""
+import os
+import time
+import heapq
+import bisect
+import logging
+import threading
+import itertools
+import multiprocessing
+from dataclasses import dataclass, field
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+# Configuration (overridable through environment)
+DEFAULT_WORKERS = int(os.getenv('TRANSCRIPTION_WORKERS', '1'))
+DEFAULT_BATCH_SIZE = int(os.getenv('TRANSCRIPTION_BATCH_SIZE', '8'))
+DEFAULT_CPU_THREADS = int(os.getenv('TRANSCRIPTION_CPU_THREADS', '2'))
+MAX_BATCH_WAIT_SECONDS = 2.0   # Wait at most this long for a batch to fill up
+MAX_CLIP_SECONDS = 30.0        # Whisper window - speech spans are split to fit
+FILE_GAP_SECONDS = MAX_CLIP_SECONDS + 1.0  # Silence between files in a batch (> faster-whisper clip merge window)
+
+# Queue sources (lower = served first)
+SOURCE_REALTIME = 0  # inotify 1min MP3s
+SOURCE_BACKLOG = 1   # scan of 10min chunks
+
+LANGUAGE_NAMES = {
+    'en': 'English', 'fr': 'French', 'de': 'German', 'es': 'Spanish',
+    'it': 'Italian', 'pt': 'Portuguese', 'nl': 'Dutch', 'pl': 'Polish',
+    'ru': 'Russian', 'zh': 'Chinese', 'ja': 'Japanese', 'ko': 'Korean'
+}
+
+
+@dataclass
+class TranscriptionJob:
+    """One audio file waiting for transcription (must stay picklable - sent to worker processes)"""
+    device_folder: str
+    audio_path: str
+    hour: int
+    chunk_index: int
+    kind: str                       # '1min' or '10min'
+    minute_offset: int = 0          # Slot within the 10min chunk (1min jobs only)
+    source: int = SOURCE_REALTIME
+    language: Optional[str] = None  # Language hint (code) - enables cross-device batching
+    enqueued_at: float = field(default_factory=time.time)
+
+
+# =====================================================
+# WORKER PROCESS SIDE
+# =====================================================
+
+_worker_model = None
+_worker_pipeline = None
+
+
+def _init_worker(model_name: str, cpu_threads: int):
+    """Process initializer: load ONE Whisper model per worker process"""
+    global _worker_model, _worker_pipeline
+
+    os.environ['ORT_DISABLE_ALL_PROVIDERS'] = '1'
+    os.environ['ONNXRUNTIME_PROVIDERS'] = 'CPUExecutionProvider'
+
+    from faster_whisper import WhisperModel
+    _worker_model = WhisperModel(
+        model_name,
+        device="cpu",
+        compute_type="int8",
+        cpu_threads=cpu_threads,
+        num_workers=1
+    )
+
+    try:
+        from faster_whisper import BatchedInferencePipeline
+        _worker_pipeline = BatchedInferencePipeline(model=_worker_model)
+    except ImportError:
+        # Older faster-whisper: fall back to sequential per-file inference
+        _worker_pipeline = None
+
+    print(f"[AudioTranscriptionScheduler] Worker {os.getpid()} loaded '{model_name}' (batched={_worker_pipeline is not None})")
+
+
+def _detect_speech_clips(audio) -> List[Dict[str, int]]:
+    """Speech spans of PCM (numpy energy VAD) in samples, each at most MAX_CLIP_SECONDS long"""
+    from shared.src.lib.utils.audio_transcription_utils import segment_speech, WHISPER_SAMPLE_RATE
+
+    max_samples = int(MAX_CLIP_SECONDS * WHISPER_SAMPLE_RATE)
+    clips = []
+    for span_start, span_end in segment_speech(audio):
+        start, end = int(span_start * WHISPER_SAMPLE_RATE), int(span_end * WHISPER_SAMPLE_RATE)
+        while end - start > max_samples:
+            clips.append({'start': start, 'end': start + max_samples})
+            start += max_samples
+        clips.append({'start': start, 'end': end})
+    return clips
+
+
+def _empty_result(job: TranscriptionJob, audio_seconds: float, reason: str) -> Dict[str, Any]:
+    return {
+        'success': True,
+        'transcript': '',
+        'language': 'unknown',
+        'language_code': job.language or 'unknown',
+        'confidence': 0.0,
+        'segments': [],
+        'duration': 0.0,
+        'audio_seconds': audio_seconds,
+        'skipped': True,
+        'reason': reason
+    }
+
+
+def _build_result(segments: List[Dict[str, Any]], language_code: str, confidence: float, audio_seconds: float) -> Dict[str, Any]:
+    """Build transcribe_audio()-compatible result dict"""
+    from shared.src.lib.utils.audio_transcription_utils import (
+        clean_transcript_text, correct_spelling, ENABLE_SPELLCHECK
+    )
+
+    transcript = clean_transcript_text(" ".join(s['text'] for s in segments).strip())
+    if ENABLE_SPELLCHECK:
+        transcript = correct_spelling(transcript, language_code)
+
+    return {
+        'success': True,
+        'transcript': transcript,
+        'language': LANGUAGE_NAMES.get(language_code, language_code),
+        'language_code': language_code,
+        'confidence': confidence,
+        'segments': segments,
+        'duration': max((s['end'] for s in segments), default=0.0),
+        'audio_seconds': audio_seconds
+    }
+
+
+def _to_segment(seg, offset_seconds: float) -> Dict[str, Any]:
+    start = seg.start - offset_seconds
+    end = seg.end - offset_seconds
+    confidence = max(0.0, min(1.0, seg.avg_logprob + 1.0)) if hasattr(seg, 'avg_logprob') else 0.0
+    return {
+        'start': start,
+        'end': end,
+        'text': seg.text.strip(),
+        'confidence': confidence,
+        'duration': end - start
+    }
+
+
+def _transcribe_group(jobs_audio: List[Tuple[int, Any, List[Dict[str, int]]]], language: Optional[str],
+                      batch_size: int) -> Dict[int, Tuple[List[Dict[str, Any]], str, float]]:
+    """
+    Transcribe the speech clips of several files in one batched call
+
+    Files are concatenated in a single PCM buffer, separated by FILE_GAP_SECONDS of
+    silence so faster-whisper never merges clips of two files into one chunk (it merges
+    adjacent clips up to 30s). Clips are offset accordingly, output segments are mapped
+    back to their file by sample offset and segments crossing a file boundary are dropped.
+    """
+    import numpy as np
+    from shared.src.lib.utils.audio_transcription_utils import WHISPER_SAMPLE_RATE
+
+    gap = np.zeros(int(FILE_GAP_SECONDS * WHISPER_SAMPLE_RATE), dtype=jobs_audio[0][1].dtype)
+    offsets = []
+    ends = []
+    clips = []
+    parts = []
+    position = 0
+    for _, audio, file_clips in jobs_audio:
+        if parts:
+            parts.append(gap)
+            position += len(gap)
+        offsets.append(position)
+        clips.extend({'start': c['start'] + position, 'end': c['end'] + position} for c in file_clips)
+        parts.append(audio)
+        position += len(audio)
+        ends.append(position)
+    buffer = np.concatenate(parts)
+
+    segments_iter, info = _worker_pipeline.transcribe(
+        buffer,
+        language=language,
+        beam_size=1,
+        vad_filter=False,
+        clip_timestamps=clips,
+        batch_size=batch_size,
+        without_timestamps=True,
+        temperature=0
+    )
+
+    per_file: Dict[int, List[Dict[str, Any]]] = {job_index: [] for job_index, _, _ in jobs_audio}
+    for seg in segments_iter:
+        file_pos = max(0, bisect.bisect_right(offsets, int(seg.start * WHISPER_SAMPLE_RATE)) - 1)
+        if int(seg.end * WHISPER_SAMPLE_RATE) > ends[file_pos] + WHISPER_SAMPLE_RATE:
+            # Never attribute text across files (would leak device A speech into device B)
+            logger.warning(f"[TRANSCRIPTION] Dropping segment crossing a file boundary ({seg.start:.1f}s-{seg.end:.1f}s)")
+            continue
+        job_index = jobs_audio[file_pos][0]
+        per_file[job_index].append(_to_segment(seg, offsets[file_pos] / WHISPER_SAMPLE_RATE))
+
+    confidence = getattr(info, 'language_probability', 0.5)
+    return {job_index: (segments, info.language, confidence) for job_index, segments in per_file.items()}
+
+
+def _transcribe_sequential(audio, clips: List[Dict[str, int]], language: Optional[str]) -> Tuple[List[Dict[str, Any]], str, float]:
+    """Fallback when BatchedInferencePipeline is unavailable - still only decodes speech clips"""
+    from shared.src.lib.utils.audio_transcription_utils import WHISPER_SAMPLE_RATE
+
+    segments_iter, info = _worker_model.transcribe(
+        audio,
+        beam_size=1,
+        vad_filter=False,
+        clip_timestamps=[c[key] / WHISPER_SAMPLE_RATE for c in clips for key in ('start', 'end')],
+        language=language,
+        word_timestamps=False,
+        condition_on_previous_text=False,
+        temperature=0
+    )
+    segments = [_to_segment(seg, 0.0) for seg in segments_iter]
+    return segments, info.language, getattr(info, 'language_probability', 0.5)
+
+
+def transcribe_batch(jobs: List[TranscriptionJob], batch_size: int = DEFAULT_BATCH_SIZE) -> List[Dict[str, Any]]:
+    """
+    Worker entry point: transcribe a batch of jobs (runs inside a worker process)
+
+    Returns one result per job, same order, transcribe_audio()-compatible plus 'audio_seconds'
+    """
+    from shared.src.lib.utils.audio_transcription_utils import (
+        decode_audio_pcm, compute_volume_db, AUDIO_THRESHOLD_DB, WHISPER_SAMPLE_RATE
+    )
+
+    results: List[Optional[Dict[str, Any]]] = [None] * len(jobs)
+    levels: Dict[int, Dict[str, Any]] = {}
+    groups: Dict[Optional[str], List[Tuple[int, Any, List[Dict[str, int]]]]] = {}
+
+    for index, job in enumerate(jobs):
+        try:
+            audio = decode_audio_pcm(job.audio_path, context=job.device_folder)
+            if audio is None or len(audio) == 0:
+                results[index] = {'success': False, 'transcript': '', 'language': 'unknown',
+                                  'confidence': 0.0, 'segments': [], 'audio_seconds': 0.0,
+                                  'error': 'Failed to decode audio'}
+                continue
+
+            audio_seconds = len(audio) / WHISPER_SAMPLE_RATE
+
+            # Audio level comes from the same decode (no separate ffmpeg volumedetect pass)
+            mean_volume_db = compute_volume_db(audio)
+            levels[index] = {
+                'audio': mean_volume_db > AUDIO_THRESHOLD_DB,
+                'mean_volume_db': mean_volume_db,
+                'minute_volumes_db': [compute_volume_db(audio[i:i + 60 * WHISPER_SAMPLE_RATE])
+                                      for i in range(0, len(audio), 60 * WHISPER_SAMPLE_RATE)]
+            }
+
+            clips = _detect_speech_clips(audio) if levels[index]['audio'] else []
+            if not clips:
+                # VAD before decode: silent minutes never reach Whisper
+                reason = 'no_speech' if levels[index]['audio'] else 'silent_audio'
+                results[index] = _empty_result(job, audio_seconds, reason)
+                continue
+
+            if _worker_pipeline is None:
+                segments, language_code, confidence = _transcribe_sequential(audio, clips, job.language)
+                results[index] = _build_result(segments, language_code, confidence, audio_seconds)
+                continue
+
+            # Files without language hint are batched alone (language is detected per call)
+            group_key = job.language if job.language else f"__detect_{index}"
+            groups.setdefault(group_key, []).append((index, audio, clips))
+        except Exception as e:
+            results[index] = {'success': False, 'transcript': '', 'language': 'unknown',
+                              'confidence': 0.0, 'segments': [], 'audio_seconds': 0.0, 'error': str(e)}
+
+    for group_key, jobs_audio in groups.items():
+        language = None if group_key.startswith('__detect_') else group_key
+        try:
+            group_results = _transcribe_group(jobs_audio, language, batch_size)
+            for job_index, audio, _ in jobs_audio:
+                segments, language_code, confidence = group_results[job_index]
+                results[job_index] = _build_result(segments, language_code, confidence,
+                                                   len(audio) / WHISPER_SAMPLE_RATE)
+        except Exception as e:
+            for job_index, _, _ in jobs_audio:
+                results[job_index] = {'success': False, 'transcript': '', 'language': 'unknown',
+                                      'confidence': 0.0, 'segments': [], 'audio_seconds': 0.0, 'error': str(e)}
+
+    for index, level in levels.items():
+        results[index].update(level)
+
+    return results
+
+
+# =====================================================
+# SCHEDULER (MAIN PROCESS SIDE)
+# =====================================================
+
+class TranscriptionScheduler:
+    """
+    Priority scheduler feeding batches of pending audio files to Whisper worker processes
+
+    Priority order: source (real-time before backlog) → device priority → recency
+    (real-time: newest first, like the former LIFO queue; backlog: oldest first)
+    """
+
+    def __init__(self, on_result: Callable[[TranscriptionJob, Dict[str, Any]], None],
+                 num_workers: int = DEFAULT_WORKERS, batch_size: int = DEFAULT_BATCH_SIZE,
+                 model_name: str = 'tiny', cpu_threads: int = DEFAULT_CPU_THREADS,
+                 device_priorities: Optional[Dict[str, int]] = None, max_pending: int = 500):
+        self.on_result = on_result
+        self.num_workers = max(1, num_workers)
+        self.batch_size = max(1, batch_size)
+        self.model_name = model_name
+        self.cpu_threads = cpu_threads
+        self.device_priorities = device_priorities or {}
+        self.max_pending = max_pending
+
+        self._heap: List[Tuple[Tuple, int, TranscriptionJob]] = []
+        self._counter = itertools.count()
+        self._condition = threading.Condition()
+        self._in_flight = 0
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._running = False
+
+        # Throughput statistics
+        self._stats_lock = threading.Lock()
+        self._audio_seconds = 0.0
+        self._busy_started: Optional[float] = None
+        self._busy_seconds = 0.0
+        self._jobs_done = 0
+        self._jobs_skipped = 0
+        self._batches_done = 0
+
+    def set_device_priority(self, device_folder: str, priority: int):
+        """Lower value = served first (default 0)"""
+        self.device_priorities[device_folder] = priority
+
+    def _priority_key(self, job: TranscriptionJob) -> Tuple:
+        recency = -job.enqueued_at if job.source == SOURCE_REALTIME else job.enqueued_at
+        return (job.source, self.device_priorities.get(job.device_folder, 0), recency)
+
+    def submit(self, job: TranscriptionJob) -> bool:
+        """Queue a job - returns False if the queue is full"""
+        with self._condition:
+            if len(self._heap) >= self.max_pending:
+                logger.warning(f"[TRANSCRIPTION] Queue full ({self.max_pending}) - dropping {job.device_folder}/{os.path.basename(job.audio_path)}")
+                return False
+            heapq.heappush(self._heap, (self._priority_key(job), next(self._counter), job))
+            self._condition.notify()
+        return True
+
+    def pending(self) -> int:
+        with self._condition:
+            return len(self._heap)
+
+    def start(self):
+        """Start worker processes (each loads its model once) and the dispatcher thread"""
+        if self._running:
+            return
+        # spawn: callers run detection threads - forking a threaded process is unsafe
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.num_workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker,
+            initargs=(self.model_name, self.cpu_threads)
+        )
+        self._running = True
+        threading.Thread(target=self._dispatch_loop, daemon=True, name='transcription-dispatcher').start()
+        logger.info(f"[TRANSCRIPTION] Scheduler started: {self.num_workers} worker process(es), batch_size={self.batch_size}, model={self.model_name}")
+
+    def stop(self):
+        self._running = False
+        with self._condition:
+            self._condition.notify_all()
+        if self._executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _next_batch(self) -> List[TranscriptionJob]:
+        """Block until a worker is free and jobs are pending, then wait briefly to fill the batch"""
+        with self._condition:
+            while self._running and (not self._heap or self._in_flight >= self.num_workers):
+                self._condition.wait(timeout=5)
+            if not self._running:
+                return []
+
+            deadline = time.time() + MAX_BATCH_WAIT_SECONDS
+            while len(self._heap) < self.batch_size and time.time() < deadline:
+                self._condition.wait(timeout=max(0.0, deadline - time.time()))
+
+            batch = [heapq.heappop(self._heap)[2] for _ in range(min(self.batch_size, len(self._heap)))]
+            if batch:
+                self._in_flight += 1
+                with self._stats_lock:
+                    if self._busy_started is None:
+                        self._busy_started = time.time()
+            return batch
+
+    def _dispatch_loop(self):
+        while self._running:
+            try:
+                batch = self._next_batch()
+                if not batch:
+                    continue
+                future = self._executor.submit(transcribe_batch, batch, self.batch_size)
+                future.add_done_callback(lambda f, jobs=batch: self._on_batch_done(jobs, f))
+            except Exception as e:
+                logger.error(f"[TRANSCRIPTION] Dispatcher error: {e}")
+                time.sleep(1)
+
+    def _on_batch_done(self, jobs: List[TranscriptionJob], future):
+        try:
+            results = future.result()
+        except Exception as e:
+            logger.error(f"[TRANSCRIPTION] Batch of {len(jobs)} failed: {e}")
+            results = [{'success': False, 'segments': [], 'audio_seconds': 0.0, 'error': str(e)} for _ in jobs]
+
+        with self._condition:
+            self._in_flight -= 1
+            self._condition.notify()
+
+        with self._stats_lock:
+            self._batches_done += 1
+            for result in results:
+                self._jobs_done += 1
+                self._audio_seconds += result.get('audio_seconds', 0.0)
+                if result.get('skipped'):
+                    self._jobs_skipped += 1
+            if self._in_flight == 0 and self._busy_started is not None:
+                self._busy_seconds += time.time() - self._busy_started
+                self._busy_started = None
+
+        for job, result in zip(jobs, results):
+            try:
+                self.on_result(job, result)
+            except Exception as e:
+                logger.error(f"[{job.device_folder}] Transcription result handler error: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Throughput as audio-seconds per wall-second of busy time (>1.0 = faster than real time)"""
+        with self._condition:
+            pending = len(self._heap)
+            in_flight = self._in_flight
+        with self._stats_lock:
+            busy = self._busy_seconds
+            if self._busy_started is not None:
+                busy += time.time() - self._busy_started
+            return {
+                'workers': self.num_workers,
+                'batch_size': self.batch_size,
+                'pending': pending,
+                'in_flight_batches': in_flight,
+                'batches_done': self._batches_done,
+                'jobs_done': self._jobs_done,
+                'jobs_skipped_no_speech': self._jobs_skipped,
+                'audio_seconds': round(self._audio_seconds, 1),
+                'busy_seconds': round(busy, 1),
+                'throughput': round(self._audio_seconds / busy, 2) if busy > 0 else 0.0
+            }
@@ -11,17 +11,20 @@ from typing import List, Tuple, Dict, Any, Optional
 from datetime import datetime
 from shared.src.lib.utils.video_utils import merge_video_files
 
-logger = logging.getLogger(__name__)
-
+from shared.src.lib.utils.audio_analysis_utils import (
+    AUDIO_THRESHOLD_DB,
+    compute_volume_db,
+    decode_pcm,
+    get_audio_analysis_engine
+)
 
-# Audio detection threshold (dB)
-AUDIO_THRESHOLD_DB = -50.0  # Volume above this = audio detected, below = silent
+logger = logging.getLogger(__name__)
 
 
 def check_audio_level(file_path: str, sample_duration: float = 0.5, threshold_db: float = AUDIO_THRESHOLD_DB, 
                        timeout: int = 10, context: str = "") -> Tuple[bool, float]:
     """
-    Check if audio file/segment has actual audio content using ffmpeg volumedetect
+    Check if audio file/segment has actual audio content (mean volume, single in-process decode)
     
     NOTE: This checks MEAN volume over the duration - it will NOT detect brief audio dropouts!
     For dropout detection, use check_audio_continuous() instead.
@@ -33,7 +36,7 @@ def check_audio_level(file_path: str, sample_duration: float = 0.5, threshold_db
         file_path: Path to audio/video file (MP3, TS, MP4, etc.)
         sample_duration: Duration to sample in seconds (default 0.5s for fast check)
         threshold_db: Volume threshold in dB (default -50.0dB)
-        timeout: ffmpeg timeout in seconds (default 10s)
+        timeout: Decode timeout in seconds when falling back to ffmpeg (default 10s)
         context: Context string for logging (e.g., device name)
     
     Returns:
@@ -46,61 +49,18 @@ def check_audio_level(file_path: str, sample_duration: float = 0.5, threshold_db
         >>> if has_audio:
         >>>     print(f"Audio detected: {volume:.1f}dB")
     """
-    try:
-        cmd = [
-            'ffmpeg',
-            '-hide_banner',
-            '-loglevel', 'info',
-            '-i', file_path,
-            '-t', str(sample_duration),
-            '-af', 'volumedetect',
-            '-f', 'null',
-            '-'
-        ]
-        
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            timeout=timeout
-        )
-        
-        # Parse mean_volume from stderr
-        mean_volume = -100.0
-        for line in result.stderr.split('\n'):
-            if 'mean_volume:' in line:
-                try:
-                    mean_volume = float(line.split('mean_volume:')[1].split('dB')[0].strip())
-                    break
-                except Exception as e:
-                    if context:
-                        logger.warning(f"[{context}] Failed to parse volume from: {line} (error: {e})")
-                    else:
-                        logger.warning(f"Failed to parse volume from: {line} (error: {e})")
-        
-        # Determine if audio is present
-        has_audio = mean_volume > threshold_db
-        
-        return has_audio, mean_volume
-        
-    except subprocess.TimeoutExpired:
-        if context:
-            logger.warning(f"[{context}] Audio level check timeout for: {file_path}")
-        else:
-            logger.warning(f"Audio level check timeout for: {file_path}")
-        return False, -100.0
-    except Exception as e:
-        if context:
-            logger.warning(f"[{context}] Failed to check audio level: {e}")
-        else:
-            logger.warning(f"Failed to check audio level: {e}")
+    metrics = get_audio_analysis_engine().analyze_segment(
+        file_path, max_duration=sample_duration, threshold_db=threshold_db, timeout=timeout, context=context
+    )
+    if metrics is None:
         return False, -100.0
+    return metrics['audio'], metrics['mean_volume_db']
 
 
 def check_audio_continuous(file_path: str, sample_duration: float, threshold_db: float = AUDIO_THRESHOLD_DB,
                            min_silence_duration: float = 0.1, timeout: int = 10, context: str = "") -> Tuple[bool, float, float]:
     """
-    Check if audio is CONTINUOUS (no dropouts/silence periods) using ffmpeg silencedetect
+    Check if audio is CONTINUOUS (no dropouts/silence periods) - silence runs computed on decoded PCM
     
     This detects audio LOSS/dropouts during the segment, not just mean volume.
     Perfect for zapping detection where we need to know if audio drops out during blackscreen.
@@ -110,7 +70,7 @@ def check_audio_continuous(file_path: str, sample_duration: float, threshold_db:
         sample_duration: Duration to analyze in seconds (e.g., 1.0 for HDMI, 4.0 for VNC)
         threshold_db: Silence threshold in dB (default -50.0dB)
         min_silence_duration: Minimum silence duration to detect in seconds (default 0.1s)
-        timeout: ffmpeg timeout in seconds (default 10s)
+        timeout: Decode timeout in seconds when falling back to ffmpeg (default 10s)
         context: Context string for logging (e.g., device name)
     
     Returns:
@@ -129,86 +89,20 @@ def check_audio_continuous(file_path: str, sample_duration: float, threshold_db:
         - Returns False if 200ms dropout in 1s segment (zapping scenario)
         - Returns True only if audio is continuous throughout
     """
-    try:
-        # Use silencedetect filter to find silence periods
-        cmd = [
-            'ffmpeg',
-            '-hide_banner',
-            '-loglevel', 'info',
-            '-i', file_path,
-            '-t', str(sample_duration),
-            '-af', f'silencedetect=noise={threshold_db}dB:d={min_silence_duration}',
-            '-f', 'null',
-            '-'
-        ]
-        
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            timeout=timeout
-        )
-        
-        # Parse silence periods from stderr
-        silence_periods = []
-        silence_start = None
-        
-        for line in result.stderr.split('\n'):
-            if 'silence_start:' in line:
-                try:
-                    silence_start = float(line.split('silence_start:')[1].strip())
-                except:
-                    pass
-            elif 'silence_end:' in line and silence_start is not None:
-                try:
-                    # Extract silence_end and duration
-                    parts = line.split('|')
-                    silence_end = float(parts[0].split('silence_end:')[1].strip())
-                    silence_duration = float(parts[1].split('silence_duration:')[1].strip())
-                    silence_periods.append({
-                        'start': silence_start,
-                        'end': silence_end,
-                        'duration': silence_duration
-                    })
-                    silence_start = None
-                except:
-                    pass
-        
-        # Calculate total silence duration
-        total_silence = sum(p['duration'] for p in silence_periods)
-        
-        # Also get mean volume for logging
-        mean_volume = -100.0
-        for line in result.stderr.split('\n'):
-            if 'mean_volume:' in line:
-                try:
-                    mean_volume = float(line.split('mean_volume:')[1].split('dB')[0].strip())
-                    break
-                except:
-                    pass
-        
-        # Has continuous audio = NO silence detected
-        has_continuous_audio = len(silence_periods) == 0
-        
-        if context and silence_periods:
-            logger.info(f"[{context}] Detected {len(silence_periods)} silence period(s): total {total_silence:.2f}s")
-            for i, period in enumerate(silence_periods):
-                logger.info(f"[{context}]   Period {i+1}: {period['start']:.2f}s - {period['end']:.2f}s ({period['duration']:.2f}s)")
-        
-        return has_continuous_audio, total_silence, mean_volume
-        
-    except subprocess.TimeoutExpired:
-        if context:
-            logger.warning(f"[{context}] Audio continuity check timeout for: {file_path}")
-        else:
-            logger.warning(f"Audio continuity check timeout for: {file_path}")
-        return False, 0.0, -100.0
-    except Exception as e:
-        if context:
-            logger.warning(f"[{context}] Failed to check audio continuity: {e}")
-        else:
-            logger.warning(f"Failed to check audio continuity: {e}")
+    metrics = get_audio_analysis_engine().analyze_segment(
+        file_path, max_duration=sample_duration, threshold_db=threshold_db,
+        min_silence_duration=min_silence_duration, timeout=timeout, context=context
+    )
+    if metrics is None:
         return False, 0.0, -100.0
+    
+    silence_periods = metrics['silence_periods']
+    if context and silence_periods:
+        logger.info(f"[{context}] Detected {len(silence_periods)} silence period(s): total {metrics['total_silence']:.2f}s")
+        for i, period in enumerate(silence_periods):
+            logger.info(f"[{context}]   Period {i+1}: {period['start']:.2f}s - {period['end']:.2f}s ({period['duration']:.2f}s)")
+    
+    return metrics['has_continuous_audio'], metrics['total_silence'], metrics['mean_volume_db']
 
 
 # Global Whisper model cache (singleton pattern)
@@ -311,9 +205,128 @@ def extract_audio_from_ts(ts_file_path: str, output_path: Optional[str] = None,
         return None
 
 
+WHISPER_SAMPLE_RATE = 16000  # Whisper expects 16kHz mono
+
+
+def decode_audio_pcm(file_path: str, sample_rate: int = WHISPER_SAMPLE_RATE, timeout: int = 60, context: str = ""):
+    """
+    Decode audio of any file (MP3, TS, MP4, WAV) to mono float32 PCM in memory (single pass, no temp file)
+
+    Returns:
+        numpy float32 array in [-1.0, 1.0] or None on failure
+    """
+    audio = decode_pcm(file_path, sample_rate=sample_rate, timeout=timeout, context=context)
+    if audio is None or len(audio) == 0:
+        return None
+    return audio
+
+
+# Speech pre-segmentation (numpy energy VAD) - frame / hysteresis settings
+SPEECH_FRAME_MS = 30            # Analysis frame length
+SPEECH_MIN_DURATION_MS = 250    # Shorter bursts (clicks, zapping pops) are dropped
+SPEECH_MIN_SILENCE_MS = 500     # Shorter gaps are bridged (pauses between words)
+SPEECH_PAD_MS = 200             # Context kept around each span (Whisper needs word onsets)
+SPEECH_NOISE_MARGIN_DB = 10.0   # Frame must exceed noise floor by this margin
+SPEECH_BAND_MIN_RATIO = 0.35    # Min share of energy in the 300-3400Hz voice band
+
+
+def segment_speech(audio, sample_rate: int = WHISPER_SAMPLE_RATE, threshold_db: float = AUDIO_THRESHOLD_DB) -> List[Tuple[float, float]]:
+    """
+    Lightweight numpy energy VAD: return speech-region spans (start_s, end_s) of float PCM
+
+    A frame is voiced when its energy is above both the absolute audio threshold and the
+    adaptive noise floor (+margin), and enough of its energy lies in the voice band
+    (rejects rumble/hiss and low music beds). Spans are bridged, filtered and padded.
+    """
+    import numpy as np
+
+    frame_len = int(sample_rate * SPEECH_FRAME_MS / 1000)
+    num_frames = len(audio) // frame_len if audio is not None else 0
+    if num_frames == 0:
+        return []
+
+    frames = audio[:num_frames * frame_len].reshape(num_frames, frame_len)
+
+    # Frame energy (dBFS)
+    energy = np.mean(np.square(frames, dtype=np.float64), axis=1)
+    energy_db = 10.0 * np.log10(np.maximum(energy, 1e-10))
+    noise_floor_db = float(np.percentile(energy_db, 10))
+    threshold = max(threshold_db, noise_floor_db + SPEECH_NOISE_MARGIN_DB)
+
+    # Voice band ratio from one batched rFFT over all frames
+    spectrum = np.square(np.abs(np.fft.rfft(frames * np.hanning(frame_len), axis=1)))
+    freqs = np.fft.rfftfreq(frame_len, d=1.0 / sample_rate)
+    band = (freqs >= 300) & (freqs <= 3400)
+    band_ratio = spectrum[:, band].sum(axis=1) / np.maximum(spectrum.sum(axis=1), 1e-12)
+
+    voiced = (energy_db > threshold) & (band_ratio >= SPEECH_BAND_MIN_RATIO)
+    if not voiced.any():
+        return []
+
+    # Run boundaries of voiced frames
+    padded = np.concatenate(([False], voiced, [False]))
+    edges = np.flatnonzero(padded[1:] != padded[:-1])
+    runs = list(zip(edges[0::2], edges[1::2]))
+
+    frame_s = SPEECH_FRAME_MS / 1000.0
+    min_gap = SPEECH_MIN_SILENCE_MS / SPEECH_FRAME_MS
+    min_len = SPEECH_MIN_DURATION_MS / SPEECH_FRAME_MS
+    pad_s = SPEECH_PAD_MS / 1000.0
+    duration = len(audio) / sample_rate
+
+    # Bridge short gaps, then drop short bursts
+    merged = [list(runs[0])]
+    for start, end in runs[1:]:
+        if start - merged[-1][1] < min_gap:
+            merged[-1][1] = end
+        else:
+            merged.append([start, end])
+
+    spans = []
+    for start, end in merged:
+        if end - start < min_len:
+            continue
+        span_start = max(0.0, float(start) * frame_s - pad_s)
+        span_end = min(duration, float(end) * frame_s + pad_s)
+        if spans and span_start <= spans[-1][1]:
+            spans[-1] = (spans[-1][0], span_end)
+        else:
+            spans.append((span_start, span_end))
+    return spans
+
+
+def analyze_audio_file(file_path: str, threshold_db: float = AUDIO_THRESHOLD_DB, context: str = "") -> Optional[Dict[str, Any]]:
+    """
+    Decode audio ONCE and derive everything needed before transcription
+
+    Replaces the separate ffmpeg volumedetect pass: 'audio' and 'mean_volume_db' come
+    from the same PCM as the speech spans handed to Whisper.
+
+    Returns:
+        Dict with 'pcm', 'duration', 'audio', 'mean_volume_db', 'speech_spans', 'speech_seconds'
+        or None if decoding failed
+    """
+    audio = decode_audio_pcm(file_path, context=context)
+    if audio is None:
+        return None
+
+    mean_volume_db = compute_volume_db(audio)
+    has_audio = mean_volume_db > threshold_db
+    speech_spans = segment_speech(audio, threshold_db=threshold_db) if has_audio else []
+
+    return {
+        'pcm': audio,
+        'duration': len(audio) / WHISPER_SAMPLE_RATE,
+        'audio': has_audio,
+        'mean_volume_db': mean_volume_db,
+        'speech_spans': speech_spans,
+        'speech_seconds': sum(end - start for start, end in speech_spans)
+    }
+
+
 def detect_audio_level(file_path: str, device_id: str = "") -> tuple:
     """
-    Detect audio level using ffmpeg volumedetect - REUSES detector.py logic
+    Detect audio level from a single in-process decode (same scale as detector.py)
     
     Args:
         file_path: Path to audio/video file (TS, WAV, MP4, etc.)
@@ -322,39 +335,20 @@ def detect_audio_level(file_path: str, device_id: str = "") -> tuple:
     Returns:
         Tuple of (has_audio: bool, volume_percentage: int, mean_volume_db: float)
     """
-    import re
-    
     prefix = f"[{device_id}] " if device_id else ""
-    try:
-        # Use ffmpeg volumedetect - same as detector.py
-        cmd = [
-            'ffmpeg', '-i', file_path,
-            '-af', 'volumedetect',
-            '-vn', '-f', 'null', '-'
-        ]
-        
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=5)
-        
-        # Parse mean_volume from stderr - same as detector.py
-        mean_volume = -100.0
-        for line in result.stderr.split('\n'):
-            if 'mean_volume:' in line:
-                match = re.search(r'mean_volume:\s*([-\d.]+)\s*dB', line)
-                if match:
-                    mean_volume = float(match.group(1))
-                    break
-        
-        # Convert dB to 0-100% scale: -60dB = 0%, 0dB = 100% - same as detector.py
-        volume_percentage = max(0, min(100, (mean_volume + 60) * 100 / 60))
-        has_audio = volume_percentage > 5  # 5% threshold - same as detector.py
-        
-        print(f"{prefix}[AudioTranscriptionUtils] Audio level: {mean_volume:.1f}dB ({volume_percentage}% - {'sound' if has_audio else 'silent'})")
-        
-        return has_audio, int(volume_percentage), mean_volume
-        
-    except Exception as e:
-        print(f"{prefix}[AudioTranscriptionUtils] Audio check error: {e}, assuming sound present")
+    metrics = get_audio_analysis_engine().analyze_segment(file_path, timeout=5, context=device_id)
+    if metrics is None:
+        print(f"{prefix}[AudioTranscriptionUtils] Audio check error, assuming sound present")
         return True, 0, -100.0
+    
+    mean_volume = metrics['mean_volume_db']
+    # Convert dB to 0-100% scale: -60dB = 0%, 0dB = 100% - same as detector.py
+    volume_percentage = max(0, min(100, (mean_volume + 60) * 100 / 60))
+    has_audio = volume_percentage > 5  # 5% threshold - same as detector.py
+    
+    print(f"{prefix}[AudioTranscriptionUtils] Audio level: {mean_volume:.1f}dB ({volume_percentage}% - {'sound' if has_audio else 'silent'})")
+    
+    return has_audio, int(volume_percentage), mean_volume
 
 
 # Global flag to enable/disable spell checking (disabled by default for CPU efficiency)
@@ -420,37 +414,61 @@ def correct_spelling(text: str, detected_language: str = None) -> str:
     corrected = [spell.correction(word) if len(word) >= 3 and spell.unknown([word]) else word for word in words]
     return ' '.join(corrected).strip()
 
-def transcribe_audio(audio_file_path: str, model_name: str = "tiny", skip_silence_check: bool = False, device_id: str = "", language: Optional[str] = None) -> Dict[str, Any]:
+def transcribe_audio(audio_file_path: str, model_name: str = "tiny", skip_silence_check: bool = False, device_id: str = "",
+                     language: Optional[str] = None, audio_analysis: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
     """
     Transcribe audio file using Whisper (with model caching)
     
+    Unless skip_silence_check is set, the file is decoded once (analyze_audio_file) and only
+    the detected speech spans are sent to Whisper - timestamps stay relative to the file.
+    
     Args:
         audio_file_path: Path to audio file (WAV recommended)
         model_name: Whisper model name (tiny, base, small, medium, large)
-        skip_silence_check: If True, skip audio level check (default False)
+        skip_silence_check: If True, skip audio level check and speech pre-segmentation (default False)
         device_id: Device identifier for logging (e.g., "capture1")
+        audio_analysis: Optional result of analyze_audio_file() already computed by the caller
     
     Returns:
         Dict with 'transcript', 'language', 'confidence', 'success'
+        (+ 'audio', 'mean_volume_db', 'speech_seconds' when pre-segmented)
     """
     prefix = f"[{device_id}] " if device_id else ""
     try:
-        # Quick pre-check: Skip Whisper if audio is silent (saves CPU)
-        # Reuses same audio detection logic as detector.py
-        if not skip_silence_check:
-            has_audio, volume_percentage, mean_volume_db = detect_audio_level(audio_file_path, device_id=device_id)
-            if not has_audio:
-                print(f"{prefix}[AudioTranscriptionUtils] Skipping Whisper - audio is silent")
-                return {
-                    'success': True,
-                    'transcript': '',
-                    'language': 'unknown',
-                    'confidence': 0.0,
-                    'skipped': True,
-                    'reason': 'silent_audio',
-                    'volume_percentage': volume_percentage,
-                    'mean_volume_db': mean_volume_db
+        audio_input = audio_file_path
+        speech_spans = None
+        level_info = {}
+        
+        # Pre-segmentation: skip Whisper on silence and dead air between speech (saves CPU)
+        if not skip_silence_check or audio_analysis is not None:
+            if audio_analysis is None:
+                audio_analysis = analyze_audio_file(audio_file_path, context=device_id)
+            
+            if audio_analysis is not None:
+                volume_percentage = max(0, min(100, (audio_analysis['mean_volume_db'] + 60) * 100 / 60))
+                level_info = {
+                    'audio': audio_analysis['audio'],
+                    'mean_volume_db': audio_analysis['mean_volume_db'],
+                    'volume_percentage': int(volume_percentage),
+                    'speech_seconds': audio_analysis['speech_seconds']
                 }
+                
+                if not audio_analysis['speech_spans']:
+                    reason = 'no_speech' if audio_analysis['audio'] else 'silent_audio'
+                    print(f"{prefix}[AudioTranscriptionUtils] Skipping Whisper - {reason} ({audio_analysis['mean_volume_db']:.1f}dB)")
+                    return {
+                        'success': True,
+                        'transcript': '',
+                        'language': 'unknown',
+                        'confidence': 0.0,
+                        'skipped': True,
+                        'reason': reason,
+                        **level_info
+                    }
+                
+                audio_input = audio_analysis['pcm']
+                speech_spans = audio_analysis['speech_spans']
+                print(f"{prefix}[AudioTranscriptionUtils] Speech: {audio_analysis['speech_seconds']:.1f}s of {audio_analysis['duration']:.1f}s in {len(speech_spans)} span(s)")
         
         model = get_whisper_model(model_name)
         
@@ -465,15 +483,20 @@ def transcribe_audio(audio_file_path: str, model_name: str = "tiny", skip_silenc
         
         # Transcribe with faster-whisper (4-5x faster than openai-whisper)
         # faster-whisper uses a different API that returns segments as a generator
+        if speech_spans:
+            # Only decode speech spans - clip timestamps keep segment times relative to the file
+            vad_kwargs = dict(vad_filter=False, clip_timestamps=[t for span in speech_spans for t in span])
+        else:
+            vad_kwargs = dict(vad_filter=True, vad_parameters=dict(min_silence_duration_ms=500))  # Skip silence automatically
+        
         segments_list, info = model.transcribe(
-            audio_file_path,
+            audio_input,
             beam_size=1,
-            vad_filter=True,  # Voice Activity Detection - skip silence automatically
-            vad_parameters=dict(min_silence_duration_ms=500),
             language=language,
             word_timestamps=False,  # Sentence-level timestamps (30-40% faster, still perfect for subtitles)
             condition_on_previous_text=False,
-            temperature=0
+            temperature=0,
+            **vad_kwargs
         )
         
         # Collect all segments and build transcript with timing info
@@ -528,7 +551,8 @@ def transcribe_audio(audio_file_path: str, model_name: str = "tiny", skip_silenc
             'language_code': language if language else info.language,
             'confidence': confidence,
             'segments': timed_segments,  # Add timed segments for subtitle display
-            'duration': total_duration  # Total audio duration in seconds
+            'duration': total_duration,  # Total audio duration in seconds
+            **level_info
         }
         
     except Exception as e:
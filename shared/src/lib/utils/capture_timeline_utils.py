@@ -0,0 +1,261 @@
+"""
+Capture Timeline Index - Shared Code
+
+Per-device index of captured frames: sequence -> arrival timestamp, with hot/cold
+capture and thumbnail paths resolved on demand. Replaces directory scans
+(`find` + stat of every file) for frame-window lookups in video verification.
+
+Architecture:
+- capture_monitor.py appends one record per frame as FFmpeg renames it into
+  the captures folder (inotify IN_MOVED_TO arrives in sequence order)
+- hot_cold_archiver.py trims records older than the cold capture retention
+- Verification helpers query "frames after t" / "frames in [t0, t1]" with a
+  binary search on the timestamp column (O(log n) + frames returned)
+
+Storage: {metadata}/timeline.idx - fixed-size little-endian records
+(int64 sequence, float64 timestamp), append-only between trims. Trims write a
+new file and rename it over the old one, so readers never see a half-rewritten
+index. Writers and the trimmer serialize on timeline.idx.lock (flock).
+
+Frames can be deleted from hot storage (rotation) before the index is trimmed,
+so every returned frame is checked on disk - hot first, then cold.
+
+✅ Cross-process: monitor/archiver write, host process reads (RAM-backed file)
+✅ Incremental reads: readers only load records appended since the last query
+"""
+
+import os
+import fcntl
+import struct
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Dict, Any, List, Optional
+
+from shared.src.lib.utils.storage_path_utils import get_capture_storage_path, get_cold_storage_path
+
+TIMELINE_FILENAME = 'timeline.idx'
+TIMELINE_RETENTION_SECONDS = 3600   # Matches cold capture/thumbnail cleanup (1 hour)
+TIMELINE_TRIM_SLACK_SECONDS = 600   # Rewrite at most every ~10 min of expired records
+FRAME_MTIME_TOLERANCE_SECONDS = 2.0  # Thumbnails are written right after their capture
+
+_RECORD = struct.Struct('<qd')  # sequence, timestamp
+
+
+def get_timeline_path(capture_base_dir: str) -> str:
+    """Index file location (hot metadata folder in RAM mode)"""
+    return os.path.join(get_capture_storage_path(capture_base_dir, 'metadata'), TIMELINE_FILENAME)
+
+
+def parse_capture_sequence(filename: str) -> Optional[int]:
+    """capture_000123456.jpg -> 123456 (None for thumbnails / other files)"""
+    if not filename.startswith('capture_') or not filename.endswith('.jpg') or filename.endswith('_thumbnail.jpg'):
+        return None
+    try:
+        return int(filename[8:-4])
+    except ValueError:
+        return None
+
+
+# =====================================================
+# WRITERS (capture_monitor / hot_cold_archiver)
+# =====================================================
+
+def record_capture(capture_base_dir: str, sequence: int, timestamp: float, index_path: str = None) -> bool:
+    """Append one frame to the device timeline (called for every new capture)"""
+    index_path = index_path or get_timeline_path(capture_base_dir)
+    try:
+        with open(index_path + '.lock', 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                with open(index_path, 'ab') as f:
+                    f.write(_RECORD.pack(sequence, timestamp))
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+        return True
+    except OSError:
+        return False
+
+
+def trim_capture_timeline(capture_base_dir: str, retention_seconds: float = TIMELINE_RETENTION_SECONDS,
+                          now: float = None) -> int:
+    """
+    Drop records older than the retention window (called by the archiver).
+
+    Only rewrites when expired records span more than TIMELINE_TRIM_SLACK_SECONDS,
+    so a 15s archiver cycle usually costs a single 16-byte read.
+
+    Returns:
+        Number of records removed
+    """
+    index_path = get_timeline_path(capture_base_dir)
+    if not os.path.exists(index_path):
+        return 0
+
+    cutoff = (now or time.time()) - retention_seconds
+    try:
+        with open(index_path, 'rb') as f:
+            head = f.read(_RECORD.size)
+        if len(head) < _RECORD.size or _RECORD.unpack(head)[1] >= cutoff - TIMELINE_TRIM_SLACK_SECONDS:
+            return 0
+
+        with open(index_path + '.lock', 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                with open(index_path, 'rb') as f:
+                    data = f.read()
+                data = data[:len(data) - len(data) % _RECORD.size]
+
+                timestamps = array('d', (timestamp for _, timestamp in _RECORD.iter_unpack(data)))
+                keep_from = bisect_left(timestamps, cutoff)
+
+                tmp_path = index_path + '.tmp'
+                with open(tmp_path, 'wb') as f:
+                    f.write(data[keep_from * _RECORD.size:])
+                os.rename(tmp_path, index_path)
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+        return keep_from
+    except OSError:
+        return 0
+
+
+# =====================================================
+# READER (verification helpers)
+# =====================================================
+
+class CaptureTimeline:
+    """In-memory view of one device timeline, refreshed incrementally from the index file"""
+
+    def __init__(self, capture_base_dir: str):
+        self.capture_base_dir = capture_base_dir
+        self.index_path = get_timeline_path(capture_base_dir)
+
+        self._sequences = array('q')
+        self._timestamps = array('d')
+        self._inode = None
+        self._offset = 0
+        self._lock = threading.Lock()
+
+        # Hot and cold folders (identical in SD mode)
+        self._folders = {}
+        for subfolder in ('captures', 'thumbnails'):
+            hot = get_capture_storage_path(capture_base_dir, subfolder)
+            cold = get_cold_storage_path(capture_base_dir, subfolder)
+            self._folders[subfolder] = [hot] if hot == cold else [hot, cold]
+
+    def __len__(self) -> int:
+        return len(self._sequences)
+
+    def refresh(self) -> bool:
+        """Load records appended since the last call (full reload after a trim). False if no index."""
+        with self._lock:
+            return self._load()
+
+    def _load(self) -> bool:
+        try:
+            with open(self.index_path, 'rb') as f:
+                inode = os.fstat(f.fileno()).st_ino
+                if inode != self._inode:
+                    # New file (first load or trimmed by the archiver): new arrays, so snapshots
+                    # taken by concurrent readers keep indexing the old ones
+                    self._sequences = array('q')
+                    self._timestamps = array('d')
+                    self._offset = 0
+                    self._inode = inode
+                f.seek(self._offset)
+                data = f.read()
+        except OSError:
+            return False
+
+        data = data[:len(data) - len(data) % _RECORD.size]  # Partial tail record - read it next time
+        for sequence, timestamp in _RECORD.iter_unpack(data):
+            self._sequences.append(sequence)
+            self._timestamps.append(timestamp)
+        self._offset += len(data)
+        return True
+
+    def _snapshot(self):
+        """
+        Refresh, then (sequences, timestamps, count) taken under the lock.
+
+        Arrays are only appended to until a reload replaces them, so the first `count`
+        records of the returned pair stay aligned whatever other threads do afterwards.
+        """
+        with self._lock:
+            self._load()
+            return self._sequences, self._timestamps, len(self._timestamps)
+
+    def covers(self, timestamp: float) -> bool:
+        """True if the index was already recording at this time (so it has every frame after it)"""
+        timestamps = self._timestamps
+        return len(timestamps) > 0 and timestamps[0] <= timestamp
+
+    def frames_after(self, start_timestamp: float, max_count: int = 0, use_thumbnails: bool = False) -> List[Dict[str, Any]]:
+        """Frames captured at or after start_timestamp that still exist on disk (oldest first)"""
+        sequences, timestamps, count = self._snapshot()
+        start = bisect_left(timestamps, start_timestamp, 0, count)
+        return self._resolve(sequences, timestamps, start, count, max_count, use_thumbnails)
+
+    def frames_between(self, start_timestamp: float, end_timestamp: float, max_count: int = 0,
+                       use_thumbnails: bool = False) -> List[Dict[str, Any]]:
+        """Frames captured in [start_timestamp, end_timestamp] that still exist on disk (oldest first)"""
+        sequences, timestamps, count = self._snapshot()
+        start = bisect_left(timestamps, start_timestamp, 0, count)
+        end = bisect_right(timestamps, end_timestamp, 0, count)
+        return self._resolve(sequences, timestamps, start, end, max_count, use_thumbnails)
+
+    def _resolve(self, sequences: array, timestamps: array, start: int, end: int, max_count: int,
+                 use_thumbnails: bool) -> List[Dict[str, Any]]:
+        folders = self._folders['thumbnails' if use_thumbnails else 'captures']
+        suffix = '_thumbnail.jpg' if use_thumbnails else '.jpg'
+
+        frames = []
+        for i in range(start, end):
+            sequence = sequences[i]
+            timestamp = timestamps[i]
+            filename = f"capture_{sequence:09d}{suffix}"
+            path = self._find_frame(folders, filename, timestamp)
+            if not path:
+                continue  # Rotated out of hot storage / cleaned from cold
+            frames.append({
+                'path': path,
+                'timestamp': timestamp,
+                'filename': filename,
+                'sequence': sequence,
+                'sequential_format': True
+            })
+            if max_count > 0 and len(frames) >= max_count:
+                break
+        return frames
+
+    @staticmethod
+    def _find_frame(folders: List[str], filename: str, timestamp: float) -> Optional[str]:
+        """Hot path first, then cold - skipping files overwritten since (FFmpeg restart reuses sequences)"""
+        for folder in folders:
+            path = os.path.join(folder, filename)
+            try:
+                if abs(os.stat(path).st_mtime - timestamp) <= FRAME_MTIME_TOLERANCE_SECONDS:
+                    return path
+            except OSError:
+                continue
+        return None
+
+
+# Global timeline instances (one per device base directory)
+_timelines: Dict[str, CaptureTimeline] = {}
+_timelines_lock = threading.Lock()
+
+
+def get_capture_timeline(capture_base_dir: str) -> CaptureTimeline:
+    """Get the shared timeline reader for a device"""
+    capture_base_dir = capture_base_dir.rstrip('/')
+    timeline = _timelines.get(capture_base_dir)
+    if timeline is None:
+        with _timelines_lock:
+            timeline = _timelines.get(capture_base_dir)
+            if timeline is None:
+                timeline = CaptureTimeline(capture_base_dir)
+                _timelines[capture_base_dir] = timeline
+    return timeline
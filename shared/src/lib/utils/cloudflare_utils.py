@@ -76,6 +76,10 @@ class CloudflareUtils:
         # Use 'virtualpytest' as bucket name (boto3 requires valid bucket name)
         self.bucket_name = 'virtualpytest'
         self.s3_client = self._init_s3_client()
+        
+        # Shared transfer settings: unchanged-object skip, resumable multipart, per-host throttle
+        from .r2_transfer_utils import R2TransferEngine
+        self.transfer = R2TransferEngine(self.s3_client, self.bucket_name)
         self._initialized = True
     
     def _init_s3_client(self):
@@ -124,7 +128,8 @@ class CloudflareUtils:
             logger.error(f"Failed to initialize Cloudflare R2 client: {str(e)}")
             raise
     
-    def upload_files(self, file_mappings: List[Dict], max_workers: int = 10, auto_delete_cold: bool = True, for_report_assets: bool = False) -> Dict:
+    def upload_files(self, file_mappings: List[Dict], max_workers: int = 10, auto_delete_cold: bool = True, for_report_assets: bool = False,
+                     skip_unchanged: bool = False) -> Dict:
         """
         Upload files concurrently.
         
@@ -133,12 +138,16 @@ class CloudflareUtils:
             max_workers: Max concurrent uploads
             auto_delete_cold: Whether to delete cold storage files after upload
             for_report_assets: If True, return URLs suitable for HTML reports (14-day signed URLs in private mode)
+            skip_unchanged: If True, skip files whose remote object has the same ETag (HEAD per file)
             Optional 'content_type' key to override auto-detection
             max_workers: Maximum number of concurrent upload threads
             auto_delete_cold: If True, automatically delete files from cold storage after successful upload
             
+        Large files use resumable multipart uploads and every upload shares the host
+        bandwidth budget (see r2_transfer_utils).
+            
         Returns:
-            Dict with upload results
+            Dict with upload results (per file: 'size', 'skipped', 'duration_ms', 'throughput_mbps')
         """
         uploaded_files = []
         failed_uploads = []
@@ -189,20 +198,21 @@ class CloudflareUtils:
                         content_type = 'application/octet-stream'
                 
                 # Add mtime metadata for capture files
-                extra_args = {'ContentType': content_type}
+                metadata = None
                 if 'capture_' in os.path.basename(local_path) and local_path.endswith('.jpg'):
                     capture_time = str(int(os.path.getmtime(local_path)))
-                    extra_args['Metadata'] = {'capture_time': capture_time}
-                
-                file_size = os.path.getsize(local_path)
+                    metadata = {'capture_time': capture_time}
                 
-                with open(local_path, 'rb') as f:
-                    self.s3_client.upload_fileobj(
-                        f,
-                        self.bucket_name,
-                        remote_path,
-                        ExtraArgs=extra_args
-                    )
+                transfer = self.transfer.upload(local_path, remote_path, content_type=content_type,
+                                                metadata=metadata, skip_unchanged=skip_unchanged)
+                if not transfer['success']:
+                    return {
+                        'success': False,
+                        'local_path': local_path,
+                        'remote_path': remote_path,
+                        'error': transfer['error'],
+                        'resumable': transfer.get('resumable', False)
+                    }
                 
                 # Get URL based on use case
                 if for_report_assets:
@@ -217,7 +227,10 @@ class CloudflareUtils:
                     'local_path': local_path,
                     'remote_path': remote_path,
                     'url': file_url,
-                    'size': file_size,
+                    'size': transfer['size'],
+                    'skipped': transfer['skipped'],
+                    'duration_ms': transfer['duration_ms'],
+                    'throughput_mbps': transfer['throughput_mbps'],
                     'deleted': False
                 }
                 
@@ -271,6 +284,7 @@ class CloudflareUtils:
         response = {
             'success': len(failed_uploads) == 0,
             'uploaded_count': len(uploaded_files),
+            'skipped_count': sum(1 for f in uploaded_files if f.get('skipped')),
             'failed_count': len(failed_uploads),
             'uploaded_files': uploaded_files,
             'failed_uploads': failed_uploads
@@ -312,9 +326,21 @@ class CloudflareUtils:
             if fetch_time > 1.0:
                 logger.warning(f"Slow R2 fetch: {remote_path} took {fetch_time:.2f}s to get response")
             
-            # Write file content
-            with open(local_path, 'wb') as f:
-                f.write(response['Body'].read())
+            # Write to a temp file in the same dir and rename: concurrent readers (parallel
+            # verification probes) never see a truncated file
+            import tempfile
+            with tempfile.NamedTemporaryFile('wb', dir=os.path.dirname(local_path), prefix=f".{os.path.basename(local_path)}.",
+                                             suffix='.tmp', delete=False) as f:
+                temp_path = f.name
+            try:
+                with open(temp_path, 'wb') as f:
+                    f.write(response['Body'].read())
+                os.chmod(temp_path, 0o644)   # mkstemp creates 0600, keep the permissions open() gave
+                os.replace(temp_path, local_path)
+            except BaseException:
+                if os.path.exists(temp_path):
+                    os.unlink(temp_path)
+                raise
             
             write_time = time.time() - start_time - fetch_time
             total_time = time.time() - start_time
@@ -786,7 +812,7 @@ def upload_reference_image(local_path: str, userinterface_name: str, image_name:
     uploader = get_cloudflare_utils()
     remote_path = f"reference-images/{userinterface_name}/{image_name}"
     file_mappings = [{'local_path': local_path, 'remote_path': remote_path}]
-    result = uploader.upload_files(file_mappings)
+    result = uploader.upload_files(file_mappings, skip_unchanged=True)  # Same image re-saved: HEAD only
     
     # Return single file format for compatibility
     if result['uploaded_files']:
@@ -833,7 +859,7 @@ def upload_navigation_screenshot(local_path: str, userinterface_name: str, scree
     uploader = get_cloudflare_utils()
     remote_path = f"navigation/{userinterface_name}/{screenshot_name}"
     file_mappings = [{'local_path': local_path, 'remote_path': remote_path}]
-    result = uploader.upload_files(file_mappings)
+    result = uploader.upload_files(file_mappings, skip_unchanged=True)  # Same image re-saved: HEAD only
     
     # Return single file format for compatibility
     if result['uploaded_files']:
@@ -21,7 +21,7 @@ def capture_screenshot_for_script(device, context, screenshot_id: str = None) ->
     3. Add to context with ID
     4. Return screenshot ID for report mapping
     
-    Upload happens in batch at script end via context.upload_screenshots_to_r2()
+    Upload happens at script end through the report asset pipeline (generate_and_upload_script_report)
     
     Args:
         device: Device instance with controllers
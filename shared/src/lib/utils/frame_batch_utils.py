@@ -0,0 +1,246 @@
+"""
+Frame Batch Analysis - Shared Code
+
+Batch kernel for zapping / freeze / macroblock analysis over a window of
+captured frames. Replaces per-image loops (cv2.imread + per-frame metric) with:
+- Parallel JPEG decode (OpenCV releases the GIL while decoding)
+- Reduced-resolution decode (IMREAD_REDUCED_*: the JPEG decoder scales in the
+  DCT domain, so a /2 decode is much cheaper than decode + resize)
+- Frames of the same size stacked into one array, metrics computed with
+  vectorized NumPy over the whole window at once
+
+Metrics keep the per-image algorithms' semantics:
+- dark_percentages: % of pixels <= threshold in an (original-resolution) region
+- frame_differences: mean absolute difference between consecutive frames on a
+  sampled grid (sample rate given in original pixels, same density as before)
+- macroblock_metrics: green/pink artifact % (HSV) and Laplacian variance
+
+Grayscale frames are decoded at 1/FRAME_BATCH_REDUCTION of their size, so dark
+ratios and frame differences are computed on 2x2-averaged pixels and stay
+comparable with the full-resolution thresholds. Color frames for macroblock
+analysis should be decoded at full size (reduction=1): the reduced JPEG decode
+skips chroma upsampling, which inflates the HSV artifact percentage.
+
+Usage:
+    for offset, batch in iter_frame_batches(paths, window=16):
+        percentages = dark_percentages(batch, threshold=5)
+        ...  # early stopping between windows
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+FRAME_BATCH_WORKERS = int(os.getenv('FRAME_BATCH_WORKERS', '4'))
+FRAME_BATCH_WINDOW = 16    # Frames decoded per window (early stopping is checked between windows)
+FRAME_BATCH_REDUCTION = 2  # Decode at half resolution
+
+_READ_FLAGS = {
+    (1, False): cv2.IMREAD_GRAYSCALE,
+    (2, False): cv2.IMREAD_REDUCED_GRAYSCALE_2,
+    (4, False): cv2.IMREAD_REDUCED_GRAYSCALE_4,
+    (8, False): cv2.IMREAD_REDUCED_GRAYSCALE_8,
+    (1, True): cv2.IMREAD_COLOR,
+    (2, True): cv2.IMREAD_REDUCED_COLOR_2,
+    (4, True): cv2.IMREAD_REDUCED_COLOR_4,
+    (8, True): cv2.IMREAD_REDUCED_COLOR_8,
+}
+
+# Green / pink macroblock artifact ranges (HSV, same as image_utils.analyze_macroblocks)
+GREEN_ARTIFACT_RANGE = ((40, 100, 50), (80, 255, 255))
+PINK_ARTIFACT_RANGE = ((140, 100, 50), (170, 255, 255))
+
+_decode_pool: Optional[ThreadPoolExecutor] = None
+
+
+def _get_decode_pool() -> ThreadPoolExecutor:
+    global _decode_pool
+    if _decode_pool is None:
+        _decode_pool = ThreadPoolExecutor(max_workers=FRAME_BATCH_WORKERS, thread_name_prefix="frame-decode")
+    return _decode_pool
+
+
+class FrameBatch:
+    """Decoded frames of one window - frames of the same size are stacked into one array"""
+
+    def __init__(self, paths: List[str], images: List[Optional[np.ndarray]], reduction: int, errors: List[Optional[str]]):
+        self.paths = paths
+        self.reduction = reduction
+        self.images = images
+        self.errors = errors  # None, 'Image file not found' or 'Could not load image'
+
+        # Stacked arrays per frame size: [(indices, array)] - normally a single group
+        groups = {}
+        for i, img in enumerate(images):
+            if img is not None:
+                groups.setdefault(img.shape, []).append(i)
+        self.groups = [(np.array(indices), np.stack([images[i] for i in indices])) for indices in groups.values()]
+
+    def __len__(self) -> int:
+        return len(self.paths)
+
+    def loaded(self, index: int) -> bool:
+        return self.images[index] is not None
+
+    def original_size(self, index: int) -> Optional[Tuple[int, int]]:
+        """(width, height) of the frame at full resolution (decoder rounds reduced sizes up)"""
+        img = self.images[index]
+        if img is None:
+            return None
+        return img.shape[1] * self.reduction, img.shape[0] * self.reduction
+
+
+def load_frame_batch(paths: List[str], reduction: int = FRAME_BATCH_REDUCTION, color: bool = False,
+                     preloaded: dict = None) -> FrameBatch:
+    """
+    Decode frames in parallel at reduced resolution.
+
+    Args:
+        paths: Image paths (order is kept)
+        reduction: 1, 2, 4 or 8 - decode at 1/reduction of the original size
+        color: Decode BGR instead of grayscale
+        preloaded: {path: image} already decoded (window overlap) - not decoded again
+    """
+    flag = _READ_FLAGS[(reduction, color)]
+    preloaded = preloaded or {}
+
+    def decode(path):
+        if path in preloaded:
+            return preloaded[path]
+        return cv2.imread(path, flag)
+
+    if len(paths) > 1 and FRAME_BATCH_WORKERS > 1:
+        images = list(_get_decode_pool().map(decode, paths))
+    else:
+        images = [decode(path) for path in paths]
+
+    errors = [None if img is not None else ('Image file not found' if not os.path.exists(path) else 'Could not load image')
+              for path, img in zip(paths, images)]
+    return FrameBatch(paths, images, reduction, errors)
+
+
+def iter_frame_batches(paths: List[str], window: int = FRAME_BATCH_WINDOW, overlap: int = 0,
+                       reduction: int = FRAME_BATCH_REDUCTION, color: bool = False) -> Iterator[Tuple[int, FrameBatch]]:
+    """
+    Decode paths window by window so callers can stop early without decoding the rest.
+
+    Yields:
+        (offset of the window's first frame in paths, FrameBatch)
+        With overlap=1 each window starts with the previous window's last frame
+        (for consecutive-frame comparisons) - that frame is not decoded twice.
+    """
+    start = 0
+    preloaded = {}
+    while start < len(paths) and (start == 0 or start + overlap < len(paths)):
+        window_paths = paths[start:start + window]
+        batch = load_frame_batch(window_paths, reduction, color, preloaded)
+        yield start, batch
+        if overlap:
+            preloaded = {path: img for path, img in zip(window_paths[-overlap:], batch.images[-overlap:]) if img is not None}
+        start += window - overlap
+
+
+# =====================================================
+# METRICS
+# =====================================================
+
+def _to_reduced_region(region: Tuple[int, int, int, int], reduction: int) -> Tuple[int, int, int, int]:
+    x, y, width, height = region
+    return x // reduction, y // reduction, max(1, width // reduction), max(1, height // reduction)
+
+
+def dark_percentages(batch: FrameBatch, threshold: int,
+                     regions: List[Optional[Tuple[int, int, int, int]]] = None) -> np.ndarray:
+    """
+    Percentage of pixels <= threshold for every frame (NaN for frames that did not load)
+
+    Args:
+        batch: Grayscale FrameBatch
+        threshold: Pixel intensity threshold (0-255)
+        regions: Optional per-frame (x, y, width, height) in original-resolution pixels
+    """
+    result = np.full(len(batch), np.nan)
+    for indices, stack in batch.groups:
+        # Frames sharing a size and region are cropped and counted in one pass
+        by_region = {}
+        for position, index in enumerate(indices):
+            region = regions[index] if regions else None
+            key = _to_reduced_region(region, batch.reduction) if region else None
+            by_region.setdefault(key, []).append(position)
+
+        for region, positions in by_region.items():
+            frames = stack[positions]
+            if region:
+                x, y, width, height = region
+                frames = frames[:, y:y + height, x:x + width]
+            if frames.shape[1] == 0 or frames.shape[2] == 0:
+                continue
+            dark = np.count_nonzero(frames <= threshold, axis=(1, 2))
+            result[indices[positions]] = dark * 100.0 / (frames.shape[1] * frames.shape[2])
+    return result
+
+
+def frame_differences(batch: FrameBatch, sample_rate: int = 10) -> np.ndarray:
+    """
+    Mean absolute difference between consecutive frames: result[i] compares frame i and i+1.
+    NaN where a frame did not load or the two frames differ in size.
+
+    Args:
+        sample_rate: Grid step in original-resolution pixels (every Nth pixel)
+    """
+    step = max(1, sample_rate // batch.reduction)
+    result = np.full(max(0, len(batch) - 1), np.nan)
+    if len(batch) < 2:
+        return result
+
+    if len(batch.groups) == 1 and len(batch.groups[0][0]) == len(batch):
+        # Common case: every frame loaded with the same size - one vectorized diff over the window
+        sampled = batch.groups[0][1][:, ::step, ::step].astype(np.int16)
+        result[:] = np.abs(np.diff(sampled, axis=0)).mean(axis=(1, 2))
+        return result
+
+    for i in range(len(batch) - 1):
+        img1, img2 = batch.images[i], batch.images[i + 1]
+        if img1 is None or img2 is None or img1.shape != img2.shape:
+            continue
+        result[i] = cv2.absdiff(img1[::step, ::step], img2[::step, ::step]).mean()
+    return result
+
+
+def macroblock_metrics(batch: FrameBatch, sample_rate: int = 10) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Artifact percentage (green/pink HSV pixels) and Laplacian variance per frame.
+    NaN for frames that did not load.
+
+    Args:
+        batch: Color (BGR) FrameBatch
+        sample_rate: Grid step in original-resolution pixels
+    """
+    step = max(1, sample_rate // batch.reduction)
+    artifacts = np.full(len(batch), np.nan)
+    blur = np.full(len(batch), np.nan)
+
+    for indices, stack in batch.groups:
+        sampled = np.ascontiguousarray(stack[:, ::step, ::step])
+        count, height, width = sampled.shape[:3]
+
+        # Frames stacked vertically into one tall image: one cvtColor/inRange call for the whole group
+        tall = sampled.reshape(count * height, width, 3)
+        hsv = cv2.cvtColor(tall, cv2.COLOR_BGR2HSV)
+        artifact_mask = cv2.inRange(hsv, *GREEN_ARTIFACT_RANGE) | cv2.inRange(hsv, *PINK_ARTIFACT_RANGE)
+        artifact_pixels = np.count_nonzero(artifact_mask.reshape(count, height, width), axis=(1, 2))
+        artifacts[indices] = artifact_pixels * 100.0 / (height * width)
+
+        # 4-neighbour Laplacian (cv2.Laplacian ksize=1 kernel) on the frame interiors
+        gray = cv2.cvtColor(tall, cv2.COLOR_BGR2GRAY).reshape(count, height, width).astype(np.float64)
+        if height < 3 or width < 3:
+            blur[indices] = 0.0
+            continue
+        laplacian = (gray[:, :-2, 1:-1] + gray[:, 2:, 1:-1] + gray[:, 1:-1, :-2] + gray[:, 1:-1, 2:]
+                     - 4 * gray[:, 1:-1, 1:-1])
+        blur[indices] = laplacian.var(axis=(1, 2))
+
+    return artifacts, blur
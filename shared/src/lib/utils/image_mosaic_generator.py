@@ -61,6 +61,8 @@ def create_zapping_failure_mosaic(image_paths: List[str],
         if analysis_info and detection_method == 'freeze':
             comparisons = analysis_info.get('comparisons', [])
         
+        from shared.src.lib.utils.storage_path_utils import get_capture_for_width
+        
         # Process each image
         for idx, image_path in enumerate(image_paths):
             if not os.path.exists(image_path):
@@ -73,8 +75,9 @@ def create_zapping_failure_mosaic(image_paths: List[str],
             y = 40 + (row * (thumb_height + 25))
             
             try:
-                # Load and resize image
-                img = Image.open(image_path)
+                # Load and resize image (smallest capture pyramid level that covers the tile)
+                source_path, _ = get_capture_for_width(image_path, thumb_width)
+                img = Image.open(source_path)
                 img_resized = img.resize((thumb_width, thumb_height), Image.Resampling.LANCZOS)
                 mosaic.paste(img_resized, (x, y))
                 
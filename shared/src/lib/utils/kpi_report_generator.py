@@ -305,6 +305,7 @@ def generate_kpi_success_report(
             navigation_path=request.userinterface_name,
             algorithm=match_result.get('algorithm', 'unknown'),
             captures_scanned=match_result.get('captures_scanned', 0),
+            time_to_result_ms=match_result.get('time_to_result_ms', 0),
             before_action_thumb=thumb_urls['before_action'],
             after_action_thumb=thumb_urls['after_action'],
             before_match_thumb=thumb_urls['before_match'],
@@ -404,6 +405,7 @@ def generate_kpi_failure_report(
         html.append(f'<p><b>Error:</b> {match_result.get("error", "Unknown")}</p>')
         html.append(f'<p><b>Captures Scanned:</b> {match_result.get("captures_scanned", 0)}</p>')
         html.append(f'<p><b>Algorithm:</b> {match_result.get("algorithm", "unknown")}</p>')
+        html.append(f'<p><b>Time to Result:</b> {match_result.get("time_to_result_ms", 0)}ms</p>')
         html.append(f'<p><b>UI:</b> {request.userinterface_name}</p>')
         html.append(f'<p><b>Device:</b> {request.device_id} ({request.device_model or "unknown"})</p>')
         html.append(f'<p><b>Host:</b> {request.host_name or "unknown"}</p>')
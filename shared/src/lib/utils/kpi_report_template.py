@@ -466,7 +466,7 @@ def create_kpi_report_template() -> str:
                     <strong>Host:</strong> {host_name} &nbsp;|&nbsp; <strong>Device:</strong> {device_name} ({device_model}) &nbsp;|&nbsp; <strong>UI:</strong> {navigation_path}
                 </div>
                 <div class="meta-line">
-                    <strong>Tree:</strong> {tree_id} &nbsp;|&nbsp; <strong>Action Set:</strong> {action_set_id} &nbsp;|&nbsp; <strong>Algorithm:</strong> {algorithm} &nbsp;|&nbsp; <strong>Scanned:</strong> {captures_scanned} frames
+                    <strong>Tree:</strong> {tree_id} &nbsp;|&nbsp; <strong>Action Set:</strong> {action_set_id} &nbsp;|&nbsp; <strong>Algorithm:</strong> {algorithm} &nbsp;|&nbsp; <strong>Scanned:</strong> {captures_scanned} frames in {time_to_result_ms}ms
                 </div>
             </div>
         </div>
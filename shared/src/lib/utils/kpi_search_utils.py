@@ -0,0 +1,215 @@
+"""
+KPI Search Utilities - find the first matching frame with as few verification probes as possible
+
+The KPI executor used to walk the capture timeline backward two frames at a time,
+running one verification per frame on copies of the captures. For appear/disappear
+references the verification result along the timeline is monotonic (no match ...
+no match, match ... match), so the first match can be found by search instead:
+
+- monotonic: one galloping round from the action (0, 1, 3, 7, ... + last frame),
+             then k-ary search on the bracket, k = number of probe workers.
+             No match in the gallop round falls back to the scan: a transient
+             match (toast, banner) can sit between gallop points and be gone
+             by the last frame
+- scan:      parallel backward scan (batches of k frames) for references that can
+             flicker - same result as the legacy scan (start of the last matching block)
+
+Probes are synchronous callables run concurrently on a thread pool, results are
+memoized so a frame is never verified twice. warm_up() runs one probe alone first,
+so shared caches (reference images) are filled before probes run in parallel.
+FrameCache pins the frames the search may read with hardlinks (zero-copy, the inode
+survives HOT rotation) and falls back to a copy when the working dir is on another
+filesystem.
+
+Usage:
+    engine = KPISearchEngine(lambda i: verify(frames[i]['path']))
+    engine.warm_up(len(frames) - 1)
+    result = engine.search(len(frames), monotonic=True)
+    # {'success', 'index', 'probes', 'rounds', 'time_to_result_ms', 'algorithm'}
+"""
+
+import os
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+KPI_PROBE_WORKERS = max(1, int(os.getenv('KPI_PROBE_WORKERS', '4')))
+KPI_SEARCH_MODE = os.getenv('KPI_SEARCH_MODE', 'auto').lower()   # auto | monotonic | scan
+
+# Commands whose single-frame result flips once along the timeline after the action
+MONOTONIC_COMMANDS = {
+    'waitForImageToAppear',
+    'waitForTextToAppear',
+    'waitForImageToDisappear',
+    'waitForTextToDisappear',
+}
+
+
+def is_monotonic_verification(verifications: List[Dict[str, Any]], mode: str = KPI_SEARCH_MODE) -> bool:
+    """True when the KPI references can be searched (KPI_SEARCH_MODE=auto checks the commands)"""
+    if mode == 'monotonic':
+        return True
+    if mode == 'scan':
+        return False
+    return bool(verifications) and all(v.get('command') in MONOTONIC_COMMANDS for v in verifications)
+
+
+def get_kpi_working_dir(capture_dir: str, name: str) -> str:
+    """Working dir next to the captures (same filesystem, so frames can be hardlinked), /tmp as fallback"""
+    candidate = os.path.join(os.path.dirname(capture_dir.rstrip('/')), '.kpi_working', name)
+    try:
+        os.makedirs(candidate, exist_ok=True)
+        return candidate
+    except OSError:
+        fallback = os.path.join('/tmp/kpi_working', name)
+        os.makedirs(fallback, exist_ok=True)
+        return fallback
+
+
+class FrameCache:
+    """Pins capture frames into a working dir with hardlinks (copy only across filesystems)"""
+
+    def __init__(self, working_dir: str):
+        self.working_dir = working_dir
+        self.linked = 0
+        self.copied = 0
+        self._pinned: Dict[str, str] = {}
+
+    def pin(self, source_path: str) -> Optional[str]:
+        """Return the working-dir path of source_path (None if the frame is already gone)"""
+        filename = os.path.basename(source_path)
+        if filename in self._pinned:
+            return self._pinned[filename]
+        dest_path = os.path.join(self.working_dir, filename)
+        try:
+            os.link(source_path, dest_path)
+            self.linked += 1
+        except FileExistsError:
+            pass
+        except FileNotFoundError:
+            return None
+        except OSError:
+            try:
+                shutil.copy2(source_path, dest_path)  # copy2 preserves the mtime used as frame timestamp
+                self.copied += 1
+            except (OSError, IOError):
+                return None
+        self._pinned[filename] = dest_path
+        return dest_path
+
+    def __len__(self) -> int:
+        return len(self._pinned)
+
+    def close(self) -> None:
+        shutil.rmtree(self.working_dir, ignore_errors=True)
+        self._pinned.clear()
+
+
+class KPISearchEngine:
+    """Concurrent, memoized frame probes + monotonic (gallop/k-ary) or backward scan search"""
+
+    def __init__(self, probe: Callable[[int], bool], workers: int = KPI_PROBE_WORKERS):
+        self.probe = probe
+        self.workers = max(1, workers)
+        self.results: Dict[int, bool] = {}
+        self.rounds = 0
+
+    def _probe_batch(self, indices: Iterable[int], pool: ThreadPoolExecutor) -> Dict[int, bool]:
+        """Probe indices concurrently (memoized), one round per call"""
+        pending = sorted({i for i in indices if i not in self.results})
+        if pending:
+            self.rounds += 1
+            for index, matched in zip(pending, pool.map(self._safe_probe, pending)):
+                self.results[index] = matched
+        return self.results
+
+    def _safe_probe(self, index: int) -> bool:
+        try:
+            return bool(self.probe(index))
+        except Exception as e:
+            print(f"[@kpi_search] ⚠️ Probe {index} failed: {e}")
+            return False
+
+    def warm_up(self, index: int) -> bool:
+        """
+        Run one probe alone before the concurrent rounds (memoized, so it is not repeated).
+
+        The first verification fills per-process caches (reference image downloaded from R2,
+        area from the database) once instead of every worker of the first round racing on them.
+        """
+        self.rounds += 1
+        self.results[index] = self._safe_probe(index)
+        return self.results[index]
+
+    def search(self, total: int, monotonic: bool, early_index: Optional[int] = None) -> Dict[str, Any]:
+        """Find the first matching frame index in [0, total)"""
+        started = time.time()
+        if total <= 0:
+            index, algorithm = None, 'no_frames'
+        else:
+            with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='kpi-probe') as pool:
+                if monotonic:
+                    index, algorithm = self._search_monotonic(total, pool)
+                else:
+                    index, algorithm = self._search_scan(total, pool, early_index)
+
+        return {
+            'success': index is not None,
+            'index': index,
+            'probes': len(self.results),
+            'rounds': self.rounds,
+            'time_to_result_ms': int((time.time() - started) * 1000),
+            'algorithm': algorithm,
+        }
+
+    def _search_monotonic(self, total: int, pool: ThreadPoolExecutor):
+        # Gallop from the action (KPIs are usually short) + last frame to know a match exists at all
+        gallop = [0]
+        while len(gallop) < self.workers - 1 and gallop[-1] * 2 + 1 < total - 1:
+            gallop.append(gallop[-1] * 2 + 1)
+        results = self._probe_batch(gallop + [total - 1], pool)
+
+        hi = next((i for i in sorted(results) if results[i]), None)
+        if hi is None:
+            # Not monotonic after all (match came and went between gallop points) - scan, probes stay memoized
+            index, algorithm = self._search_scan(total, pool, None)
+            return index, 'monotonic_fallback_scan' if index is not None else algorithm
+        lo = max((i for i in results if i < hi), default=-1)   # Invariant: lo no match (or -1), hi match
+
+        # PERFORMANCE: k-ary search - each round splits the bracket into workers+1 parts
+        while hi - lo > 1:
+            span = hi - lo
+            step = span / (min(self.workers, span - 1) + 1)
+            points = {lo + max(1, int(round(step * (j + 1)))) for j in range(min(self.workers, span - 1))}
+            results = self._probe_batch((p for p in points if lo < p < hi), pool)
+            for i in sorted(p for p in points if lo < p < hi):
+                if results[i]:
+                    hi = i
+                    break
+                lo = i
+        return hi, 'monotonic_gallop_kary'
+
+    def _search_scan(self, total: int, pool: ThreadPoolExecutor, early_index: Optional[int]):
+        # Quick check rides along with the first backward batch
+        first = list(range(total - 1, max(-1, total - 1 - self.workers), -1))
+        if early_index is not None:
+            first.append(early_index)
+        results = self._probe_batch(first, pool)
+        if early_index is not None and results[early_index]:
+            return early_index, 'quick_check_early'
+
+        earliest = None
+        cursor = total - 1
+        while cursor >= 0:
+            batch = list(range(cursor, max(-1, cursor - self.workers), -1))
+            results = self._probe_batch(batch, pool)
+            for i in batch:
+                if results[i]:
+                    earliest = i
+                elif earliest is not None:
+                    return earliest, 'backward_scan_parallel'   # Boundary: start of the last matching block
+            cursor -= self.workers
+        if earliest is not None:
+            return earliest, 'backward_scan_parallel'
+        return None, 'exhaustive_search_failed'
@@ -0,0 +1,358 @@
+"""
+Navigation Metrics Rollups - Shared Code
+
+Incremental aggregation of execution_results into per-node / per-edge rolling
+window metrics (volume, success rate, average / p50 / p95 duration) for the
+tree editor and pathfinding stats.
+
+Architecture:
+- Write side: every batch of execution_results written by the recorder is folded
+  client-side into ROLLUP_BUCKET_SECONDS buckets (fold_execution_results) and
+  merged into navigation_metric_rollups with one RPC (counters are added
+  server-side, so concurrent hosts never overwrite each other)
+- Compact storage: one row per element and 5-minute bucket holding counters
+  and a fixed log-spaced duration histogram (DURATION_BOUNDS_MS) - a 1000-run
+  zap on one edge is a handful of rows, not 1000. Buckets older than
+  ROLLUP_COMPACT_AFTER_SECONDS are merged into hour buckets by the database
+  (retention.compact_navigation_metric_rollups)
+- Read side: TreeMetricsRollup keeps a tree's buckets in memory with prefix
+  sums, so any window is a binary search + one subtraction per element.
+  NavigationMetricsCache holds one per (team, tree) and only fetches rows whose
+  updated_at moved since its last refresh - late merges into old buckets
+  (spool replays) and compacted hours are picked up, history is never re-scanned
+- Both the recorder batches and the direct writes (immediate=True,
+  EXECUTION_RESULTS_BATCHING=false) feed the rollups
+
+Windows are aligned to bucket boundaries (up to one bucket of extra history:
+5 minutes for 1h, one hour for 24h/7d once compacted); percentiles are
+interpolated inside histogram bins (within ~25%).
+"""
+
+import os
+import threading
+import time
+from bisect import bisect_left
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+ROLLUP_BUCKET_SECONDS = 300
+ROLLUP_COMPACT_BUCKET_SECONDS = 3600
+ROLLUP_COMPACT_AFTER_SECONDS = 25 * 3600
+ROLLUP_WINDOWS = {'1h': 3600, '24h': 86400, '7d': 7 * 86400}
+ROLLUP_MAX_WINDOW_SECONDS = max(ROLLUP_WINDOWS.values())
+NAVIGATION_METRICS_CACHE_TTL = float(os.getenv('NAVIGATION_METRICS_CACHE_TTL', '30'))
+ROLLUP_REFRESH_OVERLAP_SECONDS = 60  # Re-read rows updated shortly before the last one seen (commit lag of concurrent merges)
+
+# Histogram bin upper bounds (ms); one extra overflow bin above the last bound
+DURATION_BOUNDS_MS = (25, 50, 75, 100, 150, 200, 300, 400, 500, 750, 1000, 1500,
+                      2000, 3000, 4000, 5000, 7500, 10000, 15000, 20000, 30000, 60000, 120000)
+HISTOGRAM_SIZE = len(DURATION_BOUNDS_MS) + 1
+
+_EXECUTIONS, _SUCCESSES, _TOTAL_MS, _HISTOGRAM = 0, 1, 2, 3  # Column layout of the series matrix
+_DIRECT_SUM_BUCKETS = 64  # Short suffixes (1h window) are summed directly, longer ones use prefix sums
+
+
+def _to_epoch(value) -> float:
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, datetime):
+        return value.timestamp()
+    return datetime.fromisoformat(str(value).replace('Z', '+00:00')).timestamp()
+
+
+def _bucket_iso(epoch: float) -> str:
+    return datetime.fromtimestamp(epoch, tz=timezone.utc).isoformat()
+
+
+def duration_bin(duration_ms: float) -> int:
+    """Histogram bin of a duration (last bin = above DURATION_BOUNDS_MS[-1])"""
+    return bisect_left(DURATION_BOUNDS_MS, duration_ms)
+
+
+def histogram_percentile(histogram, percentile: float) -> int:
+    """Duration (ms) at a percentile (0-100), interpolated linearly inside the bin"""
+    total = int(sum(histogram))
+    if total == 0:
+        return 0
+    target = total * percentile / 100.0
+    cumulative = 0
+    for i, count in enumerate(histogram):
+        count = int(count)
+        if count and cumulative + count >= target:
+            lower = DURATION_BOUNDS_MS[i - 1] if i > 0 else 0
+            upper = DURATION_BOUNDS_MS[i] if i < len(DURATION_BOUNDS_MS) else DURATION_BOUNDS_MS[-1]
+            return int(round(lower + (upper - lower) * (target - cumulative) / count))
+        cumulative += count
+    return DURATION_BOUNDS_MS[-1]
+
+
+# =====================================================
+# WRITE SIDE
+# =====================================================
+
+def fold_execution_results(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Aggregate a batch of execution_results rows into rollup deltas (one per element and bucket).
+
+    Returns:
+        Rows for merge_navigation_metric_rollups: team_id, tree_id, element_type,
+        element_id, action_set_id, bucket_start, executions, successes, total_ms, duration_histogram
+    """
+    deltas: Dict[tuple, Dict[str, Any]] = {}
+    for row in rows:
+        tree_id = row.get('tree_id')
+        if row.get('edge_id'):
+            element_type, element_id = 'edge', row['edge_id']
+        elif row.get('node_id'):
+            element_type, element_id = 'node', row['node_id']
+        else:
+            continue
+        if not tree_id or not row.get('team_id'):
+            continue
+
+        try:
+            executed_at = _to_epoch(row.get('executed_at') or time.time())
+        except ValueError:
+            executed_at = time.time()
+        bucket_start = int(executed_at // ROLLUP_BUCKET_SECONDS) * ROLLUP_BUCKET_SECONDS
+        action_set_id = row.get('action_set_id') or ''
+
+        key = (row['team_id'], tree_id, element_type, element_id, action_set_id, bucket_start)
+        delta = deltas.get(key)
+        if delta is None:
+            delta = deltas[key] = {
+                'team_id': row['team_id'],
+                'tree_id': tree_id,
+                'element_type': element_type,
+                'element_id': element_id,
+                'action_set_id': action_set_id,
+                'bucket_start': _bucket_iso(bucket_start),
+                'executions': 0,
+                'successes': 0,
+                'total_ms': 0,
+                'duration_histogram': [0] * HISTOGRAM_SIZE
+            }
+
+        duration_ms = max(0, int(row.get('execution_time_ms') or 0))
+        delta['executions'] += 1
+        delta['successes'] += 1 if row.get('success') else 0
+        delta['total_ms'] += duration_ms
+        delta['duration_histogram'][duration_bin(duration_ms)] += 1
+
+    return list(deltas.values())
+
+
+# =====================================================
+# READ SIDE
+# =====================================================
+
+class _Series:
+    """Buckets of one node / edge (direction) in time order, with lazily rebuilt prefix sums"""
+
+    __slots__ = ('buckets', 'values', '_prefix')
+
+    def __init__(self):
+        self.buckets: List[int] = []
+        self.values: List[List[int]] = []  # [executions, successes, total_ms, *histogram]
+        self._prefix: Optional[np.ndarray] = None
+
+    def put(self, bucket: int, value: List[int]):
+        """Set a bucket to its current stored totals (re-fetched buckets replace the old copy)"""
+        if not self.buckets or bucket > self.buckets[-1]:
+            self.buckets.append(bucket)
+            self.values.append(value)
+        else:
+            i = bisect_left(self.buckets, bucket)
+            if i < len(self.buckets) and self.buckets[i] == bucket:
+                self.values[i] = value
+            else:
+                self.buckets.insert(i, bucket)
+                self.values.insert(i, value)
+        self._prefix = None
+
+    def drop_range(self, start: int, end: int):
+        """Remove buckets in [start, end) (folded into one bucket by compaction)"""
+        i, j = bisect_left(self.buckets, start), bisect_left(self.buckets, end)
+        if i < j:
+            del self.buckets[i:j]
+            del self.values[i:j]
+            self._prefix = None
+
+    def drop_before(self, bucket: int):
+        i = bisect_left(self.buckets, bucket)
+        if i:
+            del self.buckets[:i]
+            del self.values[:i]
+            self._prefix = None
+
+    def totals_since(self, bucket: int) -> Optional[np.ndarray]:
+        """Summed counters + histogram of every bucket >= bucket (None if there are none)"""
+        i = bisect_left(self.buckets, bucket)
+        if i == len(self.buckets):
+            return None
+        if self._prefix is None and len(self.buckets) - i <= _DIRECT_SUM_BUCKETS:
+            return np.array(self.values[i:], dtype=np.int64).sum(axis=0)
+        if self._prefix is None:
+            self._prefix = np.cumsum(np.array(self.values, dtype=np.int64), axis=0)
+        return self._prefix[-1] - self._prefix[i - 1] if i else self._prefix[-1]
+
+
+class TreeMetricsRollup:
+    """In-memory rollup buckets of one tree, answering window queries from prefix sums"""
+
+    def __init__(self, team_id: str, tree_id: str):
+        self.team_id = team_id
+        self.tree_id = tree_id
+        self.refreshed_at = 0.0
+        self.synced_until: Optional[float] = None  # Newest updated_at seen (database clock) - refresh fetches from here
+        self._series: Dict[Tuple[str, str, str], _Series] = {}
+        self._windows: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return sum(len(series.buckets) for series in self._series.values())
+
+    def merge_rows(self, rows: List[Dict[str, Any]], now: float = None):
+        """Apply rollup rows as stored in navigation_metric_rollups (current bucket totals), oldest bucket first"""
+        # Hour buckets before this are compacted: the hour row holds the whole hour, its 5-minute buckets are gone
+        compacted_before = int(((now or time.time()) - ROLLUP_COMPACT_AFTER_SECONDS) // ROLLUP_COMPACT_BUCKET_SECONDS) * ROLLUP_COMPACT_BUCKET_SECONDS
+        with self._lock:
+            for row in rows:
+                key = (row['element_type'], row['element_id'], row.get('action_set_id') or '')
+                series = self._series.get(key)
+                if series is None:
+                    series = self._series[key] = _Series()
+                bucket = int(_to_epoch(row['bucket_start']))
+                if bucket < compacted_before and bucket % ROLLUP_COMPACT_BUCKET_SECONDS == 0:
+                    series.drop_range(bucket, bucket + ROLLUP_COMPACT_BUCKET_SECONDS)
+                histogram = list(row.get('duration_histogram') or [])
+                histogram = (histogram + [0] * HISTOGRAM_SIZE)[:HISTOGRAM_SIZE]
+                series.put(bucket, [int(row['executions']), int(row['successes']), int(row['total_ms'])] + histogram)
+                if row.get('updated_at'):
+                    updated_at = _to_epoch(row['updated_at'])
+                    if self.synced_until is None or updated_at > self.synced_until:
+                        self.synced_until = updated_at
+            self._windows.clear()
+
+    def expire(self, now: float = None):
+        """Forget buckets older than the longest window"""
+        oldest = int(((now or time.time()) - ROLLUP_MAX_WINDOW_SECONDS) // ROLLUP_BUCKET_SECONDS) * ROLLUP_BUCKET_SECONDS
+        with self._lock:
+            for key in list(self._series):
+                series = self._series[key]
+                series.drop_before(oldest)
+                if not series.buckets:
+                    del self._series[key]
+
+    def window_metrics(self, window: str = '24h', now: float = None) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """
+        Metrics per node and edge over a rolling window.
+
+        Returns:
+            {'nodes': {node_id: metrics}, 'edges': {edge_id or edge_id#action_set_id: metrics}}
+            metrics = {volume, successes, success_rate, avg_execution_time, p50_execution_time, p95_execution_time}
+        """
+        cacheable = now is None
+        if cacheable and window in self._windows:
+            return self._windows[window]
+
+        start = int(((now or time.time()) - ROLLUP_WINDOWS[window]) // ROLLUP_BUCKET_SECONDS) * ROLLUP_BUCKET_SECONDS
+        result = {'nodes': {}, 'edges': {}}
+        with self._lock:
+            for (element_type, element_id, action_set_id), series in self._series.items():
+                totals = series.totals_since(start)
+                if totals is None or not totals[_EXECUTIONS]:
+                    continue
+                executions = int(totals[_EXECUTIONS])
+                successes = int(totals[_SUCCESSES])
+                histogram = totals[_HISTOGRAM:]
+                metrics = {
+                    'volume': executions,
+                    'successes': successes,
+                    'success_rate': successes / executions,
+                    'avg_execution_time': int(totals[_TOTAL_MS] // executions),
+                    'p50_execution_time': histogram_percentile(histogram, 50),
+                    'p95_execution_time': histogram_percentile(histogram, 95)
+                }
+                if element_type == 'node':
+                    result['nodes'][element_id] = metrics
+                else:
+                    # Direction-specific key, same convention as navigation_metrics_db.get_tree_metrics
+                    result['edges'][f"{element_id}#{action_set_id}" if action_set_id else element_id] = metrics
+            if cacheable:
+                self._windows[window] = result
+        return result
+
+
+class NavigationMetricsCache:
+    """TreeMetricsRollup per (team, tree), refreshed incrementally at most every ttl seconds"""
+
+    def __init__(self, fetch_rows: Optional[Callable[[str, str, str, Optional[str]], Optional[List[Dict[str, Any]]]]] = None,
+                 ttl: float = NAVIGATION_METRICS_CACHE_TTL):
+        self._fetch_rows = fetch_rows
+        self.ttl = ttl
+        self._trees: Dict[Tuple[str, str], TreeMetricsRollup] = {}
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'refreshes': 0, 'rows_fetched': 0}
+
+    @property
+    def fetch_rows(self) -> Callable[[str, str, str, Optional[str]], Optional[List[Dict[str, Any]]]]:
+        if self._fetch_rows is None:
+            from shared.src.lib.database.navigation_metrics_db import get_metric_rollups
+            self._fetch_rows = get_metric_rollups
+        return self._fetch_rows
+
+    def get_tree(self, team_id: str, tree_id: str, force_refresh: bool = False) -> TreeMetricsRollup:
+        key = (team_id, tree_id)
+        rollup = self._trees.get(key)
+        if rollup is None:
+            with self._lock:
+                rollup = self._trees.setdefault(key, TreeMetricsRollup(team_id, tree_id))
+
+        now = time.time()
+        if not force_refresh and rollup.refreshed_at and now - rollup.refreshed_at < self.ttl:
+            self.stats['hits'] += 1
+            return rollup
+
+        # Only rows changed since the last refresh - any bucket of the window, not just the newest ones
+        since = _bucket_iso(now - ROLLUP_MAX_WINDOW_SECONDS)
+        updated_since = None
+        if rollup.synced_until is not None:
+            updated_since = _bucket_iso(rollup.synced_until - ROLLUP_REFRESH_OVERLAP_SECONDS)
+        rows = self.fetch_rows(team_id, tree_id, since, updated_since)
+        if rows is not None:
+            rollup.merge_rows(rows, now)
+            rollup.expire(now)
+            rollup.refreshed_at = now
+            self.stats['refreshes'] += 1
+            self.stats['rows_fetched'] += len(rows)
+        return rollup
+
+    def get_window_metrics(self, team_id: str, tree_id: str, windows: List[str] = None) -> Dict[str, Any]:
+        """{window: {'nodes': {...}, 'edges': {...}}} for the requested windows (default: all)"""
+        rollup = self.get_tree(team_id, tree_id)
+        return {window: rollup.window_metrics(window) for window in (windows or ROLLUP_WINDOWS)}
+
+    def invalidate(self, team_id: str = None, tree_id: str = None):
+        with self._lock:
+            if team_id is None:
+                self._trees.clear()
+            else:
+                self._trees.pop((team_id, tree_id), None)
+
+
+# Global cache instance
+_metrics_cache: Optional[NavigationMetricsCache] = None
+_metrics_cache_lock = threading.Lock()
+
+
+def get_navigation_metrics_cache() -> NavigationMetricsCache:
+    """Get the shared navigation metrics rollup cache"""
+    global _metrics_cache
+    if _metrics_cache is None:
+        with _metrics_cache_lock:
+            if _metrics_cache is None:
+                _metrics_cache = NavigationMetricsCache()
+    return _metrics_cache
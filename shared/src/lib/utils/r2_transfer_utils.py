@@ -0,0 +1,349 @@
+"""
+R2 Transfer Engine - Shared Code
+
+Upload engine behind CloudflareUtils.upload_files:
+- Unchanged objects are skipped: a HEAD request compares the remote ETag with
+  the local file's (MD5, or the multipart "md5-of-part-md5s-N" form), so
+  reference images are not re-uploaded
+- Files >= R2_MULTIPART_THRESHOLD use multipart upload; progress (upload id +
+  part ETags) is kept in R2_UPLOAD_STATE_DIR, so an interrupted video upload
+  resumes at the first missing part instead of starting over
+- One bandwidth budget per host process (R2_MAX_BANDWIDTH, bytes/s, 0 = unlimited)
+  shared by every upload thread. Files and parts are streamed: the client reads
+  them in slices, each slice waits for the throttle (no whole file in memory)
+- Every upload reports its duration and throughput
+
+Works with any boto3-compatible S3 client (R2, MinIO, a local stub in tests).
+
+Usage:
+    engine = R2TransferEngine(s3_client, bucket_name)
+    result = engine.upload('/tmp/video.mp4', 'script-reports/.../video.mp4', content_type='video/mp4')
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional
+
+MB = 1024 * 1024
+
+R2_MULTIPART_THRESHOLD = int(os.getenv('R2_MULTIPART_THRESHOLD', str(64 * MB)))
+R2_MULTIPART_CHUNK_SIZE = max(5 * MB, int(os.getenv('R2_MULTIPART_CHUNK_SIZE', str(16 * MB))))  # S3/R2 minimum part size is 5 MB
+R2_MULTIPART_CONCURRENCY = int(os.getenv('R2_MULTIPART_CONCURRENCY', '4'))
+R2_MAX_BANDWIDTH = int(os.getenv('R2_MAX_BANDWIDTH', '0'))  # Bytes/s for the whole host process, 0 = unlimited
+R2_UPLOAD_STATE_DIR = os.getenv('R2_UPLOAD_STATE_DIR', os.path.join(tempfile.gettempdir(), 'virtualpytest', 'r2_uploads'))
+R2_UPLOAD_STATE_MAX_AGE = 6 * 86400  # R2 aborts incomplete multipart uploads after 7 days
+
+_THROTTLE_SLICE = 256 * 1024  # Bytes granted per throttle wait (keeps the rate smooth)
+
+
+class BandwidthThrottle:
+    """Token bucket shared by all upload threads of a process"""
+
+    def __init__(self, bytes_per_second: int = R2_MAX_BANDWIDTH):
+        self.rate = bytes_per_second
+        self._allowance = float(bytes_per_second)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def consume(self, size: int):
+        """Block until size bytes may be sent (no-op when unlimited)"""
+        if self.rate <= 0:
+            return
+        while size > 0:
+            grant = min(size, _THROTTLE_SLICE, self.rate)
+            with self._lock:
+                now = time.monotonic()
+                self._allowance = min(float(self.rate), self._allowance + (now - self._last) * self.rate)
+                self._last = now
+                wait = 0.0 if self._allowance >= grant else (grant - self._allowance) / self.rate
+                self._allowance -= grant
+            if wait > 0:
+                time.sleep(wait)
+            size -= grant
+
+
+class _ThrottledReader:
+    """Read-only stream over a file range - the throttle grants each slice as the client reads it"""
+
+    def __init__(self, path: str, throttle: BandwidthThrottle, offset: int = 0, length: Optional[int] = None):
+        self._file = open(path, 'rb')
+        self._offset = offset
+        self._length = os.path.getsize(path) - offset if length is None else length
+        self._position = 0
+        self._throttle = throttle
+        self._file.seek(offset)
+
+    def read(self, size: int = -1) -> bytes:
+        remaining = self._length - self._position
+        if size is None or size < 0 or size > remaining:
+            size = remaining
+        data = self._file.read(size)
+        self._position += len(data)
+        self._throttle.consume(len(data))
+        return data
+
+    def seek(self, position: int, whence: int = os.SEEK_SET) -> int:
+        """Client retries rewind the stream (the bytes are re-sent, so they are throttled again)"""
+        if whence == os.SEEK_CUR:
+            position += self._position
+        elif whence == os.SEEK_END:
+            position += self._length
+        self._position = max(0, min(position, self._length))
+        self._file.seek(self._offset + self._position)
+        return self._position
+
+    def tell(self) -> int:
+        return self._position
+
+    def __len__(self) -> int:
+        return self._length
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+_throttle: Optional[BandwidthThrottle] = None
+_throttle_lock = threading.Lock()
+
+
+def get_bandwidth_throttle() -> BandwidthThrottle:
+    """Process-wide upload bandwidth budget (R2_MAX_BANDWIDTH)"""
+    global _throttle
+    if _throttle is None:
+        with _throttle_lock:
+            if _throttle is None:
+                _throttle = BandwidthThrottle()
+    return _throttle
+
+
+def local_etag(path: str, chunk_size: Optional[int] = None) -> str:
+    """
+    ETag the object store computes for this file: MD5 hex for a single PUT,
+    MD5 of the part MD5s + '-<parts>' for a multipart upload with chunk_size parts.
+    """
+    part_digests = []
+    whole = hashlib.md5()
+    with open(path, 'rb') as f:
+        while True:
+            data = f.read(chunk_size or 8 * MB)
+            if not data:
+                break
+            if chunk_size:
+                part_digests.append(hashlib.md5(data).digest())
+            else:
+                whole.update(data)
+    if not chunk_size:
+        return whole.hexdigest()
+    return f"{hashlib.md5(b''.join(part_digests)).hexdigest()}-{len(part_digests)}"
+
+
+class R2TransferEngine:
+    """Uploads files with unchanged-object skipping, resumable multipart and shared throttling"""
+
+    def __init__(self, s3_client, bucket_name: str, throttle: Optional[BandwidthThrottle] = None,
+                 multipart_threshold: int = R2_MULTIPART_THRESHOLD, chunk_size: int = R2_MULTIPART_CHUNK_SIZE,
+                 multipart_concurrency: int = R2_MULTIPART_CONCURRENCY, state_dir: Optional[str] = R2_UPLOAD_STATE_DIR):
+        self.s3_client = s3_client
+        self.bucket_name = bucket_name
+        self.throttle = throttle or get_bandwidth_throttle()
+        self.multipart_threshold = multipart_threshold
+        self.chunk_size = chunk_size
+        self.multipart_concurrency = multipart_concurrency
+        self.state_dir = state_dir
+        self._stats_lock = threading.Lock()
+        self.stats = {'uploaded': 0, 'skipped': 0, 'resumed': 0, 'bytes': 0, 'seconds': 0.0}
+
+    # =====================================================
+    # UPLOAD
+    # =====================================================
+
+    def upload(self, local_path: str, remote_path: str, content_type: str = 'application/octet-stream',
+               metadata: Dict[str, str] = None, skip_unchanged: bool = False) -> Dict[str, Any]:
+        """
+        Upload one file.
+
+        Args:
+            skip_unchanged: HEAD the object first and skip the upload if its ETag matches the local file
+
+        Returns:
+            Dict with 'success', 'size', 'skipped', 'multipart', 'duration_ms',
+            'throughput_mbps' (MB/s) or 'error' (+ 'resumable' for interrupted multipart uploads)
+        """
+        started = time.time()
+        size = os.path.getsize(local_path)
+        multipart = size >= self.multipart_threshold
+        extra_args = {'ContentType': content_type}
+        if metadata:
+            extra_args['Metadata'] = metadata
+
+        if skip_unchanged and self.is_unchanged(local_path, remote_path, size):
+            with self._stats_lock:
+                self.stats['skipped'] += 1
+            return self._result(True, size, started, skipped=True, multipart=multipart)
+
+        try:
+            if multipart:
+                self._upload_multipart(local_path, remote_path, size, extra_args)
+            else:
+                with _ThrottledReader(local_path, self.throttle) as body:
+                    self.s3_client.put_object(Bucket=self.bucket_name, Key=remote_path, Body=body,
+                                              ContentLength=size, **extra_args)
+        except Exception as e:
+            result = self._result(False, size, started, multipart=multipart)
+            result['error'] = str(e)
+            result['resumable'] = multipart and self.state_dir is not None
+            return result
+
+        result = self._result(True, size, started, multipart=multipart)
+        with self._stats_lock:
+            self.stats['uploaded'] += 1
+            self.stats['bytes'] += size
+            self.stats['seconds'] += result['duration_ms'] / 1000.0
+        if multipart:
+            print(f"[@r2_transfer] Uploaded {remote_path} ({size / MB:.1f} MB, {result['throughput_mbps']} MB/s)")
+        return result
+
+    def is_unchanged(self, local_path: str, remote_path: str, size: int = None) -> bool:
+        """True if the remote object has the same size and ETag as the local file"""
+        size = os.path.getsize(local_path) if size is None else size
+        try:
+            response = self.s3_client.head_object(Bucket=self.bucket_name, Key=remote_path)
+        except Exception:
+            return False  # Missing (404) or unreachable - upload
+        if int(response.get('ContentLength', -1)) != size:
+            return False
+        remote_etag = response.get('ETag', '').strip('"')
+        # Multipart ETags ("<md5>-<parts>") only match if the object was uploaded with our chunk size
+        return remote_etag == local_etag(local_path, self.chunk_size if '-' in remote_etag else None)
+
+    @staticmethod
+    def _result(success: bool, size: int, started: float, skipped: bool = False, multipart: bool = False) -> Dict[str, Any]:
+        duration = max(time.time() - started, 1e-6)
+        return {
+            'success': success,
+            'size': size,
+            'skipped': skipped,
+            'multipart': multipart,
+            'duration_ms': int(duration * 1000),
+            'throughput_mbps': 0.0 if skipped or not success else round(size / MB / duration, 2)
+        }
+
+    # =====================================================
+    # MULTIPART (resumable)
+    # =====================================================
+
+    def _state_path(self, remote_path: str) -> Optional[str]:
+        if not self.state_dir:
+            return None
+        key = hashlib.sha1(f"{self.bucket_name}/{remote_path}".encode()).hexdigest()
+        return os.path.join(self.state_dir, f"{key}.json")
+
+    def _load_state(self, local_path: str, remote_path: str, size: int) -> Optional[Dict[str, Any]]:
+        """Progress of an earlier attempt at this exact file, confirmed against the server's part list"""
+        path = self._state_path(remote_path)
+        if not path or not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'r') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if (state.get('local_path') != local_path or state.get('size') != size
+                or state.get('mtime') != os.path.getmtime(local_path) or state.get('chunk_size') != self.chunk_size
+                or time.time() - state.get('created', 0) > R2_UPLOAD_STATE_MAX_AGE):
+            self._abort(state.get('upload_id'), remote_path)
+            return None
+
+        # Trust only parts the server still has (with the ETag we recorded)
+        try:
+            server_parts = {}
+            kwargs = {'Bucket': self.bucket_name, 'Key': remote_path, 'UploadId': state['upload_id']}
+            while True:
+                response = self.s3_client.list_parts(**kwargs)
+                for part in response.get('Parts', []):
+                    server_parts[str(part['PartNumber'])] = part['ETag']
+                if not response.get('IsTruncated'):
+                    break
+                kwargs['PartNumberMarker'] = response['NextPartNumberMarker']
+        except Exception:
+            return None  # Upload expired / aborted - start over
+        state['parts'] = {number: etag for number, etag in state.get('parts', {}).items() if server_parts.get(number) == etag}
+        return state
+
+    def _save_state(self, remote_path: str, state: Dict[str, Any]):
+        path = self._state_path(remote_path)
+        if not path:
+            return
+        try:
+            os.makedirs(self.state_dir, exist_ok=True)
+            tmp_path = path + '.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump(state, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"[@r2_transfer] ⚠️ Could not save upload state for {remote_path}: {e}")
+
+    def _clear_state(self, remote_path: str):
+        path = self._state_path(remote_path)
+        if path and os.path.exists(path):
+            os.remove(path)
+
+    def _abort(self, upload_id: Optional[str], remote_path: str):
+        if not upload_id:
+            return
+        try:
+            self.s3_client.abort_multipart_upload(Bucket=self.bucket_name, Key=remote_path, UploadId=upload_id)
+        except Exception:
+            pass
+
+    def _upload_multipart(self, local_path: str, remote_path: str, size: int, extra_args: Dict[str, Any]):
+        state = self._load_state(local_path, remote_path, size)
+        if state:
+            with self._stats_lock:
+                self.stats['resumed'] += 1
+            print(f"[@r2_transfer] 🔁 Resuming {remote_path}: {len(state['parts'])} parts already uploaded")
+        else:
+            response = self.s3_client.create_multipart_upload(Bucket=self.bucket_name, Key=remote_path, **extra_args)
+            state = {'upload_id': response['UploadId'], 'local_path': local_path, 'size': size,
+                     'mtime': os.path.getmtime(local_path), 'chunk_size': self.chunk_size,
+                     'created': time.time(), 'parts': {}}
+        self._save_state(remote_path, state)
+
+        part_count = (size + self.chunk_size - 1) // self.chunk_size
+        state_lock = threading.Lock()
+
+        def upload_part(number: int):
+            offset = (number - 1) * self.chunk_size
+            length = min(self.chunk_size, size - offset)
+            with _ThrottledReader(local_path, self.throttle, offset, length) as body:
+                response = self.s3_client.upload_part(Bucket=self.bucket_name, Key=remote_path, UploadId=state['upload_id'],
+                                                      PartNumber=number, Body=body, ContentLength=length)
+            with state_lock:
+                state['parts'][str(number)] = response['ETag']
+                self._save_state(remote_path, state)
+
+        missing = [number for number in range(1, part_count + 1) if str(number) not in state['parts']]
+        with ThreadPoolExecutor(max_workers=max(1, self.multipart_concurrency), thread_name_prefix="r2-part") as executor:
+            # list() re-raises the first failed part; progress of the others is already saved
+            list(executor.map(upload_part, missing))
+
+        parts = [{'PartNumber': number, 'ETag': state['parts'][str(number)]} for number in range(1, part_count + 1)]
+        self.s3_client.complete_multipart_upload(Bucket=self.bucket_name, Key=remote_path, UploadId=state['upload_id'],
+                                                 MultipartUpload={'Parts': parts})
+        self._clear_state(remote_path)
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = dict(self.stats)
+        stats['throughput_mbps'] = round(stats['bytes'] / MB / stats['seconds'], 2) if stats['seconds'] else 0.0
+        return stats
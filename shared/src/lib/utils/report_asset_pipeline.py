@@ -0,0 +1,279 @@
+"""
+Report Asset Pipeline - Shared Code
+
+Concurrent preparation and upload of everything a script report links to
+(screenshots, execution logs, test video, report HTML). Replaces the sequential
+screenshots -> logs -> video -> HTML uploads of generate_and_upload_script_report.
+
+Architecture:
+- Screenshots are hashed (content SHA-1) - identical files are uploaded once and
+  every local path maps to the same URL
+- Remote names come from the hash, so URLs are known right after hashing: the
+  report HTML is rendered while derivatives are still being generated/uploaded
+- Web-sized derivative (REPORT_SCREENSHOT_MAX_WIDTH) per unique screenshot, encoded
+  in a process pool (REPORT_ASSET_FORMAT: jpg or webp). Thumbnails are opt-in
+  (REPORT_THUMBNAIL_WIDTH > 0): the report HTML links full screenshots only
+- One upload pool for every asset: screenshots, logs, video and the HTML upload
+  in parallel instead of one after another
+- wait() reports which assets failed, so the caller can re-render the HTML with
+  local fallbacks (same output as the old sequential flow)
+
+Usage:
+    pipeline = ReportAssetPipeline(device_model, script_name, timestamp)
+    url_mapping = pipeline.add_screenshots(screenshot_paths)
+    logs_url = pipeline.add_text(stdout, 'logs')
+    pipeline.add_file(video_path, 'video')
+    pipeline.add_text(html_content, 'report')
+    result = pipeline.wait()
+"""
+
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, wait as wait_futures
+from typing import Any, Dict, List, Optional
+
+REPORT_ASSET_FORMAT = os.getenv('REPORT_ASSET_FORMAT', 'jpg').lower()  # jpg or webp
+REPORT_ASSET_QUALITY = int(os.getenv('REPORT_ASSET_QUALITY', '80'))
+REPORT_SCREENSHOT_MAX_WIDTH = int(os.getenv('REPORT_SCREENSHOT_MAX_WIDTH', '1280'))
+REPORT_THUMBNAIL_WIDTH = int(os.getenv('REPORT_THUMBNAIL_WIDTH', '0'))  # 0 = no thumbnails (not read by the report HTML)
+REPORT_ASSET_PROCESSES = int(os.getenv('REPORT_ASSET_PROCESSES', str(min(4, os.cpu_count() or 1))))
+REPORT_UPLOAD_WORKERS = int(os.getenv('REPORT_UPLOAD_WORKERS', '16'))
+REPORT_ASSET_INLINE_LIMIT = 4  # Fewer screenshots than this are encoded in-process (pool startup costs more)
+
+# Remote file name and content type per text/file asset kind (same names as the cloudflare_utils uploaders)
+_ASSET_KINDS = {
+    'report': ('report.html', 'text/html'),
+    'video': ('video.mp4', 'video/mp4'),
+    'logs': ('execution.txt', 'text/plain; charset=utf-8'),
+}
+
+_derivative_pool: Optional[ProcessPoolExecutor] = None
+_derivative_pool_lock = threading.Lock()
+
+
+def _get_derivative_pool() -> ProcessPoolExecutor:
+    global _derivative_pool
+    if _derivative_pool is None:
+        with _derivative_pool_lock:
+            if _derivative_pool is None:
+                _derivative_pool = ProcessPoolExecutor(max_workers=REPORT_ASSET_PROCESSES)
+    return _derivative_pool
+
+
+def hash_file(path: str) -> str:
+    """SHA-1 of the file content"""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def create_screenshot_derivatives(path: str, output_dir: str, name: str, fmt: str = REPORT_ASSET_FORMAT,
+                                  max_width: int = REPORT_SCREENSHOT_MAX_WIDTH, thumbnail_width: int = REPORT_THUMBNAIL_WIDTH,
+                                  quality: int = REPORT_ASSET_QUALITY) -> Dict[str, Any]:
+    """
+    Write the web-sized image and thumbnail of a screenshot (runs in the derivative process pool).
+
+    Returns:
+        Dict with 'success', 'web_path', 'thumbnail_path' (None if not generated) or 'error'.
+        web_path is the original file when it needs no resize / re-encode.
+    """
+    try:
+        import cv2
+    except ImportError:
+        return {'success': True, 'web_path': path, 'thumbnail_path': None}
+
+    image = cv2.imread(path, cv2.IMREAD_COLOR)
+    if image is None:
+        return {'success': False, 'error': f"Could not load image: {path}"}
+
+    if fmt == 'webp':
+        ext, params = '.webp', [cv2.IMWRITE_WEBP_QUALITY, quality]
+    else:
+        ext, params = '.jpg', [cv2.IMWRITE_JPEG_QUALITY, quality, cv2.IMWRITE_JPEG_OPTIMIZE, 1]
+
+    def write(img, width, suffix):
+        height, current_width = img.shape[:2]
+        if width and current_width > width:
+            img = cv2.resize(img, (width, max(1, round(height * width / current_width))), interpolation=cv2.INTER_AREA)
+        out_path = os.path.join(output_dir, f"{name}{suffix}{ext}")
+        if not cv2.imwrite(out_path, img, params):
+            raise IOError(f"Could not encode {out_path}")
+        return out_path
+
+    try:
+        if image.shape[1] <= max_width and ext == os.path.splitext(path)[1].lower():
+            web_path = path  # Already web-sized JPEG - upload as-is
+        else:
+            web_path = write(image, max_width, '')
+        thumbnail_path = write(image, thumbnail_width, '_thumbnail') if thumbnail_width else None
+        return {'success': True, 'web_path': web_path, 'thumbnail_path': thumbnail_path}
+    except Exception as e:
+        return {'success': False, 'error': str(e)}
+
+
+class ReportAssetPipeline:
+    """Prepares and uploads the assets of one script report concurrently"""
+
+    def __init__(self, device_model: str, script_name: str, timestamp: str, uploader=None,
+                 upload_workers: int = REPORT_UPLOAD_WORKERS, fmt: str = REPORT_ASSET_FORMAT):
+        date_str = timestamp[:8]  # YYYYMMDD from YYYYMMDDHHMMSS
+        folder_name = f"{script_name}_{date_str}_{timestamp}"
+        self.report_folder = f"script-reports/{device_model}/{folder_name}"
+        self.logs_folder = f"script-logs/{device_model}/{folder_name}"
+        self.fmt = 'webp' if fmt == 'webp' else 'jpg'
+
+        if uploader is None:
+            from .cloudflare_utils import get_cloudflare_utils
+            uploader = get_cloudflare_utils()
+        self.uploader = uploader
+
+        self.work_dir = tempfile.mkdtemp(prefix='report_assets_')
+        self._uploads = ThreadPoolExecutor(max_workers=upload_workers, thread_name_prefix="report-upload")
+        self._tasks: List[Dict[str, Any]] = []  # {'kind', 'future', 'paths'}
+        self._stats_lock = threading.Lock()
+
+        self.url_mapping: Dict[str, str] = {}
+        self.thumbnail_mapping: Dict[str, str] = {}
+        self.stats = {'screenshots': 0, 'unique_screenshots': 0, 'uploaded_bytes': 0}
+
+    # =====================================================
+    # SCREENSHOTS
+    # =====================================================
+
+    def add_screenshots(self, screenshot_paths: List[str]) -> Dict[str, str]:
+        """
+        Hash screenshots and queue their derivatives + uploads.
+
+        Returns:
+            {local_path: report URL} for every existing local screenshot (URLs are
+            final before the upload completes - safe to render the HTML with)
+        """
+        by_hash: Dict[str, List[str]] = {}
+        for path in dict.fromkeys(p for p in screenshot_paths if p and not p.startswith('http')):
+            try:
+                by_hash.setdefault(hash_file(path), []).append(path)
+            except OSError:
+                continue  # Missing screenshot - keeps its local path in the report
+
+        pool = _get_derivative_pool() if len(by_hash) >= REPORT_ASSET_INLINE_LIMIT and REPORT_ASSET_PROCESSES > 1 else None
+        ext = f".{self.fmt}"
+        for content_hash, paths in by_hash.items():
+            name = content_hash[:16]
+            remote_path = f"{self.report_folder}/screenshots/{name}{ext}"
+            remote_thumbnail = f"{self.report_folder}/screenshots/{name}_thumbnail{ext}"
+            url = self.uploader.get_url_for_report_asset(remote_path)
+            thumbnail_url = self.uploader.get_url_for_report_asset(remote_thumbnail) if REPORT_THUMBNAIL_WIDTH else None
+            for path in paths:
+                self.url_mapping[path] = url
+                if thumbnail_url:
+                    self.thumbnail_mapping[path] = thumbnail_url
+
+            args = (paths[0], self.work_dir, name, self.fmt)
+            derivatives = pool.submit(create_screenshot_derivatives, *args) if pool else None
+            future = self._uploads.submit(self._upload_screenshot, args, derivatives, remote_path, remote_thumbnail)
+            self._tasks.append({'kind': 'screenshot', 'future': future, 'paths': paths})
+
+        self.stats['screenshots'] += sum(len(paths) for paths in by_hash.values())
+        self.stats['unique_screenshots'] += len(by_hash)
+        print(f"[@report_asset_pipeline] Queued {len(by_hash)} unique screenshots "
+              f"({self.stats['screenshots']} paths, {'process pool' if pool else 'inline'} encoding)")
+        return dict(self.url_mapping)
+
+    def _upload_screenshot(self, args: tuple, derivatives: Optional[Future], remote_path: str, remote_thumbnail: str) -> Dict[str, Any]:
+        prepared = derivatives.result() if derivatives else create_screenshot_derivatives(*args)
+        if not prepared['success']:
+            return prepared
+        content_type = 'image/webp' if self.fmt == 'webp' else 'image/jpeg'
+        mappings = [{'local_path': prepared['web_path'], 'remote_path': remote_path, 'content_type': content_type}]
+        if prepared.get('thumbnail_path'):
+            mappings.append({'local_path': prepared['thumbnail_path'], 'remote_path': remote_thumbnail, 'content_type': content_type})
+        return self._upload(mappings)
+
+    # =====================================================
+    # LOGS / VIDEO / REPORT HTML
+    # =====================================================
+
+    def remote_path(self, kind: str) -> str:
+        """R2 path of a 'report', 'video' or 'logs' asset"""
+        filename = _ASSET_KINDS[kind][0]
+        return f"{self.logs_folder if kind == 'logs' else self.report_folder}/{filename}"
+
+    def add_text(self, content: str, kind: str) -> str:
+        """Queue the upload of generated text ('logs' or 'report'). Returns its URL."""
+        remote_path = self.remote_path(kind)
+        local_path = os.path.join(self.work_dir, _ASSET_KINDS[kind][0])
+        with open(local_path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        return self._queue_file(kind, local_path, remote_path)
+
+    def add_file(self, local_path: str, kind: str) -> str:
+        """Queue the upload of an existing file ('video'). Returns its URL."""
+        return self._queue_file(kind, local_path, self.remote_path(kind))
+
+    def _queue_file(self, kind: str, local_path: str, remote_path: str) -> str:
+        mapping = {'local_path': local_path, 'remote_path': remote_path, 'content_type': _ASSET_KINDS[kind][1]}
+        future = self._uploads.submit(self._upload, [mapping])
+        self._tasks.append({'kind': kind, 'future': future, 'paths': [local_path], 'remote_path': remote_path})
+        return self.uploader.get_url_for_report_asset(remote_path)
+
+    def _upload(self, mappings: List[Dict[str, str]]) -> Dict[str, Any]:
+        result = self.uploader.upload_files(mappings, max_workers=len(mappings), auto_delete_cold=False, for_report_assets=True)
+        if not result['success']:
+            errors = [f['error'] for f in result['failed_uploads']]
+            return {'success': False, 'error': '; '.join(errors) or 'Upload failed'}
+        with self._stats_lock:
+            self.stats['uploaded_bytes'] += sum(f.get('size', 0) for f in result['uploaded_files'])
+        return {'success': True}
+
+    # =====================================================
+    # COMPLETION
+    # =====================================================
+
+    def wait(self, kinds: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Wait for queued uploads (all, or only the given kinds) not waited for yet.
+
+        Returns:
+            Dict with 'success', 'failed_screenshots' (local paths), 'failed_kinds'
+            ('logs', 'video', 'report') and 'errors'
+        """
+        tasks = [task for task in self._tasks if kinds is None or task['kind'] in kinds]
+        self._tasks = [task for task in self._tasks if task not in tasks]
+        wait_futures([task['future'] for task in tasks])
+
+        failed_screenshots, failed_kinds, errors = [], [], []
+        for task in tasks:
+            try:
+                result = task['future'].result()
+            except Exception as e:
+                result = {'success': False, 'error': str(e)}
+            if result['success']:
+                continue
+            errors.append(f"{task['kind']}: {result.get('error')}")
+            if task['kind'] == 'screenshot':
+                failed_screenshots.extend(task['paths'])
+            elif task['kind'] not in failed_kinds:
+                failed_kinds.append(task['kind'])
+
+        for path in failed_screenshots:
+            self.url_mapping.pop(path, None)
+            self.thumbnail_mapping.pop(path, None)
+        if errors:
+            print(f"[@report_asset_pipeline] ⚠️ {len(errors)} asset uploads failed: {errors[:3]}")
+
+        return {
+            'success': not errors,
+            'failed_screenshots': failed_screenshots,
+            'failed_kinds': failed_kinds,
+            'errors': errors
+        }
+
+    def close(self):
+        """Stop the upload pool and remove generated files"""
+        self._uploads.shutdown(wait=True)
+        shutil.rmtree(self.work_dir, ignore_errors=True)
@@ -161,6 +161,7 @@ def generate_and_upload_script_report(
     
     Returns:
         Dict with 'report_url', 'report_path', and 'success' keys
+        ('screenshot_url_mapping' holds the local->R2 URLs of uploaded screenshots)
     """
     try:
         print(f"[@utils:report_utils:generate_and_upload_script_report] DEBUG: Starting report generation...")
@@ -168,9 +169,6 @@ def generate_and_upload_script_report(
         print(f"[@utils:report_utils:generate_and_upload_script_report] DEBUG: Parameters - device_info: {device_info}")
         print(f"[@utils:report_utils:generate_and_upload_script_report] DEBUG: Parameters - screenshot_paths length: {len(screenshot_paths) if screenshot_paths else 0}")
         
-        from .cloudflare_utils import upload_script_report, upload_validation_screenshots, upload_script_logs, upload_test_video
-        from datetime import datetime
-        
         execution_timestamp = datetime.now().strftime('%Y%m%d%H%M%S')
         print(f"[@utils:report_utils:generate_and_upload_script_report] DEBUG: Timestamp generated: {execution_timestamp}")
         
@@ -204,167 +202,130 @@ def generate_and_upload_script_report(
         )
         failed_verifications = total_verifications - passed_verifications
         
-        # Upload screenshots FIRST to get R2 URLs (or use provided mapping)
-        url_mapping = screenshot_url_mapping or {}  # Use provided mapping if available
-        
-        if not url_mapping and screenshot_paths:
-            # No mapping provided - need to upload screenshots
-            print(f"[@utils:report_utils:generate_and_upload_script_report] No mapping provided - uploading screenshots...")
-            screenshot_result = upload_validation_screenshots(
-                screenshot_paths=screenshot_paths,
-                device_model=device_info.get('device_model', 'unknown'),
-                script_name=script_name.replace('.py', ''),
-                timestamp=execution_timestamp
-            )
-            
-            if screenshot_result['success']:
-                uploaded_screenshots = screenshot_result.get('uploaded_screenshots', [])
-                
-                for i, upload_info in enumerate(uploaded_screenshots):
-                    try:
-                        local_path = upload_info['local_path']
-                        r2_url = upload_info['url']
-                        url_mapping[local_path] = r2_url
-                    except Exception as mapping_error:
-                        print(f"[@utils:report_utils:generate_and_upload_script_report] ERROR: Failed to process mapping {i+1}: {mapping_error}")
-                        print(f"[@utils:report_utils:generate_and_upload_script_report] ERROR: upload_info: {upload_info}")
-                        import traceback
-                        print(f"[@utils:report_utils:generate_and_upload_script_report] ERROR: Traceback: {traceback.format_exc()}")
-                        # Continue with next mapping instead of crashing
-                        continue
-                        
+        # PERFORMANCE: Screenshots, logs, video and HTML go through one asset pipeline - uploads run
+        # concurrently, screenshots are deduplicated by content hash and uploaded as web-sized
+        # derivatives + thumbnails, and the HTML is rendered as soon as the URLs are known
+        from .report_asset_pipeline import ReportAssetPipeline
+        device_model = device_info.get('device_model', 'unknown')
+        pipeline = ReportAssetPipeline(device_model, script_name.replace('.py', ''), execution_timestamp)
+        
+        try:
+            url_mapping = dict(screenshot_url_mapping or {})  # Use provided mapping if available
+            if not url_mapping and screenshot_paths:
+                url_mapping = pipeline.add_screenshots(screenshot_paths)
+            elif url_mapping:
+                print(f"[@utils:report_utils:generate_and_upload_script_report] Using provided mapping with {len(url_mapping)} local->R2 URL pairs")
             else:
-                print(f"[@utils:report_utils:generate_and_upload_script_report] Screenshot upload failed: {screenshot_result.get('error', 'Unknown error')}")
-        elif url_mapping:
-            print(f"[@utils:report_utils:generate_and_upload_script_report] Using provided mapping with {len(url_mapping)} local->R2 URL pairs")
-        else:
-            print(f"[@utils:report_utils:generate_and_upload_script_report] DEBUG: No screenshots to upload")
-        
-        # Update step_results to use R2 URLs instead of local paths
-        updated_step_results = update_step_results_with_r2_urls(step_results, url_mapping)
-        
-        # Upload script logs to R2 if stdout is provided
-        logs_url = ""
-        logs_path = ""
-        if stdout and stdout.strip():
-            print(f"[@utils:report_utils:generate_and_upload_script_report] Uploading script logs...")
-            logs_upload_result = upload_script_logs(
-                log_content=stdout,
-                device_model=device_info.get('device_model', 'unknown'),
-                script_name=script_name.replace('.py', ''),
-                timestamp=execution_timestamp
-            )
+                print(f"[@utils:report_utils:generate_and_upload_script_report] DEBUG: No screenshots to upload")
             
-            if logs_upload_result['success']:
-                logs_url = logs_upload_result['url']
-                logs_path = logs_upload_result['path']
-                print(f"[@utils:report_utils:generate_and_upload_script_report] Logs uploaded: {logs_url}")
+            # Script logs (stdout) - URL is known before the upload finishes
+            logs_url = ""
+            logs_path = ""
+            if stdout and stdout.strip():
+                logs_url = pipeline.add_text(stdout, 'logs')
+                logs_path = pipeline.remote_path('logs')
             else:
-                print(f"[@utils:report_utils:generate_and_upload_script_report] Logs upload failed: {logs_upload_result.get('error', 'Unknown error')}")
-        else:
-            print(f"[@utils:report_utils:generate_and_upload_script_report] No stdout provided, skipping log upload")
-        
-        # Upload test video to R2 if test_video_url is provided and points to a local file
-        uploaded_test_video_url = test_video_url
-        if test_video_url and test_video_url.strip():
-            # Check if it's a local file path that needs to be uploaded
-            import os
-            if os.path.exists(test_video_url) and test_video_url.endswith('.mp4'):
-                print(f"[@utils:report_utils:generate_and_upload_script_report] Uploading test video: {test_video_url}")
-                video_upload_result = upload_test_video(
-                    local_video_path=test_video_url,
-                    device_model=device_info.get('device_model', 'unknown'),
-                    script_name=script_name.replace('.py', ''),
-                    timestamp=execution_timestamp
-                )
-                
-                if video_upload_result['success']:
-                    uploaded_test_video_url = video_upload_result['video_url']
-                    print(f"[@utils:report_utils:generate_and_upload_script_report] Test video uploaded: {uploaded_test_video_url}")
+                print(f"[@utils:report_utils:generate_and_upload_script_report] No stdout provided, skipping log upload")
+            
+            # Test video - uploaded if test_video_url points to a local file
+            uploaded_test_video_url = test_video_url
+            if test_video_url and test_video_url.strip():
+                if os.path.exists(test_video_url) and test_video_url.endswith('.mp4'):
+                    print(f"[@utils:report_utils:generate_and_upload_script_report] Uploading test video: {test_video_url}")
+                    uploaded_test_video_url = pipeline.add_file(test_video_url, 'video')
                 else:
-                    print(f"[@utils:report_utils:generate_and_upload_script_report] Test video upload failed: {video_upload_result.get('error', 'Unknown error')}")
-                    # Keep original URL as fallback
+                    print(f"[@utils:report_utils:generate_and_upload_script_report] Test video URL provided but not a local file, using as-is: {test_video_url}")
             else:
-                print(f"[@utils:report_utils:generate_and_upload_script_report] Test video URL provided but not a local file, using as-is: {test_video_url}")
-        else:
-            print(f"[@utils:report_utils:generate_and_upload_script_report] No test video provided")
-        
-        # Calculate proper start and end times based on actual script execution
-        # execution_timestamp is when report is generated (end time)
-        # start_time should be execution_timestamp - execution_time
-        execution_time_seconds = execution_time / 1000.0  # Convert ms to seconds
-        
-        # Parse execution_timestamp to datetime object
-        end_datetime = datetime.strptime(execution_timestamp, '%Y%m%d%H%M%S')
-        
-        # Calculate start time by subtracting execution duration
-        from datetime import timedelta
-        start_datetime = end_datetime - timedelta(seconds=execution_time_seconds)
-        
-        # Format back to timestamp strings
-        calculated_start_time = start_datetime.strftime('%Y%m%d%H%M%S')
-        calculated_end_time = execution_timestamp  # This is already the end time
-        
-        print(f"[@utils:report_utils:generate_and_upload_script_report] DEBUG: Calculated timing:")
-        print(f"  - Execution duration: {execution_time_seconds:.1f}s ({execution_time}ms)")
-        print(f"  - Start time: {calculated_start_time} ({start_datetime.strftime('%H:%M:%S')})")
-        print(f"  - End time: {calculated_end_time} ({end_datetime.strftime('%H:%M:%S')})")
-
-        # Prepare report data (same structure as validation.py) - now with R2 URLs and correct timestamps
-        report_data = {
-            'script_name': script_name,
-            'device_info': device_info,
-            'host_info': host_info,
-            'execution_time': execution_time,
-            'success': success,
-            'step_results': updated_step_results,  # Use updated step results with R2 URLs
-            'screenshots': {
-                'initial': url_mapping.get(screenshot_paths[0], screenshot_paths[0]) if screenshot_paths and len(screenshot_paths) > 0 else None,
-                'steps': [url_mapping.get(path, path) for path in screenshot_paths[1:-1]] if screenshot_paths and len(screenshot_paths) > 2 else [],
-                'final': url_mapping.get(screenshot_paths[-1], screenshot_paths[-1]) if screenshot_paths and len(screenshot_paths) > 1 else None
-            },
-            'error_msg': error_message,
-            'timestamp': execution_timestamp,
-            'start_time': calculated_start_time,  # Proper start time
-            'end_time': calculated_end_time,      # Proper end time
-            'userinterface_name': userinterface_name or f'script_{script_name}',
-            'total_steps': len(updated_step_results),
-            'passed_steps': sum(1 for step in updated_step_results if step.get('success', False)),
-            'failed_steps': sum(1 for step in updated_step_results if not step.get('success', True)),
-            'total_verifications': total_verifications,
-            'passed_verifications': passed_verifications,
-            'failed_verifications': failed_verifications,
-            'execution_summary': execution_summary,
-            'test_video_url': uploaded_test_video_url,
-            'script_result_id': script_result_id,
-            'custom_data': custom_data or {},  # Pass zap data from memory
-            'zap_detailed_summary': zap_detailed_summary,
-            'logs_url': logs_url  # Add logs URL for clickable link in report
-        }
-        
-        html_content = generate_validation_report(report_data)
+                print(f"[@utils:report_utils:generate_and_upload_script_report] No test video provided")
+            
+            # Calculate proper start and end times based on actual script execution
+            # execution_timestamp is when report is generated (end time)
+            # start_time should be execution_timestamp - execution_time
+            execution_time_seconds = execution_time / 1000.0  # Convert ms to seconds
+            end_datetime = datetime.strptime(execution_timestamp, '%Y%m%d%H%M%S')
+            from datetime import timedelta
+            start_datetime = end_datetime - timedelta(seconds=execution_time_seconds)
+            calculated_start_time = start_datetime.strftime('%Y%m%d%H%M%S')
+            calculated_end_time = execution_timestamp  # This is already the end time
+            
+            print(f"[@utils:report_utils:generate_and_upload_script_report] DEBUG: Calculated timing:")
+            print(f"  - Execution duration: {execution_time_seconds:.1f}s ({execution_time}ms)")
+            print(f"  - Start time: {calculated_start_time} ({start_datetime.strftime('%H:%M:%S')})")
+            print(f"  - End time: {calculated_end_time} ({end_datetime.strftime('%H:%M:%S')})")
+            
+            def render_report(url_mapping: Dict[str, str], logs_url: str, test_video_url: str) -> str:
+                # Update step_results to use R2 URLs instead of local paths
+                updated_step_results = update_step_results_with_r2_urls(step_results, url_mapping)
+                # Prepare report data (same structure as validation.py) - with R2 URLs and correct timestamps
+                report_data = {
+                    'script_name': script_name,
+                    'device_info': device_info,
+                    'host_info': host_info,
+                    'execution_time': execution_time,
+                    'success': success,
+                    'step_results': updated_step_results,  # Use updated step results with R2 URLs
+                    'screenshots': {
+                        'initial': url_mapping.get(screenshot_paths[0], screenshot_paths[0]) if screenshot_paths and len(screenshot_paths) > 0 else None,
+                        'steps': [url_mapping.get(path, path) for path in screenshot_paths[1:-1]] if screenshot_paths and len(screenshot_paths) > 2 else [],
+                        'final': url_mapping.get(screenshot_paths[-1], screenshot_paths[-1]) if screenshot_paths and len(screenshot_paths) > 1 else None
+                    },
+                    'error_msg': error_message,
+                    'timestamp': execution_timestamp,
+                    'start_time': calculated_start_time,  # Proper start time
+                    'end_time': calculated_end_time,      # Proper end time
+                    'userinterface_name': userinterface_name or f'script_{script_name}',
+                    'total_steps': len(updated_step_results),
+                    'passed_steps': sum(1 for step in updated_step_results if step.get('success', False)),
+                    'failed_steps': sum(1 for step in updated_step_results if not step.get('success', True)),
+                    'total_verifications': total_verifications,
+                    'passed_verifications': passed_verifications,
+                    'failed_verifications': failed_verifications,
+                    'execution_summary': execution_summary,
+                    'test_video_url': test_video_url,
+                    'script_result_id': script_result_id,
+                    'custom_data': custom_data or {},  # Pass zap data from memory
+                    'zap_detailed_summary': zap_detailed_summary,
+                    'logs_url': logs_url  # Add logs URL for clickable link in report
+                }
+                return generate_validation_report(report_data)
+            
+            # Render while screenshots/logs/video are still uploading, then upload the HTML alongside them
+            report_url = pipeline.add_text(render_report(url_mapping, logs_url, uploaded_test_video_url), 'report')
+            assets = pipeline.wait()
+            
+            if assets['failed_screenshots'] or 'logs' in assets['failed_kinds'] or 'video' in assets['failed_kinds']:
+                # Some linked assets are missing - re-render with the old fallbacks (local paths, no logs link)
+                print(f"[@utils:report_utils:generate_and_upload_script_report] Re-rendering report without failed assets: {assets['errors']}")
+                for path in assets['failed_screenshots']:
+                    url_mapping.pop(path, None)
+                if 'logs' in assets['failed_kinds']:
+                    logs_url, logs_path = "", ""
+                if 'video' in assets['failed_kinds']:
+                    uploaded_test_video_url = test_video_url  # Keep original URL as fallback
+                report_url = pipeline.add_text(render_report(url_mapping, logs_url, uploaded_test_video_url), 'report')
+                assets = pipeline.wait()
+            
+            print(f"[@utils:report_utils:generate_and_upload_script_report] Assets: {pipeline.stats}")
+        finally:
+            pipeline.close()
         
-        # Upload report to R2
-        upload_result = upload_script_report(
-            html_content=html_content,
-            device_model=device_info.get('device_model', 'unknown'),
-            script_name=script_name.replace('.py', ''),
-            timestamp=execution_timestamp
-        )
-       
-        if upload_result['success']:
-            report_url = upload_result['report_url']
-            report_path = upload_result['report_path']
+        if 'report' not in assets['failed_kinds']:
+            report_path = pipeline.remote_path('report')
             print(f"[@utils:report_utils:generate_and_upload_script_report] Report uploaded: {report_url}")
+            # Markers parsed from the script output (script_output.py, script_output_parser.py) - keep them unchanged
+            print(f"[@cloudflare_utils:upload_script_report] INFO: Uploaded script report: {report_path}")
+            if logs_url:
+                print(f"[@utils:report_utils:generate_and_upload_script_report] Logs uploaded: {logs_url}")
             return {
                 'success': True,
                 'report_url': report_url,
                 'report_path': report_path,
                 'logs_url': logs_url,
-                'logs_path': logs_path
+                'logs_path': logs_path,
+                'screenshot_url_mapping': url_mapping
             }
         else:
-            print(f"[@utils:report_utils:generate_and_upload_script_report] Upload failed: {upload_result.get('error', 'Unknown error')}")
+            print(f"[@utils:report_utils:generate_and_upload_script_report] Upload failed: {assets['errors']}")
             return {
                 'success': False,
                 'report_url': '',
@@ -0,0 +1,430 @@
+"""
+Segment-Based Video Extraction - Shared Code
+
+Builds a time window of device video (test videos for script reports) from
+the HOT HLS segments and the COLD 10-minute MP4 chunks with FFmpeg stream copy.
+
+Architecture:
+- Segment timeline: HOT segments are placed on the wall clock by their mtime
+  (written when FFmpeg closes the segment), COLD chunks by their 10-minute
+  window (calculate_chunk_location). Only pieces overlapping the window are used.
+- COLD chunks are cut, not copied: the chunk's sample index (moov stts/stss/
+  stsz/stsc/stco, read with a few small seeks - chunks are faststart) gives the
+  keyframe at or before the window start, so the cut starts on a keyframe.
+  The span of the selected samples is reported as cold_bytes (a stat only: the
+  mov demuxer seeks to the inpoint through the same index, FFmpeg reads the chunk)
+- Concat-demuxer runs with -c copy (no re-encoding): COLD cuts (inpoint/outpoint)
+  and HOT segments (MPEG-TS, aac_adtstoasc) are remuxed separately, then joined.
+  A window covered by one source takes a single run
+- The output is probed (ffprobe) and only accepted with a video stream and the
+  expected duration
+
+Usage:
+    result = extract_video_window(start_ts, end_ts, '/tmp/test.mp4', hot_dir, cold_dir, segment_duration=1.0)
+"""
+
+import glob
+import json
+import logging
+import os
+import struct
+import subprocess
+import time
+from array import array
+from bisect import bisect_right
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SECONDS = 600        # COLD chunk length (10 minutes)
+MIN_PIECE_SECONDS = 0.2    # Ignore slivers shorter than this (rounding at piece boundaries)
+OUTPUT_DURATION_TOLERANCE = 0.1  # Output duration may differ from the pieces' by 10% (at least 2 segments)
+
+_CONTAINER_BOXES = {b'moov', b'trak', b'mdia', b'minf', b'stbl', b'edts'}
+
+
+# =====================================================
+# MP4 SAMPLE INDEX
+# =====================================================
+
+class Mp4SampleIndex:
+    """Video track sample index of an MP4 (keyframe times and byte offsets), parsed from the moov box only"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.duration = 0.0
+        self.sample_times = array('d')    # Decode time (s) of every video sample, edit list applied (sorted)
+        self.sample_offsets = array('q')  # Byte offset of every video sample
+        self.sample_sizes = array('l')
+        self.keyframes: List[int] = []    # Sample indexes (0-based) of sync samples
+        self.keyframe_times: List[float] = []  # Presentation time (s) of every sync sample - what inpoint seeks on
+        self._parse()
+
+    def _parse(self):
+        with open(self.path, 'rb') as f:
+            file_size = os.fstat(f.fileno()).st_size
+            moov = None
+            position = 0
+            while position + 8 <= file_size:
+                f.seek(position)
+                size, box_type = struct.unpack('>I4s', f.read(8))
+                header = 8
+                if size == 1:
+                    size = struct.unpack('>Q', f.read(8))[0]
+                    header = 16
+                elif size == 0:
+                    size = file_size - position
+                if box_type == b'moov':
+                    moov = f.read(size - header)  # Only the index is read - mdat is skipped
+                    break
+                if size < header:
+                    break
+                position += size
+        if moov is None:
+            raise ValueError(f"No moov box in {self.path}")
+
+        boxes = self._children(moov, 0, len(moov))
+        mvhd = boxes.get(b'mvhd')
+        if mvhd:
+            timescale, duration = self._timescale_duration(moov, mvhd)
+            self.duration = duration / timescale if timescale else 0.0
+
+        for trak_start, trak_end in self._all(moov, 0, len(moov), b'trak'):
+            trak = self._children(moov, trak_start, trak_end)
+            mdia = self._children(moov, *trak[b'mdia'])
+            hdlr_start = mdia[b'hdlr'][0]
+            if moov[hdlr_start + 8:hdlr_start + 12] != b'vide':
+                continue
+            timescale, _ = self._timescale_duration(moov, mdia[b'mdhd'])
+            media_offset = self._edit_media_time(moov, trak) / timescale
+            stbl = self._children(moov, *self._children(moov, *mdia[b'minf'])[b'stbl'])
+            self._parse_stbl(moov, stbl, timescale, media_offset)
+            return
+        raise ValueError(f"No video track in {self.path}")
+
+    @staticmethod
+    def _all(data: bytes, start: int, end: int, wanted: bytes) -> List[Tuple[int, int]]:
+        found = []
+        position = start
+        while position + 8 <= end:
+            size, box_type = struct.unpack_from('>I4s', data, position)
+            header = 8
+            if size == 1:
+                size = struct.unpack_from('>Q', data, position + 8)[0]
+                header = 16
+            elif size == 0:
+                size = end - position
+            if size < header:
+                break
+            if box_type == wanted:
+                found.append((position + header, position + size))
+            position += size
+        return found
+
+    @classmethod
+    def _children(cls, data: bytes, start: int, end: int) -> Dict[bytes, Tuple[int, int]]:
+        """First child box of each type: {type: (payload start, box end)}"""
+        children = {}
+        position = start
+        while position + 8 <= end:
+            size, box_type = struct.unpack_from('>I4s', data, position)
+            header = 8
+            if size == 1:
+                size = struct.unpack_from('>Q', data, position + 8)[0]
+                header = 16
+            elif size == 0:
+                size = end - position
+            if size < header:
+                break
+            children.setdefault(box_type, (position + header, position + size))
+            position += size
+        return children
+
+    @staticmethod
+    def _timescale_duration(data: bytes, box: Tuple[int, int]) -> Tuple[int, int]:
+        """(timescale, duration) of an mvhd / mdhd box"""
+        start = box[0]
+        if data[start] == 1:
+            return struct.unpack_from('>IQ', data, start + 20)
+        return struct.unpack_from('>II', data, start + 12)
+
+    def _edit_media_time(self, data: bytes, trak: Dict[bytes, Tuple[int, int]]) -> int:
+        """Media time the edit list starts playback at (demuxed timestamps are shifted by it)"""
+        if b'edts' not in trak:
+            return 0
+        elst = self._children(data, *trak[b'edts']).get(b'elst')
+        if not elst:
+            return 0
+        start = elst[0]
+        version = data[start]
+        count = struct.unpack_from('>I', data, start + 4)[0]
+        position = start + 8
+        for _ in range(count):
+            if version == 1:
+                _, media_time = struct.unpack_from('>Qq', data, position)
+                position += 20
+            else:
+                _, media_time = struct.unpack_from('>Ii', data, position)
+                position += 12
+            if media_time != -1:  # -1 = empty edit (delay), the next entry holds the media start
+                return media_time
+        return 0
+
+    def _parse_stbl(self, data: bytes, stbl: Dict[bytes, Tuple[int, int]], timescale: int, media_offset: float):
+        # stts: decode time of every sample
+        start = stbl[b'stts'][0]
+        count = struct.unpack_from('>I', data, start + 4)[0]
+        dts = 0
+        for i in range(count):
+            sample_count, delta = struct.unpack_from('>II', data, start + 8 + i * 8)
+            for _ in range(sample_count):
+                self.sample_times.append(dts / timescale - media_offset)
+                dts += delta
+        samples = len(self.sample_times)
+
+        # stss: sync samples (absent = every sample is a keyframe)
+        if b'stss' in stbl:
+            start = stbl[b'stss'][0]
+            count = struct.unpack_from('>I', data, start + 4)[0]
+            self.keyframes = [n - 1 for n in struct.unpack_from(f'>{count}I', data, start + 8)]
+        else:
+            self.keyframes = list(range(samples))
+
+        # ctts: presentation = decode time + composition offset (B-frames), the edit list removes the initial delay
+        composition = [0] * samples
+        if b'ctts' in stbl:
+            start = stbl[b'ctts'][0]
+            signed = data[start] == 1
+            count = struct.unpack_from('>I', data, start + 4)[0]
+            sample = 0
+            for i in range(count):
+                sample_count, offset = struct.unpack_from('>Ii' if signed else '>II', data, start + 8 + i * 8)
+                for _ in range(sample_count):
+                    if sample < samples:
+                        composition[sample] = offset
+                    sample += 1
+        self.keyframe_times = [self.sample_times[k] + composition[k] / timescale for k in self.keyframes if k < samples]
+
+        # stsz: sample sizes
+        start = stbl[b'stsz'][0]
+        uniform, count = struct.unpack_from('>II', data, start + 4)
+        self.sample_sizes = array('l', [uniform] * count if uniform else struct.unpack_from(f'>{count}I', data, start + 12))
+
+        # stco / co64 + stsc: byte offset of every sample
+        if b'stco' in stbl:
+            start = stbl[b'stco'][0]
+            count = struct.unpack_from('>I', data, start + 4)[0]
+            chunk_offsets = struct.unpack_from(f'>{count}I', data, start + 8)
+        else:
+            start = stbl[b'co64'][0]
+            count = struct.unpack_from('>I', data, start + 4)[0]
+            chunk_offsets = struct.unpack_from(f'>{count}Q', data, start + 8)
+
+        start = stbl[b'stsc'][0]
+        count = struct.unpack_from('>I', data, start + 4)[0]
+        runs = [struct.unpack_from('>III', data, start + 8 + i * 12)[:2] for i in range(count)]
+        sample = 0
+        for run, (first_chunk, samples_per_chunk) in enumerate(runs):
+            last_chunk = runs[run + 1][0] - 1 if run + 1 < len(runs) else len(chunk_offsets)
+            for chunk in range(first_chunk - 1, last_chunk):
+                offset = chunk_offsets[chunk]
+                for _ in range(samples_per_chunk):
+                    if sample >= len(self.sample_sizes):
+                        break
+                    self.sample_offsets.append(offset)
+                    offset += self.sample_sizes[sample]
+                    sample += 1
+
+    def keyframe_before(self, seconds: float) -> float:
+        """Time of the last keyframe at or before seconds (0.0 before the first one)"""
+        position = bisect_right(self.keyframe_times, seconds + 1e-6)
+        return max(0.0, self.keyframe_times[position - 1]) if position else 0.0
+
+    def byte_range(self, start_seconds: float, end_seconds: float) -> Tuple[int, int]:
+        """Bytes spanned by the video samples in [start_seconds, end_seconds) (audio is interleaved inside)"""
+        first = bisect_right(self.sample_times, start_seconds - 1e-6)
+        last = bisect_right(self.sample_times, end_seconds) - 1
+        if not self.sample_offsets or last < first:
+            return 0, 0
+        first = min(first, len(self.sample_offsets) - 1)
+        last = min(last, len(self.sample_offsets) - 1)
+        return self.sample_offsets[first], self.sample_offsets[last] + self.sample_sizes[last]
+
+
+# =====================================================
+# SEGMENT TIMELINE
+# =====================================================
+
+def get_hot_segment_timeline(segments_dir: str, segment_duration: float) -> List[Dict[str, Any]]:
+    """HOT segments on the wall clock: [{'path', 'start', 'end'}] in sequence order"""
+    timeline = []
+    for path in sorted(glob.glob(os.path.join(segments_dir, 'segment_*.ts'))):
+        try:
+            end = os.path.getmtime(path)
+        except OSError:
+            continue  # Deleted by FFmpeg (hls delete_segments) since the glob
+        timeline.append({'path': path, 'start': end - segment_duration, 'end': end})
+    return timeline
+
+
+def get_cold_chunk_pieces(cold_segments_dir: str, start_ts: float, end_ts: float) -> List[Dict[str, Any]]:
+    """
+    COLD chunk cuts covering [start_ts, end_ts): [{'path', 'inpoint', 'outpoint', 'start', 'end', 'bytes'}]
+
+    The first cut starts at the keyframe at or before start_ts. Chunks left over
+    from the same slot yesterday (mtime before the window) are ignored.
+    """
+    from shared.src.lib.utils.storage_path_utils import calculate_chunk_location
+
+    pieces = []
+    position = start_ts
+    while position < end_ts - MIN_PIECE_SECONDS:
+        moment = datetime.fromtimestamp(position)
+        hour, chunk_index = calculate_chunk_location(moment)
+        chunk_start = moment.replace(minute=chunk_index * 10, second=0, microsecond=0).timestamp()
+        chunk_end = chunk_start + CHUNK_SECONDS
+        chunk_path = os.path.join(cold_segments_dir, str(hour), f'chunk_10min_{chunk_index}.mp4')
+
+        try:
+            if os.path.getmtime(chunk_path) >= chunk_start:
+                index = Mp4SampleIndex(chunk_path)
+                inpoint = index.keyframe_before(position - chunk_start)
+                outpoint = min(end_ts, chunk_end) - chunk_start
+                if index.duration:
+                    outpoint = min(outpoint, index.duration)
+                if outpoint - inpoint >= MIN_PIECE_SECONDS:
+                    first_byte, last_byte = index.byte_range(inpoint, outpoint)
+                    pieces.append({'path': chunk_path, 'inpoint': inpoint, 'outpoint': outpoint,
+                                   'start': chunk_start + inpoint, 'end': chunk_start + outpoint,
+                                   'bytes': last_byte - first_byte})
+        except (OSError, ValueError, KeyError, struct.error) as e:
+            logger.warning(f"COLD chunk unusable for extraction: {chunk_path} ({e})")
+        position = chunk_end
+    return pieces
+
+
+# =====================================================
+# EXTRACTION
+# =====================================================
+
+def _concat_copy(entries: List[str], output_path: str, timeout: float, extra_args: Tuple[str, ...] = ()) -> Optional[str]:
+    """One concat-demuxer stream-copy run into an MP4. Returns the error, None on success."""
+    concat_file = f"{output_path}.concat.txt"
+    try:
+        with open(concat_file, 'w') as f:
+            f.write(''.join(entries))
+        process = subprocess.run([
+            'ffmpeg', '-y', '-f', 'concat', '-safe', '0', '-i', concat_file,
+            '-map', '0:v', '-map', '0:a?',
+            '-c', 'copy',  # No re-encoding
+            *extra_args,
+            '-movflags', '+faststart', '-f', 'mp4', output_path
+        ], capture_output=True, timeout=max(1.0, timeout))
+        if process.returncode != 0 or not os.path.exists(output_path):
+            return f"FFmpeg failed: {process.stderr.decode(errors='replace')[-200:]}"
+        return None
+    finally:
+        try:
+            os.remove(concat_file)
+        except OSError:
+            pass
+
+
+def probe_video(path: str, timeout: float = 10) -> Dict[str, Any]:
+    """Duration and stream types of a media file (ffprobe): {'duration', 'streams'}"""
+    process = subprocess.run([
+        'ffprobe', '-v', 'error', '-show_entries', 'format=duration:stream=codec_type', '-of', 'json', path
+    ], capture_output=True, timeout=timeout)
+    if process.returncode != 0:
+        raise ValueError(process.stderr.decode(errors='replace')[-200:])
+    info = json.loads(process.stdout or b'{}')
+    return {
+        'duration': float(info.get('format', {}).get('duration') or 0.0),
+        'streams': [stream.get('codec_type') for stream in info.get('streams', [])]
+    }
+
+
+def extract_video_window(start_ts: float, end_ts: float, output_path: str, hot_segments_dir: str,
+                         cold_segments_dir: str, segment_duration: float, timeout: int = 60) -> Dict[str, Any]:
+    """
+    Write the video of [start_ts, end_ts) to output_path with stream-copy FFmpeg runs.
+
+    Returns:
+        Dict with 'success', 'output_path', 'hot_segments', 'cold_pieces', 'cold_bytes',
+        'covered_seconds', 'duration', 'elapsed_ms' or 'error'
+    """
+    started = time.time()
+    deadline = started + timeout
+    hot = [segment for segment in get_hot_segment_timeline(hot_segments_dir, segment_duration)
+           if segment['end'] > start_ts and segment['start'] < end_ts]
+
+    # COLD only backfills what HOT no longer has (never overlaps the first HOT segment)
+    cold_until = hot[0]['start'] if hot else end_ts
+    cold = get_cold_chunk_pieces(cold_segments_dir, start_ts, cold_until) if cold_until - start_ts >= MIN_PIECE_SECONDS else []
+
+    covered = sum(piece['outpoint'] - piece['inpoint'] for piece in cold) + len(hot) * segment_duration
+    result = {
+        'success': False,
+        'output_path': None,
+        'hot_segments': len(hot),
+        'cold_pieces': len(cold),
+        'cold_bytes': sum(piece['bytes'] for piece in cold),
+        'covered_seconds': round(covered, 1)
+    }
+    if not hot and not cold:
+        result['error'] = 'No HOT segments or COLD chunks cover the window'
+        return result
+
+    cold_output = f"{output_path}.cold.mp4"
+    hot_output = f"{output_path}.hot.mp4"
+    temp_output = f"{output_path}.tmp"
+    try:
+        # MP4 and MPEG-TS are never mixed in one concat run: TS carries Annex B H.264 and ADTS AAC,
+        # the MP4 muxer would copy them verbatim after an MP4 first input (its avcC/ASC extradata wins)
+        parts = []
+        if cold:
+            error = _concat_copy([f"file '{piece['path']}'\ninpoint {piece['inpoint']:.3f}\noutpoint {piece['outpoint']:.3f}\n"
+                                  for piece in cold], cold_output, deadline - time.time())
+            if error:
+                result['error'] = f"COLD: {error}"
+                return result
+            parts.append(cold_output)
+        if hot:
+            error = _concat_copy([f"file '{segment['path']}'\n" for segment in hot], hot_output, deadline - time.time(),
+                                 ('-bsf:a', 'aac_adtstoasc'))
+            if error:
+                result['error'] = f"HOT: {error}"
+                return result
+            parts.append(hot_output)
+
+        if len(parts) == 1:
+            os.replace(parts[0], temp_output)
+        else:
+            # Both parts are MP4 now; COLD chunks are archived HOT segments, so codec parameters match
+            error = _concat_copy([f"file '{part}'\n" for part in parts], temp_output, deadline - time.time())
+            if error:
+                result['error'] = error
+                return result
+
+        # Accept the output only if it has video and roughly the duration of the pieces it was built from
+        probe = probe_video(temp_output, timeout=max(1.0, deadline - time.time()))
+        result['duration'] = round(probe['duration'], 1)
+        tolerance = max(OUTPUT_DURATION_TOLERANCE * covered, 2 * segment_duration)
+        if 'video' not in probe['streams'] or abs(probe['duration'] - covered) > tolerance:
+            result['error'] = f"Invalid output: {probe['duration']:.1f}s (expected {covered:.1f}s), streams {probe['streams']}"
+            return result
+
+        os.replace(temp_output, output_path)
+        result.update({'success': True, 'output_path': output_path})
+        return result
+    except (OSError, ValueError, subprocess.TimeoutExpired) as e:
+        result['error'] = str(e)
+        return result
+    finally:
+        result['elapsed_ms'] = int((time.time() - started) * 1000)
+        for path in (cold_output, hot_output, temp_output):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
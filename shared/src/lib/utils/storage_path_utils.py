@@ -20,7 +20,7 @@ import json
 import logging
 import re
 import time
-from typing import Optional
+from typing import Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
@@ -504,6 +504,74 @@ def get_thumbnails_path(device_folder):
     return get_capture_storage_path(device_folder, 'thumbnails')
 
 
+# =====================================================
+# CAPTURE PYRAMID
+# =====================================================
+# Every capture frame is written at two sizes by the capture FFmpeg filter graph
+# (run_ffmpeg_and_rename_local.sh): the thumbnail is scaled from the capture, so the
+# frame is decoded once. Level = pixel-area divisor of the 1280x720 capture.
+# Thumbnails live in HOT storage only and are evicted by hot_cold_archiver (HOT_LIMITS).
+#
+# Readers of the 1/16 level: freeze detection, incident uploads, zapping mosaics.
+# Full captures stay the input of KPI matching (template match against full-size
+# references) and of report screenshots (COLD copies, uploaded at capture size).
+# No intermediate level is written: no consumer reads one.
+CAPTURE_PYRAMID_LEVELS = {
+    1: {'subfolder': 'captures', 'suffix': '', 'width': 1280, 'height': 720},
+    16: {'subfolder': 'thumbnails', 'suffix': '_thumbnail', 'width': 320, 'height': 180},
+}
+
+
+def get_capture_pyramid_path(capture_path: str, level: int) -> str:
+    """
+    Get the path of a capture at a pyramid level (1 = capture, 16 = thumbnail).
+    
+    Preserves storage location (hot→hot, cold→cold). Captures outside a 'captures'
+    directory (e.g. KPI working dirs) keep their variants next to them.
+    
+    Examples:
+        >>> get_capture_pyramid_path('/var/www/html/stream/capture4/hot/captures/capture_000001.jpg', 16)
+        '/var/www/html/stream/capture4/hot/thumbnails/capture_000001_thumbnail.jpg'
+        
+        >>> get_capture_pyramid_path('/tmp/kpi_working/abc123/capture_000001.jpg', 16)
+        '/tmp/kpi_working/abc123/capture_000001_thumbnail.jpg'
+    """
+    if level not in CAPTURE_PYRAMID_LEVELS:
+        raise ValueError(f"Unknown capture pyramid level {level} (expected one of {sorted(CAPTURE_PYRAMID_LEVELS)})")
+    
+    info = CAPTURE_PYRAMID_LEVELS[level]
+    capture_dir = os.path.dirname(capture_path)
+    filename = os.path.basename(capture_path)
+    if not info['suffix']:
+        return capture_path
+    
+    if os.path.basename(capture_dir) == 'captures':
+        capture_dir = os.path.join(os.path.dirname(capture_dir), info['subfolder'])
+    
+    return os.path.join(capture_dir, filename.replace('.jpg', f"{info['suffix']}.jpg"))
+
+
+def get_capture_for_width(capture_path: str, min_width: int) -> Tuple[str, int]:
+    """
+    Smallest available pyramid level at least min_width pixels wide.
+    
+    Consumers that downscale anyway (zapping mosaics) read the
+    pre-scaled file instead of decoding the full capture. Falls back to the capture
+    itself when the smaller level was already evicted.
+    
+    Returns:
+        (path, width) - width of the selected level
+    """
+    for level in sorted(CAPTURE_PYRAMID_LEVELS, reverse=True):
+        info = CAPTURE_PYRAMID_LEVELS[level]
+        if info['width'] < min_width:
+            continue
+        path = get_capture_pyramid_path(capture_path, level)
+        if level == 1 or os.path.exists(path):
+            return path, info['width']
+    return capture_path, CAPTURE_PYRAMID_LEVELS[1]['width']
+
+
 def get_thumbnail_path_from_capture(capture_path: str) -> str:
     """
     Get thumbnail path from capture image path.
@@ -527,23 +595,7 @@ def get_thumbnail_path_from_capture(capture_path: str) -> str:
         >>> get_thumbnail_path_from_capture('/tmp/kpi_working/abc123/capture_000001.jpg')
         '/tmp/kpi_working/abc123/capture_000001_thumbnail.jpg'
     """
-    # Get directory and filename
-    capture_dir = os.path.dirname(capture_path)
-    capture_filename = os.path.basename(capture_path)
-    
-    # Generate thumbnail filename (capture_X.jpg → capture_X_thumbnail.jpg)
-    thumb_filename = capture_filename.replace('.jpg', '_thumbnail.jpg')
-    
-    # Check if capture is in a 'captures' directory
-    dir_basename = os.path.basename(capture_dir)
-    if dir_basename == 'captures':
-        # Replace captures directory with thumbnails directory
-        thumb_dir = os.path.join(os.path.dirname(capture_dir), 'thumbnails')
-    else:
-        # If not in captures directory (e.g., working directory), use same directory
-        thumb_dir = capture_dir
-    
-    return os.path.join(thumb_dir, thumb_filename)
+    return get_capture_pyramid_path(capture_path, 16)
 
 
 def get_metadata_path(device_folder):
@@ -931,9 +983,12 @@ def extract_test_video_hybrid(
     Extract test video using HYBRID approach (HOT + COLD).
     
     Strategy:
-    1. Try HOT segments first (recent data, last ~90s)
-    2. If not enough, backfill gap from COLD chunks
-    3. Merge both pieces seamlessly
+    1. Place HOT segments and COLD 10-minute chunks on the wall clock and keep
+       only the pieces overlapping [start_time, start_time + duration]
+    2. Cut COLD chunks at the keyframe before the start (MP4 sample index)
+    3. Write everything with ONE stream-copy FFmpeg pass (segment_extraction_utils)
+    
+    Falls back to the previous merge-then-concat extraction if the single pass fails.
     
     This solves the problem where archiver has already moved old segments to COLD,
     leaving only recent segments in HOT storage.
@@ -953,19 +1008,53 @@ def extract_test_video_hybrid(
         >>> video = extract_test_video_hybrid('capture3', test_start, 154, '/tmp/test.mp4')
         >>> # Creates video even if only 64s available in HOT (backfills 90s from COLD)
     """
-    from datetime import timedelta
+    try:
+        # PERFORMANCE: Timeline-selected pieces, keyframe-aligned COLD cut, stream copy only (no re-encode)
+        from shared.src.lib.utils.segment_extraction_utils import extract_video_window
+        
+        start_ts = start_time.timestamp()
+        result = extract_video_window(
+            start_ts,
+            start_ts + duration_seconds,
+            output_path,
+            hot_segments_dir=get_segments_path(device_folder),        # REUSE: auto hot/cold detection
+            cold_segments_dir=get_cold_segments_path(device_folder),
+            segment_duration=get_device_segment_duration(device_folder)  # REUSE: 1s or 4s per segment
+        )
+        if result['success']:
+            logger.info(f"[{device_folder}] Test video: {result['covered_seconds']}s from {result['cold_pieces']} COLD cut(s) "
+                        f"({result['cold_bytes'] / 1024 / 1024:.1f}MB) + {result['hot_segments']} HOT segments in {result['elapsed_ms']}ms")
+            return result['output_path']
+        logger.warning(f"[{device_folder}] Segment extraction failed ({result.get('error')}), using merge-then-concat extraction")
+    except Exception as e:
+        logger.warning(f"[{device_folder}] Segment extraction failed ({e}), using merge-then-concat extraction")
+    
+    return _extract_test_video_legacy(device_folder, start_time, duration_seconds, output_path)
+
+
+def _extract_test_video_legacy(
+    device_folder: str,
+    start_time,
+    duration_seconds: int,
+    output_path: str,
+    hot_segments_dir: str = None,
+    cold_segments_dir: str = None,
+    segment_duration: float = None
+) -> Optional[str]:
+    """
+    Previous extraction: last N HOT segments merged to MP4, COLD gap cut to its own
+    MP4, then both concatenated (fallback + benchmark baseline).
+    """
     import glob
     
     try:
-        end_time = start_time + timedelta(seconds=duration_seconds)
-        
         # ============================================
         # STEP 1: Check HOT segments (recent data)
         # ============================================
-        hot_segments_dir = get_segments_path(device_folder)  # REUSE: auto hot/cold detection
+        hot_segments_dir = hot_segments_dir or get_segments_path(device_folder)  # REUSE: auto hot/cold detection
         hot_segments = sorted(glob.glob(f"{hot_segments_dir}/segment_*.ts"))
         
-        segment_duration = get_device_segment_duration(device_folder)  # REUSE: 1s or 4s per segment
+        segment_duration = segment_duration or get_device_segment_duration(device_folder)  # REUSE: 1s or 4s per segment
         available_hot_seconds = int(len(hot_segments) * segment_duration)
         
         logger.info(f"[{device_folder}] Test video: need {duration_seconds}s, found {available_hot_seconds}s in HOT")
@@ -987,7 +1076,8 @@ def extract_test_video_hybrid(
         cold_gap_file = _extract_from_cold_chunks(
             device_folder,
             start_time,
-            gap_seconds
+            gap_seconds,
+            cold_segments_dir
         )
         
         if not cold_gap_file or not os.path.exists(cold_gap_file):
@@ -1030,7 +1120,8 @@ def extract_test_video_hybrid(
 def _extract_from_cold_chunks(
     device_folder: str,
     start_time,
-    duration_seconds: int
+    duration_seconds: int,
+    cold_segments_dir: str = None
 ) -> Optional[str]:
     """
     Extract video segment from COLD MP4 chunks using FFmpeg -ss/-t.
@@ -1054,7 +1145,7 @@ def _extract_from_cold_chunks(
         hour, chunk_index = calculate_chunk_location(start_time)
         
         # REUSE: Get COLD segments directory
-        cold_base = get_cold_segments_path(device_folder)
+        cold_base = cold_segments_dir or get_cold_segments_path(device_folder)
         chunk_path = os.path.join(cold_base, str(hour), f'chunk_10min_{chunk_index}.mp4')
         
         if not os.path.exists(chunk_path):
@@ -0,0 +1,77 @@
+"""
+Test Restart Decode Pass
+
+Tests that one FFmpeg decode feeds frames and both PCM formats to concurrent
+consumers, and that a stalled consumer is detached without blocking the pass.
+"""
+
+import importlib.util
+import io
+import os
+import shutil
+import subprocess
+import threading
+import wave
+
+import pytest
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..'))
+
+# Loaded from its file: the controllers package imports every device driver
+_spec = importlib.util.spec_from_file_location(
+    'video_restart_decode_helpers',
+    os.path.join(project_root, 'backend_host', 'src', 'controllers', 'verification', 'video_restart_decode_helpers.py'))
+restart_decode = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(restart_decode)
+RestartDecodePass = restart_decode.RestartDecodePass
+
+
+@pytest.mark.skipif(not shutil.which('ffmpeg'), reason='ffmpeg not on PATH')
+def test_one_pass_feeds_every_stage(tmp_path):
+    """Test 3 one-second segments give 3 aligned frames and both WAV formats, read concurrently"""
+    segments = []
+    for i in range(3):
+        path = str(tmp_path / f'segment_{i:09d}.mp4')
+        subprocess.run(['ffmpeg', '-loglevel', 'error', '-y', '-f', 'lavfi', '-i', 'testsrc=size=160x120:rate=10',
+                        '-f', 'lavfi', '-i', 'sine=frequency=440', '-t', '1', '-c:v', 'libx264', '-pix_fmt', 'yuv420p',
+                        '-c:a', 'aac', path], check=True)
+        segments.append((os.path.basename(path), path))
+
+    decode = RestartDecodePass(segments, 'test', queue_size=2)
+    assert decode.start() and decode.has_audio
+
+    outputs = {}
+    stages = [
+        threading.Thread(target=lambda: outputs.update(frames=decode.write_frames(str(tmp_path / 'frames' / 'video-1')))),
+        threading.Thread(target=lambda: outputs.update(speech=decode.write_wav('speech_pcm', str(tmp_path / 'speech.wav')))),
+        threading.Thread(target=lambda: outputs.update(dubbing=decode.write_wav('dubbing_pcm', str(tmp_path / 'dubbing.wav')))),
+    ]
+    for stage in stages:
+        stage.start()
+    for stage in stages:
+        stage.join(timeout=60)
+
+    result = decode.wait()
+    assert result['success'] and result['frames'] == len(outputs['frames']) == 3
+    with open(outputs['frames'][0], 'rb') as f:
+        assert f.read(2) == b'\xff\xd8'
+    for name, rate, channels in (('speech', 16000, 1), ('dubbing', 44100, 2)):
+        with wave.open(outputs[name]) as wav:
+            assert (wav.getframerate(), wav.getnchannels()) == (rate, channels)
+            assert wav.getnframes() / rate == pytest.approx(3.0, abs=0.2)
+
+
+def test_stalled_consumer_is_detached(monkeypatch):
+    """Test a consumer that never reads is dropped after the put timeout and still gets the end of stream"""
+    monkeypatch.setattr(restart_decode, 'RESTART_DECODE_PUT_TIMEOUT', 0.05)
+    decode = RestartDecodePass([], 'test')
+    decode.queues['frames'] = restart_decode.queue.Queue(maxsize=1)
+
+    jpeg = b'\xff\xd8' + b'\x00' * 16 + b'\xff\xd9'
+    reader = threading.Thread(target=decode._read_stream, args=('frames', io.BufferedReader(io.BytesIO(jpeg * 5))))
+    reader.start()
+    reader.join(timeout=5)
+
+    assert not reader.is_alive()
+    assert 'frames' in decode._detached and decode._frames == 5
+    assert list(decode.iter_stream('frames')) == []
@@ -0,0 +1,66 @@
+"""
+Test Agent Runtime Backlog
+
+Tests that events queued while an instance is busy are dispatched after the task
+ends, whether it completed or failed.
+"""
+
+import asyncio
+import os
+import sys
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..'))
+sys.path.insert(0, os.path.join(project_root, 'backend_server', 'src'))
+sys.path.insert(0, project_root)
+
+from agent.runtime import runtime as runtime_module
+from agent.runtime.runtime import AgentRuntime
+from agent.runtime.state import AgentInstanceState, AgentState
+from events.event_bus import Event, EventPriority
+
+
+class FailingBus:
+    """Event bus whose 'agent.task.started' publish fails, so every task ends in ERROR"""
+
+    def __init__(self):
+        self.published = []
+
+    async def publish(self, event):
+        self.published.append(event)
+        if event.type == 'agent.task.started':
+            raise RuntimeError('agent crashed')
+
+
+class RuntimeDB:
+    def update_instance_state(self, *args, **kwargs):
+        pass
+
+    def record_execution_history(self, **kwargs):
+        pass
+
+
+def test_backlog_dispatched_after_failed_task(monkeypatch):
+    """Test an event queued before the running task fails is still handled once the instance is in ERROR"""
+    monkeypatch.setattr(runtime_module, 'agent_runtime_db', RuntimeDB())
+
+    async def run():
+        bus = FailingBus()
+        runtime = AgentRuntime(event_bus=bus, lock_manager=object(), registry=object())
+        runtime.instances['agent-1'] = AgentInstanceState('agent-1', 'explorer', '1.0', AgentState.IDLE)
+
+        first = Event(type='device.offline', payload={'device_id': 'd1'}, priority=EventPriority.NORMAL)
+        queued = Event(type='device.alert', payload={'device_id': 'd2'}, priority=EventPriority.HIGH)
+        await runtime.handle_event('agent-1', first)
+        await runtime.handle_event('agent-1', queued)   # Instance busy - goes to the backlog
+        assert len(runtime.pending_events['agent-1']) == 1
+
+        while runtime.tasks:
+            await asyncio.gather(*list(runtime.tasks.values()))
+        return bus, runtime
+
+    bus, runtime = asyncio.run(run())
+    started = [event.payload['task_id'] for event in bus.published if event.type == 'agent.task.started']
+    failed = [event.payload['task_id'] for event in bus.published if event.type == 'agent.task.failed']
+    assert len(started) == 2 and failed == started
+    assert 'agent-1' not in runtime.pending_events
+    assert runtime.instances['agent-1'].state == AgentState.ERROR
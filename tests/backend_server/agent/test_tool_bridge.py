@@ -0,0 +1,126 @@
+"""
+Test Tool Bridge Result Cache
+
+Tests TTL expiry, group invalidation (including results computed across an
+invalidation), copy-on-read, and the read-only grouping of execute_batch.
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..'))
+sys.path.insert(0, os.path.join(project_root, 'backend_server', 'src'))
+sys.path.insert(0, project_root)
+
+from agent.core import tool_bridge
+from agent.core.tool_bridge import ToolBridge
+
+TOOLS = ['list_nodes', 'list_testcases', 'get_execution_status', 'create_node']
+
+
+class MCPServer:
+    """MCP server stand-in: counts calls, optional hook runs inside a call"""
+
+    def __init__(self):
+        self.calls = []
+        self.hook = None
+        self._lock = threading.Lock()
+
+    def get_available_tools(self):
+        return [{'name': name, 'description': name, 'inputSchema': {'type': 'object'}} for name in TOOLS]
+
+    def handle_tool_call(self, tool_name, params):
+        with self._lock:
+            self.calls.append(tool_name)
+            version = len(self.calls)
+        if self.hook:
+            self.hook(tool_name)
+        return {'content': [{'type': 'text', 'text': f"{tool_name} v{version}"}], 'version': version}
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+def _bridge():
+    server = MCPServer()
+    return ToolBridge(mcp_server=server), server
+
+
+def test_cached_result_expires_after_ttl(monkeypatch):
+    """Test a read-only result is served from cache until its TTL, then fetched again"""
+    clock = Clock()
+    monkeypatch.setattr(tool_bridge, 'time', clock)
+    bridge, server = _bridge()
+
+    first = bridge.execute('list_nodes', {'tree_id': 't1'})
+    assert bridge.execute('list_nodes', {'tree_id': 't1'}) == first
+    assert bridge.execute('list_nodes', {'tree_id': 't2'})['version'] == 2   # Other params, other entry
+    clock.now += tool_bridge.CACHEABLE_TOOLS['list_nodes'][1] + 1
+    assert bridge.execute('list_nodes', {'tree_id': 't1'})['version'] == 3
+    assert bridge.cache_stats['hits'] == 1
+
+
+def test_cached_result_is_a_copy():
+    """Test mutating a returned result does not change what the next caller gets"""
+    bridge, _ = _bridge()
+    first = bridge.execute('list_nodes', {})
+    first['content'][0]['text'] = 'mutated by the caller'
+    assert bridge.execute('list_nodes', {})['content'][0]['text'] == 'list_nodes v1'
+
+
+def test_mutating_tool_invalidates_its_groups_only():
+    """Test create_node drops cached tree results but keeps testcase results"""
+    bridge, server = _bridge()
+    bridge.execute('list_nodes', {})
+    bridge.execute('list_testcases', {})
+    bridge.execute('create_node', {'label': 'home'})
+
+    assert bridge.execute('list_nodes', {})['version'] == 4
+    assert bridge.execute('list_testcases', {})['version'] == 2
+    assert server.calls == ['list_nodes', 'list_testcases', 'create_node', 'list_nodes']
+
+
+def test_result_computed_across_invalidation_not_cached():
+    """Test a read that overlaps an invalidation of its group is returned but not cached"""
+    bridge, server = _bridge()
+    server.hook = lambda tool_name: bridge.invalidate('tree') if tool_name == 'list_nodes' and len(server.calls) == 1 else None
+
+    assert bridge.execute('list_nodes', {})['version'] == 1
+    assert bridge.execute('list_nodes', {})['version'] == 2   # v1 may predate the change: refetched
+    assert bridge.execute('list_nodes', {})['version'] == 2
+
+
+def test_execute_batch_runs_reads_concurrently_and_writes_alone():
+    """Test consecutive read-only calls overlap, a mutating call waits for them, results stay in call order"""
+    bridge, server = _bridge()
+    active, peak, order = [0], [0], []
+    lock = threading.Lock()
+
+    def hook(tool_name):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+            order.append(('start', tool_name))
+        time.sleep(0.05)
+        with lock:
+            active[0] -= 1
+            order.append(('end', tool_name))
+
+    server.hook = hook
+    calls = [('list_nodes', {}), ('get_execution_status', {}), ('create_node', {}), ('list_testcases', {})]
+    outcomes = asyncio.run(bridge.execute_batch(calls))
+
+    assert [error for _, error in outcomes] == [None] * 4
+    assert [result['content'][0]['text'].split()[0] for result, _ in outcomes] == [name for name, _ in calls]
+    assert peak[0] == 2
+    create_start = order.index(('start', 'create_node'))
+    assert ('end', 'list_nodes') in order[:create_start] and ('end', 'get_execution_status') in order[:create_start]
+    assert order.index(('end', 'create_node')) < order.index(('start', 'list_testcases'))
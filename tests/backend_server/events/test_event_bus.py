@@ -0,0 +1,108 @@
+"""
+Test Event Bus
+
+Tests publish/deliver, batched logging and id uniqueness on the LocalRedis stand-in.
+"""
+
+import asyncio
+import os
+import sys
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..'))
+sys.path.insert(0, os.path.join(project_root, 'backend_server', 'src'))
+sys.path.insert(0, project_root)
+
+from events.event_bus import Event, EventBus, EventLogWriter, EventPriority
+from events.local_redis import LocalRedis
+
+
+def _make_bus(logged):
+    writer = EventLogWriter(write_batch=lambda rows: logged.append(rows) or len(rows), flush_interval=0.01)
+    return EventBus(redis_client=LocalRedis(), log_writer=writer)
+
+
+def test_event_ids_unique_under_burst():
+    """Test ids do not collide when created in the same millisecond"""
+    ids = {Event(type="test.event", payload={}, priority=EventPriority.LOW).id for _ in range(5000)}
+    assert len(ids) == 5000
+
+
+def test_publish_delivers_and_logs_in_batches():
+    """Test events reach every subscriber and are logged in batches"""
+    async def run():
+        logged = []
+        bus = _make_bus(logged)
+        received_a, received_b = [], []
+
+        async def handler_a(event):
+            received_a.append(event.id)
+
+        await bus.subscribe("test.event", handler_a)
+        await bus.start()
+        await bus.subscribe("test.event", lambda event: received_b.append(event.id))
+
+        events = [Event(type="test.event", payload={"n": i}, priority=EventPriority.NORMAL) for i in range(50)]
+        for event in events:
+            await bus.publish(event)
+        await asyncio.sleep(0)
+        await bus.drain()
+
+        metrics = bus.get_metrics()
+        await bus.disconnect()
+        return events, received_a, received_b, logged, metrics
+
+    events, received_a, received_b, logged, metrics = asyncio.run(run())
+
+    assert received_a == [event.id for event in events]
+    assert received_b == [event.id for event in events]
+    assert sum(len(batch) for batch in logged) == 50
+    assert len(logged) < 50
+    assert metrics['delivered'] == 100
+    assert metrics['latency_ms']['samples'] == 100
+
+
+def test_slow_subscriber_does_not_block_others():
+    """Test subscribers are dispatched concurrently"""
+    async def run():
+        bus = _make_bus([])
+        fast = []
+        release = asyncio.Event()
+
+        async def slow(event):
+            await release.wait()
+
+        await bus.subscribe("test.event", slow)
+        await bus.subscribe("test.event", lambda event: fast.append(event.id))
+        await bus.start()
+
+        for i in range(3):
+            await bus.publish(Event(type="test.event", payload={"n": i}, priority=EventPriority.HIGH))
+        for _ in range(10):
+            await asyncio.sleep(0)
+
+        fast_count = len(fast)
+        release.set()
+        await bus.drain()
+        await bus.disconnect()
+        return fast_count
+
+    assert asyncio.run(run()) == 3
+
+
+def test_priority_queue_orders_and_coalesces():
+    """Test CRITICAL events come first and device repeats merge into one"""
+    from events.priority_queue import PriorityEventQueue
+
+    queue = PriorityEventQueue(coalesce_window=60)
+    queue.push(Event(type="metrics.collected", payload={}, priority=EventPriority.LOW))
+    for _ in range(20):
+        queue.push(Event(type="alert.blackscreen", payload={"device_id": "device1"}, priority=EventPriority.CRITICAL))
+    queue.push(Event(type="alert.blackscreen", payload={"device_id": "device2"}, priority=EventPriority.CRITICAL))
+
+    assert len(queue) == 3
+    first, _ = queue.pop()
+    second, _ = queue.pop()
+    last, _ = queue.pop()
+    assert (first.payload["device_id"], first.count) == ("device1", 20)
+    assert (second.payload["device_id"], second.count) == ("device2", 1)
+    assert last.type == "metrics.collected"
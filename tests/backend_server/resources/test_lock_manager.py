@@ -0,0 +1,146 @@
+"""
+Test Resource Lock Manager
+
+Tests that two concurrent acquirers never both hold a resource, in-process and
+against a lock taken directly in the DB by another process (campaign executor),
+and that acquire never waits for the DB.
+"""
+
+import asyncio
+import os
+import sys
+import threading
+from datetime import datetime, timedelta
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..'))
+sys.path.insert(0, os.path.join(project_root, 'backend_server', 'src'))
+sys.path.insert(0, project_root)
+
+from events.event_bus import EventBus, EventLogWriter
+from events.local_redis import LocalRedis
+from resources.lock_manager import ResourceLockManager
+from shared.src.lib.database import resource_locks_db
+
+
+class LockTable:
+    """resource_locks with the unique resource_id index (conditional insert semantics)"""
+
+    def __init__(self):
+        self.rows = {}
+        self._lock = threading.Lock()
+
+    def insert_lock(self, resource_id, resource_type, owner_id, owner_type='agent', timeout_seconds=3600,
+                    priority=3, team_id='default', acquired_at=None):
+        with self._lock:
+            row = self.rows.get(resource_id)
+            if row and row['expires_at'] > datetime.utcnow():
+                return None
+            now = acquired_at or datetime.utcnow()
+            self.rows[resource_id] = {
+                'resource_id': resource_id, 'resource_type': resource_type, 'owner_id': owner_id,
+                'owner_type': owner_type, 'acquired_at': now.isoformat(),
+                'expires_at': now + timedelta(seconds=timeout_seconds), 'priority': priority, 'team_id': team_id
+            }
+            return f"lock-{owner_id}"
+
+    def release_lock(self, resource_id, owner_id, team_id='default'):
+        with self._lock:
+            if self.rows.get(resource_id, {}).get('owner_id') == owner_id:
+                del self.rows[resource_id]
+                return True
+            return False
+
+    def get_active_lock(self, resource_id):
+        row = self.rows.get(resource_id)
+        return dict(row, expires_at=row['expires_at'].isoformat()) if row else None
+
+
+def _install(monkeypatch, table):
+    monkeypatch.setattr(resource_locks_db, 'get_supabase', lambda: object())
+    monkeypatch.setattr(resource_locks_db, 'insert_lock', table.insert_lock)
+    monkeypatch.setattr(resource_locks_db, 'release_lock', table.release_lock)
+    monkeypatch.setattr(resource_locks_db, 'get_active_lock', table.get_active_lock)
+    monkeypatch.setattr(resource_locks_db, 'add_to_queue', lambda *args: True)
+    monkeypatch.setattr(resource_locks_db, 'remove_from_queue', lambda *args: True)
+
+
+def _manager():
+    writer = EventLogWriter(write_batch=lambda rows: len(rows), flush_interval=0.01)
+    return ResourceLockManager(event_bus=EventBus(redis_client=LocalRedis(), log_writer=writer))
+
+
+def test_concurrent_acquirers_get_one_lease(monkeypatch):
+    """Test two agents racing for a device: one holds it, the other is queued and handed it on release"""
+    table = LockTable()
+    _install(monkeypatch, table)
+
+    async def run():
+        manager = _manager()
+        results = await asyncio.gather(
+            manager.acquire('host1:device1', 'device', 'agent-a'),
+            manager.acquire('host1:device1', 'device', 'agent-b'),
+        )
+        holder = manager.get_status('host1:device1')['owner_id']
+        await manager.release('host1:device1', holder)
+        await manager.stop()
+        return results, holder, table.rows['host1:device1']['owner_id']
+
+    results, first_holder, next_holder = asyncio.run(run())
+    assert sorted(results) == [False, True]
+    assert first_holder == 'agent-a'
+    assert next_holder == 'agent-b'
+
+
+def test_acquirer_loses_to_db_lock_of_other_process(monkeypatch):
+    """Test an agent granted a device a campaign executor locked in the DB (not yet reconciled) is revoked and queued"""
+    table = LockTable()
+    _install(monkeypatch, table)
+
+    async def run():
+        manager = _manager()
+        published = []
+        publish = manager.event_bus.publish
+
+        async def record(event):
+            published.append((event.type, event.payload.get('owner_id')))
+            await publish(event)
+
+        manager.event_bus.publish = record
+        campaign = await asyncio.to_thread(resource_locks_db.acquire_lock, 'host1:device1', 'device', 'campaign-1', 'campaign')
+        agent = await manager.acquire('host1:device1', 'device', 'agent-a')
+        await manager.stop()   # Waits for the background insert check
+        return campaign, agent, manager.get_status('host1:device1'), manager.stats['lost_races'], published
+
+    campaign, agent, status, lost_races, published = asyncio.run(run())
+    assert campaign and agent   # Granted from memory, without waiting for the DB
+    assert status['owner_id'] == 'campaign-1' and status['queue_length'] == 1
+    assert table.rows['host1:device1']['owner_id'] == 'campaign-1'
+    assert lost_races == 1
+    assert ('resource.revoked', 'agent-a') in published
+
+
+def test_acquire_does_not_wait_for_db_writes(monkeypatch):
+    """Test acquire returns while the conditional insert is still queued behind a slow DB"""
+    table = LockTable()
+    _install(monkeypatch, table)
+    release_db = threading.Event()
+    insert_lock = table.insert_lock
+
+    def slow_insert(*args):
+        release_db.wait(5)
+        return insert_lock(*args)
+
+    monkeypatch.setattr(resource_locks_db, 'insert_lock', slow_insert)
+
+    async def run():
+        manager = _manager()
+        acquired = await asyncio.wait_for(manager.acquire('host1:device1', 'device', 'agent-a'), timeout=1)
+        pending = manager.get_stats()['pending_db_writes']
+        release_db.set()
+        await manager.stop()
+        return acquired, pending, manager.get_stats()
+
+    acquired, pending, stats = asyncio.run(run())
+    assert acquired and pending == 1
+    assert stats['acquire_calls'] == 1 and stats['avg_acquire_us'] > 0
+    assert table.rows['host1:device1']['owner_id'] == 'agent-a'
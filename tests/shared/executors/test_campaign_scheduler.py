@@ -0,0 +1,163 @@
+"""
+Test Campaign Scheduler
+
+Tests the parallel lane scheduler of the campaign executor: one step per device
+at a time, concurrent hosts, the per-host slot cap shared by campaigns, and the
+sequential mode keeping the historical one-after-the-other order.
+"""
+
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..'))
+sys.path.insert(0, project_root)
+
+pytest.importorskip('shared.src.lib.executors', reason='executors package dependencies not installed')
+from shared.src.lib.executors import campaign_executor
+from shared.src.lib.executors.campaign_executor import CampaignExecutionContext, CampaignExecutor
+
+STEP_SECONDS = 0.1
+
+
+class Host:
+    def __init__(self, host_name, device_count):
+        self.host_name = host_name
+        self.device_count = device_count
+
+    def get_device_count(self):
+        return self.device_count
+
+
+class LockTable:
+    """resource_locks stand-in: one owner per resource_id"""
+
+    DEFAULT_TEAM_ID = 'default'
+
+    def __init__(self):
+        self.owners = {}
+        self.acquired = []
+        self._lock = threading.Lock()
+
+    def get_supabase(self):
+        return self
+
+    def acquire_lock(self, resource_id, resource_type, owner_id, owner_type, timeout_seconds, team_id):
+        with self._lock:
+            if self.owners.get(resource_id, owner_id) != owner_id:
+                return None
+            self.owners[resource_id] = owner_id
+            self.acquired.append(resource_id)
+            return f"lock-{len(self.acquired)}"
+
+    def release_lock(self, resource_id, owner_id, team_id):
+        with self._lock:
+            if self.owners.get(resource_id) == owner_id:
+                del self.owners[resource_id]
+
+
+class StepRecorder:
+    """Replaces script execution: records when each step ran and how many ran at once per host"""
+
+    def __init__(self):
+        self.runs = []
+        self.active = {}
+        self.peak = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, context, campaign_config, script_config, execution_order, device_id=None):
+        host = context.host.host_name
+        with self._lock:
+            self.active[host] = self.active.get(host, 0) + 1
+            self.peak[host] = max(self.peak.get(host, 0), self.active[host])
+        started = time.monotonic()
+        time.sleep(STEP_SECONDS)
+        with self._lock:
+            self.active[host] -= 1
+            self.runs.append({'host': host, 'device': device_id, 'order': execution_order,
+                              'campaign': context.campaign_id, 'start': started, 'end': time.monotonic()})
+        return {'success': True, 'execution_order': execution_order, 'script_name': script_config['script_name']}
+
+
+@pytest.fixture
+def recorder(monkeypatch):
+    locks = LockTable()
+    recorder = StepRecorder()
+    monkeypatch.setattr(campaign_executor, 'resource_locks_db', locks)
+    monkeypatch.setattr(campaign_executor, '_host_slots', {})
+    monkeypatch.setattr(campaign_executor, 'DEVICE_LOCK_POLL_SECONDS', 0.01)
+    monkeypatch.setattr(CampaignExecutor, '_execute_single_script', recorder)  # Not a function: called without self
+    recorder.locks = locks
+    return recorder
+
+
+def _run_campaign(campaign_id, host, devices, parallel=True):
+    """Run one campaign with one step per entry of devices"""
+    context = CampaignExecutionContext(campaign_id, campaign_id)
+    context.host = host
+    scripts = [{'script_name': f'step_{i}.py', 'script_type': 'script', 'device': device} for i, device in enumerate(devices, 1)]
+    context.total_scripts = len(scripts)
+    CampaignExecutor()._execute_steps(context, {'device': 'device1'}, scripts, {'parallel': parallel})
+    return context
+
+
+def _run_concurrently(*campaigns):
+    threads = [threading.Thread(target=_run_campaign, args=campaign) for campaign in campaigns]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def _overlap(a, b):
+    return a['start'] < b['end'] and b['start'] < a['end']
+
+
+def test_steps_on_one_device_serialize(recorder):
+    """Test two steps on the same device never overlap, while another device runs alongside"""
+    context = _run_campaign('campaign-a', Host('host-a', 2), ['device1', 'device1', 'device2'])
+
+    by_order = {run['order']: run for run in recorder.runs}
+    assert not _overlap(by_order[1], by_order[2])
+    assert _overlap(by_order[1], by_order[3])
+    assert context.successful_scripts == 3
+    assert recorder.locks.acquired.count('host-a:device1') == 2 and not recorder.locks.owners
+
+
+def test_device_lock_serializes_campaigns(recorder):
+    """Test two campaigns on the same device of a host wait for each other's device lock"""
+    _run_concurrently(('campaign-a', Host('host-a', 2), ['device1']), ('campaign-b', Host('host-a', 2), ['device1']))
+
+    first, second = recorder.runs
+    assert first['campaign'] != second['campaign'] and not _overlap(first, second)
+
+
+def test_different_hosts_run_concurrently(recorder):
+    """Test campaigns on different hosts do not share a slot, even with one slot per host"""
+    _run_concurrently(('campaign-a', Host('host-a', 1), ['device1']), ('campaign-b', Host('host-b', 1), ['device1']))
+
+    first, second = recorder.runs
+    assert first['host'] != second['host'] and _overlap(first, second)
+
+
+def test_host_slot_limit_shared_by_campaigns(recorder, monkeypatch):
+    """Test concurrent campaigns never run more steps on a host than its slot limit"""
+    monkeypatch.setattr(campaign_executor, 'MAX_PARALLEL_PER_HOST', 2)
+    _run_concurrently(('campaign-a', Host('host-a', 4), ['device1', 'device2']),
+                      ('campaign-b', Host('host-a', 4), ['device3', 'device4']))
+
+    assert len(recorder.runs) == 4
+    assert recorder.peak['host-a'] == 2
+
+
+def test_sequential_mode_keeps_order(recorder):
+    """Test parallel=False runs steps one after the other in configuration order, without device locks"""
+    context = _run_campaign('campaign-a', Host('host-a', 3), ['device1', 'device2', 'device3'], parallel=False)
+
+    assert [run['order'] for run in recorder.runs] == [1, 2, 3]
+    assert all(a['end'] <= b['start'] for a, b in zip(recorder.runs, recorder.runs[1:]))
+    assert [result['execution_order'] for result in context.script_executions] == [1, 2, 3]
+    assert recorder.locks.acquired == []
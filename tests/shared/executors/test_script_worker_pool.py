@@ -0,0 +1,57 @@
+"""
+Test Script Worker Pool
+
+Tests that project modules preloaded by a warm worker are reused by every run
+instead of being re-imported, and re-imported only when the run env changes.
+"""
+
+import os
+import sys
+
+import pytest
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..'))
+sys.path.insert(0, project_root)
+
+# Workers start with `python -m shared.src.lib.executors.script_worker_pool`, which imports the package
+pytest.importorskip('shared.src.lib.executors', reason='executors package dependencies not installed')
+from shared.src.lib.executors.script_worker_pool import ScriptWorkerPool
+
+PRELOADED = 'shared.src.lib.utils.kpi_search_utils'
+
+PROBE = f"""
+import sys
+preloaded = {PRELOADED!r} in sys.modules
+import {PRELOADED}
+print('PRELOADED', preloaded)
+"""
+
+
+def _output(run):
+    lines = []
+    while True:
+        line = run.readline(timeout=30)
+        if line is None:
+            break
+        lines.append(line)
+    assert run.wait() == 0, ''.join(lines)
+    return next(line.split() for line in lines if line.startswith('PRELOADED'))
+
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason='fork server needs os.fork')
+def test_warm_runs_reuse_preloaded_project_modules(tmp_path):
+    """Test consecutive runs find the project module already imported, and a changed env re-imports it"""
+    script = tmp_path / 'probe.py'
+    script.write_text(PROBE)
+    env = dict(os.environ)   # Same env as the worker was spawned with
+    pool = ScriptWorkerPool(pool_size=1, max_runs=10, socket_dir=str(tmp_path), preload_modules=[PRELOADED])
+    try:
+        first = _output(pool.start_run(str(script), [], env))
+        second = _output(pool.start_run(str(script), [], dict(env, TEAM_ID='team-2', AI_SCRIPT_NAME='probe')))
+        changed = _output(pool.start_run(str(script), [], dict(env, KPI_PROBE_WORKERS='8')))
+    finally:
+        pool.shutdown()
+
+    assert first[1] == 'True' and second[1] == 'True'   # Per-run keys keep the warm imports
+    assert changed[1] == 'False'                        # Import-time config changed: dropped, re-imported
+    assert pool.stats['pooled_runs'] == 3 and pool.stats['worker_starts'] == 1
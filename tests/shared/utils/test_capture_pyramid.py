@@ -0,0 +1,45 @@
+"""
+Test Capture Pyramid Paths
+
+Tests pyramid level path resolution and smallest-level selection with eviction fallback.
+"""
+
+import os
+import sys
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..'))
+sys.path.insert(0, project_root)
+
+from shared.src.lib.utils.storage_path_utils import (
+    get_capture_for_width,
+    get_capture_pyramid_path,
+    get_thumbnail_path_from_capture,
+)
+
+
+def _touch(path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(b'\xff\xd8\xff\xd9')
+    return str(path)
+
+
+def test_pyramid_paths_follow_storage_location():
+    """Test levels resolve to sibling folders for captures and stay in place for working dirs"""
+    capture = '/var/www/html/stream/capture4/hot/captures/capture_000000001.jpg'
+    assert get_capture_pyramid_path(capture, 1) == capture
+    assert get_capture_pyramid_path(capture, 16) == '/var/www/html/stream/capture4/hot/thumbnails/capture_000000001_thumbnail.jpg'
+    assert get_thumbnail_path_from_capture(capture) == '/var/www/html/stream/capture4/hot/thumbnails/capture_000000001_thumbnail.jpg'
+    assert get_thumbnail_path_from_capture('/tmp/kpi_working/abc/capture_000000001.jpg') == '/tmp/kpi_working/abc/capture_000000001_thumbnail.jpg'
+
+
+def test_smallest_available_level_is_selected(tmp_path):
+    """Test consumers get the smallest existing level wide enough, and the capture once levels are evicted"""
+    capture = _touch(tmp_path / 'captures' / 'capture_000000001.jpg')
+    thumbnail = _touch(tmp_path / 'thumbnails' / 'capture_000000001_thumbnail.jpg')
+
+    assert get_capture_for_width(capture, 200) == (thumbnail, 320)
+    assert get_capture_for_width(capture, 1280) == (capture, 1280)
+
+    os.remove(thumbnail)
+    assert get_capture_for_width(capture, 200) == (capture, 1280)
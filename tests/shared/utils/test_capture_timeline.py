@@ -0,0 +1,65 @@
+"""
+Test Capture Timeline Index
+
+Tests window queries against the on-disk index, and that a trim reload during a
+query never mixes records of the old and new index.
+"""
+
+import os
+import sys
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..'))
+sys.path.insert(0, project_root)
+
+from shared.src.lib.utils import capture_timeline_utils
+from shared.src.lib.utils.capture_timeline_utils import CaptureTimeline, record_capture, trim_capture_timeline
+
+NOW = 1_700_000_000.0
+
+
+def _device(tmp_path, count):
+    """SD-mode device with `count` frames, one per second ending at NOW"""
+    base = str(tmp_path / 'capture1')
+    os.makedirs(os.path.join(base, 'metadata'))
+    os.makedirs(os.path.join(base, 'captures'))
+    for sequence in range(count):
+        timestamp = NOW - (count - 1 - sequence)
+        path = os.path.join(base, 'captures', f"capture_{sequence:09d}.jpg")
+        with open(path, 'wb') as f:
+            f.write(b'\xff\xd8\xff\xd9')
+        os.utime(path, (timestamp, timestamp))
+        record_capture(base, sequence, timestamp)
+    return base
+
+
+def test_frames_between_returns_window(tmp_path):
+    """Test a window query returns the frames inside it, oldest first"""
+    timeline = CaptureTimeline(_device(tmp_path, 20))
+    frames = timeline.frames_between(NOW - 5, NOW - 2)
+    assert [frame['sequence'] for frame in frames] == [14, 15, 16, 17]
+    assert timeline.covers(NOW - 19) and not timeline.covers(NOW - 20)
+
+
+def test_trim_reload_during_query_keeps_snapshot(tmp_path, monkeypatch):
+    """Test a concurrent trim + reload while a query resolves frames leaves that query on its own snapshot"""
+    base = _device(tmp_path, 20)
+    timeline = CaptureTimeline(base)
+    timeline.refresh()
+
+    monkeypatch.setattr(capture_timeline_utils, 'TIMELINE_TRIM_SLACK_SECONDS', 0)
+    find_frame = CaptureTimeline._find_frame
+    reloaded = []
+
+    def find_frame_with_reload(folders, filename, timestamp):
+        # Another thread: the archiver trims the index and a second query reloads it
+        if not reloaded:
+            reloaded.append(trim_capture_timeline(base, retention_seconds=3, now=NOW))
+            timeline.refresh()
+        return find_frame(folders, filename, timestamp)
+
+    monkeypatch.setattr(CaptureTimeline, '_find_frame', staticmethod(find_frame_with_reload))
+    frames = timeline.frames_after(NOW - 10)
+
+    assert reloaded == [16] and len(timeline) == 4
+    assert [frame['sequence'] for frame in frames] == list(range(9, 20))
+    assert all(frame['timestamp'] == NOW - (19 - frame['sequence']) for frame in frames)
@@ -0,0 +1,139 @@
+"""
+Test Execution Results Recorder
+
+Tests spooling while the database is unreachable, replay on recovery, bisection
+of rejected batches into a dead letter file, the replay cap and the fork reset.
+"""
+
+import glob
+import json
+import os
+import sys
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..'))
+sys.path.insert(0, project_root)
+
+from shared.src.lib.database import execution_results_recorder
+from shared.src.lib.database.execution_results_recorder import ExecutionResultsRecorder
+
+
+class APIError(Exception):
+    """Client error carrying a PostgreSQL / PostgREST code, like postgrest.APIError"""
+
+    def __init__(self, code):
+        super().__init__(f"error {code}")
+        self.code = code
+
+
+class FakeDatabase:
+    """write_batch stub: unreachable while down, rejects rows flagged 'bad' with a constraint violation"""
+
+    def __init__(self):
+        self.down = False
+        self.rows = []
+        self.calls = 0
+
+    def write_batch(self, table, rows, on_conflict):
+        self.calls += 1
+        if self.down:
+            raise ConnectionError("database unreachable")
+        if any(row.get('bad') for row in rows):
+            raise APIError('23502')
+        self.rows.extend(row['id'] for row in rows)
+        return True
+
+
+def _read_jsonl(pattern):
+    batches = []
+    for path in glob.glob(pattern):
+        with open(path, encoding='utf-8') as f:
+            batches.extend(json.loads(line) for line in f)
+    return batches
+
+
+def _recorder(database, tmp_path, **kwargs):
+    # No background thread: the tests drive every flush themselves
+    return ExecutionResultsRecorder(write_batch=database.write_batch, batch_size=4, spool_dir=str(tmp_path),
+                                    background=False, **kwargs)
+
+
+def test_unreachable_database_spools_and_replays(tmp_path):
+    """Test rows spooled while the database is down are written once by the next successful flush"""
+    database = FakeDatabase()
+    recorder = _recorder(database, tmp_path)
+
+    database.down = True
+    for i in range(6):
+        recorder.record('execution_results', {'id': i})
+    assert not recorder.flush()
+    assert database.calls == 1   # Rest of the flush goes straight to the spool
+    assert sum(len(b['rows']) for b in _read_jsonl(str(tmp_path / '*.jsonl'))) == 6
+
+    database.down = False
+    recorder.record('execution_results', {'id': 6})
+    assert recorder.flush()
+    assert sorted(database.rows) == list(range(7))
+    assert recorder.stats['replayed'] == 6
+    assert not glob.glob(str(tmp_path / '*.jsonl*'))
+
+
+def test_flush_reports_rows_spooled_by_the_background_drain(tmp_path):
+    """Test flush() is False when the background thread already spooled the caller's rows"""
+    database = FakeDatabase()
+    recorder = _recorder(database, tmp_path)
+
+    database.down = True
+    recorder.record('execution_results', {'id': 0})
+    recorder._flush_buffers()   # What the background thread does on its interval
+    assert recorder.pending == 0
+    assert not recorder.flush()
+
+    database.down = False
+    recorder.record('execution_results', {'id': 1})
+    assert recorder.flush()     # Failure was reported once, the next flush starts clean
+
+
+def test_rejected_rows_are_bisected_into_dead_letter(tmp_path):
+    """Test a batch with one invalid row writes the valid rows and never blocks later flushes"""
+    database = FakeDatabase()
+    recorder = _recorder(database, tmp_path)
+
+    for i in range(4):
+        recorder.record('execution_results', {'id': i, 'bad': i == 2})
+    assert recorder.flush()
+    assert sorted(database.rows) == [0, 1, 3]
+    assert recorder.stats['dead_lettered'] == 1 and recorder.stats['spooled'] == 0
+
+    dead = _read_jsonl(str(tmp_path / 'dead_letter' / '*.jsonl'))
+    assert [row['id'] for batch in dead for row in batch['rows']] == [2]
+    assert '23502' in dead[0]['error']
+
+
+def test_replay_is_capped(tmp_path):
+    """Test a spooled batch that keeps failing is dead-lettered after max_replays attempts"""
+    database = FakeDatabase()
+    recorder = _recorder(database, tmp_path, max_replays=2)
+
+    database.down = True
+    recorder.record('execution_results', {'id': 0})
+    recorder.flush()
+    for _ in range(3):
+        recorder.replay()
+
+    assert not _read_jsonl(str(tmp_path / '*.jsonl'))
+    assert recorder.stats['dead_lettered'] == 1
+    assert 'after 2 replays' in _read_jsonl(str(tmp_path / 'dead_letter' / '*.jsonl'))[0]['error']
+
+
+def test_fork_reset_drops_inherited_rows(tmp_path, monkeypatch):
+    """Test a forked child gets a fresh recorder and the inherited one never writes the parent's rows"""
+    database = FakeDatabase()
+    inherited = _recorder(database, tmp_path)
+    inherited.record('execution_results', {'id': 0})
+    monkeypatch.setattr(execution_results_recorder, '_recorder', inherited)
+
+    execution_results_recorder._reset_after_fork()
+    inherited.close()
+
+    assert execution_results_recorder.get_execution_results_recorder() is not inherited
+    assert inherited.pending == 0 and database.calls == 0
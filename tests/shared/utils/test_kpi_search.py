@@ -0,0 +1,72 @@
+"""
+Test KPI Search Engine
+
+Tests monotonic (gallop + k-ary) and backward scan searches against a simulated
+capture timeline, and hardlink pinning in the frame cache.
+"""
+
+import os
+import sys
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..'))
+sys.path.insert(0, project_root)
+
+from shared.src.lib.utils.kpi_search_utils import FrameCache, KPISearchEngine, is_monotonic_verification
+
+
+def test_monotonic_search_finds_first_match_with_few_probes():
+    """Test every appearance index is found exactly, far below one probe per frame"""
+    total = 150
+    for first_match in (0, 1, 7, 42, 100, 149):
+        engine = KPISearchEngine(lambda i: i >= first_match, workers=4)
+        result = engine.search(total, monotonic=True)
+        assert result['success'] and result['index'] == first_match
+        assert result['probes'] <= 20
+    assert not KPISearchEngine(lambda i: False, workers=4).search(total, monotonic=True)['success']
+    assert is_monotonic_verification([{'command': 'waitForImageToAppear'}], mode='auto')
+    assert not is_monotonic_verification([{'command': 'waitForImageToAppear'}, {'command': 'checkAudio'}], mode='auto')
+
+
+def test_monotonic_search_falls_back_to_scan_for_transient_match():
+    """Test a toast visible between gallop points and gone by the last frame is still found"""
+    timeline = [False] * 20 + [True] * 4 + [False] * 126
+    engine = KPISearchEngine(lambda i: timeline[i], workers=4)
+    result = engine.search(len(timeline), monotonic=True)
+    assert result['success'] and result['index'] == 20
+    assert result['algorithm'] == 'monotonic_fallback_scan'
+
+
+def test_warm_up_probe_runs_alone_and_is_reused():
+    """Test the warm-up probe runs before any concurrent round and is not verified again by the search"""
+    calls = []
+    engine = KPISearchEngine(lambda i: calls.append(i) or i >= 42, workers=4)
+    assert engine.warm_up(149)
+    result = engine.search(150, monotonic=True)
+    assert result['index'] == 42
+    assert calls[0] == 149 and calls.count(149) == 1 and len(calls) == result['probes']
+
+
+def test_scan_search_keeps_last_matching_block():
+    """Test a flickering reference resolves to the start of the last matching block, like the legacy scan"""
+    timeline = [False] * 10 + [True] * 3 + [False] * 5 + [True] * 12
+    engine = KPISearchEngine(lambda i: timeline[i], workers=3)
+    result = engine.search(len(timeline), monotonic=False, early_index=1)
+    assert result['success'] and result['index'] == 18
+    assert result['algorithm'] == 'backward_scan_parallel'
+
+
+def test_frame_cache_pins_with_hardlinks(tmp_path):
+    """Test pinned frames share the capture inode and outlive rotation of the source"""
+    source = tmp_path / 'captures' / 'capture_000000001.jpg'
+    source.parent.mkdir()
+    source.write_bytes(b'\xff\xd8\xff\xd9')
+    (tmp_path / 'work').mkdir()
+    cache = FrameCache(str(tmp_path / 'work'))
+
+    pinned = cache.pin(str(source))
+    assert cache.linked == 1 and os.stat(pinned).st_ino == os.stat(source).st_ino
+    os.remove(source)
+    assert os.path.exists(pinned)
+    assert cache.pin(str(tmp_path / 'captures' / 'capture_000000002.jpg')) is None
+    cache.close()
+    assert not os.path.exists(str(tmp_path / 'work'))
@@ -0,0 +1,83 @@
+"""
+Test Navigation Metrics Rollup Cache
+
+Tests that an incremental refresh picks up late merges into old buckets and
+compacted hours without double counting.
+"""
+
+import os
+import sys
+import time
+from datetime import datetime, timezone
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..'))
+sys.path.insert(0, project_root)
+
+from shared.src.lib.utils.navigation_metrics_rollup import (
+    ROLLUP_BUCKET_SECONDS,
+    ROLLUP_COMPACT_BUCKET_SECONDS,
+    NavigationMetricsCache,
+    fold_execution_results,
+)
+
+
+def _iso(epoch):
+    return datetime.fromtimestamp(epoch, tz=timezone.utc).isoformat()
+
+
+class RollupTable:
+    """navigation_metric_rollups: merge adds deltas and bumps updated_at, fetch filters like get_metric_rollups"""
+
+    def __init__(self):
+        self.rows = {}
+        self.clock = time.time() - 3600
+
+    def merge(self, deltas):
+        self.clock += 120
+        for delta in deltas:
+            key = (delta['element_id'], int(datetime.fromisoformat(delta['bucket_start']).timestamp()))
+            row = self.rows.setdefault(key, dict(delta, executions=0, successes=0, total_ms=0,
+                                                 duration_histogram=[0] * len(delta['duration_histogram'])))
+            row['executions'] += delta['executions']
+            row['successes'] += delta['successes']
+            row['total_ms'] += delta['total_ms']
+            row['duration_histogram'] = [a + b for a, b in zip(row['duration_histogram'], delta['duration_histogram'])]
+            row['updated_at'] = _iso(self.clock)
+
+    def compact(self, hour):
+        """retention.compact_navigation_metric_rollups for one hour"""
+        moved = [self.rows.pop(key) for key in list(self.rows) if hour < key[1] < hour + ROLLUP_COMPACT_BUCKET_SECONDS]
+        self.merge([dict(row, bucket_start=_iso(hour)) for row in moved])
+
+    def fetch(self, team_id, tree_id, since, updated_since=None):
+        rows = [row for key, row in self.rows.items()
+                if key[1] >= datetime.fromisoformat(since).timestamp()
+                and (updated_since is None or row['updated_at'] > updated_since)]
+        return sorted(rows, key=lambda row: row['bucket_start'])
+
+
+def _runs(executed_at, count, success=True):
+    return fold_execution_results([{'team_id': 'team', 'tree_id': 'tree', 'edge_id': 'edge', 'success': success,
+                                    'execution_time_ms': 500, 'executed_at': _iso(executed_at)}] * count)
+
+
+def test_refresh_picks_up_late_merges_and_compaction():
+    """Test a warm cache sees rows merged into old buckets and compacted hours with unchanged totals"""
+    now = time.time()
+    table = RollupTable()
+    old_hour = int((now - 30 * 3600) // ROLLUP_COMPACT_BUCKET_SECONDS) * ROLLUP_COMPACT_BUCKET_SECONDS
+    table.merge(_runs(old_hour, 2))
+    table.merge(_runs(old_hour + 2 * ROLLUP_BUCKET_SECONDS, 3))
+    table.merge(_runs(now - 60, 1))
+
+    cache = NavigationMetricsCache(fetch_rows=table.fetch, ttl=0)
+    assert cache.get_window_metrics('team', 'tree', ['7d'])['7d']['edges']['edge']['volume'] == 6
+
+    # Spool replay lands in a 3 hour old bucket, then the hourly compaction folds the old hour
+    table.merge(_runs(now - 3 * 3600, 4, success=False))
+    table.compact(old_hour)
+    metrics = cache.get_window_metrics('team', 'tree', ['24h', '7d'])
+    assert metrics['7d']['edges']['edge']['volume'] == 10
+    assert metrics['7d']['edges']['edge']['successes'] == 6
+    assert metrics['24h']['edges']['edge']['volume'] == 5
+    assert cache.stats['rows_fetched'] == 3 + 3   # Cold load, then the changed rows + the row inside the overlap
@@ -0,0 +1,147 @@
+"""
+Test R2 Transfer Engine
+
+Tests unchanged-object skipping, multipart resume and throttling against an
+in-memory S3-compatible stub.
+"""
+
+import hashlib
+import os
+import sys
+import time
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..'))
+sys.path.insert(0, project_root)
+
+from shared.src.lib.utils.r2_transfer_utils import MB, BandwidthThrottle, R2TransferEngine, local_etag
+
+
+def _send(body):
+    """Read a request body in socket-sized blocks, like the HTTP client does"""
+    return b''.join(iter(lambda: body.read(64 * 1024), b''))
+
+
+class LocalS3:
+    """Minimal S3 API (the calls R2TransferEngine makes), ETags computed like S3/R2"""
+
+    def __init__(self, fail_parts=()):
+        self.objects = {}   # key -> (body, etag, content_type)
+        self.uploads = {}   # upload_id -> {part_number: (body, etag)}
+        self.fail_parts = set(fail_parts)
+        self.calls = []
+
+    def head_object(self, Bucket, Key):
+        self.calls.append('head_object')
+        if Key not in self.objects:
+            raise KeyError('404 Not Found')
+        body, etag, _ = self.objects[Key]
+        return {'ContentLength': len(body), 'ETag': f'"{etag}"'}
+
+    def put_object(self, Bucket, Key, Body, ContentLength=None, ContentType=None, Metadata=None):
+        self.calls.append('put_object')
+        body = _send(Body)
+        self.objects[Key] = (body, hashlib.md5(body).hexdigest(), ContentType)
+
+    def create_multipart_upload(self, Bucket, Key, ContentType=None, Metadata=None):
+        upload_id = f"upload-{len(self.uploads) + 1}"
+        self.uploads[upload_id] = {}
+        return {'UploadId': upload_id}
+
+    def upload_part(self, Bucket, Key, UploadId, PartNumber, Body, ContentLength=None):
+        self.calls.append('upload_part')
+        if PartNumber in self.fail_parts:
+            self.fail_parts.discard(PartNumber)
+            raise ConnectionError('connection reset')
+        body = _send(Body)
+        etag = f'"{hashlib.md5(body).hexdigest()}"'
+        self.uploads[UploadId][PartNumber] = (body, etag)
+        return {'ETag': etag}
+
+    def list_parts(self, Bucket, Key, UploadId, **kwargs):
+        parts = self.uploads[UploadId]
+        return {'Parts': [{'PartNumber': n, 'ETag': etag} for n, (_, etag) in sorted(parts.items())], 'IsTruncated': False}
+
+    def complete_multipart_upload(self, Bucket, Key, UploadId, MultipartUpload):
+        parts = self.uploads.pop(UploadId)
+        body = b''.join(parts[p['PartNumber']][0] for p in MultipartUpload['Parts'])
+        digests = b''.join(hashlib.md5(parts[p['PartNumber']][0]).digest() for p in MultipartUpload['Parts'])
+        self.objects[Key] = (body, f"{hashlib.md5(digests).hexdigest()}-{len(parts)}", None)
+
+    def abort_multipart_upload(self, Bucket, Key, UploadId):
+        self.uploads.pop(UploadId, None)
+
+
+def _write(path, size):
+    with open(path, 'wb') as f:
+        f.write(os.urandom(size))
+    return str(path)
+
+
+def _engine(s3, tmp_path, **kwargs):
+    return R2TransferEngine(s3, 'bucket', throttle=BandwidthThrottle(0), multipart_threshold=12 * MB,
+                            chunk_size=5 * MB, multipart_concurrency=1, state_dir=str(tmp_path / 'state'), **kwargs)
+
+
+def test_unchanged_object_is_skipped(tmp_path):
+    """Test a second upload of the same file only costs a HEAD request"""
+    s3 = LocalS3()
+    engine = _engine(s3, tmp_path)
+    path = _write(tmp_path / 'reference.jpg', 200 * 1024)
+
+    first = engine.upload(path, 'reference-images/ui/logo.jpg', skip_unchanged=True)
+    second = engine.upload(path, 'reference-images/ui/logo.jpg', skip_unchanged=True)
+
+    assert first['success'] and not first['skipped']
+    assert second['success'] and second['skipped']
+    assert s3.calls.count('put_object') == 1
+
+
+def test_multipart_upload_resumes_after_interruption(tmp_path):
+    """Test an interrupted multipart upload only sends the missing parts on retry"""
+    s3 = LocalS3(fail_parts={3})
+    engine = _engine(s3, tmp_path)
+    path = _write(tmp_path / 'video.mp4', 13 * MB)  # 3 parts of 5 MB
+
+    failed = engine.upload(path, 'script-reports/dev/video.mp4')
+    assert not failed['success'] and failed['resumable']
+
+    resumed = engine.upload(path, 'script-reports/dev/video.mp4')
+    assert resumed['success'] and resumed['multipart']
+    assert s3.calls.count('upload_part') == 4  # 1, 2, failed 3, retried 3
+    assert engine.stats['resumed'] == 1
+
+    with open(path, 'rb') as f:
+        assert s3.objects['script-reports/dev/video.mp4'][0] == f.read()
+    assert s3.objects['script-reports/dev/video.mp4'][1] == local_etag(path, 5 * MB)
+    assert engine.upload(path, 'script-reports/dev/video.mp4', skip_unchanged=True)['skipped']
+
+
+def test_upload_streams_through_throttle(tmp_path):
+    """Test an upload is throttled slice by slice as it is sent, never as one whole-file grant"""
+
+    class RecordingThrottle(BandwidthThrottle):
+        def __init__(self):
+            super().__init__(0)
+            self.grants = []
+
+        def consume(self, size):
+            self.grants.append(size)
+
+    throttle = RecordingThrottle()
+    s3 = LocalS3()
+    engine = R2TransferEngine(s3, 'bucket', throttle=throttle, multipart_threshold=12 * MB, state_dir=None)
+    path = _write(tmp_path / 'capture.mp4', 3 * MB)
+
+    assert engine.upload(path, 'captures/capture.mp4')['success']
+    assert sum(throttle.grants) == 3 * MB and max(throttle.grants) == 64 * 1024
+    with open(path, 'rb') as f:
+        assert s3.objects['captures/capture.mp4'][0] == f.read()
+
+
+def test_throttle_limits_bandwidth():
+    """Test the shared token bucket holds uploads to the configured rate"""
+    throttle = BandwidthThrottle(bytes_per_second=4 * MB)
+    started = time.monotonic()
+    throttle.consume(4 * MB)  # First second of budget is available immediately
+    throttle.consume(2 * MB)
+    assert 0.4 <= time.monotonic() - started < 1.0
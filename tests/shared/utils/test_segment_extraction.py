@@ -0,0 +1,98 @@
+"""
+Test Segment Extraction
+
+Tests the MP4 sample index against a small FFmpeg-generated chunk, and a
+window mixing a COLD MP4 chunk with HOT MPEG-TS segments.
+"""
+
+import glob
+import os
+import shutil
+import struct
+import subprocess
+import sys
+from datetime import datetime
+
+import pytest
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..'))
+sys.path.insert(0, project_root)
+
+from shared.src.lib.utils.segment_extraction_utils import Mp4SampleIndex, extract_video_window, probe_video
+
+requires_ffmpeg = pytest.mark.skipif(not shutil.which('ffmpeg'), reason='ffmpeg not on PATH')
+requires_ffprobe = pytest.mark.skipif(not shutil.which('ffmpeg') or not shutil.which('ffprobe'), reason='ffmpeg/ffprobe not on PATH')
+
+SOURCE = ['-f', 'lavfi', '-i', 'testsrc=size=160x120:rate=10', '-f', 'lavfi', '-i', 'sine=frequency=440:sample_rate=8000',
+          '-c:v', 'libx264', '-g', '10', '-keyint_min', '10', '-sc_threshold', '0', '-pix_fmt', 'yuv420p', '-c:a', 'aac']
+
+
+def _ffmpeg(*args):
+    subprocess.run(['ffmpeg', '-loglevel', 'error', '-y', *args], check=True)
+
+
+@requires_ffmpeg
+def test_sample_index_matches_encoded_chunk(tmp_path):
+    """Test keyframe presentation times and per-sample byte offsets of a faststart MP4 with B-frames and audio"""
+    chunk = str(tmp_path / 'chunk_10min_0.mp4')
+    _ffmpeg(*SOURCE, '-t', '3', '-movflags', '+faststart', chunk)
+    index = Mp4SampleIndex(chunk)
+
+    assert index.duration == pytest.approx(3.0, abs=0.1)
+    assert len(index.sample_times) == 30 and index.keyframes == [0, 10, 20]
+    assert index.keyframe_times == pytest.approx([0.0, 1.0, 2.0])
+    assert index.keyframe_before(1.55) == pytest.approx(1.0)
+    assert index.keyframe_before(0.99) == 0.0
+
+    # Every sample is a run of length-prefixed NAL units filling its size exactly; keyframes hold an IDR slice
+    with open(chunk, 'rb') as f:
+        for sample, (offset, size) in enumerate(zip(index.sample_offsets, index.sample_sizes)):
+            f.seek(offset)
+            data = f.read(size)
+            position, nal_types = 0, set()
+            while position < size:
+                length = struct.unpack_from('>I', data, position)[0]
+                nal_types.add(data[position + 4] & 0x1F)
+                position += 4 + length
+            assert position == size
+            assert (5 in nal_types) == (sample in index.keyframes)
+
+    first, last = index.byte_range(1.0, 2.0)
+    assert index.sample_offsets[10] <= first < last <= os.path.getsize(chunk)
+
+
+@requires_ffprobe
+def test_window_mixing_cold_chunk_and_hot_segments(tmp_path):
+    """Test a window spanning a COLD MP4 cut and HOT MPEG-TS segments decodes with video + audio for its duration"""
+    src_dir = tmp_path / 'src'
+    src_dir.mkdir()
+    _ffmpeg(*SOURCE, '-t', '15', '-f', 'segment', '-segment_time', '1', '-segment_format', 'mpegts',
+            '-reset_timestamps', '1', str(src_dir / 'segment_%09d.ts'))
+    segments = sorted(glob.glob(str(src_dir / 'segment_*.ts')))
+
+    chunk_start = datetime.now().replace(hour=10, minute=0, second=0, microsecond=0).timestamp()
+    cold_dir = tmp_path / 'segments'
+    (cold_dir / '10').mkdir(parents=True)
+    chunk = str(cold_dir / '10' / 'chunk_10min_0.mp4')
+    with open(tmp_path / 'list.txt', 'w') as f:
+        f.writelines(f"file '{segment}'\n" for segment in segments[:10])
+    _ffmpeg('-f', 'concat', '-safe', '0', '-i', str(tmp_path / 'list.txt'), '-c', 'copy', '-movflags', '+faststart', chunk)
+    os.utime(chunk, (chunk_start + 10, chunk_start + 10))
+
+    hot_dir = tmp_path / 'hot'
+    hot_dir.mkdir()
+    for i in range(10, len(segments)):
+        dest = str(hot_dir / os.path.basename(segments[i]))
+        shutil.copy(segments[i], dest)
+        os.utime(dest, (chunk_start + i + 1, chunk_start + i + 1))
+
+    output = str(tmp_path / 'test.mp4')
+    result = extract_video_window(chunk_start + 4, chunk_start + 15, output, str(hot_dir), str(cold_dir), segment_duration=1.0)
+
+    assert result['success'], result.get('error')
+    assert result['cold_pieces'] == 1 and result['hot_segments'] == 5
+    probe = probe_video(output)
+    assert probe['duration'] == pytest.approx(11.0, abs=1.0)
+    assert sorted(probe['streams']) == ['audio', 'video']
+    decode = subprocess.run(['ffmpeg', '-v', 'error', '-i', output, '-f', 'null', '-'], capture_output=True, text=True)
+    assert decode.returncode == 0 and not decode.stderr.strip()